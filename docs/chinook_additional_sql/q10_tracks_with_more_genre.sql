@@ -10,5 +10,5 @@ WHERE t.Name IN (SELECT
 				GROUP BY t.Name
 				HAVING COUNT(DISTINCT t.GenreId) > 1
 				ORDER BY COUNT(DISTINCT t.GenreId) DESC, t.TrackId)
-ORDER BY t.Name
-LIMIT 20
\ No newline at end of file
+ORDER BY t.Name, g.Name
+LIMIT :limit
\ No newline at end of file
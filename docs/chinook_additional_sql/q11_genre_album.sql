@@ -7,5 +7,5 @@ INNER JOIN album a
 INNER JOIN genre g
 	ON t.GenreId = g.GenreId
 -- WHERE t.AlbumId = 102 OR t.AlbumId = 251 
-ORDER BY t.AlbumId
-LIMIT 20
\ No newline at end of file
+ORDER BY t.AlbumId, g.Name
+LIMIT :limit
\ No newline at end of file
@@ -9,5 +9,5 @@ INNER JOIN album a
 INNER JOIN artist art
 	ON a.ArtistId = art.ArtistId
 -- WHERE a.ArtistId = 6 
-ORDER BY a.ArtistId
-LIMIT 20
\ No newline at end of file
+ORDER BY a.ArtistId, g.Name
+LIMIT :limit
\ No newline at end of file
@@ -9,4 +9,4 @@ INNER JOIN artist art
 	ON a.ArtistId = art.ArtistId
 GROUP BY a.ArtistId
 ORDER BY number_of_genre DESC, a.ArtistId
-LIMIT 20
\ No newline at end of file
+LIMIT :limit
\ No newline at end of file
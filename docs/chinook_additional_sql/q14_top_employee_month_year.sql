@@ -7,6 +7,7 @@ INNER JOIN customer c
 	ON i.CustomerId = c.CustomerId
 INNER JOIN employee e
 	ON c.SupportRepId = e.EmployeeId
-WHERE YEAR(i.InvoiceDate) = 2012 AND MONTH(i.InvoiceDate) = 08
+WHERE YEAR(i.InvoiceDate) = :year AND MONTH(i.InvoiceDate) = :month
 GROUP BY c.SupportRepId
-ORDER BY total_sales DESC, c.SupportRepId
\ No newline at end of file
+ORDER BY total_sales DESC, c.SupportRepId
+LIMIT :limit
\ No newline at end of file
@@ -9,6 +9,7 @@ INNER JOIN employee e
 	ON c.SupportRepId = e.EmployeeId
 INNER JOIN employee m
 	ON e.ReportsTo = m.EmployeeId
-WHERE YEAR(i.InvoiceDate) = 2012 AND MONTH(i.InvoiceDate) = 08
+WHERE YEAR(i.InvoiceDate) = :year AND MONTH(i.InvoiceDate) = :month
 GROUP BY manager_id
-ORDER BY total_revenue DESC
\ No newline at end of file
+ORDER BY total_revenue DESC, e.ReportsTo
+LIMIT :limit
\ No newline at end of file
@@ -6,4 +6,5 @@ FROM invoice i
 INNER JOIN customer c
 	ON i.CustomerId = c.CustomerId
 GROUP BY i.CustomerId
-ORDER BY total_amount DESC, i.CustomerId
\ No newline at end of file
+ORDER BY total_amount DESC, i.CustomerId
+LIMIT :limit
\ No newline at end of file
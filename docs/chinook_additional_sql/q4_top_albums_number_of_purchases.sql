@@ -9,4 +9,4 @@ INNER JOIN album a
 	ON t.AlbumId = a.AlbumId
 GROUP BY t.AlbumId
 ORDER BY number_of_purchases DESC, t.AlbumId
-LIMIT 20
\ No newline at end of file
+LIMIT :limit
\ No newline at end of file
@@ -11,11 +11,11 @@ FROM (
 			t.GenreId,
 			g.Name AS genre_name,
 			COUNT(il.InvoiceId) AS number_of_purchases,
-			ROW_NUMBER() OVER (PARTITION BY t.GenreId ORDER BY COUNT(il.InvoiceId) DESC) AS genre_rank
+			ROW_NUMBER() OVER (PARTITION BY t.GenreId ORDER BY COUNT(il.InvoiceId) DESC, t.TrackId) AS genre_rank
 		FROM track t
 		INNER JOIN invoiceline il
 			ON t.TrackId = il.TrackId
 		INNER JOIN genre g
 			ON t.GenreId = g.GenreId
 		GROUP BY t.TrackId) AS genre_ranked_table
-WHERE genre_ranked_table.genre_rank < 3
\ No newline at end of file
+WHERE genre_ranked_table.genre_rank <= :limit
\ No newline at end of file
@@ -4,4 +4,4 @@ SELECT
     t.Milliseconds
 FROM track t
 ORDER BY t.Milliseconds DESC, t.TrackId
-LIMIT 20
\ No newline at end of file
+LIMIT :limit
\ No newline at end of file
@@ -7,4 +7,4 @@ INNER JOIN track t
 	ON plt.TrackId = t.TrackId
 GROUP BY plt.TrackId
 ORDER BY number_of_playlist DESC, plt.TrackId
-LIMIT 20
\ No newline at end of file
+LIMIT :limit
\ No newline at end of file
@@ -19,6 +19,7 @@ import logging
 import mservice.utils as helper
 import mservice.connections as connections
 import mservice.aggregate_operation as db_aggregate
+import mservice.sketches as sketches_store
 
 LOGGER = logging.getLogger(__name__)
 
@@ -42,11 +43,16 @@ def main():
                                            helper.ARGUMENTS.user, helper.ARGUMENTS.password,
                                            helper.ARGUMENTS.host, helper.ARGUMENTS.database)
 
-    # Getting a session factory binded to previously created engine
-    session_factory = connections.get_session_factory(engine)
+    # Getting a session factory binded to previously created engine, or to the warehouse if one is given
+    session_factory = connections.get_report_session_factory(engine, helper.ARGUMENTS.warehouse)
     session = session_factory()
 
-    db_aggregate.get_top_album_purchases(session, helper.ARGUMENTS.number)
+    # Estimating from the sketches saved at the given path, opened once for the process, when one is given
+    sketches = None if helper.ARGUMENTS.sketches is None else \
+        sketches_store.open_shared_sketches(helper.ARGUMENTS.sketches)
+
+    db_aggregate.get_top_album_purchases(session, helper.ARGUMENTS.number, approximate=sketches is not None,
+                                         sketches=sketches)
 
 
 if __name__ == '__main__':
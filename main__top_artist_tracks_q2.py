@@ -42,8 +42,8 @@ def main():
                                            helper.ARGUMENTS.user, helper.ARGUMENTS.password,
                                            helper.ARGUMENTS.host, helper.ARGUMENTS.database)
 
-    # Getting a session factory binded to previously created engine
-    session_factory = connections.get_session_factory(engine)
+    # Getting a session factory binded to previously created engine, or to the warehouse if one is given
+    session_factory = connections.get_report_session_factory(engine, helper.ARGUMENTS.warehouse)
     session = session_factory()
 
     db_aggregate.get_top_artist_tracks(session, helper.ARGUMENTS.number)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Batch Benchmark Main
+======================
+
+Main Module for comparing the full report pack run one statement per report with the same pack run as a batch
+scanning every table once
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+
+    * main - main function to call appropriate functions to run the batch benchmark
+"""
+
+# Standard imports
+import logging
+
+# User Imports
+import mservice.utils as helper
+import mservice.connections as connections
+import mservice.benchmark as benchmark
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to run the batch benchmark
+
+    :return: Nothing
+    :rtype: None
+    """
+
+    # Getting the path for logging config using arparse
+    log_config_file = helper.ARGUMENTS.logfile
+
+    # Configuring logging
+    helper.configure_logging(log_config_file)
+
+    engine = connections.create_new_engine(helper.ARGUMENTS.dialect, helper.ARGUMENTS.driver,
+                                           helper.ARGUMENTS.user, helper.ARGUMENTS.password,
+                                           helper.ARGUMENTS.host, helper.ARGUMENTS.database)
+
+    session_factory = connections.get_session_factory(engine)
+
+    benchmark.benchmark_report_batch(session_factory, number=helper.ARGUMENTS.number or 10)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Contention Benchmark Main
+============================
+
+Main Module for comparing lock based and optimistic updates of tracks, with the given number of concurrent
+writers
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+
+    * main - main function to call appropriate functions to run the contention benchmark
+"""
+
+# Standard imports
+import logging
+
+# User Imports
+import mservice.utils as helper
+import mservice.connections as connections
+import mservice.benchmark as benchmark
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to run the contention benchmark
+
+    :return: Nothing
+    :rtype: None
+    """
+
+    # Getting the path for logging config using arparse
+    log_config_file = helper.ARGUMENTS.logfile
+
+    # Configuring logging
+    helper.configure_logging(log_config_file)
+
+    engine = connections.create_new_engine(helper.ARGUMENTS.dialect, helper.ARGUMENTS.driver,
+                                           helper.ARGUMENTS.user, helper.ARGUMENTS.password,
+                                           helper.ARGUMENTS.host, helper.ARGUMENTS.database)
+
+    session_factory = connections.get_session_factory(engine)
+
+    benchmark.benchmark_update_contention(session_factory, workers=helper.ARGUMENTS.number or 8)
+
+
+if __name__ == '__main__':
+    main()
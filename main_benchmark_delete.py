@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Delete Benchmark Main
+========================
+
+Main Module for comparing the ORM cascade delete of a genre with the set based delete, on genres seeded with the given
+number of tracks
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+
+    * main - main function to call appropriate functions to run the delete benchmark
+"""
+
+# Standard imports
+import logging
+
+# User Imports
+import mservice.utils as helper
+import mservice.connections as connections
+import mservice.benchmark as benchmark
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to run the delete benchmark
+
+    :return: Nothing
+    :rtype: None
+    """
+
+    # Getting the path for logging config using arparse
+    log_config_file = helper.ARGUMENTS.logfile
+
+    # Configuring logging
+    helper.configure_logging(log_config_file)
+
+    engine = connections.create_new_engine(helper.ARGUMENTS.dialect, helper.ARGUMENTS.driver,
+                                           helper.ARGUMENTS.user, helper.ARGUMENTS.password,
+                                           helper.ARGUMENTS.host, helper.ARGUMENTS.database)
+
+    session_factory = connections.get_session_factory(engine)
+
+    benchmark.benchmark_genre_delete(session_factory, helper.ARGUMENTS.number or 100000)
+
+
+if __name__ == '__main__':
+    main()
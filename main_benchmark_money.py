@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Money Benchmark Main
+======================
+
+Main Module for comparing the aggregation of money amounts as Decimal and as integer cents, over the given number of
+invoice lines
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+
+    * main - main function to call appropriate functions to run the money benchmark
+"""
+
+# Standard imports
+import logging
+
+# User Imports
+import mservice.utils as helper
+import mservice.benchmark as benchmark
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to run the money benchmark
+
+    :return: Nothing
+    :rtype: None
+    """
+
+    # Getting the path for logging config using arparse
+    log_config_file = helper.ARGUMENTS.logfile
+
+    # Configuring logging
+    helper.configure_logging(log_config_file)
+
+    benchmark.benchmark_money_aggregation(number_of_lines=helper.ARGUMENTS.number or 10000000)
+
+
+if __name__ == '__main__':
+    main()
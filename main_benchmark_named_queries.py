@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Named Query Benchmark Main
+============================
+
+Main Module for running the hand written SQL of every question side by side with its ORM report, checking both give
+the same rows and timing them, the database given being the data scale
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+
+    * main - main function to call appropriate functions to compare the named queries with the ORM reports
+"""
+
+# Standard imports
+import logging
+
+# User Imports
+import mservice.utils as helper
+import mservice.connections as connections
+import mservice.benchmark as benchmark
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to compare the named queries with the ORM reports
+
+    :return: Nothing
+    :rtype: None
+    """
+
+    # Getting the path for logging config using arparse
+    log_config_file = helper.ARGUMENTS.logfile
+
+    # Configuring logging
+    helper.configure_logging(log_config_file)
+
+    engine = connections.create_new_engine(helper.ARGUMENTS.dialect, helper.ARGUMENTS.driver,
+                                           helper.ARGUMENTS.user, helper.ARGUMENTS.password,
+                                           helper.ARGUMENTS.host, helper.ARGUMENTS.database)
+
+    session_factory = connections.get_session_factory(engine)
+
+    # The configured database is the only data scale, the harness takes several databases of different sizes
+    benchmark.benchmark_named_queries({helper.ARGUMENTS.database: session_factory},
+                                      number=helper.ARGUMENTS.number or 10)
+
+
+if __name__ == '__main__':
+    main()
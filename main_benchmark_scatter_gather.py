@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Scatter Gather Benchmark Main
+===============================
+
+Main Module for comparing the invoice reports run as single queries with the same reports scattered over ranges of
+invoice ids in several worker processes
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+
+    * main - main function to call appropriate functions to run the scatter gather benchmark
+"""
+
+# Standard imports
+import logging
+
+# User Imports
+import mservice.utils as helper
+import mservice.connections as connections
+import mservice.benchmark as benchmark
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to run the scatter gather benchmark
+
+    :return: Nothing
+    :rtype: None
+    """
+
+    # Getting the path for logging config using arparse
+    log_config_file = helper.ARGUMENTS.logfile
+
+    # Configuring logging
+    helper.configure_logging(log_config_file)
+
+    engine = connections.create_new_engine(helper.ARGUMENTS.dialect, helper.ARGUMENTS.driver,
+                                           helper.ARGUMENTS.user, helper.ARGUMENTS.password,
+                                           helper.ARGUMENTS.host, helper.ARGUMENTS.database)
+
+    session_factory = connections.get_session_factory(engine)
+
+    benchmark.benchmark_scatter_gather(session_factory, number=helper.ARGUMENTS.number or 10)
+
+
+# The worker processes import this module, so the benchmark only runs in the parent
+if __name__ == '__main__':
+    main()
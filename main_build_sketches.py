@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Build Sketches Main
+=====================
+
+Main Module for building the distinct count sketches of Q4, Q9 and Q13 in one streaming pass, and saving them to the
+file the report mains open with the --sketches argument
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+
+    * main - main function to call appropriate functions to build and save the sketches
+"""
+
+# Standard imports
+import logging
+
+# User Imports
+import mservice.utils as helper
+import mservice.connections as connections
+import mservice.sketches as sketches_store
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to build and save the sketches
+
+    :return: Nothing
+    :rtype: None
+    """
+
+    # Getting the path for logging config using arparse
+    log_config_file = helper.ARGUMENTS.logfile
+
+    # Configuring logging
+    helper.configure_logging(log_config_file)
+
+    if helper.ARGUMENTS.sketches is None:
+        LOGGER.error("the path to save the sketches to should be given with --sketches")
+        return
+
+    engine = connections.create_new_engine(helper.ARGUMENTS.dialect, helper.ARGUMENTS.driver,
+                                           helper.ARGUMENTS.user, helper.ARGUMENTS.password,
+                                           helper.ARGUMENTS.host, helper.ARGUMENTS.database)
+
+    session_factory = connections.get_session_factory(engine)
+    session = session_factory()
+
+    try:
+        sketches = sketches_store.DistinctSketches.build(session)
+    finally:
+        session.close()
+
+    sketches.save(helper.ARGUMENTS.sketches)
+    LOGGER.info("Saved the sketches to %s", helper.ARGUMENTS.sketches)
+
+
+if __name__ == '__main__':
+    main()
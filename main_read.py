@@ -3,7 +3,8 @@
 Read Operation Main
 ======================
 
-Main Module for reading records in the chinook database
+Main Module for reading records in the chinook database, joining the tables, or scanning the invoice fact table after
+refreshing it when the --fact_table switch is given
 
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
@@ -21,6 +22,7 @@ from sqlalchemy.orm.exc import NoResultFound
 # User Imports
 import mservice.utils as helper
 import mservice.connections as connections
+import mservice.database_model as models
 import mservice.read_operation as db_read
 
 LOGGER = logging.getLogger(__name__)
@@ -45,9 +47,20 @@ def main():
                                            helper.ARGUMENTS.host, helper.ARGUMENTS.database)
 
     session_factory = connections.get_session_factory(engine)
+
+    # Copying the invoice lines missing from the fact table before scanning it
+    if helper.ARGUMENTS.fact_table:
+        session = session_factory()
+
+        try:
+            models.refresh_invoice_fact(session)
+            session.commit()
+        finally:
+            session.close()
+
     session = session_factory()
 
-    db_read.perform_read_join(session, helper.ARGUMENTS.number)
+    db_read.perform_read_join(session, helper.ARGUMENTS.number, from_fact_table=helper.ARGUMENTS.fact_table)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Refresh Snapshot Main
+=======================
+
+Main Module for reading the catalog from the database into a new version of the on disk snapshot store
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+
+    * main - main function to call appropriate functions to refresh the snapshot
+"""
+
+# Standard imports
+import logging
+
+# User Imports
+import mservice.utils as helper
+import mservice.connections as connections
+import mservice.snapshot as snapshot
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to refresh the snapshot
+
+    :return: Nothing
+    :rtype: None
+    """
+
+    # Getting the path for logging config using arparse
+    log_config_file = helper.ARGUMENTS.logfile
+
+    # Configuring logging
+    helper.configure_logging(log_config_file)
+
+    engine = connections.create_new_engine(helper.ARGUMENTS.dialect, helper.ARGUMENTS.driver,
+                                           helper.ARGUMENTS.user, helper.ARGUMENTS.password,
+                                           helper.ARGUMENTS.host, helper.ARGUMENTS.database)
+
+    session_factory = connections.get_session_factory(engine)
+
+    snapshot.refresh_snapshot(session_factory, helper.ARGUMENTS.snapshot)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel Reports Main
+=======================
+
+Main Module for running the Q1 to Q15 report pack concurrently, one session per report, on as many threads as the
+workers argument asks, the connection pool being sized for them. With the --from_snapshot switch the catalog reports
+are answered from the current version of the snapshot store given by the --snapshot argument
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+
+    * main - main function to call appropriate functions to run the report pack in parallel
+"""
+
+# Standard imports
+import logging
+
+# User Imports
+import mservice.utils as helper
+import mservice.connections as connections
+import mservice.aggregate_operation as db_aggregate
+import mservice.snapshot as snapshot_store
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to run the report pack in parallel
+
+    :return: Nothing
+    :rtype: None
+    """
+
+    # Getting the path for logging config using arparse
+    log_config_file = helper.ARGUMENTS.logfile
+
+    # Configuring logging
+    helper.configure_logging(log_config_file)
+
+    engine = connections.create_new_engine(helper.ARGUMENTS.dialect, helper.ARGUMENTS.driver,
+                                           helper.ARGUMENTS.user, helper.ARGUMENTS.password,
+                                           helper.ARGUMENTS.host, helper.ARGUMENTS.database,
+                                           pool_size=db_aggregate.pool_size_for_workers(helper.ARGUMENTS.workers),
+                                           max_overflow=0)
+
+    session_factory = connections.get_report_session_factory(engine, helper.ARGUMENTS.warehouse)
+
+    # Memory mapping the current version of the store once, for every catalog report of the pack
+    snapshot = snapshot_store.open_snapshot(helper.ARGUMENTS.snapshot) if helper.ARGUMENTS.from_snapshot else None
+
+    specs = db_aggregate.dashboard_report_specs(helper.ARGUMENTS.number or 10, snapshot=snapshot)
+    db_aggregate.run_reports_in_parallel(session_factory, specs, workers=helper.ARGUMENTS.workers)
+
+
+if __name__ == '__main__':
+    main()
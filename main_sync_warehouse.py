@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Sync Warehouse Main
+=======================
+
+Main Module for copying the tables of the database into the local analytics warehouse, the first time in full and
+incrementally after that. With --reconcile the rows deleted in the database are deleted from the warehouse too, which
+reads every primary key of the database and is meant for a less frequent schedule than the plain syncs
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+
+    * main - main function to call appropriate functions to sync the warehouse
+"""
+
+# Standard imports
+import logging
+
+# User Imports
+import mservice.utils as helper
+import mservice.connections as connections
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to sync the warehouse
+
+    :return: Nothing
+    :rtype: None
+    """
+
+    # Getting the path for logging config using arparse
+    log_config_file = helper.ARGUMENTS.logfile
+
+    # Configuring logging
+    helper.configure_logging(log_config_file)
+
+    engine = connections.create_new_engine(helper.ARGUMENTS.dialect, helper.ARGUMENTS.driver,
+                                           helper.ARGUMENTS.user, helper.ARGUMENTS.password,
+                                           helper.ARGUMENTS.host, helper.ARGUMENTS.database)
+
+    warehouse_engine = connections.create_warehouse_engine(helper.ARGUMENTS.warehouse or "warehouse.db")
+
+    connections.sync_warehouse(engine, warehouse_engine, workers=helper.ARGUMENTS.workers,
+                               reconcile=helper.ARGUMENTS.reconcile)
+
+
+if __name__ == '__main__':
+    main()
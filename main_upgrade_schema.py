@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Upgrade Schema Main
+=======================
+
+Main Module for bringing an existing database up to the ORM classes, creating the missing tables and adding the missing
+columns, such as the Version column of the track and invoice tables. Run it once before the other mains after
+upgrading, or with --dry_run to only log the statements
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+
+    * main - main function to call appropriate functions to upgrade the schema
+"""
+
+# Standard imports
+import logging
+
+# User Imports
+import mservice.utils as helper
+import mservice.connections as connections
+import mservice.database_model as models
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to upgrade the schema
+
+    :return: Nothing
+    :rtype: None
+    """
+
+    # Getting the path for logging config using arparse
+    log_config_file = helper.ARGUMENTS.logfile
+
+    # Configuring logging
+    helper.configure_logging(log_config_file)
+
+    engine = connections.create_new_engine(helper.ARGUMENTS.dialect, helper.ARGUMENTS.driver,
+                                           helper.ARGUMENTS.user, helper.ARGUMENTS.password,
+                                           helper.ARGUMENTS.host, helper.ARGUMENTS.database)
+
+    models.upgrade_schema(engine, dry_run=helper.ARGUMENTS.dry_run)
+
+
+if __name__ == '__main__':
+    main()
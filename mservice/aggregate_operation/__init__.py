@@ -23,3 +23,31 @@ from mservice.aggregate_operation.top_manager_month_q15 import get_top_manager_r
 from mservice.aggregate_operation.add_genre_to_album_q11 import add_genre_to_album
 from mservice.aggregate_operation.add_genre_to_artist_q12 import add_genre_to_artist
 from mservice.aggregate_operation.tracks_with_more_genre_q10 import get_tracks_with_more_genre
+from mservice.aggregate_operation.money import MONEY_CENTS, MONEY_DECIMAL, cents_to_decimal, present_money, sum_money
+from mservice.aggregate_operation.top_album_tracks_q1 import TOP_ALBUM_TRACKS_STATEMENT
+from mservice.aggregate_operation.top_artist_tracks_q2 import TOP_ARTIST_TRACKS_STATEMENT
+from mservice.aggregate_operation.top_customer_amount_q3 import TOP_CUSTOMERS_STATEMENTS
+from mservice.aggregate_operation.top_album_purchases_q4 import TOP_ALBUM_PURCHASES_STATEMENT
+from mservice.aggregate_operation.top_tracks_for_genre_q5 import TOP_TRACKS_FOR_GENRE_STATEMENT
+from mservice.aggregate_operation.longest_tracks_q6 import LONGEST_TRACKS_STATEMENT
+from mservice.aggregate_operation.longest_album_q7 import LONGEST_ALBUM_STATEMENT
+from mservice.aggregate_operation.number_of_playlist_tracks_q8 import NUMBER_OF_PLAYLIST_TRACKS_STATEMENT
+from mservice.aggregate_operation.number_of_playlist_album_q9 import NUMBER_OF_PLAYLIST_ALBUM_STATEMENT
+from mservice.aggregate_operation.tracks_with_more_genre_q10 import TRACKS_WITH_MORE_GENRE_STATEMENT
+from mservice.aggregate_operation.add_genre_to_album_q11 import ADD_GENRE_TO_ALBUM_STATEMENT
+from mservice.aggregate_operation.add_genre_to_artist_q12 import ADD_GENRE_TO_ARTIST_STATEMENT
+from mservice.aggregate_operation.top_artist_distinct_genre_q13 import TOP_ARTIST_GENRE_STATEMENT
+from mservice.aggregate_operation.top_employee_month_q14 import TOP_EMPLOYEE_SALES_STATEMENT
+from mservice.aggregate_operation.top_manager_month_q15 import TOP_MANAGER_REVENUE_STATEMENTS
+from mservice.aggregate_operation.execution import EXECUTION_CORE, EXECUTION_DBAPI, EXECUTION_ORM, fetch_rows
+from mservice.aggregate_operation.named_queries import NAMED_QUERY_FILES, get_named_query, run_named_query
+from mservice.aggregate_operation.batch_execution import BATCH_REPORTS, run_report_batch
+from mservice.aggregate_operation.parallel_runner import ReportSpec, dashboard_report_specs, pool_size_for_workers, \
+    run_reports_in_parallel
+from mservice.aggregate_operation.scatter_gather import SCATTER_REPORTS, run_scatter_gather
+from mservice.aggregate_operation.sharded_reports import get_sharded_top_customers, get_sharded_top_employee_sales, \
+    get_sharded_top_manager_revenue
+from mservice.aggregate_operation.genre_leaderboards import GenreLeaderboards
+from mservice.aggregate_operation.hierarchy_rollup import ROLLUP_REVENUE_STATEMENTS, ROLLUP_SALES_STATEMENT, \
+    get_rollup_manager_revenue, get_rollup_manager_sales
+from mservice.aggregate_operation.sales_cube import DIMENSIONS, MEASURES, SalesCube
@@ -8,7 +8,10 @@ Module for reading records from the database to create a pandas dataframe to add
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * ADD_GENRE_TO_ALBUM_STATEMENT - The statement of the report, built once
+    * build_add_genre_to_album_statement - Function to build the statement to get the distinct genres of the tracks of
+                                           every album
     * add_genre_to_album - Function to add Genre Tags to Albums
 """
 # Standard Imports
@@ -16,11 +19,41 @@ import logging
 
 # External imports
 import sqlalchemy
+from sqlalchemy import bindparam, select
 import pandas as pd
 
+# User Imports
+import mservice.database_model as models
+
 LOGGER = logging.getLogger(__name__)
 
 
+def build_add_genre_to_album_statement():
+    """
+    Function to build the statement to get the distinct genres of the tracks of every album, the number of rows being
+    bound to the "limit" parameter
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Selecting the distinct Album Title and Genre Name of every track
+    statement = select(models.AlbumTable.title.label("album"), models.GenreTable.name.label("genre"))
+
+    # Joining tracks table with album table and genre table
+    statement = statement.select_from(models.TracksTable).distinct()
+    statement = statement.join(models.AlbumTable, models.TracksTable.album_id == models.AlbumTable.album_id)
+    statement = statement.join(models.GenreTable, models.TracksTable.genre_id == models.GenreTable.genre_id)
+
+    # Sorting by Album Id, and by Genre Name between the genres of an album
+    statement = statement.order_by(models.TracksTable.album_id, models.GenreTable.name)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report, built once
+ADD_GENRE_TO_ALBUM_STATEMENT = build_add_genre_to_album_statement()
+
+
 def add_genre_to_album(engine, number_of_albums):
     """
     Function to to add Genre Tags to Albums
@@ -31,8 +64,8 @@ def add_genre_to_album(engine, number_of_albums):
     :param number_of_albums: The number of albums to be returned from the query
     :type number_of_albums: int
 
-    :return: Nothing
-    :rtype: None
+    :return: The rows returned from the query, None if the arguments were invalid
+    :rtype: :class:`pandas.DataFrame`
     """
     try:
         if not issubclass(type(engine), sqlalchemy.engine.base.Engine):
@@ -43,22 +76,8 @@ def add_genre_to_album(engine, number_of_albums):
 
         LOGGER.info("Performing Read Operation")
 
-        sql_stmt = f"""
-                        SELECT DISTINCT
-                            a.title AS album,
-                            g.Name AS genre	  
-                        FROM track t
-                        INNER JOIN album a
-                            ON t.AlbumId = a.AlbumId
-                        INNER JOIN genre g
-                            ON t.GenreId = g.GenreId
-                        -- WHERE t.AlbumId = 102 OR t.AlbumId = 251 
-                        ORDER BY t.AlbumId
-                        LIMIT {number_of_albums}
-                    """
-
         with engine.connect() as connection:
-            albums_df = pd.read_sql(sql_stmt, connection)
+            albums_df = pd.read_sql(ADD_GENRE_TO_ALBUM_STATEMENT, connection, params={"limit": number_of_albums})
 
         print("\n\n")
         print("==" * 50)
@@ -67,5 +86,7 @@ def add_genre_to_album(engine, number_of_albums):
 
         print("\n\n")
         print("==" * 50)
+
+        return albums_df
     except AttributeError as err:
         LOGGER.error(err)
@@ -8,7 +8,10 @@ Module for reading records from the database to create a pandas dataframe to add
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * ADD_GENRE_TO_ARTIST_STATEMENT - The statement of the report, built once
+    * build_add_genre_to_artist_statement - Function to build the statement to get the distinct genres of the tracks of
+                                            every artist
     * add_genre_to_artist - Function to add Genre Tags to Artist
 """
 # Standard Imports
@@ -16,11 +19,42 @@ import logging
 
 # External imports
 import sqlalchemy
+from sqlalchemy import bindparam, select
 import pandas as pd
 
+# User Imports
+import mservice.database_model as models
+
 LOGGER = logging.getLogger(__name__)
 
 
+def build_add_genre_to_artist_statement():
+    """
+    Function to build the statement to get the distinct genres of the tracks of every artist, the number of rows being
+    bound to the "limit" parameter
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Selecting the distinct Artist Name and Genre Name of every track
+    statement = select(models.ArtistTable.name.label("artist"), models.GenreTable.name.label("genre"))
+
+    # Joining tracks table with genre table, album table and artist table
+    statement = statement.select_from(models.TracksTable).distinct()
+    statement = statement.join(models.GenreTable, models.TracksTable.genre_id == models.GenreTable.genre_id)
+    statement = statement.join(models.AlbumTable, models.TracksTable.album_id == models.AlbumTable.album_id)
+    statement = statement.join(models.ArtistTable, models.AlbumTable.artist_id == models.ArtistTable.artist_id)
+
+    # Sorting by Artist Id, and by Genre Name between the genres of an artist
+    statement = statement.order_by(models.AlbumTable.artist_id, models.GenreTable.name)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report, built once
+ADD_GENRE_TO_ARTIST_STATEMENT = build_add_genre_to_artist_statement()
+
+
 def add_genre_to_artist(engine, number_of_artist):
     """
     Function to to add Genre Tags to Artist
@@ -31,8 +65,8 @@ def add_genre_to_artist(engine, number_of_artist):
     :param number_of_artist: The number of albums to be returned from the query
     :type number_of_artist: int
 
-    :return: Nothing
-    :rtype: None
+    :return: The rows returned from the query, None if the arguments were invalid
+    :rtype: :class:`pandas.DataFrame`
     """
     try:
         if not issubclass(type(engine), sqlalchemy.engine.base.Engine):
@@ -43,24 +77,8 @@ def add_genre_to_artist(engine, number_of_artist):
 
         LOGGER.info("Performing Read Operation")
 
-        sql_stmt = f"""
-                        SELECT DISTINCT 
-                            art.Name AS artist ,
-                            g.Name AS genre	   
-                        FROM track t
-                        INNER JOIN genre g
-                            ON t.GenreId = g.GenreId
-                        INNER JOIN album a
-                            ON t.AlbumId = a.AlbumId
-                        INNER JOIN artist art
-                            ON a.ArtistId = art.ArtistId
-                        -- WHERE a.ArtistId = 6 
-                        ORDER BY a.ArtistId
-                        LIMIT {number_of_artist}
-                    """
-
         with engine.connect() as connection:
-            artists_df = pd.read_sql(sql_stmt, connection)
+            artists_df = pd.read_sql(ADD_GENRE_TO_ARTIST_STATEMENT, connection, params={"limit": number_of_artist})
 
         print("\n\n")
         print("==" * 50)
@@ -69,5 +87,7 @@ def add_genre_to_artist(engine, number_of_artist):
 
         print("\n\n")
         print("==" * 50)
+
+        return artists_df
     except AttributeError as err:
         LOGGER.error(err)
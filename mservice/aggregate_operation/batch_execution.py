@@ -0,0 +1,671 @@
+# -*- coding: utf-8 -*-
+"""
+Shared Scan Batch Execution
+===============================
+
+Module for running several reports together with a single scan of every base table they read. Most reports join the
+same tables, track with album and artist for the catalog reports, invoiceline or invoice for the sales reports, so
+running them one by one repeats the same joins. Here the requested reports are grouped by the tables they read, every
+table needed is streamed once, in batches, and every row is fed to the accumulators of all the reports reading it,
+the joins with the small tables read before being dictionary lookups
+
+GROUPING SETS are not supported by MySQL, and WITH ROLLUP only rolls one grouping up, so the reports sharing a scan
+can not be expressed as a single grouped query there
+
+The rows returned are the ones of the matching SQL report. Where the SQL leaves the order of ties unspecified, ties are
+broken by ascending id, and Q10 orders names by code point rather than by the collation of the database
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * heapq - to select the top rows
+
+This script contains the following
+    * BATCH_REPORTS - The reports that can be batched along with the tables they read
+    * top_totals - Function to get the keys with the highest totals
+    * run_report_batch - Function to run several reports with one scan of every table they read
+"""
+# Standard Imports
+import heapq
+import logging
+from collections import Counter, OrderedDict, defaultdict
+from decimal import Decimal
+
+# External imports
+import sqlalchemy.orm
+from sqlalchemy import select
+from tabulate import tabulate
+
+# User Imports
+import mservice.database_model as models
+from mservice.aggregate_operation.execution import FETCH_BATCH_SIZE
+from mservice.aggregate_operation.money import MONEY_CENTS, MONEY_DECIMAL, check_money
+
+LOGGER = logging.getLogger(__name__)
+
+# The report to the tables it reads
+BATCH_REPORTS = OrderedDict([
+    ("Q1", ("album", "track")),
+    ("Q2", ("artist", "album", "track")),
+    ("Q3", ("customer", "invoice")),
+    ("Q4", ("album", "track", "invoiceline")),
+    ("Q5", ("genre", "track", "invoiceline")),
+    ("Q6", ("track",)),
+    ("Q7", ("album", "track")),
+    ("Q8", ("track", "playlisttrack")),
+    ("Q9", ("album", "track", "playlisttrack")),
+    ("Q10", ("genre", "track")),
+    ("Q11", ("genre", "album", "track")),
+    ("Q12", ("genre", "artist", "album", "track")),
+    ("Q13", ("artist", "album", "track")),
+    ("Q14", ("employee", "customer", "invoice")),
+    ("Q15", ("employee", "customer", "invoice")),
+])
+
+# The tables in scan order, the small tables the others are joined with first, along with the columns read
+SCAN_TABLES = OrderedDict([
+    ("genre", (models.GenreTable.genre_id, models.GenreTable.name)),
+    ("artist", (models.ArtistTable.artist_id, models.ArtistTable.name)),
+    ("album", (models.AlbumTable.album_id, models.AlbumTable.title, models.AlbumTable.artist_id)),
+    ("employee", (models.EmployeeTable.employee_id, models.EmployeeTable.first_name, models.EmployeeTable.last_name,
+                  models.EmployeeTable.reports_to)),
+    ("customer", (models.CustomerTable.customer_id, models.CustomerTable.first_name, models.CustomerTable.last_name,
+                  models.CustomerTable.support_rep_id)),
+    ("track", (models.TracksTable.track_id, models.TracksTable.name, models.TracksTable.album_id,
+               models.TracksTable.genre_id, models.TracksTable.milliseconds)),
+    ("invoice", (models.InvoiceTable.invoice_id, models.InvoiceTable.customer_id, models.InvoiceTable.invoice_date,
+                 models.InvoiceTable.total)),
+    ("invoiceline", (models.InvoiceLineTable.invoice_id, models.InvoiceLineTable.track_id)),
+    ("playlisttrack", (models.PlaylistTrackTable.play_list_id, models.PlaylistTrackTable.track_id)),
+])
+
+PLAYTIME_SCALE = Decimal("0.0001")
+
+
+def top_totals(totals, number):
+    """
+    Function to get the keys with the highest totals, ties broken by ascending key
+
+    :param totals: Key to total
+    :type totals: dict
+
+    :param number: The number of keys to be returned
+    :type number: int
+
+    :return: best - (key, total) pairs, highest total first
+    :rtype: list
+    """
+    return heapq.nsmallest(number, totals.items(), key=lambda item: (-item[1], item[0]))
+
+
+class _ReportAccumulators:
+    """
+    Class holding the accumulators fed by the table scans, and building the rows of the reports from them
+
+    :ivar year: The year of the invoices of Q14 and Q15
+    :vartype year: int
+
+    :ivar month: The month of the invoices of Q14 and Q15
+    :vartype month: int
+
+    :ivar money: The money representation of the totals of Q3 and Q15
+    :vartype money: str
+    """
+
+    def __init__(self, year, month, money):
+        """
+        Constructor of the accumulators
+
+        :param year: The year of the invoices of Q14 and Q15
+        :type year: int
+
+        :param month: The month of the invoices of Q14 and Q15
+        :type month: int
+
+        :param money: The money representation of the totals of Q3 and Q15, "decimal" or "cents"
+        :type money: str
+        """
+        self.year = year
+        self.month = month
+        self.money = money
+
+        self.genre_names = {}
+        self.artist_names = {}
+        self.album_titles = {}
+        self.album_artist = {}
+        self.employee_names = {}
+        self.employee_manager = {}
+        self.customer_names = {}
+        self.customer_rep = {}
+        self.track_names = {}
+        self.track_album = {}
+        self.track_genre = {}
+        self.track_milliseconds = {}
+
+        self.album_tracks = Counter()
+        self.album_playtime = Counter()
+        self.album_genres = defaultdict(set)
+        self.name_genres = defaultdict(set)
+        self.customer_totals = defaultdict(self._zero)
+        self.rep_sales = Counter()
+        self.rep_revenue = defaultdict(self._zero)
+        self.track_purchases = Counter()
+        self.album_invoices = defaultdict(set)
+        self.track_playlists = Counter()
+        self.album_playlists = defaultdict(set)
+
+    def _zero(self):
+        """
+        Function to get the zero of the money representation
+
+        :return: zero
+        :rtype: :class:`decimal.Decimal` or int
+        """
+        return 0 if self.money == MONEY_CENTS else Decimal(0)
+
+    def add_genre(self, rows):
+        """
+        Function to feed a batch of genre rows (genre id, name) to the accumulators
+
+        :param rows: The rows of the batch
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        for genre_id, name in rows:
+            self.genre_names[genre_id] = name
+
+    def add_artist(self, rows):
+        """
+        Function to feed a batch of artist rows (artist id, name) to the accumulators
+
+        :param rows: The rows of the batch
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        for artist_id, name in rows:
+            self.artist_names[artist_id] = name
+
+    def add_album(self, rows):
+        """
+        Function to feed a batch of album rows (album id, title, artist id) to the accumulators
+
+        :param rows: The rows of the batch
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        for album_id, title, artist_id in rows:
+            self.album_titles[album_id] = title
+            self.album_artist[album_id] = artist_id
+
+    def add_employee(self, rows):
+        """
+        Function to feed a batch of employee rows (employee id, first name, last name, manager id) to the accumulators
+
+        :param rows: The rows of the batch
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        for employee_id, first_name, last_name, reports_to in rows:
+            self.employee_names[employee_id] = first_name + " " + last_name
+            self.employee_manager[employee_id] = reports_to
+
+    def add_customer(self, rows):
+        """
+        Function to feed a batch of customer rows (customer id, first name, last name, support rep id) to the
+        accumulators
+
+        :param rows: The rows of the batch
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        for customer_id, first_name, last_name, support_rep_id in rows:
+            self.customer_names[customer_id] = first_name + " " + last_name
+            self.customer_rep[customer_id] = support_rep_id
+
+    def add_track(self, rows):
+        """
+        Function to feed a batch of track rows (track id, name, album id, genre id, milliseconds) to the accumulators
+
+        :param rows: The rows of the batch
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        for track_id, name, album_id, genre_id, milliseconds in rows:
+            self.track_names[track_id] = name
+            self.track_album[track_id] = album_id
+            self.track_genre[track_id] = genre_id
+            self.track_milliseconds[track_id] = milliseconds
+
+            if album_id is not None:
+                self.album_tracks[album_id] += 1
+                self.album_playtime[album_id] += milliseconds
+
+                if genre_id is not None:
+                    self.album_genres[album_id].add(genre_id)
+
+            if genre_id is not None:
+                self.name_genres[name].add(genre_id)
+
+    def add_invoice(self, rows):
+        """
+        Function to feed a batch of invoice rows (invoice id, customer id, invoice date, total) to the accumulators
+
+        :param rows: The rows of the batch
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        for _, customer_id, invoice_date, total in rows:
+            if self.money == MONEY_CENTS:
+                total = int(Decimal(total).scaleb(2).to_integral_value())
+
+            self.customer_totals[customer_id] += total
+
+            if invoice_date.year == self.year and invoice_date.month == self.month:
+                rep_id = self.customer_rep.get(customer_id)
+                self.rep_sales[rep_id] += 1
+                self.rep_revenue[rep_id] += total
+
+    def add_invoiceline(self, rows):
+        """
+        Function to feed a batch of invoiceline rows (invoice id, track id) to the accumulators
+
+        :param rows: The rows of the batch
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        for invoice_id, track_id in rows:
+            self.track_purchases[track_id] += 1
+            self.album_invoices[self.track_album.get(track_id)].add(invoice_id)
+
+    def add_playlisttrack(self, rows):
+        """
+        Function to feed a batch of playlisttrack rows (playlist id, track id) to the accumulators
+
+        :param rows: The rows of the batch
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        for play_list_id, track_id in rows:
+            self.track_playlists[track_id] += 1
+            self.album_playlists[self.track_album.get(track_id)].add(play_list_id)
+
+    def _artist_genres(self):
+        """
+        Function to get the distinct genres of the tracks of every artist
+
+        :return: artist_genres - Artist id to its set of genre ids
+        :rtype: dict
+        """
+        artist_genres = defaultdict(set)
+
+        for album_id, genres in self.album_genres.items():
+            if album_id in self.album_titles:
+                artist_genres[self.album_artist[album_id]].update(genres)
+
+        return artist_genres
+
+    def q1(self, number):
+        """
+        Function to get the rows of Q1, the albums with the most tracks, as (album id, title, number of tracks)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        totals = {album_id: count for album_id, count in self.album_tracks.items() if album_id in self.album_titles}
+        return [(album_id, self.album_titles[album_id], count) for album_id, count in top_totals(totals, number)]
+
+    def q2(self, number):
+        """
+        Function to get the rows of Q2, the artists with the most tracks, as (artist id, name, number of tracks)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        totals = Counter()
+
+        for album_id, count in self.album_tracks.items():
+            if self.album_artist.get(album_id) in self.artist_names:
+                totals[self.album_artist[album_id]] += count
+
+        return [(artist_id, self.artist_names[artist_id], count) for artist_id, count in top_totals(totals, number)]
+
+    def q3(self, number):
+        """
+        Function to get the rows of Q3, the customers who spent the most, as (customer id, name, total amount)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        totals = {customer_id: total for customer_id, total in self.customer_totals.items()
+                  if customer_id in self.customer_names}
+        return [(customer_id, self.customer_names[customer_id], total)
+                for customer_id, total in top_totals(totals, number)]
+
+    def q4(self, number):
+        """
+        Function to get the rows of Q4, the albums bought in the most invoices, as (album id, title, number of
+        purchases)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        totals = {album_id: len(invoices) for album_id, invoices in self.album_invoices.items()
+                  if album_id in self.album_titles}
+        return [(album_id, self.album_titles[album_id], count) for album_id, count in top_totals(totals, number)]
+
+    def q5(self, number):
+        """
+        Function to get the rows of Q5, the most bought tracks of every genre, as (track id, name, genre id, genre name,
+        number of purchases)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        genre_purchases = defaultdict(dict)
+
+        for track_id, count in self.track_purchases.items():
+            if self.track_genre.get(track_id) in self.genre_names:
+                genre_purchases[self.track_genre[track_id]][track_id] = count
+
+        return [(track_id, self.track_names[track_id], genre_id, self.genre_names[genre_id], count)
+                for genre_id in sorted(genre_purchases)
+                for track_id, count in top_totals(genre_purchases[genre_id], number)]
+
+    def q6(self, number):
+        """
+        Function to get the rows of Q6, the longest tracks, as (track id, name, milliseconds)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        return [(track_id, self.track_names[track_id], milliseconds)
+                for track_id, milliseconds in top_totals(self.track_milliseconds, number)]
+
+    def q7(self, number):
+        """
+        Function to get the rows of Q7, the albums with the longest playtime, as (album id, title, playtime in seconds)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        totals = {album_id: playtime for album_id, playtime in self.album_playtime.items()
+                  if album_id in self.album_titles}
+        return [(album_id, self.album_titles[album_id], Decimal(playtime).scaleb(-3).quantize(PLAYTIME_SCALE))
+                for album_id, playtime in top_totals(totals, number)]
+
+    def q8(self, number):
+        """
+        Function to get the rows of Q8, the tracks in the most playlists, as (track id, name, number of playlists)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        totals = {track_id: count for track_id, count in self.track_playlists.items() if track_id in self.track_names}
+        return [(track_id, self.track_names[track_id], count) for track_id, count in top_totals(totals, number)]
+
+    def q9(self, number):
+        """
+        Function to get the rows of Q9, the albums in the most playlists, as (album id, title, number of playlists)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        totals = {album_id: len(playlists) for album_id, playlists in self.album_playlists.items()
+                  if album_id in self.album_titles}
+        return [(album_id, self.album_titles[album_id], count) for album_id, count in top_totals(totals, number)]
+
+    def q10(self, number):
+        """
+        Function to get the rows of Q10, the track names with more than one genre, as (track name, genre name)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        rows = []
+
+        for name in sorted(name for name, genres in self.name_genres.items() if len(genres) > 1):
+            for genre_id in self._by_genre_name(self.name_genres[name]):
+                if len(rows) < number:
+                    rows.append((name, self.genre_names[genre_id]))
+
+        return rows
+
+    def _by_genre_name(self, genre_ids):
+        """
+        Function to order genres by their name as the reports do, then by their id, the unknown genres being left out
+
+        :param genre_ids: The ids of the genres
+        :type genre_ids: set
+
+        :return: genre_ids
+        :rtype: list
+        """
+        return sorted((genre_id for genre_id in genre_ids if genre_id in self.genre_names),
+                      key=lambda genre_id: (self.genre_names[genre_id], genre_id))
+
+    def _distinct_genre_rows(self, names, genres_by_id, number):
+        """
+        Function to get the distinct (name, genre name) rows of Q11 and Q12, in ascending id and genre name
+
+        :param names: Id to name, of the albums or artists
+        :type names: dict
+
+        :param genres_by_id: Id to its set of genre ids, of the albums or artists
+        :type genres_by_id: dict
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        rows = []
+        seen = set()
+
+        for key in sorted(genres_by_id):
+            if key not in names:
+                continue
+
+            for genre_id in self._by_genre_name(genres_by_id[key]):
+                row = (names[key], self.genre_names[genre_id])
+
+                if row not in seen:
+                    seen.add(row)
+                    rows.append(row)
+
+                    if len(rows) == number:
+                        return rows
+
+        return rows
+
+    def q11(self, number):
+        """
+        Function to get the rows of Q11, the genres of the albums, as (album title, genre name)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        return self._distinct_genre_rows(self.album_titles, self.album_genres, number)
+
+    def q12(self, number):
+        """
+        Function to get the rows of Q12, the genres of the artists, as (artist name, genre name)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        return self._distinct_genre_rows(self.artist_names, self._artist_genres(), number)
+
+    def q13(self, number):
+        """
+        Function to get the rows of Q13, the artists with the most distinct genres, as (artist id, name, number of
+        genres)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        totals = {artist_id: len(genres) for artist_id, genres in self._artist_genres().items()
+                  if artist_id in self.artist_names}
+        return [(artist_id, self.artist_names[artist_id], count) for artist_id, count in top_totals(totals, number)]
+
+    def q14(self, number):
+        """
+        Function to get the rows of Q14, the employees with the most sales in the month, as (employee id, name, total
+        sales)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        totals = {rep_id: count for rep_id, count in self.rep_sales.items() if rep_id in self.employee_names}
+        return [(rep_id, self.employee_names[rep_id], count) for rep_id, count in top_totals(totals, number)]
+
+    def q15(self, number):
+        """
+        Function to get the rows of Q15, the managers with the highest revenue in the month, as (manager id, name, total
+        revenue)
+
+        :param number: The number of rows to be returned
+        :type number: int
+
+        :return: rows
+        :rtype: list
+        """
+        totals = defaultdict(self._zero)
+
+        for rep_id, revenue in self.rep_revenue.items():
+            if self.employee_manager.get(rep_id) in self.employee_names:
+                totals[self.employee_manager[rep_id]] += revenue
+
+        return [(manager_id, self.employee_names[manager_id], revenue)
+                for manager_id, revenue in top_totals(totals, number)]
+
+
+def run_report_batch(session, reports, number, year=2012, month=8, money=MONEY_DECIMAL,
+                     batch_size=FETCH_BATCH_SIZE):
+    """
+    Function to run several reports with a single streamed scan of every table they read
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param reports: The names of the reports to run, "Q1" to "Q15"
+    :type reports: list
+
+    :param number: The number of rows of every report, the number of tracks per genre for Q5
+    :type number: int
+
+    :param year: The year of the invoices of Q14 and Q15
+    :type year: int
+
+    :param month: The month of the invoices of Q14 and Q15, from 1 to 12
+    :type month: int
+
+    :param money: The money representation of the totals of Q3 and Q15, "decimal" for Decimal amounts or "cents" for
+                  int cents
+    :type money: str
+
+    :param batch_size: The number of rows fetched at a time
+    :type batch_size: int
+
+    :return: results - Report name to its rows, in the order the reports were asked, None if the arguments were invalid
+    :rtype: :class:`collections.OrderedDict`
+    """
+    try:
+        if not issubclass(type(session), sqlalchemy.orm.session.Session):
+            raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+        if not reports or any(report not in BATCH_REPORTS for report in reports):
+            raise AttributeError("reports should be a non empty list of %s" % ", ".join(BATCH_REPORTS))
+
+        if not issubclass(type(number), int) or number < 1:
+            raise AttributeError("number should be integer and greater than 0")
+
+        if not issubclass(type(year), int) or not issubclass(type(month), int) or not 1 <= month <= 12:
+            raise AttributeError("year should be integer and month should be integer between 1 and 12")
+
+        check_money(money)
+
+        tables = set(table for report in reports for table in BATCH_REPORTS[report])
+        accumulators = _ReportAccumulators(year, month, money)
+
+        # Streaming the rows rather than buffering them, where the driver supports it
+        connection = session.connection().execution_options(stream_results=True, future_result=True)
+
+        for table, columns in SCAN_TABLES.items():
+            if table in tables:
+                add_rows = getattr(accumulators, "add_" + table)
+
+                for rows in connection.execute(select(*columns)).partitions(batch_size):
+                    add_rows(rows)
+
+        results = OrderedDict((report, getattr(accumulators, report.lower())(number)) for report in reports)
+
+        LOGGER.info("\n\nRan %s Reports Scanning %s Tables\n\n %s", len(results), len(tables),
+                    tabulate([[report, ", ".join(BATCH_REPORTS[report]), len(rows)]
+                              for report, rows in results.items()],
+                             headers=["Report", "Tables", "Rows"], tablefmt="grid"))
+
+        return results
+    except AttributeError as err:
+        LOGGER.error(err)
+    finally:
+        session.close()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Report Execution Modes
+===========================
+
+Module for running the statement of a report in one of three execution modes
+
+    * "orm" - through the ORM execution of the session, the rows being built by the ORM layer
+    * "core" - through the Core Connection of the session, the rows being fetched in batches with fetchmany, without
+      ORM loading nor identity map
+    * "dbapi" - the statement compiled once per shape and run on a raw DB-API cursor, the rows being the plain tuples of
+      the driver, without any result processing, so values such as NUMERIC come back in the driver's own type
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following
+    * EXECUTION_MODES - The supported execution modes
+    * check_execution - Function to validate an execution mode argument
+    * fetch_rows - Function to run a statement in the given execution mode and fetch all its rows
+"""
+# Standard Imports
+import logging
+import threading
+from collections import OrderedDict
+
+# User Imports
+from mservice.connections.statement_cache import record_statement_cache
+
+LOGGER = logging.getLogger(__name__)
+
+EXECUTION_ORM = "orm"
+EXECUTION_CORE = "core"
+EXECUTION_DBAPI = "dbapi"
+EXECUTION_MODES = (EXECUTION_ORM, EXECUTION_CORE, EXECUTION_DBAPI)
+
+FETCH_BATCH_SIZE = 1000
+COMPILED_CACHE_SIZE = 100
+
+# Statements compiled for the "dbapi" mode, least recently used first
+_COMPILED = OrderedDict()
+_COMPILED_LOCK = threading.Lock()
+
+
+def check_execution(execution):
+    """
+    Function to validate an execution mode argument
+
+    :param execution: The execution mode, "orm", "core" or "dbapi"
+    :type execution: str
+
+    :return: Nothing
+    :rtype: None
+    """
+    if execution not in EXECUTION_MODES:
+        raise AttributeError("execution should be one of %s" % ", ".join(EXECUTION_MODES))
+
+
+def _fetch_in_batches(cursor, batch_size):
+    """
+    Function to fetch every row of a cursor or result, batch_size rows at a time
+
+    :param cursor: The DB-API cursor or Core result
+    :type cursor: object
+
+    :param batch_size: The number of rows fetched at a time
+    :type batch_size: int
+
+    :return: rows
+    :rtype: list
+    """
+    rows = []
+
+    while True:
+        batch = cursor.fetchmany(batch_size)
+
+        if not batch:
+            return rows
+
+        rows.extend(batch)
+
+
+def fetch_rows(session, statement, parameters=None, execution=EXECUTION_ORM, batch_size=FETCH_BATCH_SIZE):
+    """
+    Function to run a statement in the given execution mode and fetch all its rows
+
+    :param session: The session whose connection is used
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param statement: The statement to run
+    :type statement: :class:`sqlalchemy.sql.selectable.Select`
+
+    :param parameters: The values of the bound parameters of the statement
+    :type parameters: dict
+
+    :param execution: The execution mode, "orm", "core" or "dbapi"
+    :type execution: str
+
+    :param batch_size: The number of rows fetched at a time in the "core" and "dbapi" modes
+    :type batch_size: int
+
+    :return: rows - ORM rows, Core rows or DB-API tuples depending on the execution mode
+    :rtype: list
+    """
+    check_execution(execution)
+    parameters = parameters or {}
+
+    if execution == EXECUTION_ORM:
+        return session.execute(statement, parameters).all()
+
+    connection = session.connection()
+
+    if execution == EXECUTION_CORE:
+        # Named tuple like rows, as the ORM gives, rather than the legacy rows which also behave as mappings
+        result = connection.execution_options(future_result=True).execute(statement, parameters)
+        return _fetch_in_batches(result, batch_size)
+
+    cache_key = statement._generate_cache_key()
+    compiled_key = (connection.dialect.name, cache_key.key)
+
+    # Compiling once per statement shape as the Core compiled cache does, literal values come from the cache key
+    with _COMPILED_LOCK:
+        compiled = _COMPILED.get(compiled_key)
+        record_statement_cache(connection.engine, compiled is not None)
+
+        if compiled is None:
+            compiled = statement.compile(dialect=connection.dialect, cache_key=cache_key)
+            _COMPILED[compiled_key] = compiled
+
+            if len(_COMPILED) > COMPILED_CACHE_SIZE:
+                _COMPILED.popitem(last=False)
+        else:
+            _COMPILED.move_to_end(compiled_key)
+
+    values = compiled.construct_params(parameters, extracted_parameters=cache_key.bindparams)
+
+    if compiled.positional:
+        values = tuple(values[name] for name in compiled.positiontup)
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(str(compiled), values)
+        return _fetch_in_batches(cursor, batch_size)
+    finally:
+        cursor.close()
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Per Genre Track Leaderboards
+================================
+
+Module for keeping the exact number of purchases of every track in memory, with a leaderboard per genre, so the top
+tracks of every genre, Q5, are read from memory rather than ranking the whole invoiceline and track join per request
+
+Every genre keeps a count map, track id to its number of invoice lines, and a SortedList of (-count, track id) pairs,
+so a new invoice line removes and adds back the pair of its track in O(log n) and the top N of a genre is the first N
+pairs of its list. The leaderboards are loaded from the database once, and, attached to a session factory, follow the
+tracks, genres and invoice lines every committed flush inserts or deletes. Rows written with bulk inserts are fed with
+add_invoice_lines, and rows changed with Core statements or set based deletes need a reload
+
+The rows returned are the ones of the Q5 report, ties being broken by ascending track id
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * threading - to guard the leaderboards updated from several sessions
+    * sortedcontainers - to keep the leaderboards in order
+
+This script contains the following
+    * GenreLeaderboards - class holding the leaderboards of every genre
+"""
+# Standard Imports
+import logging
+import threading
+from collections import defaultdict
+
+# External imports
+import sqlalchemy.orm
+from sortedcontainers import SortedList
+from sqlalchemy import event, func, select
+
+# User Imports
+import mservice.database_model as models
+
+LOGGER = logging.getLogger(__name__)
+
+# The key of the rows written waiting for the commit in the info of a session
+PENDING_KEY = "genre_leaderboards_pending"
+
+
+class GenreLeaderboards:
+    """
+    Class holding the number of purchases of every track and the leaderboard of every genre
+
+    :ivar counts: Genre id to its map of track id to number of purchases
+    :vartype counts: dict
+
+    :ivar rankings: Genre id to the SortedList of its (-number of purchases, track id) pairs
+    :vartype rankings: dict
+
+    :ivar tracks: Track id to its name and genre id
+    :vartype tracks: dict
+
+    :ivar genre_names: Genre id to its name
+    :vartype genre_names: dict
+    """
+
+    def __init__(self):
+        """
+        Constructor of empty leaderboards
+        """
+        self.counts = defaultdict(dict)
+        self.rankings = defaultdict(SortedList)
+        self.tracks = {}
+        self.genre_names = {}
+        self._lock = threading.Lock()
+
+    def _move(self, track_id, change):
+        """
+        Function to change the number of purchases of a track and move it in the leaderboard of its genre
+
+        :param track_id: The id of the track
+        :type track_id: int
+
+        :param change: The number of purchases added, negative for removed ones
+        :type change: int
+
+        :return: Nothing
+        :rtype: None
+        """
+        if track_id not in self.tracks or self.tracks[track_id][1] is None:
+            return
+
+        genre_id = self.tracks[track_id][1]
+        counts, ranking = self.counts[genre_id], self.rankings[genre_id]
+        count = counts.pop(track_id, 0)
+
+        if count:
+            ranking.remove((-count, track_id))
+
+        if count + change > 0:
+            counts[track_id] = count + change
+            ranking.add((-count - change, track_id))
+
+    def add_genres(self, rows):
+        """
+        Function to add (genre id, name) rows
+
+        :param rows: The rows
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        with self._lock:
+            self.genre_names.update(rows)
+
+    def add_tracks(self, rows):
+        """
+        Function to add (track id, name, genre id) rows
+
+        :param rows: The rows
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        with self._lock:
+            self.tracks.update((track_id, (name, genre_id)) for track_id, name, genre_id in rows)
+
+    def add_invoice_lines(self, track_ids, change=1):
+        """
+        Function to count invoice lines, given the ids of their tracks
+
+        :param track_ids: The id of the track of every invoice line
+        :type track_ids: list
+
+        :param change: 1 for inserted invoice lines, -1 for deleted ones
+        :type change: int
+
+        :return: Nothing
+        :rtype: None
+        """
+        with self._lock:
+            for track_id in track_ids:
+                self._move(track_id, change)
+
+    @classmethod
+    def load(cls, session):
+        """
+        Function to load the leaderboards from the database, counting the invoice lines of every track once
+
+        :param session: The session to read the tables with
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :return: leaderboards
+        :rtype: :class:`mservice.aggregate_operation.genre_leaderboards.GenreLeaderboards`
+        """
+        if not issubclass(type(session), sqlalchemy.orm.session.Session):
+            raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+        leaderboards = cls()
+        leaderboards.add_genres(session.execute(select(models.GenreTable.genre_id, models.GenreTable.name)).all())
+        leaderboards.add_tracks(session.execute(select(models.TracksTable.track_id, models.TracksTable.name,
+                                                       models.TracksTable.genre_id)).all())
+
+        purchases = session.execute(select(models.InvoiceLineTable.track_id,
+                                           func.count(models.InvoiceLineTable.invoice_id)).
+                                    group_by(models.InvoiceLineTable.track_id)).all()
+
+        for track_id, count in purchases:
+            if track_id in leaderboards.tracks and leaderboards.tracks[track_id][1] is not None:
+                leaderboards.counts[leaderboards.tracks[track_id][1]][track_id] = count
+
+        # Sorting every leaderboard once rather than inserting the tracks one by one
+        for genre_id, counts in leaderboards.counts.items():
+            leaderboards.rankings[genre_id] = SortedList((-count, track_id) for track_id, count in counts.items())
+
+        LOGGER.info("Loaded the leaderboards of %s genres", len(leaderboards.rankings))
+        return leaderboards
+
+    def top_tracks_for_genre(self, number_of_tracks):
+        """
+        Function to get the top tracks of every genre, as the rows of the Q5 report
+
+        :param number_of_tracks: The number of tracks per genre
+        :type number_of_tracks: int
+
+        :return: rows - (track id, track name, genre id, genre name, number of purchases) rows
+        :rtype: list
+        """
+        with self._lock:
+            return [(track_id, self.tracks[track_id][0], genre_id, self.genre_names[genre_id], -count)
+                    for genre_id in sorted(self.rankings) if genre_id in self.genre_names
+                    for count, track_id in self.rankings[genre_id][:number_of_tracks]]
+
+    @staticmethod
+    def _collect_changes(session, flush_context):
+        """
+        Function listening to the flushes of a session, keeping the genres, tracks and invoice lines inserted or
+        deleted until the transaction commits
+
+        :param session: The session flushed
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :param flush_context: The context of the flush
+        :type flush_context: :class:`sqlalchemy.orm.unitofwork.UOWTransaction`
+
+        :return: Nothing
+        :rtype: None
+        """
+        pending = session.info.setdefault(PENDING_KEY, defaultdict(list))
+
+        for instance in session.new:
+            if issubclass(type(instance), models.GenreTable):
+                pending["genres"].append((instance.genre_id, instance.name))
+            elif issubclass(type(instance), models.TracksTable):
+                pending["tracks"].append((instance.track_id, instance.name, instance.genre_id))
+            elif issubclass(type(instance), models.InvoiceLineTable):
+                pending["bought"].append(instance.track_id)
+
+        for instance in session.deleted:
+            if issubclass(type(instance), models.InvoiceLineTable):
+                pending["returned"].append(instance.track_id)
+
+    def _apply_changes(self, session):
+        """
+        Function listening to the commits of a session, applying the rows it wrote to the leaderboards
+
+        :param session: The session committed
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :return: Nothing
+        :rtype: None
+        """
+        pending = session.info.pop(PENDING_KEY, None)
+
+        if pending is not None:
+            self.add_genres(pending["genres"])
+            self.add_tracks(pending["tracks"])
+            self.add_invoice_lines(pending["bought"])
+            self.add_invoice_lines(pending["returned"], change=-1)
+
+    @staticmethod
+    def _discard_changes(session):
+        """
+        Function listening to the rollbacks of a session, dropping the rows it wrote
+
+        :param session: The session rolled back
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :return: Nothing
+        :rtype: None
+        """
+        session.info.pop(PENDING_KEY, None)
+
+    def attach(self, session_factory):
+        """
+        Function to follow the rows written by the sessions of a factory, once committed
+
+        :param session_factory: The session factory
+        :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+        :return: Nothing
+        :rtype: None
+        """
+        if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+            raise AttributeError("Session Maker not passed properly, correct type "
+                                 "'sqlalchemy.orm.session.sessionmaker' ")
+
+        event.listen(session_factory, "after_flush", self._collect_changes)
+        event.listen(session_factory, "after_commit", self._apply_changes)
+        event.listen(session_factory, "after_rollback", self._discard_changes)
+
+    def detach(self, session_factory):
+        """
+        Function to stop following the rows written by the sessions of a factory
+
+        :param session_factory: The session factory given to attach
+        :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+        :return: Nothing
+        :rtype: None
+        """
+        event.remove(session_factory, "after_flush", self._collect_changes)
+        event.remove(session_factory, "after_commit", self._apply_changes)
+        event.remove(session_factory, "after_rollback", self._discard_changes)
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Roll Up Sales Through the Reporting Hierarchy
+===========================================================
+
+Module for reading records from the database to find the managers with the highest revenue, or the most sales, in a
+month counting the customers of every employee below them at any level, rather than only those of their direct
+reports as Q15 does. The employeeclosure table pairs every manager with every employee below them, so the roll up is a
+single join without a recursive query
+
+With a max depth of 1 the revenue roll up gives the rows of Q15
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following
+    * ROLLUP_REVENUE_STATEMENTS - The statements of the revenue roll up for every money representation, built once
+    * ROLLUP_SALES_STATEMENT - The statement of the sales roll up, built once
+    * build_rollup_statement - Function to build the statement rolling an aggregate of the invoices up the hierarchy
+    * get_rollup_manager_revenue - Function to Find Top Managers with Highest Revenue of Everyone Below Them in a Month
+    * get_rollup_manager_sales - Function to Find Top Managers with Most Sales of Everyone Below Them in a Month
+"""
+# Standard Imports
+import logging
+
+# External imports
+import sqlalchemy.orm
+from sqlalchemy import bindparam, desc, extract, func, select
+from sqlalchemy.orm.exc import NoResultFound
+from tabulate import tabulate
+
+# User Imports
+import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
+from mservice.aggregate_operation.money import (MONEY_DECIMAL, MONEY_REPRESENTATIONS, check_money, present_money,
+                                                sum_money)
+
+LOGGER = logging.getLogger(__name__)
+
+# The max depth standing for every level of the hierarchy
+ALL_LEVELS = 2 ** 31 - 1
+
+
+def build_rollup_statement(aggregate):
+    """
+    Function to build the statement rolling an aggregate of the invoices of a month up to every manager, the number of
+    rows being bound to the "limit" parameter, the year and month to the "year" and "month" parameters and the deepest
+    level counted below the manager to the "max_depth" parameter
+
+    :param aggregate: The aggregate of the invoices, labelled as the third column of the rows
+    :type aggregate: :class:`sqlalchemy.sql.expression.ColumnElement`
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    closure = models.EmployeeClosureTable
+
+    # Selecting the Manager Id, Manager Name, and the aggregate of the invoices of everyone below them
+    statement = select(closure.ancestor_id.label("manager_id"),
+                       (models.EmployeeTable.first_name + " " + models.EmployeeTable.last_name).label("manager_name"),
+                       aggregate)
+
+    # Joining the invoices to the support rep of their customer, and the rep to every manager above them
+    statement = statement.join(models.CustomerTable,
+                               models.InvoiceTable.customer_id == models.CustomerTable.customer_id)
+    statement = statement.join(closure, models.CustomerTable.support_rep_id == closure.descendant_id)
+    statement = statement.join(models.EmployeeTable, closure.ancestor_id == models.EmployeeTable.employee_id)
+
+    # Filtering the invoices of the month, and the levels below the manager
+    statement = statement.where(closure.depth.between(1, bindparam("max_depth")),
+                                extract('month', models.InvoiceTable.invoice_date) == bindparam("month"),
+                                extract('year', models.InvoiceTable.invoice_date) == bindparam("year"))
+
+    # Grouping by Manager Id, sorting by the aggregate and the manager id
+    statement = statement.group_by(closure.ancestor_id)
+    statement = statement.order_by(desc(aggregate.name), closure.ancestor_id)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statements of the reports, built once
+ROLLUP_REVENUE_STATEMENTS = {money: build_rollup_statement(sum_money(models.InvoiceTable.total, money).
+                                                           label("total_revenue"))
+                             for money in MONEY_REPRESENTATIONS}
+ROLLUP_SALES_STATEMENT = build_rollup_statement(func.count(models.InvoiceTable.invoice_id).label("total_sales"))
+
+
+def _check_arguments(session, number_of_manager, year, month, max_depth):
+    """
+    Function to check the arguments shared by the roll up reports
+
+    :return: Nothing
+    :rtype: None
+    """
+    if not issubclass(type(session), sqlalchemy.orm.session.Session):
+        raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+    if not issubclass(type(number_of_manager), int) or number_of_manager < 1:
+        raise AttributeError("number of Managers should be integer and greater than 0")
+
+    if not issubclass(type(year), int) or not issubclass(type(month), int) or not 1 <= month <= 12:
+        raise AttributeError("year should be integer and month should be integer between 1 and 12")
+
+    if max_depth is not None and (not issubclass(type(max_depth), int) or max_depth < 1):
+        raise AttributeError("max depth should be integer and greater than 0")
+
+
+def get_rollup_manager_revenue(session, number_of_manager, money=MONEY_DECIMAL, year=2012, month=8, max_depth=None,
+                               execution=EXECUTION_ORM):
+    """
+    Function to perform read operation with the database to Find Top Managers with Highest Revenue of Everyone Below
+    Them in a Month
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param number_of_manager: The number of managers to be returned from the query
+    :type number_of_manager: int
+
+    :param money: The money representation of the totals, "decimal" for Decimal amounts or "cents" for int cents
+    :type money: str
+
+    :param year: The year of the invoices
+    :type year: int
+
+    :param month: The month of the invoices, from 1 to 12
+    :type month: int
+
+    :param max_depth: The deepest level below a manager counted, 1 for their direct reports only, every level if None
+    :type max_depth: int
+
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
+    """
+    try:
+        _check_arguments(session, number_of_manager, year, month, max_depth)
+        check_money(money)
+        check_execution(execution)
+
+        LOGGER.info("Performing Read Operation")
+
+        parameters = {"limit": number_of_manager, "year": year, "month": month, "max_depth": max_depth or ALL_LEVELS}
+        results = fetch_rows(session, ROLLUP_REVENUE_STATEMENTS[money], parameters, execution)
+
+        if not results:
+            raise NoResultFound("No Records Found")
+
+        LOGGER.info("\n\nThe Top %s Manager with Highest Revenue Below Them in Year: %s and Month: %02d",
+                    number_of_manager, year, month)
+
+        print("\n\n")
+        print("===" * 50)
+        print("\n\n")
+
+        LOGGER.info("\n\n %s", tabulate(present_money(results, (2,), money),
+                                        headers=["Manager ID", "Manager Name", "Total Revenue"], tablefmt="grid"))
+
+        print("\n\n")
+        print("===" * 50)
+        print("\n\n")
+
+        return results
+    except AttributeError as err:
+        LOGGER.error(err)
+    except NoResultFound as err:
+        LOGGER.error(err)
+    finally:
+        session.close()
+
+
+def get_rollup_manager_sales(session, number_of_manager, year=2012, month=8, max_depth=None, execution=EXECUTION_ORM):
+    """
+    Function to perform read operation with the database to Find Top Managers with Most Sales of Everyone Below Them
+    in a Month
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param number_of_manager: The number of managers to be returned from the query
+    :type number_of_manager: int
+
+    :param year: The year of the invoices
+    :type year: int
+
+    :param month: The month of the invoices, from 1 to 12
+    :type month: int
+
+    :param max_depth: The deepest level below a manager counted, 1 for their direct reports only, every level if None
+    :type max_depth: int
+
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
+    """
+    try:
+        _check_arguments(session, number_of_manager, year, month, max_depth)
+        check_execution(execution)
+
+        LOGGER.info("Performing Read Operation")
+
+        parameters = {"limit": number_of_manager, "year": year, "month": month, "max_depth": max_depth or ALL_LEVELS}
+        results = fetch_rows(session, ROLLUP_SALES_STATEMENT, parameters, execution)
+
+        if not results:
+            raise NoResultFound("No Records Found")
+
+        LOGGER.info("\n\nThe Top %s Manager with Most Sales Below Them in Year: %s and Month: %02d",
+                    number_of_manager, year, month)
+
+        print("\n\n")
+        print("===" * 50)
+        print("\n\n")
+
+        LOGGER.info("\n\n %s", tabulate(results, headers=["Manager ID", "Manager Name", "Total Sales"],
+                                        tablefmt="grid"))
+
+        print("\n\n")
+        print("===" * 50)
+        print("\n\n")
+
+        return results
+    except AttributeError as err:
+        LOGGER.error(err)
+    except NoResultFound as err:
+        LOGGER.error(err)
+    finally:
+        session.close()
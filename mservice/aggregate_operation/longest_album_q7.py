@@ -8,7 +8,9 @@ Module for reading records from the database to get the longest Albums based on
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * LONGEST_ALBUM_STATEMENT - The statement of the report, built once
+    * build_longest_album_statement - Function to build the statement to get the longest albums
     * get_longest_album - Function to perform read operation with the database to get the longest albums
 """
 # Standard Imports
@@ -16,17 +18,45 @@ import logging
 
 # External imports
 import sqlalchemy.orm
-from sqlalchemy import desc, func
+from sqlalchemy import bindparam, desc, func, select
 from sqlalchemy.orm.exc import NoResultFound
 from tabulate import tabulate
 
 # User Imports
 import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_longest_album(session, number_of_albums):
+def build_longest_album_statement():
+    """
+    Function to build the statement to get the longest albums, the number of rows being bound to the "limit" parameter
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Selecting the Album id, Album Title, and sum of playtime
+    statement = select(models.TracksTable.album_id, models.AlbumTable.title,
+                       (func.sum(models.TracksTable.milliseconds)/1000).label("total_playtime"))
+
+    # Joining tracks table and album table
+    statement = statement.join(models.AlbumTable, models.TracksTable.album_id == models.AlbumTable.album_id)
+
+    # Grouping by Album Id
+    statement = statement.group_by(models.TracksTable.album_id)
+
+    # Sorting by milliseconds and track id
+    statement = statement.order_by(desc("total_playtime"), models.TracksTable.album_id)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report, built once
+LONGEST_ALBUM_STATEMENT = build_longest_album_statement()
+
+
+def get_longest_album(session, number_of_albums, execution=EXECUTION_ORM):
     """
     Function to perform read operation with the database to get the longest albums
 
@@ -36,8 +66,11 @@ def get_longest_album(session, number_of_albums):
     :param number_of_albums: The number of albums to be returned from the query
     :type number_of_albums: int
 
-    :return: Nothing
-    :rtype: None
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
     """
     try:
         if not issubclass(type(session), sqlalchemy.orm.session.Session):
@@ -46,22 +79,11 @@ def get_longest_album(session, number_of_albums):
         if not issubclass(type(number_of_albums), int) or number_of_albums < 1:
             raise AttributeError("number of albums should be integer and greater than 0")
 
-        LOGGER.info("Performing Read Operation")
-
-        # Selecting the Album id, Album Title, and sum of playtime
-        query = session.query(models.TracksTable.album_id, models.AlbumTable.title,
-                              (func.sum(models.TracksTable.milliseconds)/1000).label("total_playtime"))
+        check_execution(execution)
 
-        # Joining tracks table and album table
-        query = query.join(models.AlbumTable, models.TracksTable.album_id == models.AlbumTable.album_id)
-
-        # Grouping by Album Id
-        query = query.group_by(models.TracksTable.album_id)
-
-        # Sorting by milliseconds and track id
-        query = query.order_by(desc("total_playtime"), models.TracksTable.album_id)
+        LOGGER.info("Performing Read Operation")
 
-        results = query.limit(number_of_albums).all()
+        results = fetch_rows(session, LONGEST_ALBUM_STATEMENT, {"limit": number_of_albums}, execution)
 
         if not results:
             raise NoResultFound("No Records Found")
@@ -78,6 +100,8 @@ def get_longest_album(session, number_of_albums):
         print("\n\n")
         print("===" * 50)
         print("\n\n")
+
+        return results
     except AttributeError as err:
         LOGGER.error(err)
     except NoResultFound as err:
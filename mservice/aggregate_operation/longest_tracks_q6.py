@@ -8,7 +8,9 @@ Module for reading records from the database to get the longest tracks based on
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * LONGEST_TRACKS_STATEMENT - The statement of the report, built once
+    * build_longest_tracks_statement - Function to build the statement to get the longest tracks
     * get_longest_tracks - Function to perform read operation with the database to get the longest tracks
 """
 # Standard Imports
@@ -16,17 +18,38 @@ import logging
 
 # External imports
 import sqlalchemy.orm
-from sqlalchemy import desc
+from sqlalchemy import bindparam, desc, select
 from sqlalchemy.orm.exc import NoResultFound
 from tabulate import tabulate
 
 # User Imports
 import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_longest_tracks(session, number_of_tracks):
+def build_longest_tracks_statement():
+    """
+    Function to build the statement to get the longest tracks, the number of rows being bound to the "limit" parameter
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Selecting the Track id, Track Name, and Playtime Of Tracks
+    statement = select(models.TracksTable.track_id, models.TracksTable.name, models.TracksTable.milliseconds)
+
+    # Sorting by milliseconds and track id
+    statement = statement.order_by(desc(models.TracksTable.milliseconds), models.TracksTable.track_id)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report, built once
+LONGEST_TRACKS_STATEMENT = build_longest_tracks_statement()
+
+
+def get_longest_tracks(session, number_of_tracks, execution=EXECUTION_ORM):
     """
     Function to perform read operation with the database to get the longest tracks
 
@@ -36,8 +59,11 @@ def get_longest_tracks(session, number_of_tracks):
     :param number_of_tracks: The number of tracks to be returned from the query
     :type number_of_tracks: int
 
-    :return: Nothing
-    :rtype: None
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
     """
     try:
         if not issubclass(type(session), sqlalchemy.orm.session.Session):
@@ -46,15 +72,11 @@ def get_longest_tracks(session, number_of_tracks):
         if not issubclass(type(number_of_tracks), int) or number_of_tracks < 1:
             raise AttributeError("number of tracks should be integer and greater than 0")
 
-        LOGGER.info("Performing Read Operation")
+        check_execution(execution)
 
-        # Selecting the Track id, Track Name, and Playtime Of Tracks
-        query = session.query(models.TracksTable.track_id, models.TracksTable.name, models.TracksTable.milliseconds)
-
-        # Sorting by milliseconds and track id
-        query = query.order_by(desc(models.TracksTable.milliseconds), models.TracksTable.track_id)
+        LOGGER.info("Performing Read Operation")
 
-        results = query.limit(number_of_tracks).all()
+        results = fetch_rows(session, LONGEST_TRACKS_STATEMENT, {"limit": number_of_tracks}, execution)
 
         if not results:
             raise NoResultFound("No Records Found")
@@ -71,6 +93,8 @@ def get_longest_tracks(session, number_of_tracks):
         print("\n\n")
         print("===" * 50)
         print("\n\n")
+
+        return results
     except AttributeError as err:
         LOGGER.error(err)
     except NoResultFound as err:
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Money Representations
+==========================
+
+Module for the money representations of the analytics paths. Prices and totals are NUMERIC(10, 2), which the driver
+returns as :class:`decimal.Decimal`, slow to create and to sum. The "cents" representation has the database sum the
+amounts as integer cents instead, so every row carries a plain int, and keeps them as ints until they are presented
+
+This script requires the following modules be installed in the python environment
+    * decimal - to convert cents back to amounts for presentation
+
+This script contains the following
+    * MONEY_REPRESENTATIONS - The supported money representations
+    * check_money - Function to validate a money representation argument
+    * sum_money - Function to build the SUM of a money column in the given representation
+    * cents_to_decimal - Function to convert cents to an amount
+    * present_money - Function to convert the cents of result rows to amounts for presentation
+"""
+# Standard Imports
+from decimal import Decimal
+
+# External imports
+from sqlalchemy import BigInteger, cast, func
+
+MONEY_DECIMAL = "decimal"
+MONEY_CENTS = "cents"
+MONEY_REPRESENTATIONS = (MONEY_DECIMAL, MONEY_CENTS)
+
+CENT = Decimal("0.01")
+
+
+def check_money(money):
+    """
+    Function to validate a money representation argument
+
+    :param money: The money representation, "decimal" or "cents"
+    :type money: str
+
+    :return: Nothing
+    :rtype: None
+    """
+    if money not in MONEY_REPRESENTATIONS:
+        raise AttributeError("money should be one of %s" % ", ".join(MONEY_REPRESENTATIONS))
+
+
+def sum_money(column, money=MONEY_DECIMAL):
+    """
+    Function to build the SUM of a money column, as a NUMERIC amount or as a BIGINT number of cents. The cents are
+    rounded per row before summing, so the sum is exact whatever the scale of the column
+
+    :param column: The money column
+    :type column: :class:`sqlalchemy.orm.attributes.InstrumentedAttribute`
+
+    :param money: The money representation, "decimal" or "cents"
+    :type money: str
+
+    :return: expression
+    :rtype: :class:`sqlalchemy.sql.elements.ColumnElement`
+    """
+    check_money(money)
+
+    if money == MONEY_CENTS:
+        return cast(func.sum(func.round(column * 100)), BigInteger)
+
+    return func.sum(column)
+
+
+def cents_to_decimal(cents):
+    """
+    Function to convert an amount in cents to the Decimal the database returns for NUMERIC(10, 2)
+
+    :param cents: The amount in cents
+    :type cents: int
+
+    :return: amount
+    :rtype: :class:`decimal.Decimal`
+    """
+    return Decimal(int(cents)).scaleb(-2).quantize(CENT)
+
+
+def present_money(rows, positions, money=MONEY_DECIMAL):
+    """
+    Function to get result rows ready for presentation, converting their cents to amounts when the rows are in cents
+
+    :param rows: The result rows
+    :type rows: list
+
+    :param positions: The positions of the money columns in the rows
+    :type positions: tuple
+
+    :param money: The money representation of the rows, "decimal" or "cents"
+    :type money: str
+
+    :return: rows - The rows, with amounts in place of cents
+    :rtype: list
+    """
+    if money != MONEY_CENTS:
+        return rows
+
+    return [tuple(cents_to_decimal(value) if position in positions and value is not None else value
+                  for position, value in enumerate(row)) for row in rows]
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Named Query Registry
+========================
+
+Module for running the hand written SQL of docs/chinook_additional_sql as named reports. Every question file is loaded
+once as a :func:`sqlalchemy.text` statement, its limit, year and month being the bound parameters "limit", "year" and
+"month", so the statement is compiled once per engine by the compiled cache of SQLAlchemy and then found there, and
+is run through :func:`fetch_rows` in any execution mode, the same as the statements of the ORM reports
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * os - to locate the SQL files
+
+This script contains the following
+    * SQL_DIRECTORY - The directory of the SQL files
+    * NAMED_QUERY_FILES - The SQL file of every question
+    * load_named_queries - Function to load the statements of every question from a directory
+    * get_named_query - Function to get the statement of one question
+    * run_named_query - Function to run the statement of one question and fetch its rows
+"""
+# Standard Imports
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+# External imports
+from sqlalchemy import text
+
+# User Imports
+from mservice.aggregate_operation.execution import EXECUTION_ORM, fetch_rows
+
+LOGGER = logging.getLogger(__name__)
+
+SQL_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "docs",
+                             "chinook_additional_sql")
+
+# The question name, as used by the benchmarks, to its SQL file. The helper and partial files are not questions
+NAMED_QUERY_FILES = OrderedDict([
+    ("Q1", "q1_top_album_no_tracks.sql"),
+    ("Q2", "q2_top_artist_no_tracks.sql"),
+    ("Q3", "q3_top_customer_total_amount.sql"),
+    ("Q4", "q4_top_albums_number_of_purchases.sql"),
+    ("Q5", "q5_top_tracks_for_genre.sql"),
+    ("Q6", "q6_longest_track.sql"),
+    ("Q7", "q7_longest_album.sql"),
+    ("Q8", "q8_number_of_playlist_of_tracks.sql"),
+    ("Q9", "q9_number_of_playlist_of_album.sql"),
+    ("Q10", "q10_tracks_with_more_genre.sql"),
+    ("Q11", "q11_genre_album.sql"),
+    ("Q12", "q12_genre_artist.sql"),
+    ("Q13", "q13_artist_distinct_genre.sql"),
+    ("Q14", "q14_top_employee_month_year.sql"),
+    ("Q15", "q15_top_manager.sql"),
+])
+
+# The statements loaded so far, per directory
+_NAMED_QUERIES = {}
+_NAMED_QUERIES_LOCK = threading.Lock()
+
+
+def load_named_queries(directory=SQL_DIRECTORY):
+    """
+    Function to load the statement of every question from the SQL files of a directory, reading the files only the
+    first time the directory is asked for
+
+    :param directory: The directory of the SQL files
+    :type directory: str
+
+    :return: statements - Question name to its statement
+    :rtype: :class:`collections.OrderedDict`
+    """
+    directory = os.path.realpath(directory)
+
+    with _NAMED_QUERIES_LOCK:
+        statements = _NAMED_QUERIES.get(directory)
+
+        if statements is None:
+            if not os.path.isdir(directory):
+                raise AttributeError("SQL directory '%s' does not exist" % directory)
+
+            statements = OrderedDict()
+
+            for name, file_name in NAMED_QUERY_FILES.items():
+                with open(os.path.join(directory, file_name), encoding="utf-8") as sql_file:
+                    # The files end without a semicolon, which text() would pass on to the driver
+                    statements[name] = text(sql_file.read().strip().rstrip(";"))
+
+            LOGGER.info("Loaded %s named queries from %s", len(statements), directory)
+            _NAMED_QUERIES[directory] = statements
+
+    return statements
+
+
+def get_named_query(name, directory=SQL_DIRECTORY):
+    """
+    Function to get the statement of one question
+
+    :param name: The question name, "Q1" to "Q15"
+    :type name: str
+
+    :param directory: The directory of the SQL files
+    :type directory: str
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.elements.TextClause`
+    """
+    if name not in NAMED_QUERY_FILES:
+        raise AttributeError("name should be one of %s" % ", ".join(NAMED_QUERY_FILES))
+
+    return load_named_queries(directory)[name]
+
+
+def run_named_query(session, name, parameters, execution=EXECUTION_ORM, directory=SQL_DIRECTORY):
+    """
+    Function to run the statement of one question and fetch its rows
+
+    :param session: The session whose connection is used
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param name: The question name, "Q1" to "Q15"
+    :type name: str
+
+    :param parameters: The values of the bound parameters, "limit" for every question, "year" and "month" for Q14 and
+                       Q15
+    :type parameters: dict
+
+    :param execution: The execution mode, "orm", "core" or "dbapi"
+    :type execution: str
+
+    :param directory: The directory of the SQL files
+    :type directory: str
+
+    :return: rows
+    :rtype: list
+    """
+    return fetch_rows(session, get_named_query(name, directory), parameters, execution)
@@ -8,7 +8,10 @@ Module for reading records from the database to get the number of playlist a tra
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * NUMBER_OF_PLAYLIST_TRACKS_STATEMENT - The statement of the report, built once
+    * build_number_of_playlist_tracks_statement - Function to build the statement to get the number of playlist a track
+                                                  has been added to
     * get_number_of_playlist_tracks - Function to perform read operation with the database to get the number of
                                       playlist a track has been added to
 """
@@ -17,17 +20,46 @@ import logging
 
 # External imports
 import sqlalchemy.orm
-from sqlalchemy import desc, func
+from sqlalchemy import bindparam, desc, func, select
 from sqlalchemy.orm.exc import NoResultFound
 from tabulate import tabulate
 
 # User Imports
 import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_number_of_playlist_tracks(session, number_of_tracks):
+def build_number_of_playlist_tracks_statement():
+    """
+    Function to build the statement to get the number of playlist a track has been added to, the number of rows being
+    bound to the "limit" parameter
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Selecting the Track Id, Track Name, and Count of playlist IDs
+    statement = select(models.PlaylistTrackTable.track_id, models.TracksTable.name,
+                       func.count(models.PlaylistTrackTable.play_list_id).label("number_of_playlist"))
+
+    # Joining tracks table and playlisttrack table
+    statement = statement.join(models.TracksTable, models.PlaylistTrackTable.track_id == models.TracksTable.track_id)
+
+    # Grouping by Track Id
+    statement = statement.group_by(models.PlaylistTrackTable.track_id)
+
+    # Sorting by number_of_playlist and track id
+    statement = statement.order_by(desc("number_of_playlist"), models.PlaylistTrackTable.track_id)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report, built once
+NUMBER_OF_PLAYLIST_TRACKS_STATEMENT = build_number_of_playlist_tracks_statement()
+
+
+def get_number_of_playlist_tracks(session, number_of_tracks, execution=EXECUTION_ORM):
     """
     Function to perform read operation with the database to get the number of playlist a track has been added to
 
@@ -37,8 +69,11 @@ def get_number_of_playlist_tracks(session, number_of_tracks):
     :param number_of_tracks: The number of tracks to be returned from the query
     :type number_of_tracks: int
 
-    :return: Nothing
-    :rtype: None
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
     """
     try:
         if not issubclass(type(session), sqlalchemy.orm.session.Session):
@@ -47,22 +82,11 @@ def get_number_of_playlist_tracks(session, number_of_tracks):
         if not issubclass(type(number_of_tracks), int) or number_of_tracks < 1:
             raise AttributeError("number of tracks should be integer and greater than 0")
 
-        LOGGER.info("Performing Read Operation")
-
-        # Selecting the Track Id, Track Name, and Count of playlist IDs
-        query = session.query(models.PlaylistTrackTable.track_id, models.TracksTable.name,
-                              func.count(models.PlaylistTrackTable.play_list_id).label("number_of_playlist"))
+        check_execution(execution)
 
-        # Joining tracks table and playlisttrack table
-        query = query.join(models.TracksTable, models.PlaylistTrackTable.track_id == models.TracksTable.track_id)
-
-        # Grouping by Track Id
-        query = query.group_by(models.PlaylistTrackTable.track_id)
-
-        # Sorting by number_of_playlist and track id
-        query = query.order_by(desc("number_of_playlist"), models.PlaylistTrackTable.track_id)
+        LOGGER.info("Performing Read Operation")
 
-        results = query.limit(number_of_tracks).all()
+        results = fetch_rows(session, NUMBER_OF_PLAYLIST_TRACKS_STATEMENT, {"limit": number_of_tracks}, execution)
 
         if not results:
             raise NoResultFound("No Records Found")
@@ -79,6 +103,8 @@ def get_number_of_playlist_tracks(session, number_of_tracks):
         print("\n\n")
         print("===" * 50)
         print("\n\n")
+
+        return results
     except AttributeError as err:
         LOGGER.error(err)
     except NoResultFound as err:
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel Report Runner
+==========================
+
+Module for running a pack of reports concurrently on a bounded thread pool, so the wall time of the pack is close to
+that of its slowest report rather than the sum of all of them. Every report runs on its own session, bound to a
+connection of its own, as sessions and connections are not shared between threads
+
+A report running past its timeout, or still running when the pack is cancelled, has its statement cancelled on the
+server, with KILL QUERY on MySQL and by interrupting the connection where the driver supports it, such as sqlite3. A
+report not started yet is simply never started. The thread pool is sized by the number of workers, and the connection
+pool of the engine should hold one connection more than that, for the KILL QUERY
+
+Given a catalog snapshot opened with :func:`mservice.snapshot.snapshot_store.open_snapshot`, the catalog reports of the
+pack are answered from its memory mapped columns, without a connection, the others still running on the database
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * concurrent.futures - to run the reports on a thread pool
+    * threading - to signal the cancellation of the pack
+
+This script contains the following
+    * ReportSpec - The report to run along with its arguments and timeout
+    * pool_size_for_workers - Function to get the connection pool size needed by a number of workers
+    * SNAPSHOT_REPORTS - The reports a catalog snapshot answers, along with the method answering them
+    * dashboard_report_specs - Function to get the specs of the Q1 to Q15 report pack
+    * run_reports_in_parallel - Function to run reports concurrently and collect their results into a summary
+"""
+# Standard Imports
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# External imports
+import sqlalchemy.orm
+import sqlalchemy.pool
+from sqlalchemy import text
+from tabulate import tabulate
+
+# User Imports
+from mservice.aggregate_operation.top_album_tracks_q1 import get_top_album_tracks
+from mservice.aggregate_operation.top_artist_tracks_q2 import get_top_artist_tracks
+from mservice.aggregate_operation.top_customer_amount_q3 import get_top_customers
+from mservice.aggregate_operation.top_album_purchases_q4 import get_top_album_purchases
+from mservice.aggregate_operation.top_tracks_for_genre_q5 import get_top_tracks_for_genre
+from mservice.aggregate_operation.longest_tracks_q6 import get_longest_tracks
+from mservice.aggregate_operation.longest_album_q7 import get_longest_album
+from mservice.aggregate_operation.number_of_playlist_tracks_q8 import get_number_of_playlist_tracks
+from mservice.aggregate_operation.number_of_playlist_album_q9 import get_number_of_playlist_album
+from mservice.aggregate_operation.tracks_with_more_genre_q10 import get_tracks_with_more_genre
+from mservice.aggregate_operation.add_genre_to_album_q11 import add_genre_to_album
+from mservice.aggregate_operation.add_genre_to_artist_q12 import add_genre_to_artist
+from mservice.aggregate_operation.top_artist_distinct_genre_q13 import get_top_artist_genre
+from mservice.aggregate_operation.top_employee_month_q14 import get_top_employee_sales
+from mservice.aggregate_operation.top_manager_month_q15 import get_top_manager_revenue
+
+LOGGER = logging.getLogger(__name__)
+
+# The name of the report, the report function called with a session and then the arguments, and the seconds the
+# report may run before being cancelled, None for no timeout
+ReportSpec = namedtuple("ReportSpec", ["name", "report", "arguments", "timeout"], defaults=[(), None])
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_TIMED_OUT = "timed out"
+STATUS_CANCELLED = "cancelled"
+
+# The seconds between two checks of the running reports for timeouts and cancellation
+POLL_INTERVAL = 0.05
+
+# The name of the report to the name of the method of the catalog snapshot answering it, by name as the snapshot
+# package imports the money module of this package
+SNAPSHOT_REPORTS = OrderedDict([
+    ("Q1", "top_album_tracks"), ("Q2", "top_artist_tracks"), ("Q3", "top_customers"), ("Q4", "top_album_purchases"),
+    ("Q5", "top_tracks_for_genre"), ("Q6", "longest_tracks"), ("Q7", "longest_album"),
+    ("Q8", "number_of_playlist_tracks"), ("Q9", "number_of_playlist_album"), ("Q10", "tracks_with_more_genre"),
+    ("Q13", "top_artist_genre"),
+])
+
+
+def pool_size_for_workers(workers):
+    """
+    Function to get the connection pool size needed to run reports on a number of workers, one connection per worker
+    and one for cancelling their statements
+
+    :param workers: The number of worker threads
+    :type workers: int
+
+    :return: pool_size
+    :rtype: int
+    """
+    if not issubclass(type(workers), int) or workers < 1:
+        raise AttributeError("workers should be integer and greater than 0")
+
+    return workers + 1
+
+
+def _engine_report(report):
+    """
+    Function to adapt a report taking an engine, such as Q11 and Q12, to be called with a session. The report connects
+    on its own, so its statement is not cancelled on timeout. The report is kept as the "engine_report" attribute of
+    the adapter, for the runner to call it without holding a connection of its own meanwhile
+
+    :param report: The report function taking an engine
+    :type report: function
+
+    :return: report - The report function taking a session
+    :rtype: function
+    """
+    def run(session, *arguments):
+        engine = session.get_bind().engine
+        session.close()
+        return report(engine, *arguments)
+
+    run.engine_report = report
+    return run
+
+
+def _snapshot_report(method_name, snapshot):
+    """
+    Function to adapt a method of a catalog snapshot to be called with a session, which is closed unused. The method
+    bound to the snapshot is kept as the "snapshot_report" attribute of the adapter, for the runner to call it without
+    checking out a connection
+
+    :param method_name: The name of the method of the snapshot answering the report
+    :type method_name: str
+
+    :param snapshot: The snapshot to answer from
+    :type snapshot: :class:`mservice.snapshot.catalog_snapshot.CatalogSnapshot`
+
+    :return: report - The report function taking a session
+    :rtype: function
+    """
+    method = getattr(snapshot, method_name)
+
+    def run(session, *arguments):
+        session.close()
+        return method(*arguments)
+
+    run.snapshot_report = method
+    return run
+
+
+def dashboard_report_specs(number=10, timeout=None, snapshot=None):
+    """
+    Function to get the specs of the Q1 to Q15 report pack
+
+    :param number: The number of rows of every report
+    :type number: int
+
+    :param timeout: The seconds every report may run before being cancelled, None for no timeout
+    :type timeout: float
+
+    :param snapshot: The snapshot answering the reports of SNAPSHOT_REPORTS, all of them running on the database if
+                     None
+    :type snapshot: :class:`mservice.snapshot.catalog_snapshot.CatalogSnapshot`
+
+    :return: specs
+    :rtype: list
+    """
+    # Imported here, the snapshot package importing the money module of this package
+    from mservice.snapshot.catalog_snapshot import CatalogSnapshot
+
+    if snapshot is not None and not issubclass(type(snapshot), CatalogSnapshot):
+        raise AttributeError("snapshot should be of type 'CatalogSnapshot'")
+
+    reports = [("Q1", get_top_album_tracks), ("Q2", get_top_artist_tracks), ("Q3", get_top_customers),
+               ("Q4", get_top_album_purchases), ("Q5", get_top_tracks_for_genre), ("Q6", get_longest_tracks),
+               ("Q7", get_longest_album), ("Q8", get_number_of_playlist_tracks),
+               ("Q9", get_number_of_playlist_album), ("Q10", get_tracks_with_more_genre),
+               ("Q11", _engine_report(add_genre_to_album)), ("Q12", _engine_report(add_genre_to_artist)),
+               ("Q13", get_top_artist_genre), ("Q14", get_top_employee_sales), ("Q15", get_top_manager_revenue)]
+
+    if snapshot is not None:
+        reports = [(name, _snapshot_report(SNAPSHOT_REPORTS[name], snapshot) if name in SNAPSHOT_REPORTS else report)
+                   for name, report in reports]
+
+    return [ReportSpec(name, report, (number,), timeout) for name, report in reports]
+
+
+def _run_report(session_factory, spec, task):
+    """
+    Function run by a worker thread, running one report on a session bound to a connection of its own, and recording
+    in the task what is needed to cancel its statement
+
+    :param session_factory: The session factory used to create the session
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param spec: The report to run
+    :type spec: :class:`ReportSpec`
+
+    :param task: The state of the task shared with the runner, "started" and "connection" being set here
+    :type task: dict
+
+    :return: The result of the report
+    :rtype: object
+    """
+    if task["cancelled"].is_set():
+        return None
+
+    engine = session_factory.kw["bind"]
+    engine_report = getattr(spec.report, "engine_report", None)
+    snapshot_report = getattr(spec.report, "snapshot_report", None)
+
+    # A report answered from a snapshot needs no connection
+    if snapshot_report is not None:
+        task["started"] = time.perf_counter()
+        return snapshot_report(*spec.arguments)
+
+    # A report taking an engine checks out a connection of its own, a second one held here would leave the pool short
+    if engine_report is not None:
+        task["started"] = time.perf_counter()
+        return engine_report(engine, *spec.arguments)
+
+    with engine.connect() as connection:
+        if connection.dialect.name == "mysql":
+            task["connection_id"] = connection.execute(text("SELECT CONNECTION_ID()")).scalar()
+
+        task["connection"] = connection.connection
+        task["started"] = time.perf_counter()
+
+        # The report closes the session, the connection being closed here
+        return spec.report(session_factory(bind=connection), *spec.arguments)
+
+
+def _cancel_statement(engine, task):
+    """
+    Function to cancel the statement a task is running, on MySQL with KILL QUERY from another connection, otherwise by
+    interrupting the connection of the task if the driver supports it
+
+    :param engine: The engine the task connected with
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :param task: The state of the task
+    :type task: dict
+
+    :return: Nothing
+    :rtype: None
+    """
+    task["cancelled"].set()
+
+    try:
+        if task.get("connection_id") is not None:
+            with engine.connect() as connection:
+                connection.execute(text("KILL QUERY %d" % task["connection_id"]))
+        elif hasattr(task.get("connection"), "interrupt"):
+            task["connection"].interrupt()
+    except sqlalchemy.exc.SQLAlchemyError as err:
+        LOGGER.warning("Could not cancel the statement of the report: %s", err)
+
+
+def run_reports_in_parallel(session_factory, specs, workers=4, cancel=None):
+    """
+    Function to run reports concurrently on a thread pool of `workers` threads, one session per report, cancelling the
+    reports running past their timeout, and collect their results and errors into a single summary
+
+    :param session_factory: The session factory used to create new sessions
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param specs: The reports to run
+    :type specs: list
+
+    :param workers: The number of worker threads
+    :type workers: int
+
+    :param cancel: An event cancelling every report not done yet once set, from another thread
+    :type cancel: :class:`threading.Event`
+
+    :return: summary - Per report, its status, "done", "failed", "timed out" or "cancelled", its seconds, None if it
+                       never started, its result and its error
+    :rtype: :class:`collections.OrderedDict`
+    """
+    if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+        raise AttributeError("Session Maker not passed properly, correct type 'sqlalchemy.orm.session.sessionmaker' ")
+
+    if not specs or not all(issubclass(type(spec), ReportSpec) for spec in specs):
+        raise AttributeError("specs should be a non empty list of ReportSpec")
+
+    if len(set(spec.name for spec in specs)) != len(specs):
+        raise AttributeError("report names should be unique")
+
+    engine = session_factory.kw["bind"]
+
+    if issubclass(type(engine.pool), sqlalchemy.pool.QueuePool) and engine.pool.size() < pool_size_for_workers(workers):
+        LOGGER.warning("The connection pool keeps %s connections while %s workers need %s, the others being opened "
+                       "and closed for every report", engine.pool.size(), workers, pool_size_for_workers(workers))
+
+    cancel = cancel or threading.Event()
+    summary = OrderedDict((spec.name, {"status": None, "seconds": None, "result": None, "error": None})
+                          for spec in specs)
+    started = time.perf_counter()
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report")
+
+    try:
+        tasks = {}
+
+        for spec in specs:
+            task = {"spec": spec, "cancelled": threading.Event(), "started": None}
+            tasks[executor.submit(_run_report, session_factory, spec, task)] = task
+
+        pending = set(tasks)
+
+        while pending:
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                task = tasks[future]
+                report = summary[task["spec"].name]
+
+                if report["status"] is not None:
+                    continue
+
+                if task["started"] is not None:
+                    report["seconds"] = time.perf_counter() - task["started"]
+
+                if future.cancelled() or task["cancelled"].is_set():
+                    report["status"] = STATUS_CANCELLED
+                elif future.exception() is not None:
+                    report["status"], report["error"] = STATUS_FAILED, repr(future.exception())
+                else:
+                    report["status"], report["result"] = STATUS_DONE, future.result()
+
+            for future in list(pending):
+                task = tasks[future]
+                spec = task["spec"]
+                timed_out = task["started"] is not None and spec.timeout is not None and \
+                    time.perf_counter() - task["started"] > spec.timeout
+
+                if not timed_out and not cancel.is_set():
+                    continue
+
+                summary[spec.name]["status"] = STATUS_TIMED_OUT if timed_out else STATUS_CANCELLED
+
+                if task["started"] is not None:
+                    summary[spec.name]["seconds"] = time.perf_counter() - task["started"]
+
+                # A report not started yet is dropped, a running one has its statement cancelled and is left to end
+                if not future.cancel():
+                    _cancel_statement(engine, task)
+                pending.discard(future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    wall_seconds = time.perf_counter() - started
+
+    LOGGER.info("\n\nRan %s Reports On %s Workers In %.3f Seconds, Their Sum Being %.3f Seconds\n\n %s", len(specs),
+                workers, wall_seconds, sum(report["seconds"] or 0 for report in summary.values()),
+                tabulate([[name, report["status"], report["seconds"], report["error"]]
+                          for name, report in summary.items()],
+                         headers=["Report", "Status", "Seconds", "Error"], tablefmt="grid"))
+    return summary
@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+"""
+Multi Dimensional Sales Cube
+================================
+
+Module for keeping the sales pre aggregated over the dimensions the business questions slice them by, so a question
+such as the sales of a genre by month, or of a country by employee, is a roll up of the cube in memory rather than a
+new scan of the invoice, invoiceline and track join
+
+Every cell of the cube holds the quantity, the revenue in cents and the number of invoices of one combination of the
+dimensions, their values being kept as int codes in a NumPy matrix, one row per cell. The number of invoices is not
+additive over the line level dimensions, genre, media_type and artist, an invoice with lines of two genres counting
+once for each genre but once only for both. So every invoice is counted in the cells of every subset of the line level
+dimensions, the dimensions left out of the subset being ALL, once per combination of the subset it has lines of. A
+roll up reads the cells of the subset of the line level dimensions it groups or filters by, whose sums count every
+invoice exactly once per group
+
+The cube is built in one streaming pass, and refreshed incrementally with the invoices inserted from an overlap before
+the latest created_on consumed, skipping those consumed already, rather than with the invoices above the highest id
+consumed, as ids do not commit in their order. Invoices updated or deleted after they were consumed are not seen, and
+need a rebuild. The cube is saved to a single file and opened again without the database
+
+This script requires the following modules be installed in the python environment
+    * json - to save the values of the dimensions
+    * logging - to perform logging operations
+    * threading - to guard the cube refreshed while it is queried
+    * numpy - to hold the cells
+
+This script contains the following
+    * DIMENSIONS - The dimensions of the cube, in the order of its codes
+    * MEASURES - The measures of every cell
+    * CUBE_ROWS_STATEMENT - The statement of the invoice lines consumed by a build, built once
+    * CUBE_ROWS_SINCE_STATEMENT - The statement of the invoice lines consumed by a refresh, built once
+    * SalesCube - class holding the cells of the cube and rolling them up
+"""
+# Standard Imports
+import json
+import logging
+import threading
+
+# External imports
+import numpy as np
+import sqlalchemy.orm
+from sqlalchemy import BigInteger, bindparam, cast, func, select
+
+# User Imports
+import mservice.database_model as models
+from mservice.database_model.insert_watermark import InsertWatermark
+from mservice.aggregate_operation.money import MONEY_DECIMAL, check_money, cents_to_decimal
+
+LOGGER = logging.getLogger(__name__)
+
+DIMENSIONS = ("year_month", "genre", "media_type", "billing_country", "support_rep", "artist")
+MEASURES = ("quantity", "revenue", "invoices")
+
+# The positions of the dimensions of the invoice lines, ALL in the cells of the invoices
+LINE_AXES = (1, 2, 5)
+
+# Every subset of the line level dimensions an invoice is counted over, but the empty one of the invoice cells
+LINE_SUBSETS = tuple(tuple(axis for bit, axis in enumerate(LINE_AXES) if mask >> bit & 1)
+                     for mask in range(1, 2 ** len(LINE_AXES)))
+
+# The code of the ALL value
+ALL = -1
+
+# The number of rows taken from the stream at once
+SCAN_BATCH_SIZE = 10000
+
+# The number of cells the matrix is first allocated with
+INITIAL_CELLS = 1024
+
+# The version of the layout of the cells saved to a file, files of another version are rebuilt
+FILE_FORMAT = 3
+
+
+def build_cube_rows_statement():
+    """
+    Function to build the statement of the invoices, one row per invoice line, or a single row without a line for an
+    invoice with none, in the order of their insert, the lines of an invoice being together
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Selecting the invoice level dimensions, the line level dimensions, the quantity, the revenue in cents and the
+    # created_on of the invoice
+    statement = select(models.InvoiceTable.invoice_id, models.InvoiceTable.invoice_date,
+                       models.InvoiceTable.billing_country, models.CustomerTable.support_rep_id,
+                       models.InvoiceLineTable.invoice_line_id, models.TracksTable.genre_id,
+                       models.TracksTable.media_type_id, models.AlbumTable.artist_id, models.InvoiceLineTable.quantity,
+                       cast(func.round(models.InvoiceLineTable.unit_price * models.InvoiceLineTable.quantity * 100),
+                            BigInteger), models.InvoiceTable.created_on)
+
+    # Joining the customer of every invoice, and the track and album of every line, if any
+    statement = statement.join(models.CustomerTable,
+                               models.InvoiceTable.customer_id == models.CustomerTable.customer_id)
+    statement = statement.outerjoin(models.InvoiceLineTable,
+                                    models.InvoiceTable.invoice_id == models.InvoiceLineTable.invoice_id)
+    statement = statement.outerjoin(models.TracksTable,
+                                    models.InvoiceLineTable.track_id == models.TracksTable.track_id)
+    statement = statement.outerjoin(models.AlbumTable, models.TracksTable.album_id == models.AlbumTable.album_id)
+
+    return statement.order_by(models.InvoiceTable.created_on, models.InvoiceTable.invoice_id)
+
+
+# The statements of the invoice lines consumed, of every invoice and of the invoices inserted from the one bound to the
+# "created_from" parameter, built once
+CUBE_ROWS_STATEMENT = build_cube_rows_statement()
+CUBE_ROWS_SINCE_STATEMENT = CUBE_ROWS_STATEMENT.where(models.InvoiceTable.created_on >= bindparam("created_from"))
+
+
+def _label_key(labels):
+    """
+    Function to sort dimension values, None coming last
+
+    :param labels: The dimension values
+    :type labels: tuple
+
+    :return: key
+    :rtype: tuple
+    """
+    return tuple((label is None, label) for label in labels)
+
+
+class SalesCube:
+    """
+    Class holding the cells of the sales cube
+
+    :ivar labels: Per dimension, the value of every code
+    :vartype labels: dict
+
+    :ivar codes: Per dimension, the code of every value
+    :vartype codes: dict
+
+    :ivar cell_codes: The codes of the dimensions of every cell, one row per cell, in the order of DIMENSIONS
+    :vartype cell_codes: :class:`numpy.ndarray`
+
+    :ivar measures: The quantity, the revenue in cents and the number of invoices of every cell
+    :vartype measures: :class:`numpy.ndarray`
+
+    :ivar size: The number of cells in use
+    :vartype size: int
+
+    :ivar watermark: The watermark of the invoices consumed
+    :vartype watermark: :class:`mservice.database_model.insert_watermark.InsertWatermark`
+
+    :ivar employee_names: Employee id to its name
+    :vartype employee_names: dict
+    """
+
+    def __init__(self):
+        """
+        Constructor of an empty cube
+        """
+        self.labels = {dimension: [] for dimension in DIMENSIONS}
+        self.codes = {dimension: {} for dimension in DIMENSIONS}
+        self.cell_codes = np.full((INITIAL_CELLS, len(DIMENSIONS)), ALL, dtype=np.int32)
+        self.measures = np.zeros((INITIAL_CELLS, len(MEASURES)), dtype=np.int64)
+        self.size = 0
+        self.watermark = InsertWatermark()
+        self.employee_names = {}
+        self._cells = {}
+        self._invoice_id = None
+        self._counting = False
+        self._invoice_cells = set()
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        """
+        The number of bytes of the cells in use
+        """
+        return self.cell_codes[:self.size].nbytes + self.measures[:self.size].nbytes
+
+    def _code(self, dimension, value):
+        """
+        Function to get the code of a dimension value, adding it if new
+
+        :param dimension: The dimension
+        :type dimension: str
+
+        :param value: The value
+        :type value: object
+
+        :return: code
+        :rtype: int
+        """
+        codes = self.codes[dimension]
+
+        if value not in codes:
+            codes[value] = len(self.labels[dimension])
+            self.labels[dimension].append(value)
+
+        return codes[value]
+
+    def _cell(self, cell_codes):
+        """
+        Function to get the row of a cell, adding it if new and doubling the matrix when full
+
+        :param cell_codes: The codes of the dimensions of the cell
+        :type cell_codes: tuple
+
+        :return: row
+        :rtype: int
+        """
+        row = self._cells.get(cell_codes)
+
+        if row is None:
+            if self.size == len(self.cell_codes):
+                self.cell_codes = np.concatenate([self.cell_codes, np.full_like(self.cell_codes, ALL)])
+                self.measures = np.concatenate([self.measures, np.zeros_like(self.measures)])
+
+            row = self._cells[cell_codes] = self.size
+            self.cell_codes[row] = cell_codes
+            self.size += 1
+
+        return row
+
+    def add_rows(self, rows):
+        """
+        Function to add rows of CUBE_ROWS_STATEMENT, the lines of an invoice being together. The lines of an invoice
+        may be split over several calls, the invoices consumed already being skipped
+
+        :param rows: (invoice id, invoice date, billing country, support rep id, invoice line id, genre id, media type
+                     id, artist id, quantity, revenue in cents, created on) rows
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        with self._lock:
+            rows_of_cells, additions = [], []
+
+            for (invoice_id, invoice_date, billing_country, support_rep_id, invoice_line_id, genre_id, media_type_id,
+                 artist_id, quantity, cents, created_on) in rows:
+
+                # The cells an invoice was counted in are kept until its last line
+                if invoice_id != self._invoice_id:
+                    self._invoice_id = invoice_id
+                    self._counting = self.watermark.consume(invoice_id, created_on)
+                    self._invoice_cells = set()
+
+                if not self._counting:
+                    continue
+
+                year_month = self._code("year_month", invoice_date.year * 100 + invoice_date.month)
+                billing_country = self._code("billing_country", billing_country)
+                support_rep_id = self._code("support_rep", support_rep_id)
+                invoice_cell = self._cell((year_month, ALL, ALL, billing_country, support_rep_id, ALL))
+
+                if invoice_cell not in self._invoice_cells:
+                    self._invoice_cells.add(invoice_cell)
+                    rows_of_cells.append(invoice_cell)
+                    additions.append((0, 0, 1))
+
+                if invoice_line_id is None:
+                    continue
+
+                line_codes = (year_month, self._code("genre", genre_id), self._code("media_type", media_type_id),
+                              billing_country, support_rep_id, self._code("artist", artist_id))
+                rows_of_cells.append(invoice_cell)
+                additions.append((quantity, cents, 0))
+
+                # The line in the cell of every subset, the invoice being counted in a cell at its first line there
+                for subset in LINE_SUBSETS:
+                    subset_cell = self._cell(tuple(code if axis in subset or axis not in LINE_AXES else ALL
+                                                   for axis, code in enumerate(line_codes)))
+                    rows_of_cells.append(subset_cell)
+                    additions.append((quantity, cents, int(subset_cell not in self._invoice_cells)))
+                    self._invoice_cells.add(subset_cell)
+
+            if rows_of_cells:
+                np.add.at(self.measures, np.array(rows_of_cells, dtype=np.int64), np.array(additions, dtype=np.int64))
+
+            self.watermark.prune()
+
+    def refresh(self, session, batch_size=SCAN_BATCH_SIZE):
+        """
+        Function to consume the invoices inserted since the watermark, in one streaming pass, after reading the names
+        of the employees
+
+        :param session: The session to read the tables with
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :param batch_size: The number of rows taken from the stream at once
+        :type batch_size: int
+
+        :return: rows - The number of rows read, those of the invoices consumed already included
+        :rtype: int
+        """
+        if not issubclass(type(session), sqlalchemy.orm.session.Session):
+            raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+        employees = session.execute(select(models.EmployeeTable.employee_id, models.EmployeeTable.first_name,
+                                           models.EmployeeTable.last_name)).all()
+
+        with self._lock:
+            self.employee_names = {employee_id: "%s %s" % (first_name, last_name)
+                                   for employee_id, first_name, last_name in employees}
+
+            # An invoice is never continued from a previous pass, the overlap reading its lines again from the first
+            self._invoice_id = None
+            self._counting = False
+            self._invoice_cells = set()
+
+        # Streaming the rows rather than buffering them, where the driver supports it
+        connection = session.connection().execution_options(stream_results=True, future_result=True)
+        consumed = 0
+
+        created_from = self.watermark.lower_bound
+
+        if created_from is None:
+            result = connection.execute(CUBE_ROWS_STATEMENT)
+        else:
+            result = connection.execute(CUBE_ROWS_SINCE_STATEMENT, {"created_from": created_from})
+
+        for rows in result.partitions(batch_size):
+            self.add_rows(rows)
+            consumed += len(rows)
+
+        LOGGER.info("Refreshed the sales cube with %s rows inserted up to %s, holding %s cells", consumed,
+                    self.watermark.latest, self.size)
+        return consumed
+
+    @classmethod
+    def build(cls, session, batch_size=SCAN_BATCH_SIZE):
+        """
+        Function to build the cube in one streaming pass over the invoices
+
+        :param session: The session to read the tables with
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :param batch_size: The number of rows taken from the stream at once
+        :type batch_size: int
+
+        :return: cube
+        :rtype: :class:`mservice.aggregate_operation.sales_cube.SalesCube`
+        """
+        cube = cls()
+        cube.refresh(session, batch_size)
+        return cube
+
+    def rollup(self, dimensions=(), where=None, order_by=None, number=None, money=MONEY_DECIMAL):
+        """
+        Function to roll the cube up to some of its dimensions, keeping the cells whose values are given in where
+
+        :param dimensions: The dimensions to group by, in the order of the rows, none for the grand total
+        :type dimensions: tuple
+
+        :param where: Dimension to the value, or list of values, its cells should have
+        :type where: dict
+
+        :param order_by: The measure to sort the rows by in descending order, ties being sorted by the dimensions, the
+                         rows being sorted by the dimensions alone if None
+        :type order_by: str
+
+        :param number: The number of rows returned, every row if None
+        :type number: int
+
+        :param money: The money representation of the revenue, "decimal" for Decimal amounts or "cents" for int cents
+        :type money: str
+
+        :return: rows - (the value of every dimension, quantity, revenue, number of invoices) rows, the number of
+                        invoices being None when where gives several values of a line level dimension not grouped by,
+                        as an invoice with lines of several of them can not be counted once from the cells
+        :rtype: list
+        """
+        where = {dimension: values if issubclass(type(values), (list, tuple, set, frozenset)) else [values]
+                 for dimension, values in (where or {}).items()}
+
+        if any(dimension not in DIMENSIONS for dimension in list(dimensions) + list(where)):
+            raise AttributeError("dimensions should be among %s" % ", ".join(DIMENSIONS))
+
+        if order_by is not None and order_by not in MEASURES:
+            raise AttributeError("order by should be one of %s" % ", ".join(MEASURES))
+
+        if number is not None and (not issubclass(type(number), int) or number < 1):
+            raise AttributeError("number of rows should be integer and greater than 0")
+
+        check_money(money)
+
+        invoices_counted = not any(DIMENSIONS.index(dimension) in LINE_AXES and dimension not in dimensions and
+                                   len(set(values)) > 1 for dimension, values in where.items())
+
+        if order_by == "invoices" and not invoices_counted:
+            raise AttributeError("the number of invoices can not be ordered by with several values of a line level "
+                                 "dimension in where")
+
+        axes = [DIMENSIONS.index(dimension) for dimension in dimensions]
+        subset = {DIMENSIONS.index(dimension) for dimension in list(dimensions) + list(where)} & set(LINE_AXES)
+
+        with self._lock:
+            cell_codes, measures = self.cell_codes[:self.size], self.measures[:self.size]
+
+            # The cells of the subset of the line level dimensions asked for, of the invoices if none
+            mask = np.ones(self.size, dtype=bool)
+
+            for axis in LINE_AXES:
+                mask &= (cell_codes[:, axis] != ALL) if axis in subset else (cell_codes[:, axis] == ALL)
+
+            for dimension, values in where.items():
+                wanted = [self.codes[dimension][value] for value in values if value in self.codes[dimension]]
+                mask &= np.isin(cell_codes[:, DIMENSIONS.index(dimension)], wanted)
+
+            if axes:
+                groups, inverse = np.unique(cell_codes[mask][:, axes], axis=0, return_inverse=True)
+            else:
+                groups, inverse = np.zeros((1, 0), dtype=np.int32), np.zeros(int(mask.sum()), dtype=np.int64)
+
+            totals = np.zeros((len(groups), len(MEASURES)), dtype=np.int64)
+            np.add.at(totals, inverse.reshape(-1), measures[mask])
+
+            rows = [tuple(self.labels[dimension][code] for dimension, code in zip(dimensions, group)) +
+                    tuple(int(total) for total in group_totals) for group, group_totals in zip(groups, totals)]
+
+        width = len(dimensions)
+
+        if order_by is None:
+            rows.sort(key=lambda row: _label_key(row[:width]))
+        else:
+            position = width + MEASURES.index(order_by)
+            rows.sort(key=lambda row: (-row[position], _label_key(row[:width])))
+
+        rows = rows[:number]
+
+        if not invoices_counted:
+            rows = [row[:-1] + (None,) for row in rows]
+
+        if money == MONEY_DECIMAL:
+            rows = [row[:width + 1] + (cents_to_decimal(row[width + 1]),) + row[width + 2:] for row in rows]
+
+        return rows
+
+    def top_employee_sales(self, number_of_employee, year=2012, month=8):
+        """
+        Function to answer Q14 from the cube, as the rows of the SQL report
+
+        :param number_of_employee: The number of employees
+        :type number_of_employee: int
+
+        :param year: The year of the invoices
+        :type year: int
+
+        :param month: The month of the invoices, from 1 to 12
+        :type month: int
+
+        :return: rows - (employee id, employee name, total sales) rows
+        :rtype: list
+        """
+        rows = self.rollup(("support_rep",), where={"year_month": year * 100 + month}, order_by="invoices")
+
+        return [(employee_id, self.employee_names[employee_id], invoices) for employee_id, _, _, invoices in rows
+                if employee_id in self.employee_names][:number_of_employee]
+
+    def save(self, path):
+        """
+        Function to save the cube and the watermark of the invoices consumed to a single file
+
+        :param path: The path of the file, ".npz" being appended if missing
+        :type path: str
+
+        :return: Nothing
+        :rtype: None
+        """
+        # The first slot of the state held the last invoice id of the earlier formats, and is left unused
+        with self._lock:
+            arrays = {"state": np.array([0, self.size, FILE_FORMAT], dtype=np.int64),
+                      "cell_codes": self.cell_codes[:self.size], "measures": self.measures[:self.size],
+                      "labels": np.array(json.dumps(self.labels)),
+                      "employee_names": np.array(json.dumps(sorted(self.employee_names.items())))}
+            arrays["watermark.latest"], arrays["watermark.keys"], arrays["watermark.created_ons"] = \
+                self.watermark.to_arrays()
+
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Function to open a cube saved with save
+
+        :param path: The path of the file
+        :type path: str
+
+        :return: cube
+        :rtype: :class:`mservice.aggregate_operation.sales_cube.SalesCube`
+        """
+        cube = cls()
+
+        with np.load(path) as arrays:
+            state = [int(value) for value in arrays["state"]]
+
+            if len(state) < 3 or state[2] != FILE_FORMAT:
+                raise AttributeError("the cube at %s was saved with another layout of the cells, it should be built "
+                                     "again" % path)
+
+            cube.size = state[1]
+            cube.watermark = InsertWatermark.from_arrays(arrays["watermark.latest"], arrays["watermark.keys"],
+                                                         arrays["watermark.created_ons"])
+            cube.cell_codes = np.concatenate([arrays["cell_codes"], np.full((INITIAL_CELLS, len(DIMENSIONS)), ALL,
+                                                                            dtype=np.int32)])
+            cube.measures = np.concatenate([arrays["measures"], np.zeros((INITIAL_CELLS, len(MEASURES)),
+                                                                         dtype=np.int64)])
+            cube.labels = json.loads(str(arrays["labels"]))
+            cube.employee_names = dict(json.loads(str(arrays["employee_names"])))
+
+        cube.codes = {dimension: {value: code for code, value in enumerate(labels)}
+                      for dimension, labels in cube.labels.items()}
+        cube._cells = {tuple(int(code) for code in cell_codes): row
+                       for row, cell_codes in enumerate(cube.cell_codes[:cube.size])}
+        return cube
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Scatter Gather Invoice Aggregation
+======================================
+
+Module for running the heavy invoice reports, Q3 top customers, Q4 album purchases and Q5 top tracks per genre,
+across several processes. A single query runs on one server thread, so the invoice id key space is split into ranges
+and a worker process, with an engine of its own, runs the partial aggregate of every report over every range. The
+parent merges the partials and answers the reports from them
+
+The partials are the full count and sum states of a range, keyed by customer, album or track, rather than a top-k of
+the range: a customer or a track spreads over every range, so only the merged totals tell its rank, and the states
+are small, one entry per customer, album or track. The ranges split invoices, so the distinct invoices of an album in
+two ranges never overlap and the counts of Q4 add up exactly
+
+The rows returned are the ones of the matching SQL report, ties being broken by ascending id
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * concurrent.futures - to run the partial aggregates in worker processes
+
+This script contains the following
+    * SCATTER_REPORTS - The reports that can be scattered
+    * split_key_range - Function to split a range of ids into contiguous ranges
+    * run_scatter_gather - Function to run reports as partial aggregates over id ranges in worker processes
+"""
+# Standard Imports
+import logging
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+# External imports
+import sqlalchemy.orm
+from sqlalchemy import bindparam, create_engine, distinct, func, select
+
+# User Imports
+import mservice.database_model as models
+from mservice.aggregate_operation.batch_execution import top_totals
+from mservice.aggregate_operation.money import MONEY_DECIMAL, MONEY_REPRESENTATIONS, check_money, sum_money
+
+LOGGER = logging.getLogger(__name__)
+
+SCATTER_REPORTS = ("Q3", "Q4", "Q5")
+
+# The partial aggregate statements, over the invoices with ids from "low" to "high"
+CUSTOMER_TOTALS_STATEMENTS = {
+    money: select(models.InvoiceTable.customer_id, sum_money(models.InvoiceTable.total, money)).
+    where(models.InvoiceTable.invoice_id.between(bindparam("low"), bindparam("high"))).
+    group_by(models.InvoiceTable.customer_id) for money in MONEY_REPRESENTATIONS}
+
+ALBUM_PURCHASES_STATEMENT = select(models.TracksTable.album_id,
+                                   func.count(distinct(models.InvoiceLineTable.invoice_id))).\
+    join(models.TracksTable, models.InvoiceLineTable.track_id == models.TracksTable.track_id).\
+    where(models.InvoiceLineTable.invoice_id.between(bindparam("low"), bindparam("high"))).\
+    group_by(models.TracksTable.album_id)
+
+TRACK_PURCHASES_STATEMENT = select(models.InvoiceLineTable.track_id, func.count(models.InvoiceLineTable.invoice_id)).\
+    where(models.InvoiceLineTable.invoice_id.between(bindparam("low"), bindparam("high"))).\
+    group_by(models.InvoiceLineTable.track_id)
+
+# The engine of a worker process, created once by the initializer of the process
+_WORKER_ENGINE = None
+
+
+def split_key_range(low, high, partitions):
+    """
+    Function to split the ids from low to high into contiguous ranges of nearly equal width
+
+    :param low: The lowest id
+    :type low: int
+
+    :param high: The highest id
+    :type high: int
+
+    :param partitions: The number of ranges
+    :type partitions: int
+
+    :return: ranges - (low, high) pairs, both ends included, fewer than partitions if there are fewer ids
+    :rtype: list
+    """
+    if not issubclass(type(partitions), int) or partitions < 1:
+        raise AttributeError("partitions should be integer and greater than 0")
+
+    width = high - low + 1
+    partitions = min(partitions, width)
+
+    bounds = [low + width * index // partitions for index in range(partitions + 1)]
+    return [(bounds[index], bounds[index + 1] - 1) for index in range(partitions)]
+
+
+def _init_worker(url):
+    """
+    Function initializing a worker process with an engine of its own, as connections can not be shared with the parent
+
+    :param url: The URL of the database
+    :type url: :class:`sqlalchemy.engine.url.URL`
+
+    :return: Nothing
+    :rtype: None
+    """
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = create_engine(url)
+
+
+def _partial_aggregates(reports, key_range, money):
+    """
+    Function run by a worker process, running the partial aggregate of every report over one range of invoice ids
+
+    :param reports: The names of the reports
+    :type reports: list
+
+    :param key_range: The lowest and highest invoice id of the range
+    :type key_range: tuple
+
+    :param money: The money representation of the totals of Q3
+    :type money: str
+
+    :return: partials - Report name to its state, key to count or sum
+    :rtype: dict
+    """
+    parameters = {"low": key_range[0], "high": key_range[1]}
+    statements = {"Q3": CUSTOMER_TOTALS_STATEMENTS[money], "Q4": ALBUM_PURCHASES_STATEMENT,
+                  "Q5": TRACK_PURCHASES_STATEMENT}
+
+    with _WORKER_ENGINE.connect() as connection:
+        return {report: dict(connection.execute(statements[report], parameters).all()) for report in reports}
+
+
+def _merge(states):
+    """
+    Function to merge count or sum states, adding the values of the same key
+
+    :param states: The states to merge, key to count or sum
+    :type states: list
+
+    :return: totals - Key to total
+    :rtype: dict
+    """
+    totals = {}
+
+    for state in states:
+        for key, value in state.items():
+            totals[key] = totals[key] + value if key in totals else value
+
+    return totals
+
+
+def _gather_rows(session, report, totals, number):
+    """
+    Function to answer a report from its merged totals, reading the names the rows carry
+
+    :param session: The session to read the names with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param report: The name of the report
+    :type report: str
+
+    :param totals: Key to total, merged over every range
+    :type totals: dict
+
+    :param number: The number of rows, the number of tracks per genre for Q5
+    :type number: int
+
+    :return: rows
+    :rtype: list
+    """
+    if report == "Q3":
+        names = {customer_id: first_name + " " + last_name for customer_id, first_name, last_name in session.execute(
+            select(models.CustomerTable.customer_id, models.CustomerTable.first_name, models.CustomerTable.last_name))}
+        totals = {customer_id: total for customer_id, total in totals.items() if customer_id in names}
+        return [(customer_id, names[customer_id], total) for customer_id, total in top_totals(totals, number)]
+
+    if report == "Q4":
+        titles = dict(session.execute(select(models.AlbumTable.album_id, models.AlbumTable.title)).all())
+        totals = {album_id: count for album_id, count in totals.items() if album_id in titles}
+        return [(album_id, titles[album_id], count) for album_id, count in top_totals(totals, number)]
+
+    tracks = {track_id: (name, genre_id, genre_name) for track_id, name, genre_id, genre_name in session.execute(
+        select(models.TracksTable.track_id, models.TracksTable.name, models.TracksTable.genre_id,
+               models.GenreTable.name).join(models.GenreTable,
+                                            models.TracksTable.genre_id == models.GenreTable.genre_id))}
+    genre_purchases = defaultdict(dict)
+
+    for track_id, count in totals.items():
+        if track_id in tracks:
+            genre_purchases[tracks[track_id][1]][track_id] = count
+
+    return [(track_id, tracks[track_id][0], genre_id, tracks[track_id][2], count)
+            for genre_id in sorted(genre_purchases)
+            for track_id, count in top_totals(genre_purchases[genre_id], number)]
+
+
+def run_scatter_gather(session_factory, reports, number, partitions=4, workers=None, money=MONEY_DECIMAL):
+    """
+    Function to run invoice reports as partial aggregates over ranges of invoice ids in worker processes, and merge
+    the partials into the rows of the reports
+
+    :param session_factory: The session factory, whose engine gives the database the workers connect to
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param reports: The names of the reports to run, "Q3", "Q4" or "Q5"
+    :type reports: list
+
+    :param number: The number of rows of every report, the number of tracks per genre for Q5
+    :type number: int
+
+    :param partitions: The number of ranges the invoice ids are split into
+    :type partitions: int
+
+    :param workers: The number of worker processes, as many as the partitions if None
+    :type workers: int
+
+    :param money: The money representation of the totals of Q3, "decimal" for Decimal amounts or "cents" for int
+                  cents
+    :type money: str
+
+    :return: results - Report name to its rows, in the order the reports were asked, None if the arguments were invalid
+    :rtype: :class:`collections.OrderedDict`
+    """
+    try:
+        if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+            raise AttributeError("Session Maker not passed properly, correct type "
+                                 "'sqlalchemy.orm.session.sessionmaker' ")
+
+        if not reports or any(report not in SCATTER_REPORTS for report in reports):
+            raise AttributeError("reports should be a non empty list of %s" % ", ".join(SCATTER_REPORTS))
+
+        if not issubclass(type(number), int) or number < 1:
+            raise AttributeError("number should be integer and greater than 0")
+
+        if workers is not None and (not issubclass(type(workers), int) or workers < 1):
+            raise AttributeError("workers should be integer and greater than 0")
+
+        check_money(money)
+
+        session = session_factory()
+
+        try:
+            low, high = session.execute(select(func.min(models.InvoiceTable.invoice_id),
+                                               func.max(models.InvoiceTable.invoice_id))).one()
+
+            if low is None:
+                return OrderedDict((report, []) for report in reports)
+
+            key_ranges = split_key_range(low, high, partitions)
+            engine = session_factory.kw["bind"]
+
+            with ProcessPoolExecutor(max_workers=workers or len(key_ranges), initializer=_init_worker,
+                                     initargs=(engine.url,)) as executor:
+                partials = list(executor.map(_partial_aggregates, [reports] * len(key_ranges), key_ranges,
+                                             [money] * len(key_ranges)))
+
+            LOGGER.info("Merging the partials of %s ranges of invoice ids from %s to %s", len(key_ranges), low, high)
+
+            return OrderedDict((report, _gather_rows(session, report, _merge([partial[report] for partial in partials]),
+                                                     number)) for report in reports)
+        finally:
+            session.close()
+    except AttributeError as err:
+        LOGGER.error(err)
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+Sharded Invoice Reports
+===========================
+
+Module for answering the invoice reports Q3 top customers, Q14 top employee sales in a month and Q15 top manager
+revenue in a month over databases sharded by customer id. Every shard runs its part of a report concurrently, on a
+connection of its own, and the rows of the shards are merged here
+
+A customer lives on a single shard, so the top customers of every shard hold the top customers overall and Q3 merges
+the top rows of the shards. The customers of an employee spread over every shard, so Q14 and Q15 gather the full
+count and sum states of every shard, keyed by support rep, and add them up before ranking. Employee names and
+managers come from the employee table, replicated to every shard, and are read from the first one
+
+The rows returned are the ones of the matching single database report, ties being broken by ascending id
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * concurrent.futures - to run the parts of a report on every shard at once
+
+This script contains the following
+    * get_sharded_top_customers - Function to Find Top Customers over the shards
+    * get_sharded_top_employee_sales - Function to Find Top Employee with Most Sales in a Month over the shards
+    * get_sharded_top_manager_revenue - Function to Find Top Manager with Highest Total Revenue in a Month over the
+                                        shards
+"""
+# Standard Imports
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# External imports
+from sqlalchemy import bindparam, extract, func, select
+from sqlalchemy.orm.exc import NoResultFound
+from tabulate import tabulate
+
+# User Imports
+import mservice.database_model as models
+from mservice.aggregate_operation.batch_execution import top_totals
+from mservice.aggregate_operation.money import MONEY_DECIMAL, MONEY_REPRESENTATIONS, check_money, present_money, \
+    sum_money
+from mservice.aggregate_operation.top_customer_amount_q3 import TOP_CUSTOMERS_STATEMENTS
+from mservice.connections.sharding import CustomerShardedSession
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _build_rep_totals_statement(aggregate):
+    """
+    Function to build the partial statement of a shard, the aggregate of the invoices of a month per support rep of
+    their customers, the year and month being bound to the "year" and "month" parameters
+
+    :param aggregate: The aggregate of the invoices
+    :type aggregate: :class:`sqlalchemy.sql.expression.ColumnElement`
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    statement = select(models.CustomerTable.support_rep_id, aggregate)
+    statement = statement.join(models.CustomerTable,
+                               models.InvoiceTable.customer_id == models.CustomerTable.customer_id)
+    statement = statement.where(models.CustomerTable.support_rep_id.isnot(None),
+                                extract('month', models.InvoiceTable.invoice_date) == bindparam("month"),
+                                extract('year', models.InvoiceTable.invoice_date) == bindparam("year"))
+
+    return statement.group_by(models.CustomerTable.support_rep_id)
+
+
+# The partial statements of Q14 and Q15, the sales and the revenue of every support rep in a shard
+REP_SALES_STATEMENT = _build_rep_totals_statement(func.count(models.InvoiceTable.invoice_id))
+REP_REVENUE_STATEMENTS = {money: _build_rep_totals_statement(sum_money(models.InvoiceTable.total, money))
+                          for money in MONEY_REPRESENTATIONS}
+
+EMPLOYEES_STATEMENT = select(models.EmployeeTable.employee_id, models.EmployeeTable.first_name,
+                             models.EmployeeTable.last_name, models.EmployeeTable.reports_to)
+
+
+def _check_sharded_session(session):
+    """
+    Function to check the session is a sharded session
+
+    :param session: The session to check
+    :type session: :class:`mservice.connections.sharding.CustomerShardedSession`
+
+    :return: Nothing
+    :rtype: None
+    """
+    if not issubclass(type(session), CustomerShardedSession):
+        raise AttributeError("session not passed correctly, should be of type "
+                             "'mservice.connections.sharding.CustomerShardedSession' ")
+
+
+def _check_month(year, month):
+    """
+    Function to check the year and month of a report
+
+    :param year: The year of the invoices
+    :type year: int
+
+    :param month: The month of the invoices, from 1 to 12
+    :type month: int
+
+    :return: Nothing
+    :rtype: None
+    """
+    if not issubclass(type(year), int) or not issubclass(type(month), int) or not 1 <= month <= 12:
+        raise AttributeError("year should be integer and month should be integer between 1 and 12")
+
+
+def _scatter(session, statement, parameters):
+    """
+    Function to run a statement on every shard at once, each on a connection of its own
+
+    :param session: The sharded session giving the engines of the shards
+    :type session: :class:`mservice.connections.sharding.CustomerShardedSession`
+
+    :param statement: The statement to run
+    :type statement: :class:`sqlalchemy.sql.selectable.Select`
+
+    :param parameters: The parameters of the statement
+    :type parameters: dict
+
+    :return: shard_rows - The rows of every shard, in the order of the shards
+    :rtype: list
+    """
+    def run(shard_id):
+        with session.get_bind(shard_id=shard_id).connect() as connection:
+            return connection.execute(statement, parameters).all()
+
+    with ThreadPoolExecutor(max_workers=len(session.shard_ids), thread_name_prefix="shard") as executor:
+        return list(executor.map(run, session.shard_ids))
+
+
+def _merge(shard_rows):
+    """
+    Function to merge the count or sum states of the shards, adding the values of the same key
+
+    :param shard_rows: The (key, value) rows of every shard
+    :type shard_rows: list
+
+    :return: totals - Key to total
+    :rtype: dict
+    """
+    totals = {}
+
+    for rows in shard_rows:
+        for key, value in rows:
+            totals[key] = totals[key] + value if key in totals else value
+
+    return totals
+
+
+def _read_employees(session):
+    """
+    Function to read the name and manager of every employee from the first shard
+
+    :param session: The sharded session
+    :type session: :class:`mservice.connections.sharding.CustomerShardedSession`
+
+    :return: employees - Employee id to its name and the id of its manager
+    :rtype: dict
+    """
+    return {employee_id: (first_name + " " + last_name, reports_to) for employee_id, first_name, last_name, reports_to
+            in session.execute(EMPLOYEES_STATEMENT, bind_arguments={"shard_id": session.shard_ids[0]})}
+
+
+def _log_results(title, results, headers):
+    """
+    Function to log the rows of a report as a table
+
+    :param title: The title of the report
+    :type title: str
+
+    :param results: The rows of the report
+    :type results: list
+
+    :param headers: The headers of the table
+    :type headers: list
+
+    :return: Nothing
+    :rtype: None
+    """
+    LOGGER.info("\n\n%s", title)
+
+    print("\n\n")
+    print("===" * 50)
+    print("\n\n")
+
+    LOGGER.info("\n\n %s", tabulate(results, headers=headers, tablefmt="grid"))
+
+    print("\n\n")
+    print("===" * 50)
+    print("\n\n")
+
+
+def get_sharded_top_customers(session, number_of_customers, money=MONEY_DECIMAL):
+    """
+    Function to Find Top Customers over the shards, merging the top customers of every shard
+
+    :param session: The sharded session to work with
+    :type session: :class:`mservice.connections.sharding.CustomerShardedSession`
+
+    :param number_of_customers: The number of customers to be returned
+    :type number_of_customers: int
+
+    :param money: The money representation of the totals, "decimal" for Decimal amounts or "cents" for int cents
+    :type money: str
+
+    :return: results - (customer id, name, total amount) rows, None if the arguments were invalid or nothing was found
+    :rtype: list
+    """
+    try:
+        _check_sharded_session(session)
+
+        if not issubclass(type(number_of_customers), int) or number_of_customers < 1:
+            raise AttributeError("number of customers should be integer and greater than 0")
+
+        check_money(money)
+
+        LOGGER.info("Performing Read Operation on %s shards", len(session.shard_ids))
+
+        shard_rows = _scatter(session, TOP_CUSTOMERS_STATEMENTS[money], {"limit": number_of_customers})
+        rows = {row[0]: tuple(row) for rows in shard_rows for row in rows}
+        results = [rows[customer_id] for customer_id, _ in
+                   top_totals({customer_id: row[2] for customer_id, row in rows.items()}, number_of_customers)]
+
+        if not results:
+            raise NoResultFound("No Records Found")
+
+        _log_results("The Top %s Customers Over %s Shards" % (number_of_customers, len(session.shard_ids)),
+                     present_money(results, (2,), money), ["Customer ID", "Customer Name", "Total Amount"])
+        return results
+    except AttributeError as err:
+        LOGGER.error(err)
+    except NoResultFound as err:
+        LOGGER.error(err)
+    finally:
+        session.close()
+
+
+def get_sharded_top_employee_sales(session, number_of_employee, year=2012, month=8):
+    """
+    Function to Find Top Employee with Most Sales in a Month over the shards, adding up the sales of every shard
+
+    :param session: The sharded session to work with
+    :type session: :class:`mservice.connections.sharding.CustomerShardedSession`
+
+    :param number_of_employee: The number of employees to be returned
+    :type number_of_employee: int
+
+    :param year: The year of the invoices
+    :type year: int
+
+    :param month: The month of the invoices, from 1 to 12
+    :type month: int
+
+    :return: results - (employee id, name, total sales) rows, None if the arguments were invalid or nothing was found
+    :rtype: list
+    """
+    try:
+        _check_sharded_session(session)
+
+        if not issubclass(type(number_of_employee), int) or number_of_employee < 1:
+            raise AttributeError("number of Employee should be integer and greater than 0")
+
+        _check_month(year, month)
+
+        LOGGER.info("Performing Read Operation on %s shards", len(session.shard_ids))
+
+        sales = _merge(_scatter(session, REP_SALES_STATEMENT, {"year": year, "month": month}))
+        employees = _read_employees(session)
+        sales = {employee_id: count for employee_id, count in sales.items() if employee_id in employees}
+
+        results = [(employee_id, employees[employee_id][0], count)
+                   for employee_id, count in top_totals(sales, number_of_employee)]
+
+        if not results:
+            raise NoResultFound("No Records Found")
+
+        _log_results("The Top %s Employee with Most Sales in Year: %s and Month: %02d Over %s Shards"
+                     % (number_of_employee, year, month, len(session.shard_ids)),
+                     results, ["Employee ID", "Employee Name", "Total Sales"])
+        return results
+    except AttributeError as err:
+        LOGGER.error(err)
+    except NoResultFound as err:
+        LOGGER.error(err)
+    finally:
+        session.close()
+
+
+def get_sharded_top_manager_revenue(session, number_of_manager, money=MONEY_DECIMAL, year=2012, month=8):
+    """
+    Function to Find Top Manager with Highest Total Revenue in a Month over the shards, adding up the revenue of the
+    support reps of every shard and then of the reps of every manager
+
+    :param session: The sharded session to work with
+    :type session: :class:`mservice.connections.sharding.CustomerShardedSession`
+
+    :param number_of_manager: The number of managers to be returned
+    :type number_of_manager: int
+
+    :param money: The money representation of the totals, "decimal" for Decimal amounts or "cents" for int cents
+    :type money: str
+
+    :param year: The year of the invoices
+    :type year: int
+
+    :param month: The month of the invoices, from 1 to 12
+    :type month: int
+
+    :return: results - (manager id, name, total revenue) rows, None if the arguments were invalid or nothing was found
+    :rtype: list
+    """
+    try:
+        _check_sharded_session(session)
+
+        if not issubclass(type(number_of_manager), int) or number_of_manager < 1:
+            raise AttributeError("number of Managers should be integer and greater than 0")
+
+        check_money(money)
+        _check_month(year, month)
+
+        LOGGER.info("Performing Read Operation on %s shards", len(session.shard_ids))
+
+        revenue = _merge(_scatter(session, REP_REVENUE_STATEMENTS[money], {"year": year, "month": month}))
+        employees = _read_employees(session)
+
+        # The revenue of a manager is that of the reps reporting to them
+        manager_revenue = _merge([[(employees[employee_id][1], total) for employee_id, total in revenue.items()
+                                   if employee_id in employees and employees[employee_id][1] in employees]])
+
+        results = [(manager_id, employees[manager_id][0], total)
+                   for manager_id, total in top_totals(manager_revenue, number_of_manager)]
+
+        if not results:
+            raise NoResultFound("No Records Found")
+
+        _log_results("The Top %s Manager with Most Sales in Year: %s and Month: %02d Over %s Shards"
+                     % (number_of_manager, year, month, len(session.shard_ids)),
+                     present_money(results, (2,), money), ["Manager ID", "Manager Name", "Total Revenue"])
+        return results
+    except AttributeError as err:
+        LOGGER.error(err)
+    except NoResultFound as err:
+        LOGGER.error(err)
+    finally:
+        session.close()
@@ -8,7 +8,9 @@ Module for reading records from the database to get the top albums based on numb
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * TOP_ALBUM_PURCHASES_STATEMENT - The statement of the report, built once
+    * build_top_album_purchases_statement - Function to build the statement to get the top albums
     * get_top_album_purchases - Function to perform read operation with the database to get the top albums
 """
 # Standard Imports
@@ -16,18 +18,48 @@ import logging
 
 # External imports
 import sqlalchemy.orm
-from sqlalchemy import func, desc, distinct
+from sqlalchemy import bindparam, desc, distinct, func, select
 
 # User Imports
 from sqlalchemy.orm.exc import NoResultFound
 from tabulate import tabulate
 
 import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
+from mservice.sketches.distinct_sketches import DistinctSketches
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_top_album_purchases(session, number_of_albums):
+def build_top_album_purchases_statement():
+    """
+    Function to build the statement to get the top albums, the number of rows being bound to the "limit" parameter
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Selecting the Album id, Album Title, and count of distinct invoice IDs
+    statement = select(models.TracksTable.album_id, models.AlbumTable.title,
+                       func.count(distinct(models.InvoiceLineTable.invoice_id)).label("number_of_purchases"))
+
+    # Joining tracks table and invoiceline table with album table
+    statement = statement.join(models.TracksTable, models.InvoiceLineTable.track_id == models.TracksTable.track_id)
+    statement = statement.join(models.AlbumTable, models.TracksTable.album_id == models.AlbumTable.album_id)
+
+    # Grouping by Album Id
+    statement = statement.group_by(models.TracksTable.album_id)
+
+    # Sorting by number_of_purchases
+    statement = statement.order_by(desc("number_of_purchases"), models.TracksTable.album_id)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report, built once
+TOP_ALBUM_PURCHASES_STATEMENT = build_top_album_purchases_statement()
+
+
+def get_top_album_purchases(session, number_of_albums, execution=EXECUTION_ORM, approximate=False, sketches=None):
     """
     Function to perform read operation with the database to get the top albums
 
@@ -37,8 +69,19 @@ def get_top_album_purchases(session, number_of_albums):
     :param number_of_albums: The number of albums to be returned from the query
     :type number_of_albums: int
 
-    :return: Nothing
-    :rtype: None
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :param approximate: Whether to estimate the distinct counts from HyperLogLog sketches instead of counting them
+                        exactly, the estimates having a relative standard error of 1.6% at the default precision
+    :type approximate: bool
+
+    :param sketches: The sketches to estimate from, opened once with
+                     :func:`mservice.sketches.distinct_sketches.open_shared_sketches`, required when approximate
+    :type sketches: :class:`mservice.sketches.distinct_sketches.DistinctSketches`
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
     """
     try:
         if not issubclass(type(session), sqlalchemy.orm.session.Session):
@@ -47,23 +90,22 @@ def get_top_album_purchases(session, number_of_albums):
         if not issubclass(type(number_of_albums), int) or number_of_albums < 1:
             raise AttributeError("number of albums should be integer and greater than 0")
 
-        LOGGER.info("Performing Read Operation")
-
-        # Selecting the Album id, Album Title, and count of distinct invoice IDs
-        query = session.query(models.TracksTable.album_id, models.AlbumTable.title,
-                              func.count(distinct(models.InvoiceLineTable.invoice_id)).label("number_of_purchases"))
+        check_execution(execution)
 
-        # Joining tracks table and invoiceline table with album table
-        query = query.join(models.TracksTable, models.InvoiceLineTable.track_id == models.TracksTable.track_id)
-        query = query.join(models.AlbumTable, models.TracksTable.album_id == models.AlbumTable.album_id)
+        if sketches is not None and not issubclass(type(sketches), DistinctSketches):
+            raise AttributeError("sketches should be of type 'DistinctSketches'")
 
-        # Grouping by Album Id
-        query = query.group_by(models.TracksTable.album_id)
+        # Building the sketches takes a pass over every table, so they are never built for a single report
+        if approximate and sketches is None:
+            raise AttributeError("sketches should be given to answer approximately, opened once with "
+                                 "'open_shared_sketches'")
 
-        # Sorting by number_of_purchases
-        query = query.order_by(desc("number_of_purchases"), models.TracksTable.album_id)
+        LOGGER.info("Performing Read Operation")
 
-        results = query.limit(number_of_albums).all()
+        if approximate:
+            results = sketches.top_rows(session, "Q4", number_of_albums)
+        else:
+            results = fetch_rows(session, TOP_ALBUM_PURCHASES_STATEMENT, {"limit": number_of_albums}, execution)
 
         if not results:
             raise NoResultFound("No Records Found")
@@ -80,6 +122,8 @@ def get_top_album_purchases(session, number_of_albums):
         print("\n\n")
         print("===" * 50)
         print("\n\n")
+
+        return results
     except AttributeError as err:
         LOGGER.error(err)
     except NoResultFound as err:
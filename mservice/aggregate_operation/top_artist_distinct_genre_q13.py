@@ -8,7 +8,10 @@ Module for reading records from the database to get the top artist with most num
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * TOP_ARTIST_GENRE_STATEMENT - The statement of the report, built once
+    * build_top_artist_genre_statement - Function to build the statement to get the top artist with most number of
+                                         distinct genre
     * get_top_artist_genre - Function to perform read operation with the database to get the top artist with
                                      most number of distinct genre
 """
@@ -17,17 +20,48 @@ import logging
 
 # External imports
 import sqlalchemy.orm
-from sqlalchemy import desc, func, distinct
+from sqlalchemy import bindparam, desc, distinct, func, select
 from sqlalchemy.orm.exc import NoResultFound
 from tabulate import tabulate
 
 # User Imports
 import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
+from mservice.sketches.distinct_sketches import DistinctSketches
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_top_artist_genre(session, number_of_artist):
+def build_top_artist_genre_statement():
+    """
+    Function to build the statement to get the top artist with most number of distinct genre, the number of rows being
+    bound to the "limit" parameter
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Selecting the Artist Id, Artist Name, and Count of Distinct Genre IDs
+    statement = select(models.AlbumTable.artist_id, models.ArtistTable.name,
+                       func.count(distinct(models.TracksTable.genre_id)).label("number_of_genre"))
+
+    # Joining tracks table, album table and artist table
+    statement = statement.join(models.AlbumTable, models.TracksTable.album_id == models.AlbumTable.album_id)
+    statement = statement.join(models.ArtistTable, models.AlbumTable.artist_id == models.ArtistTable.artist_id)
+
+    # Grouping by Artist Id
+    statement = statement.group_by(models.AlbumTable.artist_id)
+
+    # Sorting by number_of_genre and artist id
+    statement = statement.order_by(desc("number_of_genre"), models.AlbumTable.artist_id)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report, built once
+TOP_ARTIST_GENRE_STATEMENT = build_top_artist_genre_statement()
+
+
+def get_top_artist_genre(session, number_of_artist, execution=EXECUTION_ORM, approximate=False, sketches=None):
     """
     Function to perform read operation with the database to get the top artist with most number of distinct genre
 
@@ -37,8 +71,19 @@ def get_top_artist_genre(session, number_of_artist):
     :param number_of_artist: The number of albums to be returned from the query
     :type number_of_artist: int
 
-    :return: Nothing
-    :rtype: None
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :param approximate: Whether to estimate the distinct counts from HyperLogLog sketches instead of counting them
+                        exactly, the estimates having a relative standard error of 1.6% at the default precision
+    :type approximate: bool
+
+    :param sketches: The sketches to estimate from, opened once with
+                     :func:`mservice.sketches.distinct_sketches.open_shared_sketches`, required when approximate
+    :type sketches: :class:`mservice.sketches.distinct_sketches.DistinctSketches`
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
     """
     try:
         if not issubclass(type(session), sqlalchemy.orm.session.Session):
@@ -47,23 +92,22 @@ def get_top_artist_genre(session, number_of_artist):
         if not issubclass(type(number_of_artist), int) or number_of_artist < 1:
             raise AttributeError("number of tracks should be integer and greater than 0")
 
-        LOGGER.info("Performing Read Operation")
-
-        # Selecting the Artist Id, Artist Name, and Count of Distinct Genre IDs
-        query = session.query(models.AlbumTable.artist_id, models.ArtistTable.name,
-                              func.count(distinct(models.TracksTable.genre_id)).label("number_of_genre"))
+        check_execution(execution)
 
-        # Joining tracks table, album table and artist table
-        query = query.join(models.AlbumTable, models.TracksTable.album_id == models.AlbumTable.album_id)
-        query = query.join(models.ArtistTable, models.AlbumTable.artist_id == models.ArtistTable.artist_id)
+        if sketches is not None and not issubclass(type(sketches), DistinctSketches):
+            raise AttributeError("sketches should be of type 'DistinctSketches'")
 
-        # Grouping by Artist Id
-        query = query.group_by(models.AlbumTable.artist_id)
+        # Building the sketches takes a pass over every table, so they are never built for a single report
+        if approximate and sketches is None:
+            raise AttributeError("sketches should be given to answer approximately, opened once with "
+                                 "'open_shared_sketches'")
 
-        # Sorting by number_of_genre and artist id
-        query = query.order_by(desc("number_of_genre"), models.AlbumTable.artist_id)
+        LOGGER.info("Performing Read Operation")
 
-        results = query.limit(number_of_artist).all()
+        if approximate:
+            results = sketches.top_rows(session, "Q13", number_of_artist)
+        else:
+            results = fetch_rows(session, TOP_ARTIST_GENRE_STATEMENT, {"limit": number_of_artist}, execution)
 
         if not results:
             raise NoResultFound("No Records Found")
@@ -80,6 +124,8 @@ def get_top_artist_genre(session, number_of_artist):
         print("\n\n")
         print("===" * 50)
         print("\n\n")
+
+        return results
     except AttributeError as err:
         LOGGER.error(err)
     except NoResultFound as err:
@@ -8,7 +8,9 @@ Module for reading records from the database to get the top artist based on numb
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * TOP_ARTIST_TRACKS_STATEMENT - The statement of the report, built once
+    * build_top_artist_tracks_statement - Function to build the statement to get the top artist
     * get_top_artist_tracks - Function to perform read operation with the database to get the top artist
 """
 # Standard Imports
@@ -16,17 +18,46 @@ import logging
 
 # External imports
 import sqlalchemy.orm
-from sqlalchemy import func, desc
+from sqlalchemy import bindparam, desc, func, select
 from sqlalchemy.orm.exc import NoResultFound
 from tabulate import tabulate
 
 # User Imports
 import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_top_artist_tracks(session, number_of_artist):
+def build_top_artist_tracks_statement():
+    """
+    Function to build the statement to get the top artist, the number of rows being bound to the "limit" parameter
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Selecting the Artist id, Artist Name, and count of track id
+    statement = select(models.AlbumTable.artist_id, models.ArtistTable.name,
+                       func.count(models.TracksTable.track_id).label("number_of_tracks"))
+
+    # Joining tracks table and album table
+    statement = statement.join(models.AlbumTable, models.TracksTable.album_id == models.AlbumTable.album_id)
+    statement = statement.join(models.ArtistTable, models.AlbumTable.artist_id == models.ArtistTable.artist_id)
+
+    # Grouping by Artist Id
+    statement = statement.group_by(models.AlbumTable.artist_id)
+
+    # Sorting by number_of_tracks and artist id
+    statement = statement.order_by(desc("number_of_tracks"), models.AlbumTable.artist_id)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report, built once
+TOP_ARTIST_TRACKS_STATEMENT = build_top_artist_tracks_statement()
+
+
+def get_top_artist_tracks(session, number_of_artist, execution=EXECUTION_ORM):
     """
     Function to perform read operation with the database to get the top artist
 
@@ -36,8 +67,11 @@ def get_top_artist_tracks(session, number_of_artist):
     :param number_of_artist: The number of artist to be returned from the query
     :type number_of_artist: int
 
-    :return: Nothing
-    :rtype: None
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
     """
     try:
         if not issubclass(type(session), sqlalchemy.orm.session.Session):
@@ -46,23 +80,11 @@ def get_top_artist_tracks(session, number_of_artist):
         if not issubclass(type(number_of_artist), int) or number_of_artist < 1:
             raise AttributeError("number of artist should be integer and greater than 0")
 
-        LOGGER.info("Performing Read Operation")
-
-        # Selecting the Artist id, Artist Name, and count of track id
-        query = session.query(models.AlbumTable.artist_id, models.ArtistTable.name,
-                              func.count(models.TracksTable.track_id).label("number_of_tracks"))
+        check_execution(execution)
 
-        # Joining tracks table and album table
-        query = query.join(models.AlbumTable, models.TracksTable.album_id == models.AlbumTable.album_id)
-        query = query.join(models.ArtistTable, models.AlbumTable.artist_id == models.ArtistTable.artist_id)
-
-        # Grouping by Artist Id
-        query = query.group_by(models.AlbumTable.artist_id)
-
-        # Sorting by number_of_tracks and artist id
-        query = query.order_by(desc("number_of_tracks"), models.AlbumTable.artist_id)
+        LOGGER.info("Performing Read Operation")
 
-        results = query.limit(number_of_artist).all()
+        results = fetch_rows(session, TOP_ARTIST_TRACKS_STATEMENT, {"limit": number_of_artist}, execution)
 
         if not results:
             raise NoResultFound("No Records Found")
@@ -79,6 +101,8 @@ def get_top_artist_tracks(session, number_of_artist):
         print("\n\n")
         print("===" * 50)
         print("\n\n")
+
+        return results
     except AttributeError as err:
         LOGGER.error(err)
     except NoResultFound as err:
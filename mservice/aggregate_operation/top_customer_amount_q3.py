@@ -8,7 +8,9 @@ Module for reading records from the database to get the top customers based on t
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * TOP_CUSTOMERS_STATEMENTS - The statements of the report for every money representation
+    * build_top_customers_statement - Function to build the statement to get the top customers
     * get_top_customers - Function to perform read operation with the database to get the top customers
 """
 # Standard Imports
@@ -16,17 +18,52 @@ import logging
 
 # External imports
 import sqlalchemy.orm
-from sqlalchemy import func, desc
+from sqlalchemy import bindparam, desc, select
 from sqlalchemy.orm.exc import NoResultFound
 from tabulate import tabulate
 
 # User Imports
 import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
+from mservice.aggregate_operation.money import (MONEY_DECIMAL, MONEY_REPRESENTATIONS, check_money, present_money,
+                                                sum_money)
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_top_customers(session, number_of_customers):
+def build_top_customers_statement(money=MONEY_DECIMAL):
+    """
+    Function to build the statement to get the top customers, the number of rows being bound to the "limit" parameter
+
+    :param money: The money representation of the totals, "decimal" for Decimal amounts or "cents" for int cents
+    :type money: str
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Selecting the Customer ID, Customer Full Name, Total amount customer spent
+    statement = select(models.InvoiceTable.customer_id,
+                       (models.CustomerTable.first_name + " " + models.CustomerTable.last_name).label("name"),
+                       sum_money(models.InvoiceTable.total, money).label("total_amount"))
+
+    # Joining customer table and invoice table
+    statement = statement.join(models.CustomerTable,
+                               models.InvoiceTable.customer_id == models.CustomerTable.customer_id)
+
+    # Grouping by Customer Id
+    statement = statement.group_by(models.InvoiceTable.customer_id)
+
+    # Sorting by total amount and customer Id
+    statement = statement.order_by(desc("total_amount"), models.InvoiceTable.customer_id)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report for every money representation, built once
+TOP_CUSTOMERS_STATEMENTS = {money: build_top_customers_statement(money) for money in MONEY_REPRESENTATIONS}
+
+
+def get_top_customers(session, number_of_customers, money=MONEY_DECIMAL, execution=EXECUTION_ORM):
     """
     Function to perform read operation with the database to get the top customers
 
@@ -36,8 +73,14 @@ def get_top_customers(session, number_of_customers):
     :param number_of_customers: The number of customers to be returned from the query
     :type number_of_customers: int
 
-    :return: Nothing
-    :rtype: None
+    :param money: The money representation of the totals, "decimal" for Decimal amounts or "cents" for int cents
+    :type money: str
+
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
     """
     try:
         if not issubclass(type(session), sqlalchemy.orm.session.Session):
@@ -46,23 +89,13 @@ def get_top_customers(session, number_of_customers):
         if not issubclass(type(number_of_customers), int) or number_of_customers < 1:
             raise AttributeError("number of customers should be integer and greater than 0")
 
-        LOGGER.info("Performing Read Operation")
+        check_money(money)
 
-        # Selecting the Customer ID, Customer Full Name, Total amount customer spent
-        query = session.query(models.InvoiceTable.customer_id, func.concat(models.CustomerTable.first_name, " ",
-                                                                           models.CustomerTable.last_name).label("name"),
-                              func.sum(models.InvoiceTable.total).label("total_amount"))
+        check_execution(execution)
 
-        # Joining customer table and invoice table
-        query = query.join(models.CustomerTable, models.InvoiceTable.customer_id == models.CustomerTable.customer_id)
-
-        # Grouping by Customer Id
-        query = query.group_by(models.InvoiceTable.customer_id)
-
-        # Sorting by total amount and customer Id
-        query = query.order_by(desc("total_amount"), models.InvoiceTable.customer_id)
+        LOGGER.info("Performing Read Operation")
 
-        results = query.limit(number_of_customers).all()
+        results = fetch_rows(session, TOP_CUSTOMERS_STATEMENTS[money], {"limit": number_of_customers}, execution)
 
         if not results:
             raise NoResultFound("No Records Found")
@@ -73,12 +106,15 @@ def get_top_customers(session, number_of_customers):
         print("===" * 50)
         print("\n\n")
 
-        LOGGER.info("\n\n %s", tabulate(results, headers=["Customer ID", " Customer Name", "Total Amount"],
+        LOGGER.info("\n\n %s", tabulate(present_money(results, (2,), money),
+                                        headers=["Customer ID", " Customer Name", "Total Amount"],
                                         tablefmt="grid"))
 
         print("\n\n")
         print("===" * 50)
         print("\n\n")
+
+        return results
     except AttributeError as err:
         LOGGER.error(err)
     except NoResultFound as err:
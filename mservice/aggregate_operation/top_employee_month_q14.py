@@ -8,7 +8,10 @@ Module for reading records from the database to Find Top Employee with Most Sale
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * TOP_EMPLOYEE_SALES_STATEMENT - The statement of the report, built once
+    * build_top_employee_sales_statement - Function to build the statement to Find Top Employee with Most Sales in a
+                                           Month
     * get_top_employee_sales - Function to perform read operation with the database to Find Top Employee with
                              Most Sales in a Month
 """
@@ -17,17 +20,55 @@ import logging
 
 # External imports
 import sqlalchemy.orm
-from sqlalchemy import desc, func, extract
+from sqlalchemy import bindparam, desc, extract, func, select
 from sqlalchemy.orm.exc import NoResultFound
 from tabulate import tabulate
 
 # User Imports
 import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
+from mservice.aggregate_operation.sales_cube import SalesCube
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_top_employee_sales(session, number_of_employee):
+def build_top_employee_sales_statement():
+    """
+    Function to build the statement to Find Top Employee with Most Sales in a Month, the number of rows being bound to
+    the "limit" parameter, the year and month being bound to the "year" and "month" parameters
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Selecting the Employee Id, Employee Name, and Total Sales
+    statement = select(models.CustomerTable.support_rep_id.label("employee_id"),
+                       (models.EmployeeTable.first_name + " " + models.EmployeeTable.last_name).label("name"),
+                       func.count(models.InvoiceTable.invoice_id).label("total_sales"))
+
+    # Joining Invoice, customer and employee Table
+    statement = statement.join(models.CustomerTable,
+                               models.InvoiceTable.customer_id == models.CustomerTable.customer_id)
+    statement = statement.join(models.EmployeeTable,
+                               models.CustomerTable.support_rep_id == models.EmployeeTable.employee_id)
+
+    # Filtering the result For given year and month
+    statement = statement.where(extract('month', models.InvoiceTable.invoice_date) == bindparam("month"),
+                                extract('year', models.InvoiceTable.invoice_date) == bindparam("year"))
+
+    # Grouping by Employee Id
+    statement = statement.group_by(models.CustomerTable.support_rep_id)
+
+    # Sorting by total_sales and employee id
+    statement = statement.order_by(desc("total_sales"), models.CustomerTable.support_rep_id)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report, built once
+TOP_EMPLOYEE_SALES_STATEMENT = build_top_employee_sales_statement()
+
+
+def get_top_employee_sales(session, number_of_employee, year=2012, month=8, execution=EXECUTION_ORM, cube=None):
     """
     Function to perform read operation with the database to Find Top Employee with Most Sales in a Month
 
@@ -37,8 +78,20 @@ def get_top_employee_sales(session, number_of_employee):
     :param number_of_employee: The number of albums to be returned from the query
     :type number_of_employee: int
 
-    :return: Nothing
-    :rtype: None
+    :param year: The year of the invoices
+    :type year: int
+
+    :param month: The month of the invoices, from 1 to 12
+    :type month: int
+
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :param cube: The sales cube to read the sales from instead of the database, if any
+    :type cube: :class:`mservice.aggregate_operation.sales_cube.SalesCube`
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
     """
     try:
         if not issubclass(type(session), sqlalchemy.orm.session.Session):
@@ -47,33 +100,27 @@ def get_top_employee_sales(session, number_of_employee):
         if not issubclass(type(number_of_employee), int) or number_of_employee < 1:
             raise AttributeError("number of Employee should be integer and greater than 0")
 
-        LOGGER.info("Performing Read Operation")
-
-        # Selecting the Employee Id, Employee Name, and Total Sales
-        query = session.query(models.CustomerTable.support_rep_id.label("employee_id"),
-                              func.concat(models.EmployeeTable.first_name, " ", models.EmployeeTable.last_name).
-                              label("name"), func.count(models.InvoiceTable.invoice_id).label("total_sales"))
-
-        # Joining Invoice, customer and employee Table
-        query = query.join(models.CustomerTable, models.InvoiceTable.customer_id == models.CustomerTable.customer_id)
-        query = query.join(models.EmployeeTable, models.CustomerTable.support_rep_id == models.EmployeeTable.employee_id)
+        if not issubclass(type(year), int) or not issubclass(type(month), int) or not 1 <= month <= 12:
+            raise AttributeError("year should be integer and month should be integer between 1 and 12")
 
-        # Filtering the result For given year and month
-        query = query.filter(extract('month', models.InvoiceTable.invoice_date) == 8,
-                             extract('year', models.InvoiceTable.invoice_date) == 2012)
+        check_execution(execution)
 
-        # Grouping by Employee Id
-        query = query.group_by(models.CustomerTable.support_rep_id)
+        if cube is not None and not issubclass(type(cube), SalesCube):
+            raise AttributeError("cube should be of type 'SalesCube'")
 
-        # Sorting by total_sales and employee id
-        query = query.order_by(desc("total_sales"), models.CustomerTable.support_rep_id)
+        LOGGER.info("Performing Read Operation")
 
-        results = query.limit(number_of_employee).all()
+        if cube is not None:
+            results = cube.top_employee_sales(number_of_employee, year, month)
+        else:
+            parameters = {"limit": number_of_employee, "year": year, "month": month}
+            results = fetch_rows(session, TOP_EMPLOYEE_SALES_STATEMENT, parameters, execution)
 
         if not results:
             raise NoResultFound("No Records Found")
 
-        LOGGER.info("\n\nThe Top %s Employee with Most Sales in Year: 2012 and Month: 08", number_of_employee)
+        LOGGER.info("\n\nThe Top %s Employee with Most Sales in Year: %s and Month: %02d", number_of_employee, year,
+                    month)
 
         print("\n\n")
         print("===" * 50)
@@ -85,6 +132,8 @@ def get_top_employee_sales(session, number_of_employee):
         print("\n\n")
         print("===" * 50)
         print("\n\n")
+
+        return results
     except AttributeError as err:
         LOGGER.error(err)
     except NoResultFound as err:
@@ -8,7 +8,10 @@ Module for reading records from the database to Find Top Manager with Highest Re
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * TOP_MANAGER_REVENUE_STATEMENTS - The statements of the report for every money representation
+    * build_top_manager_revenue_statement - Function to build the statement to Find Top Manager with Highest Total
+                                            Revenue in a Month
     * get_top_manager_revenue - Function to perform read operation with the database to Find Top Manager with
                              Highest Total Revenue in a Month
 """
@@ -17,7 +20,7 @@ import logging
 
 # External imports
 import sqlalchemy.orm
-from sqlalchemy import desc, func, extract
+from sqlalchemy import bindparam, desc, extract, select
 from sqlalchemy.orm import aliased
 
 # User Imports
@@ -25,11 +28,58 @@ from sqlalchemy.orm.exc import NoResultFound
 from tabulate import tabulate
 
 import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
+from mservice.aggregate_operation.money import (MONEY_DECIMAL, MONEY_REPRESENTATIONS, check_money, present_money,
+                                                sum_money)
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_top_manager_revenue(session, number_of_manager):
+def build_top_manager_revenue_statement(money=MONEY_DECIMAL):
+    """
+    Function to build the statement to Find Top Manager with Highest Total Revenue in a Month, the number of rows being
+    bound to the "limit" parameter, the year and month being bound to the "year" and "month" parameters
+
+    :param money: The money representation of the totals, "decimal" for Decimal amounts or "cents" for int cents
+    :type money: str
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Creating an alias for manager and employee Since they both are from same table and needs to self reference
+    manager = aliased(models.EmployeeTable)
+    employee = aliased(models.EmployeeTable)
+
+    # Selecting the Manager Id, Manager Name, And his Total Revenue, By summing all his invoice total
+    statement = select(employee.reports_to.label("manager_id"),
+                       (manager.first_name + " " + manager.last_name).label("manager_name"),
+                       sum_money(models.InvoiceTable.total, money).label("total_revenue"))
+
+    # Joining the customer table with invoice table, and with the previously aliased employee and manager table
+    statement = statement.join(models.CustomerTable,
+                               models.InvoiceTable.customer_id == models.CustomerTable.customer_id)
+    statement = statement.join(employee, models.CustomerTable.support_rep_id == employee.employee_id)
+    statement = statement.join(manager, employee.reports_to == manager.employee_id)
+
+    # Filtering out the invoices which occurred in month 8 and year 2012
+    statement = statement.where(extract('month', models.InvoiceTable.invoice_date) == bindparam("month"),
+                                extract('year', models.InvoiceTable.invoice_date) == bindparam("year"))
+
+    # Grouping by Manager Id
+    statement = statement.group_by("manager_id")
+
+    # Sorting By total revenue, ties broken by manager id
+    statement = statement.order_by(desc("total_revenue"), employee.reports_to)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report for every money representation, built once
+TOP_MANAGER_REVENUE_STATEMENTS = {money: build_top_manager_revenue_statement(money) for money in MONEY_REPRESENTATIONS}
+
+
+def get_top_manager_revenue(session, number_of_manager, money=MONEY_DECIMAL, year=2012, month=8,
+                            execution=EXECUTION_ORM):
     """
     Function to perform read operation with the database to Find Top Manager with Highest Total Revenue in a Month
 
@@ -39,8 +89,20 @@ def get_top_manager_revenue(session, number_of_manager):
     :param number_of_manager: The number of managers to be returned from the query
     :type number_of_manager: int
 
-    :return: Nothing
-    :rtype: None
+    :param money: The money representation of the totals, "decimal" for Decimal amounts or "cents" for int cents
+    :type money: str
+
+    :param year: The year of the invoices
+    :type year: int
+
+    :param month: The month of the invoices, from 1 to 12
+    :type month: int
+
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
 
     """
     try:
@@ -50,49 +112,37 @@ def get_top_manager_revenue(session, number_of_manager):
         if not issubclass(type(number_of_manager), int) or number_of_manager < 1:
             raise AttributeError("number of Managers should be integer and greater than 0")
 
-        LOGGER.info("Performing Read Operation")
-
-        # Creating an alias for manager and employee Since they both are from same table and needs to self reference
-        manager = aliased(models.EmployeeTable)
-        employee = aliased(models.EmployeeTable)
-
-        # Selecting the Manager Id, Manager Name, And his Total Revenue, By summing all his invoice total
-        query = session.query(employee.reports_to.label("manager_id"),
-                              func.concat(manager.first_name, " ", manager.last_name).label("manager_name"),
-                              func.sum(models.InvoiceTable.total).label("total_revenue"))
+        check_money(money)
 
-        # Joining the customer table with invoice table, and with the previously aliased employee and manager table
-        query = query.join(models.CustomerTable, models.InvoiceTable.customer_id == models.CustomerTable.customer_id)
-        query = query.join(employee, models.CustomerTable.support_rep_id == employee.employee_id)
-        query = query.join(manager, employee.reports_to == manager.employee_id)
+        if not issubclass(type(year), int) or not issubclass(type(month), int) or not 1 <= month <= 12:
+            raise AttributeError("year should be integer and month should be integer between 1 and 12")
 
-        # Filtering out the invoices which occurred in month 8 and year 2012
-        query = query.filter(extract('month', models.InvoiceTable.invoice_date) == 8,
-                             extract('year', models.InvoiceTable.invoice_date) == 2012)
+        check_execution(execution)
 
-        # Grouping by Manager Id
-        query = query.group_by("manager_id")
-
-        # Sorting By total revenue
-        query = query.order_by(desc("total_revenue"))
+        LOGGER.info("Performing Read Operation")
 
-        results = query.limit(number_of_manager).all()
+        parameters = {"limit": number_of_manager, "year": year, "month": month}
+        results = fetch_rows(session, TOP_MANAGER_REVENUE_STATEMENTS[money], parameters, execution)
 
         if not results:
             raise NoResultFound("No Records Found")
 
-        LOGGER.info("\n\nThe Top %s Manager with Most Sales in Year: 2012 and Month: 08", number_of_manager)
+        LOGGER.info("\n\nThe Top %s Manager with Most Sales in Year: %s and Month: %02d", number_of_manager, year,
+                    month)
 
         print("\n\n")
         print("===" * 50)
         print("\n\n")
 
-        LOGGER.info("\n\n %s", tabulate(results, headers=["Manager ID", "Manager Name", "Total Revenue"],
+        LOGGER.info("\n\n %s", tabulate(present_money(results, (2,), money),
+                                        headers=["Manager ID", "Manager Name", "Total Revenue"],
                                         tablefmt="grid"))
 
         print("\n\n")
         print("===" * 50)
         print("\n\n")
+
+        return results
     except AttributeError as err:
         LOGGER.error(err)
     except NoResultFound as err:
@@ -8,7 +8,9 @@ Module for reading records from the database to Get Top Tracks For each Genre
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * TOP_TRACKS_FOR_GENRE_STATEMENT - The statement of the report, built once
+    * build_top_tracks_for_genre_statement - Function to build the statement to Get Top Tracks For each Genre
     * get_top_tracks_for_genre - Function to perform read operation with the database to Get Top Tracks For
                                    each Genre
 """
@@ -17,17 +19,66 @@ import logging
 
 # External imports
 import sqlalchemy.orm
-from sqlalchemy import func, desc
+from sqlalchemy import bindparam, desc, func, select
 from sqlalchemy.orm.exc import NoResultFound
 from tabulate import tabulate
 
 # User Imports
 import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
+from mservice.aggregate_operation.genre_leaderboards import GenreLeaderboards
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_top_tracks_for_genre(session, number_of_tracks):
+def build_top_tracks_for_genre_statement():
+    """
+    Function to build the statement to Get Top Tracks For each Genre, the number of tracks per genre being bound to the
+    "limit" parameter
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Creating a subquery that returns the track id, track name, genre id, genre name, and number of purchases
+    # Of the track and a rank for each track, the track with highest number of purchases will have the lowest rank
+    # number, this is done using a row_number function, by partitioning over the genre Id, the tracks with as many
+    # purchases being ranked by ascending Track Id
+    genre_ranked_table = select(models.TracksTable.track_id.label("track_id"),
+                                models.TracksTable.name.label("track_name"),
+                                models.TracksTable.genre_id.label("genre_id"),
+                                models.GenreTable.name.label("genre_name"),
+                                func.count(models.InvoiceLineTable.invoice_id).label("number_of_purchases"),
+                                func.row_number().over(partition_by=models.TracksTable.genre_id,
+                                                       order_by=
+                                                       (desc(func.count(models.InvoiceLineTable.invoice_id)),
+                                                        models.TracksTable.track_id)).
+                                label("track_rank"))
+
+    # Joining the invoiceline table and tracks table and Genre Table
+    genre_ranked_table = genre_ranked_table.join(models.InvoiceLineTable,
+                                                 models.TracksTable.track_id == models.InvoiceLineTable.track_id)
+
+    genre_ranked_table = genre_ranked_table.join(models.GenreTable,
+                                                 models.TracksTable.genre_id == models.GenreTable.genre_id)
+
+    # Grouping By the Track Id and using that as a subquery
+    genre_ranked_table = genre_ranked_table.group_by(models.TracksTable.track_id).subquery()
+
+    # Selecting the Track ID, Track Name, Genre Id, Genre Name, Total Number Of Purchases from the Subquery
+    # Table genre_ranked_table
+    statement = select(genre_ranked_table.c.track_id, genre_ranked_table.c.track_name,
+                       genre_ranked_table.c.genre_id, genre_ranked_table.c.genre_name,
+                       genre_ranked_table.c.number_of_purchases)
+
+    # To get the top tracks of every genre, the statement is filtered on track_rank up to the limit
+    return statement.where(genre_ranked_table.c.track_rank <= bindparam("limit"))
+
+
+# The statement of the report, built once
+TOP_TRACKS_FOR_GENRE_STATEMENT = build_top_tracks_for_genre_statement()
+
+
+def get_top_tracks_for_genre(session, number_of_tracks, execution=EXECUTION_ORM, leaderboards=None):
     """
     Function to perform read operation with the database to Get Top Tracks For each Genre
 
@@ -37,8 +88,14 @@ def get_top_tracks_for_genre(session, number_of_tracks):
     :param number_of_tracks: The number of tracks to be returned from the query
     :type number_of_tracks: int
 
-    :return: Nothing
-    :rtype: None
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :param leaderboards: The leaderboards to read the top tracks from instead of the database, if any
+    :type leaderboards: :class:`mservice.aggregate_operation.genre_leaderboards.GenreLeaderboards`
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
     """
     try:
         if not issubclass(type(session), sqlalchemy.orm.session.Session):
@@ -47,39 +104,17 @@ def get_top_tracks_for_genre(session, number_of_tracks):
         if not issubclass(type(number_of_tracks), int) or number_of_tracks < 1:
             raise AttributeError("number of tracks should be integer and greater than 0")
 
+        check_execution(execution)
+
+        if leaderboards is not None and not issubclass(type(leaderboards), GenreLeaderboards):
+            raise AttributeError("leaderboards should be of type 'GenreLeaderboards'")
+
         LOGGER.info("Performing Read Operation")
 
-        # Creating a subquery that returns the track id, track name, genre id, genre name, and number of purchases
-        # Of the track and a rank for each track, the track with highest number of purchases will have the lowest rank
-        # number, this is done using a row_number function, by partitioning over the genre Id
-        genre_ranked_table = session.query(models.TracksTable.track_id.label("track_id"),
-                                           models.TracksTable.name.label("track_name"),
-                                           models.TracksTable.genre_id.label("genre_id"),
-                                           models.GenreTable.name.label("genre_name"),
-                                           func.count(models.InvoiceLineTable.invoice_id).label("number_of_purchases"),
-                                           func.row_number().over(partition_by=models.TracksTable.genre_id,
-                                                                  order_by=
-                                                                  desc(func.count(models.InvoiceLineTable.invoice_id))).
-                                           label("track_rank"))
-
-        # Joining the invoiceline table and tracks table and Genre Table
-        genre_ranked_table = genre_ranked_table.join(models.InvoiceLineTable,
-                                                     models.TracksTable.track_id == models.InvoiceLineTable.track_id)
-
-        genre_ranked_table = genre_ranked_table.join(models.GenreTable,
-                                                     models.TracksTable.genre_id == models.GenreTable.genre_id)
-
-        # Grouping By the Track Id and using that as a subquery
-        genre_ranked_table = genre_ranked_table.group_by(models.TracksTable.track_id).subquery()
-
-        # Selecting the Track ID, Track Name, Genre Id, Genre Name, Total Number Of Purchases from the Subquery
-        # Table genre_ranked_table
-        query = session.query(genre_ranked_table.c.track_id, genre_ranked_table.c.track_name,
-                              genre_ranked_table.c.genre_id, genre_ranked_table.c.genre_name,
-                              genre_ranked_table.c.number_of_purchases)
-
-        # To get the top 2 tracks for all genre, the query is filtered for track_rank less than 3
-        results = query.filter(genre_ranked_table.c.track_rank < number_of_tracks + 1).all()
+        if leaderboards is not None:
+            results = leaderboards.top_tracks_for_genre(number_of_tracks)
+        else:
+            results = fetch_rows(session, TOP_TRACKS_FOR_GENRE_STATEMENT, {"limit": number_of_tracks}, execution)
 
         if not results:
             raise NoResultFound("No Records Found")
@@ -96,6 +131,8 @@ def get_top_tracks_for_genre(session, number_of_tracks):
         print("\n\n")
         print("===" * 50)
         print("\n\n")
+
+        return results
     except AttributeError as err:
         LOGGER.error(err)
     except NoResultFound as err:
@@ -8,7 +8,9 @@ Module for reading records from the database to Get Tracks with More than One Ge
 This script requires the following modules be installed in the python environment
     * logging - to perform logging operations
 
-This script contains the following function
+This script contains the following
+    * TRACKS_WITH_MORE_GENRE_STATEMENT - The statement of the report, built once
+    * build_tracks_with_more_genre_statement - Function to build the statement to Get Tracks with More than One Genre
     * get_tracks_with_more_genre - Function to perform read operation with the database to Get Tracks with
                                   More than One Genre
 """
@@ -17,17 +19,50 @@ import logging
 
 # External imports
 import sqlalchemy.orm
-from sqlalchemy import func, distinct
+from sqlalchemy import bindparam, distinct, func, select
 from sqlalchemy.orm.exc import NoResultFound
 from tabulate import tabulate
 
 # User Imports
 import mservice.database_model as models
+from mservice.aggregate_operation.execution import EXECUTION_ORM, check_execution, fetch_rows
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_tracks_with_more_genre(session, number_of_tracks):
+def build_tracks_with_more_genre_statement():
+    """
+    Function to build the statement to Get Tracks with More than One Genre, the number of rows being bound to the
+    "limit" parameter
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    # Creating a subquery that returns the name of tracks which is associated with more the one genre
+    stmt = select(models.TracksTable.name).group_by(models.TracksTable.name)
+    stmt = stmt.having(func.count(distinct(models.TracksTable.genre_id)) > 1)
+
+    # Selecting the Track Name, Genre Name
+    statement = select(distinct(models.TracksTable.name).label("track_name"),
+                       models.GenreTable.name.label("genre_name"))
+
+    # Filtering the statement to return only tracks that are returned from the subquery
+    statement = statement.where(models.TracksTable.name.in_(stmt))
+
+    # Joining tracks table and genre table
+    statement = statement.join(models.GenreTable, models.TracksTable.genre_id == models.GenreTable.genre_id)
+
+    # Sorting by Tracks Name, and by Genre Name between the genres of a track
+    statement = statement.order_by(models.TracksTable.name, models.GenreTable.name)
+
+    return statement.limit(bindparam("limit"))
+
+
+# The statement of the report, built once
+TRACKS_WITH_MORE_GENRE_STATEMENT = build_tracks_with_more_genre_statement()
+
+
+def get_tracks_with_more_genre(session, number_of_tracks, execution=EXECUTION_ORM):
     """
     Function to perform read operation with the database to Get Tracks with More than One Genre
 
@@ -37,8 +72,11 @@ def get_tracks_with_more_genre(session, number_of_tracks):
     :param number_of_tracks: The number of tracks to be returned from the query
     :type number_of_tracks: int
 
-    :return: Nothing
-    :rtype: None
+    :param execution: The execution mode, "orm" for ORM rows, "core" for Core rows or "dbapi" for DB-API tuples
+    :type execution: str
+
+    :return: results - The rows returned from the query, None if the arguments were invalid or nothing was found
+    :rtype: list
 
     """
     try:
@@ -49,26 +87,11 @@ def get_tracks_with_more_genre(session, number_of_tracks):
         if not issubclass(type(number_of_tracks), int) or number_of_tracks < 1:
             raise AttributeError("number of tracks should be integer and greater than 0")
 
-        LOGGER.info("Performing Read Operation")
-
-        # Creating a subquery that returns the name of tracks which is associated with more the one genre
-        stmt = session.query(models.TracksTable.name).group_by(models.TracksTable.name)
-        stmt = stmt.having(func.count(distinct(models.TracksTable.genre_id)) > 1).subquery()
+        check_execution(execution)
 
-        # Selecting the Track Name, Genre Name
-        query = session.query(distinct(models.TracksTable.name).label("track_name"),
-                              models.GenreTable.name.label("genre_name"))
-
-        # Filtering the query to return only tracks that are returned from the subquery
-        query = query.filter(models.TracksTable.name.in_(stmt))
-
-        # Joining tracks table and genre table
-        query = query.join(models.GenreTable, models.TracksTable.genre_id == models.GenreTable.genre_id)
-
-        # Sorting by Tracks Name
-        query = query.order_by(models.TracksTable.name)
+        LOGGER.info("Performing Read Operation")
 
-        results = query.limit(number_of_tracks).all()
+        results = fetch_rows(session, TRACKS_WITH_MORE_GENRE_STATEMENT, {"limit": number_of_tracks}, execution)
 
         if not results:
             raise NoResultFound("No Records Found")
@@ -84,6 +107,8 @@ def get_tracks_with_more_genre(session, number_of_tracks):
         print("\n\n")
         print("===" * 50)
         print("\n\n")
+
+        return results
     except AttributeError as err:
         LOGGER.error(err)
     except NoResultFound as err:
@@ -0,0 +1,19 @@
+# -*- coding: UTF-8 -*-
+"""
+Initialization For Benchmarks
+=================================
+
+This is an initialization module for the benchmark modules
+"""
+
+# Importing necessary modules and functions to be used by modules using this package
+from mservice.benchmark.delete_benchmark import benchmark_genre_delete
+from mservice.benchmark.contention_benchmark import benchmark_update_contention
+from mservice.benchmark.snapshot_benchmark import benchmark_snapshot_reports
+from mservice.benchmark.money_benchmark import benchmark_money_aggregation
+from mservice.benchmark.execution_benchmark import benchmark_report_execution
+from mservice.benchmark.named_query_benchmark import benchmark_named_queries
+from mservice.benchmark.batch_benchmark import benchmark_report_batch
+from mservice.benchmark.scatter_gather_benchmark import benchmark_scatter_gather
+from mservice.benchmark.sketch_benchmark import benchmark_distinct_sketches
+from mservice.benchmark.heavy_hitter_benchmark import benchmark_heavy_hitters
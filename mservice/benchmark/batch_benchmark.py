@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Benchmark Shared Scan Batch Execution
+====================================================
+
+Module for comparing the full report pack run one statement per report with the same pack run as a batch scanning
+every table once, counting the statements each runs and checking both give the same rows
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * time - to time the report packs
+
+This script contains the following function
+    * benchmark_report_batch - Function to time the report pack both ways
+"""
+# Standard Imports
+import logging
+import time
+from collections import Counter
+
+# External imports
+import sqlalchemy.orm
+from tabulate import tabulate
+
+# User Imports
+from mservice.aggregate_operation.batch_execution import BATCH_REPORTS, run_report_batch
+from mservice.aggregate_operation.execution import fetch_rows
+from mservice.benchmark.execution_benchmark import REPORT_STATEMENTS
+from mservice.benchmark.named_query_benchmark import UNORDERED_QUERIES
+from mservice.connections.statement_cache import get_statement_cache_counters, track_statement_cache
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _count_statements(engine):
+    """
+    Function to get the number of statements executed so far by a tracked engine
+
+    :param engine: The engine
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :return: statements
+    :rtype: int
+    """
+    return sum(get_statement_cache_counters(engine).values())
+
+
+def benchmark_report_batch(session_factory, number=10, repeat=5):
+    """
+    Function to run the full report pack `repeat` times one statement per report and as a batch, and compare their
+    median latencies, the statements they run and their rows. Rows may differ where the SQL report leaves the order of
+    ties unspecified, the rows of the reports without a full order being compared regardless of their order
+
+    :param session_factory: The session factory used to create new sessions
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param number: The number of rows asked from every report
+    :type number: int
+
+    :param repeat: The number of runs of the pack in both ways
+    :type repeat: int
+
+    :return: results - Per way, the median milliseconds of the pack and the statements it ran, along with the reports
+                       whose rows differ
+    :rtype: dict
+    """
+    if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+        raise AttributeError("Session Maker not passed properly, correct type 'sqlalchemy.orm.session.sessionmaker' ")
+
+    if not issubclass(type(repeat), int) or repeat < 1:
+        raise AttributeError("repeat should be integer and greater than 0")
+
+    engine = session_factory.kw["bind"]
+    track_statement_cache(engine)
+
+    timings = {"per report": [], "batch": []}
+    statements = {}
+
+    for _ in range(repeat):
+        session = session_factory()
+        executed = _count_statements(engine)
+        started = time.perf_counter()
+
+        try:
+            separate_rows = {}
+
+            for name, statement, parameters in REPORT_STATEMENTS:
+                rows = fetch_rows(session, statement, dict(parameters, limit=number))
+                separate_rows[name] = [tuple(row) for row in rows]
+        finally:
+            session.close()
+
+        timings["per report"].append(time.perf_counter() - started)
+        statements["per report"] = _count_statements(engine) - executed
+
+        executed = _count_statements(engine)
+        started = time.perf_counter()
+        batch_rows = run_report_batch(session_factory(), list(BATCH_REPORTS), number)
+        timings["batch"].append(time.perf_counter() - started)
+        statements["batch"] = _count_statements(engine) - executed
+
+    different = [name for name, rows in batch_rows.items()
+                 if (Counter(rows) != Counter(separate_rows[name]) if name in UNORDERED_QUERIES
+                     else rows != separate_rows[name])]
+
+    results = {way: {"ms": sorted(seconds)[len(seconds) // 2] * 1000, "statements": statements[way]}
+               for way, seconds in timings.items()}
+    results["different_rows"] = different
+
+    LOGGER.info("\n\nReports With Different Rows: %s\n\n %s", ", ".join(different) or "None",
+                tabulate([[way, result["ms"], result["statements"]] for way, result in results.items()
+                          if way != "different_rows"], headers=["Way", "Pack (ms)", "Statements"], tablefmt="grid"))
+    return results
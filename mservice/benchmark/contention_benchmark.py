@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Benchmark Update Contention
+==========================================
+
+Module for comparing lock based updates (SELECT ... FOR UPDATE, change, commit) with optimistic compare and set
+updates, while several threads keep updating the same few tracks
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * threading, time - to run and time the concurrent writers
+
+This script contains the following function
+    * benchmark_update_contention - Function to run both kinds of writers against the same tracks and time them
+"""
+# Standard Imports
+import logging
+import threading
+import time
+from decimal import Decimal
+
+# External imports
+import sqlalchemy.orm
+from tabulate import tabulate
+
+# User Imports
+import mservice.database_model as models
+from mservice.connections.retry import retry_transaction
+from mservice.update_operation.optimistic_update import update_optimistically
+
+LOGGER = logging.getLogger(__name__)
+
+
+@retry_transaction(max_attempts=20)
+def _locked_price_increment(session, track_id):
+    """
+    Function to increment the price of a track by a cent, holding a row lock from the read to the commit
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param track_id: The track to update
+    :type track_id: int
+
+    :return: Nothing
+    :rtype: None
+    """
+    track = session.query(models.TracksTable).filter(models.TracksTable.track_id == track_id).with_for_update().one()
+    track.unit_price = track.unit_price + Decimal("0.01")
+    session.commit()
+
+
+def _optimistic_price_increment(session, track_id):
+    """
+    Function to increment the price of a track by a cent with a compare and set, redoing it on conflicts
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param track_id: The track to update
+    :type track_id: int
+
+    :return: attempts - The number of attempts the update took
+    :rtype: int
+    """
+    _, attempts = update_optimistically(session, models.TracksTable, track_id,
+                                        lambda track: {"unit_price": track.unit_price + Decimal("0.01")},
+                                        max_attempts=1000)
+    return attempts
+
+
+def _run_writers(session_factory, writer, track_ids, workers, updates_per_worker):
+    """
+    Function to run the given writer from several threads, each doing its updates round robin over the tracks
+
+    :param session_factory: The session factory used to create a session per thread
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param writer: Function updating one track, returning the number of attempts it took or None
+    :type writer: callable
+
+    :param track_ids: The contended tracks
+    :type track_ids: list
+
+    :param workers: The number of threads
+    :type workers: int
+
+    :param updates_per_worker: The number of updates done by each thread
+    :type updates_per_worker: int
+
+    :return: seconds, attempts, errors - The wall time, the total attempts and the number of failed updates
+    :rtype: tuple
+    """
+    totals = {"attempts": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def work(worker_number):
+        session = session_factory()
+        attempts, errors = 0, 0
+        try:
+            for update_number in range(updates_per_worker):
+                track_id = track_ids[(worker_number + update_number) % len(track_ids)]
+                try:
+                    attempts += writer(session, track_id) or 1
+                except sqlalchemy.exc.SQLAlchemyError as err:
+                    LOGGER.error("Update of track %s failed: %s", track_id, err)
+                    session.rollback()
+                    errors += 1
+        finally:
+            session.close()
+            with lock:
+                totals["attempts"] += attempts
+                totals["errors"] += errors
+
+    threads = [threading.Thread(target=work, args=(number,)) for number in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return time.perf_counter() - started, totals["attempts"], totals["errors"]
+
+
+def benchmark_update_contention(session_factory, track_ids=(1, 2), workers=8, updates_per_worker=50):
+    """
+    Function to run lock based and optimistic writers against the same tracks and compare their throughput. The prices
+    of the tracks are restored afterwards
+
+    :param session_factory: The session factory used to create new sessions
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param track_ids: The contended tracks, fewer tracks means more contention
+    :type track_ids: tuple
+
+    :param workers: The number of concurrent writer threads
+    :type workers: int
+
+    :param updates_per_worker: The number of updates done by each thread
+    :type updates_per_worker: int
+
+    :return: results - Per strategy, the seconds taken, updates per second, attempts per update and failed updates
+    :rtype: dict
+    """
+    if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+        raise AttributeError("Session Maker not passed properly, correct type 'sqlalchemy.orm.session.sessionmaker' ")
+
+    if not issubclass(type(workers), int) or workers < 1:
+        raise AttributeError("workers should be integer and greater than 0")
+
+    session = session_factory()
+    original_prices = dict(session.query(models.TracksTable.track_id, models.TracksTable.unit_price).
+                           filter(models.TracksTable.track_id.in_(track_ids)).all())
+    session.close()
+
+    results = {}
+    updates = workers * updates_per_worker
+
+    for name, writer in (("lock based", _locked_price_increment), ("optimistic", _optimistic_price_increment)):
+        seconds, attempts, errors = _run_writers(session_factory, writer, list(track_ids), workers, updates_per_worker)
+        results[name] = {"seconds": seconds, "updates_per_second": updates / seconds,
+                         "attempts_per_update": attempts / updates, "failed_updates": errors}
+
+    # The version is bumped along with the price, so an optimistic writer holding the version before the restore fails
+    session = session_factory()
+    for track_id, unit_price in original_prices.items():
+        session.query(models.TracksTable).filter(models.TracksTable.track_id == track_id).\
+            update({models.TracksTable.unit_price: unit_price,
+                    models.TracksTable.version_id: models.TracksTable.version_id + 1}, synchronize_session=False)
+    session.commit()
+    session.close()
+
+    LOGGER.info("\n\n %s", tabulate([[name] + list(result.values()) for name, result in results.items()],
+                                    headers=["Strategy", "Seconds", "Updates Per Second", "Attempts Per Update",
+                                             "Failed Updates"], tablefmt="grid"))
+    return results
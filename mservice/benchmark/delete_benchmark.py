@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Benchmark Deleting a Genre
+==========================================
+
+Module for comparing the ORM cascade delete of a genre, which loads every dependent track, invoiceline and playlist
+entry into the session, with the set based delete issuing chunked DELETE statements
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * time - to time the deletes
+
+This script contains the following function
+    * seed_genre_with_tracks - Function to create a genre whose every track is purchased once and part of a playlist
+    * benchmark_genre_delete - Function to time both ways of deleting a freshly seeded genre
+"""
+# Standard Imports
+import datetime
+import logging
+import time
+
+# External imports
+import sqlalchemy.orm
+from tabulate import tabulate
+
+# User Imports
+import mservice.database_model as models
+from mservice.create_operation.id_allocator import BlockIdAllocator
+from mservice.delete_operation.set_based_delete import delete_with_dependents
+
+LOGGER = logging.getLogger(__name__)
+
+BATCH_SIZE = 10000
+
+
+def seed_genre_with_tracks(session_factory, allocator, number_of_tracks):
+    """
+    Function to create a new genre with the given number of tracks, each track purchased in one invoiceline of a single
+    new invoice and added to a new playlist
+
+    :param session_factory: The session factory used to create the seeding session
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param allocator: The allocator to take the ids from
+    :type allocator: :class:`mservice.create_operation.id_allocator.BlockIdAllocator`
+
+    :param number_of_tracks: The number of tracks of the genre
+    :type number_of_tracks: int
+
+    :return: genre_id
+    :rtype: int
+    """
+    genre_id = allocator.next_id(models.GenreTable)
+    invoice_id = allocator.next_id(models.InvoiceTable)
+    play_list_id = allocator.next_id(models.PlaylistTable)
+    all_track_ids = allocator.reserve(models.TracksTable, number_of_tracks)
+    all_invoice_line_ids = allocator.reserve(models.InvoiceLineTable, number_of_tracks)
+
+    session = session_factory()
+    try:
+        session.bulk_insert_mappings(models.GenreTable, [dict(genre_id=genre_id, name="BENCHMARK_GENRE")])
+        session.bulk_insert_mappings(models.InvoiceTable, [dict(invoice_id=invoice_id, customer_id=1,
+                                                                invoice_date=datetime.datetime(2020, 10, 22),
+                                                                total=round(0.99 * number_of_tracks, 2))])
+        session.bulk_insert_mappings(models.PlaylistTable, [dict(play_list_id=play_list_id, name="BENCHMARK")])
+
+        for start in range(0, number_of_tracks, BATCH_SIZE):
+            track_ids = all_track_ids[start:start + BATCH_SIZE]
+            invoice_line_ids = all_invoice_line_ids[start:start + BATCH_SIZE]
+
+            session.bulk_insert_mappings(models.TracksTable, [
+                dict(track_id=track_id, name="Benchmark Track", album_id=1, media_type_id=1, genre_id=genre_id,
+                     milliseconds=343719, bytes=11170334, unit_price=0.99) for track_id in track_ids])
+
+            session.bulk_insert_mappings(models.InvoiceLineTable, [
+                dict(invoice_line_id=invoice_line_id, invoice_id=invoice_id, track_id=track_id, unit_price=0.99,
+                     quantity=1) for invoice_line_id, track_id in zip(invoice_line_ids, track_ids)])
+
+            session.bulk_insert_mappings(models.PlaylistTrackTable, [
+                dict(play_list_id=play_list_id, track_id=track_id) for track_id in track_ids])
+
+        session.commit()
+    finally:
+        session.close()
+
+    return genre_id
+
+
+def benchmark_genre_delete(session_factory, number_of_tracks=100000, chunk_size=5000):
+    """
+    Function to seed two identical genres and delete one through the ORM cascade and the other with the set based
+    delete, timing both
+
+    :param session_factory: The session factory used to create new sessions
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param number_of_tracks: The number of tracks of each seeded genre
+    :type number_of_tracks: int
+
+    :param chunk_size: The maximum number of rows deleted by each statement of the set based delete
+    :type chunk_size: int
+
+    :return: timings - Seconds taken by each way of deleting, and the rows deleted per table
+    :rtype: dict
+    """
+    if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+        raise AttributeError("Session Maker not passed properly, correct type 'sqlalchemy.orm.session.sessionmaker' ")
+
+    if not issubclass(type(number_of_tracks), int) or number_of_tracks < 1:
+        raise AttributeError("number of tracks should be integer and greater than 0")
+
+    allocator = BlockIdAllocator(session_factory, block_size=BATCH_SIZE)
+
+    LOGGER.info("Seeding Genres With %s Tracks", number_of_tracks)
+    orm_genre_id = seed_genre_with_tracks(session_factory, allocator, number_of_tracks)
+    set_genre_id = seed_genre_with_tracks(session_factory, allocator, number_of_tracks)
+
+    session = session_factory()
+    impact = delete_with_dependents(session, models.GenreTable, [set_genre_id], dry_run=True)
+    session.close()
+
+    session = session_factory()
+    started = time.perf_counter()
+    try:
+        session.delete(session.query(models.GenreTable).filter(models.GenreTable.genre_id == orm_genre_id).one())
+        session.commit()
+        orm_seconds = time.perf_counter() - started
+    except Exception as err:
+        LOGGER.error("ORM cascade delete failed: %s", err)
+        session.rollback()
+        orm_seconds = None
+    finally:
+        session.close()
+
+    session = session_factory()
+    started = time.perf_counter()
+    try:
+        delete_with_dependents(session, models.GenreTable, [set_genre_id], chunk_size=chunk_size)
+        set_based_seconds = time.perf_counter() - started
+    finally:
+        session.close()
+
+    timings = {"orm_cascade_seconds": orm_seconds, "set_based_seconds": set_based_seconds, "impact": dict(impact)}
+
+    LOGGER.info("\n\n %s", tabulate([["ORM cascade", orm_seconds], ["Set based", set_based_seconds]],
+                                    headers=["Delete", "Seconds"], tablefmt="grid"))
+    LOGGER.info("Rows deleted per table: %s", timings["impact"])
+    return timings
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Benchmark Report Execution Modes
+===============================================
+
+Module for comparing, for every report, the latency of the same statement run through the ORM, through a Core
+Connection and on a raw DB-API cursor, so the Python overhead of every layer can be told apart from the time spent in
+the database. The difference between the DB-API and Core modes is the cost of compiling and processing the results,
+the difference between Core and ORM the cost of the ORM layer
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * time - to time the statements
+
+This script contains the following
+    * REPORT_STATEMENTS - The statements of the reports, along with the values of their parameters but the limit
+    * benchmark_report_execution - Function to time every report in every execution mode
+"""
+# Standard Imports
+import logging
+import time
+
+# External imports
+import sqlalchemy.orm
+from tabulate import tabulate
+
+# User Imports
+import mservice.aggregate_operation as reports
+from mservice.aggregate_operation.execution import EXECUTION_MODES, fetch_rows
+from mservice.connections.statement_cache import get_statement_cache_counters, track_statement_cache
+
+LOGGER = logging.getLogger(__name__)
+
+MONTH_PARAMETERS = {"year": 2012, "month": 8}
+
+REPORT_STATEMENTS = [
+    ("Q1", reports.TOP_ALBUM_TRACKS_STATEMENT, {}),
+    ("Q2", reports.TOP_ARTIST_TRACKS_STATEMENT, {}),
+    ("Q3", reports.TOP_CUSTOMERS_STATEMENTS[reports.MONEY_DECIMAL], {}),
+    ("Q4", reports.TOP_ALBUM_PURCHASES_STATEMENT, {}),
+    ("Q5", reports.TOP_TRACKS_FOR_GENRE_STATEMENT, {}),
+    ("Q6", reports.LONGEST_TRACKS_STATEMENT, {}),
+    ("Q7", reports.LONGEST_ALBUM_STATEMENT, {}),
+    ("Q8", reports.NUMBER_OF_PLAYLIST_TRACKS_STATEMENT, {}),
+    ("Q9", reports.NUMBER_OF_PLAYLIST_ALBUM_STATEMENT, {}),
+    ("Q10", reports.TRACKS_WITH_MORE_GENRE_STATEMENT, {}),
+    ("Q11", reports.ADD_GENRE_TO_ALBUM_STATEMENT, {}),
+    ("Q12", reports.ADD_GENRE_TO_ARTIST_STATEMENT, {}),
+    ("Q13", reports.TOP_ARTIST_GENRE_STATEMENT, {}),
+    ("Q14", reports.TOP_EMPLOYEE_SALES_STATEMENT, MONTH_PARAMETERS),
+    ("Q15", reports.TOP_MANAGER_REVENUE_STATEMENTS[reports.MONEY_DECIMAL], MONTH_PARAMETERS),
+]
+
+
+def benchmark_report_execution(session_factory, number=10, repeat=20):
+    """
+    Function to run every report statement `repeat` times in every execution mode, on the same session, and compare
+    the median latencies. The statements are built once, so after their first run they are found in the compiled cache
+
+    :param session_factory: The session factory used to create new sessions
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param number: The number of rows asked from every report
+    :type number: int
+
+    :param repeat: The number of runs of every query in every mode
+    :type repeat: int
+
+    :return: results - Per report, the median milliseconds of every execution mode and the number of rows, along with
+                       the compiled statement cache counters of the run
+    :rtype: dict
+    """
+    if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+        raise AttributeError("Session Maker not passed properly, correct type 'sqlalchemy.orm.session.sessionmaker' ")
+
+    if not issubclass(type(repeat), int) or repeat < 1:
+        raise AttributeError("repeat should be integer and greater than 0")
+
+    engine = session_factory.kw["bind"]
+    track_statement_cache(engine)
+    counters_before = get_statement_cache_counters(engine)
+
+    results = {}
+    session = session_factory()
+
+    try:
+        for name, statement, parameters in REPORT_STATEMENTS:
+            results[name] = {}
+            parameters = dict(parameters, limit=number)
+
+            for execution in EXECUTION_MODES:
+                timings = []
+
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    rows = fetch_rows(session, statement, parameters, execution)
+                    timings.append(time.perf_counter() - started)
+
+                results[name][execution] = sorted(timings)[len(timings) // 2] * 1000
+
+            results[name]["rows"] = len(rows)
+    finally:
+        session.close()
+
+    cache = {name: count - counters_before[name] for name, count in get_statement_cache_counters(engine).items()}
+
+    LOGGER.info("\n\nCompiled Statement Cache: %s\n\n %s", cache,
+                tabulate([[name] + list(result.values()) for name, result in results.items()],
+                         headers=["Report"] + ["%s (ms)" % mode.upper() for mode in EXECUTION_MODES] + ["Rows"],
+                         tablefmt="grid"))
+
+    results["statement_cache"] = cache
+    return results
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Benchmark Heavy Hitter Tracks
+===========================================
+
+Module for validating the best selling tracks of every genre kept by Space-Saving rankings against the exact Q5
+report, for several numbers of counters, and timing the replay of the invoice lines, the answers of the rankings and
+the exact report
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * time - to time the reports
+
+This script contains the following function
+    * benchmark_heavy_hitters - Function to compare the rankings with the exact best selling tracks of every genre
+"""
+# Standard Imports
+import logging
+import time
+from collections import defaultdict
+
+# External imports
+import sqlalchemy.orm
+from tabulate import tabulate
+
+# User Imports
+from mservice.aggregate_operation.top_tracks_for_genre_q5 import get_top_tracks_for_genre
+from mservice.sketches.heavy_hitters import TrackHeavyHitters
+
+LOGGER = logging.getLogger(__name__)
+
+
+def benchmark_heavy_hitters(session_factory, number=5, capacities=(10, 50, 100, 500)):
+    """
+    Function to replay the invoice lines into rankings of every number of counters, and compare the best selling
+    tracks of every genre with the rows of get_top_tracks_for_genre. As Q5 leaves the order of ties unspecified, a
+    genre counts as exact when its counts are the exact ones rank by rank, and the recall is the share of the exact
+    tracks the rankings return
+
+    :param session_factory: The session factory used to create new sessions
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param number: The number of tracks per genre
+    :type number: int
+
+    :param capacities: The numbers of counters of every ranking to try
+    :type capacities: tuple
+
+    :return: results - Per number of counters, the milliseconds of the replay and of the answer, the share of genres
+                       whose counts are exact, the recall of the exact tracks and the largest overcount; and the
+                       milliseconds of the exact report
+    :rtype: dict
+    """
+    if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+        raise AttributeError("Session Maker not passed properly, correct type 'sqlalchemy.orm.session.sessionmaker' ")
+
+    started = time.perf_counter()
+    exact_rows = get_top_tracks_for_genre(session_factory(), number) or []
+    results = {"exact": {"ms": (time.perf_counter() - started) * 1000}}
+
+    exact = defaultdict(list)
+
+    for track_id, _, genre_id, _, count in exact_rows:
+        exact[genre_id].append((track_id, count))
+
+    for capacity in capacities:
+        heavy_hitters = TrackHeavyHitters(capacity)
+        session = session_factory()
+
+        try:
+            started = time.perf_counter()
+            heavy_hitters.replay(session)
+            replay_ms = (time.perf_counter() - started) * 1000
+        finally:
+            session.close()
+
+        started = time.perf_counter()
+        top = heavy_hitters.top_tracks_for_genre(number)
+        answer_ms = (time.perf_counter() - started) * 1000
+
+        exact_genres = sum(1 for genre_id, rows in exact.items()
+                           if [count for _, count in rows] == [count for _, count, _ in top.get(genre_id, [])])
+        found = sum(len({track_id for track_id, _ in rows} & {track_id for track_id, _, _ in top.get(genre_id, [])})
+                    for genre_id, rows in exact.items())
+
+        results[capacity] = {"replay_ms": replay_ms, "answer_ms": answer_ms,
+                             "exact_genres": exact_genres / len(exact) if exact else 1.0,
+                             "recall": found / len(exact_rows) if exact_rows else 1.0,
+                             "max_overcount": max((overcount for rows in top.values() for _, _, overcount in rows),
+                                                  default=0)}
+
+    LOGGER.info("\n\nHeavy Hitter Tracks, The Top %s Of Every Genre Against The Exact Report Taking %.1f ms\n\n %s",
+                number, results["exact"]["ms"],
+                tabulate([[capacity, results[capacity]["replay_ms"], results[capacity]["answer_ms"],
+                           results[capacity]["exact_genres"], results[capacity]["recall"],
+                           results[capacity]["max_overcount"]] for capacity in capacities],
+                         headers=["Counters", "Replay (ms)", "Answer (ms)", "Exact Genres", "Recall",
+                                  "Max Overcount"], tablefmt="grid"))
+    return results
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Benchmark Money Aggregation
+==========================================
+
+Module for comparing the cost of summing invoice line amounts per customer as :class:`decimal.Decimal`, the way the
+driver returns NUMERIC(10, 2) values, with summing them as integer cents, both in plain Python and vectorized with
+NumPy. The lines are generated in memory, so only the aggregation is measured and not the database
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * time - to time the aggregations
+    * numpy - to generate the lines and run the vectorized sums
+
+This script contains the following function
+    * benchmark_money_aggregation - Function to sum the same lines in every representation and time them
+"""
+# Standard Imports
+import logging
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+# External imports
+import numpy as np
+from tabulate import tabulate
+
+# User Imports
+from mservice.aggregate_operation.money import cents_to_decimal
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _sum_decimal(groups, cents, chunk_size):
+    """
+    Function to sum the amounts per group as Decimal, creating the Decimal of every line the way the driver does
+
+    :param groups: The group of every line
+    :type groups: :class:`numpy.ndarray`
+
+    :param cents: The amount of every line in cents
+    :type cents: :class:`numpy.ndarray`
+
+    :param chunk_size: The number of lines converted at once, bounding the memory used by the Decimal objects
+    :type chunk_size: int
+
+    :return: totals - Group to total amount
+    :rtype: dict
+    """
+    totals = defaultdict(Decimal)
+
+    for start in range(0, len(cents), chunk_size):
+        amounts = [Decimal(value).scaleb(-2) for value in cents[start:start + chunk_size].tolist()]
+
+        for group, amount in zip(groups[start:start + chunk_size].tolist(), amounts):
+            totals[group] += amount
+
+    return totals
+
+
+def _sum_python_cents(groups, cents, chunk_size):
+    """
+    Function to sum the amounts per group as Python int cents
+
+    :param groups: The group of every line
+    :type groups: :class:`numpy.ndarray`
+
+    :param cents: The amount of every line in cents
+    :type cents: :class:`numpy.ndarray`
+
+    :param chunk_size: The number of lines converted to Python ints at once
+    :type chunk_size: int
+
+    :return: totals - Group to total cents
+    :rtype: dict
+    """
+    totals = defaultdict(int)
+
+    for start in range(0, len(cents), chunk_size):
+        for group, amount in zip(groups[start:start + chunk_size].tolist(), cents[start:start + chunk_size].tolist()):
+            totals[group] += amount
+
+    return totals
+
+
+def _sum_numpy_cents(groups, cents):
+    """
+    Function to sum the amounts per group as int64 cents with a single vectorized pass. bincount sums in float64,
+    which is exact for totals below 2 ** 53 cents
+
+    :param groups: The group of every line
+    :type groups: :class:`numpy.ndarray`
+
+    :param cents: The amount of every line in cents
+    :type cents: :class:`numpy.ndarray`
+
+    :return: totals - Total cents indexed by group
+    :rtype: :class:`numpy.ndarray`
+    """
+    return np.bincount(groups, weights=cents).astype(np.int64)
+
+
+def benchmark_money_aggregation(number_of_lines=10000000, number_of_groups=1000, chunk_size=1000000, seed=0):
+    """
+    Function to sum the same invoice lines per customer as Decimal, as Python int cents and as NumPy int64 cents, and
+    compare their time, checking the three give the same totals
+
+    :param number_of_lines: The number of invoice lines
+    :type number_of_lines: int
+
+    :param number_of_groups: The number of customers the lines are spread over
+    :type number_of_groups: int
+
+    :param chunk_size: The number of lines converted to Python objects at once
+    :type chunk_size: int
+
+    :param seed: The seed of the generated lines
+    :type seed: int
+
+    :return: results - Per representation, the seconds taken and the lines summed per second
+    :rtype: dict
+    """
+    if not issubclass(type(number_of_lines), int) or number_of_lines < 1:
+        raise AttributeError("number of lines should be integer and greater than 0")
+
+    if not issubclass(type(number_of_groups), int) or number_of_groups < 1:
+        raise AttributeError("number of groups should be integer and greater than 0")
+
+    generator = np.random.default_rng(seed)
+    groups = generator.integers(0, number_of_groups, number_of_lines, dtype=np.int64)
+
+    # Unit prices of 0.99 or 1.99 times a quantity of 1 to 3, as in the catalog
+    cents = generator.choice(np.array([99, 199], dtype=np.int64), number_of_lines) * \
+        generator.integers(1, 4, number_of_lines, dtype=np.int64)
+
+    timings = {}
+
+    started = time.perf_counter()
+    decimal_totals = _sum_decimal(groups, cents, chunk_size)
+    timings["decimal"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    python_totals = _sum_python_cents(groups, cents, chunk_size)
+    timings["python int cents"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    numpy_totals = _sum_numpy_cents(groups, cents)
+    timings["numpy int64 cents"] = time.perf_counter() - started
+
+    for group, total in decimal_totals.items():
+        if cents_to_decimal(python_totals[group]) != total or cents_to_decimal(numpy_totals[group]) != total:
+            raise ArithmeticError("Totals of group %s differ between representations" % group)
+
+    results = {name: {"seconds": seconds, "lines_per_second": number_of_lines / seconds}
+               for name, seconds in timings.items()}
+
+    LOGGER.info("\n\nSummed %s Lines Over %s Groups\n\n %s", number_of_lines, number_of_groups,
+                tabulate([[name, result["seconds"], result["lines_per_second"],
+                           timings["decimal"] / result["seconds"]] for name, result in results.items()],
+                         headers=["Representation", "Seconds", "Lines Per Second", "Speedup Over Decimal"],
+                         tablefmt="grid"))
+    return results
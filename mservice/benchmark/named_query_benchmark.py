@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Compare the Named Queries with the ORM Reports
+=============================================================
+
+Module for running the hand written SQL of every question side by side with the statement of its ORM report, on
+databases of different sizes, checking both give the same rows and timing which of the two is faster at every size
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * time - to time the statements
+
+This script contains the following
+    * UNORDERED_QUERIES - The questions whose rows are compared regardless of their order
+    * benchmark_named_queries - Function to compare every question at every data scale
+"""
+# Standard Imports
+import logging
+import time
+from collections import Counter
+
+# External imports
+import sqlalchemy.orm
+from tabulate import tabulate
+
+# User Imports
+from mservice.aggregate_operation.execution import fetch_rows
+from mservice.aggregate_operation.named_queries import load_named_queries
+from mservice.benchmark.execution_benchmark import REPORT_STATEMENTS
+
+LOGGER = logging.getLogger(__name__)
+
+# Q5 has no ORDER BY, though its rank breaks the ties by track id so the same tracks are kept. The other questions
+# break their ties, so the rows under the limit are the same for both statements
+UNORDERED_QUERIES = ("Q5",)
+
+
+def _time_statement(session, statement, parameters, repeat):
+    """
+    Function to run a statement `repeat` times and get its rows and median latency
+
+    :param session: The session to run the statement on
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param statement: The statement to run
+    :type statement: :class:`sqlalchemy.sql.expression.Executable`
+
+    :param parameters: The values of the bound parameters of the statement
+    :type parameters: dict
+
+    :param repeat: The number of runs
+    :type repeat: int
+
+    :return: rows, milliseconds
+    :rtype: tuple
+    """
+    timings = []
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = fetch_rows(session, statement, parameters)
+        timings.append(time.perf_counter() - started)
+
+    return [tuple(row) for row in rows], sorted(timings)[len(timings) // 2] * 1000
+
+
+def benchmark_named_queries(session_factories, number=10, repeat=20):
+    """
+    Function to run the named query and the ORM report of every question `repeat` times on every database, check they
+    give the same rows and compare their median latencies
+
+    :param session_factories: The data scale, such as the name or size of a database, to the session factory of the
+                              database
+    :type session_factories: dict
+
+    :param number: The number of rows asked from every question
+    :type number: int
+
+    :param repeat: The number of runs of every statement
+    :type repeat: int
+
+    :return: results - Per data scale and question, the median milliseconds of both statements, the faster of the two
+                       and the number of rows
+    :rtype: dict
+    """
+    if not issubclass(type(session_factories), dict) or not session_factories:
+        raise AttributeError("session factories should be a non empty dict of data scale to session factory")
+
+    for session_factory in session_factories.values():
+        if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+            raise AttributeError("Session Maker not passed properly, correct type "
+                                 "'sqlalchemy.orm.session.sessionmaker' ")
+
+    if not issubclass(type(repeat), int) or repeat < 1:
+        raise AttributeError("repeat should be integer and greater than 0")
+
+    named_queries = load_named_queries()
+    results = {}
+
+    for scale, session_factory in session_factories.items():
+        results[scale] = {}
+        session = session_factory()
+
+        try:
+            for name, statement, parameters in REPORT_STATEMENTS:
+                parameters = dict(parameters, limit=number)
+
+                orm_rows, orm_milliseconds = _time_statement(session, statement, parameters, repeat)
+                sql_rows, sql_milliseconds = _time_statement(session, named_queries[name], parameters, repeat)
+
+                if name in UNORDERED_QUERIES:
+                    identical = Counter(orm_rows) == Counter(sql_rows)
+                else:
+                    identical = orm_rows == sql_rows
+
+                if not identical:
+                    raise AssertionError("%s gives different rows as named query and as ORM report at scale %s"
+                                         % (name, scale))
+
+                results[scale][name] = {"orm": orm_milliseconds, "sql": sql_milliseconds,
+                                        "faster": "sql" if sql_milliseconds < orm_milliseconds else "orm",
+                                        "rows": len(orm_rows)}
+        finally:
+            session.close()
+
+        LOGGER.info("\n\nData Scale: %s\n\n %s", scale,
+                    tabulate([[name] + list(result.values()) for name, result in results[scale].items()],
+                             headers=["Question", "ORM (ms)", "SQL (ms)", "Faster", "Rows"], tablefmt="grid"))
+    return results
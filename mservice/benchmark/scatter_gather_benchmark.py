@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Benchmark Scatter Gather Aggregation
+===================================================
+
+Module for comparing the invoice reports Q3, Q4 and Q5 run as single queries with the same reports scattered over
+ranges of invoice ids in 1, 2, 4 and more worker processes, timing how the scatter gather scales with the workers and
+checking it gives the same rows
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * time - to time the reports
+
+This script contains the following function
+    * benchmark_scatter_gather - Function to time the invoice reports with every number of workers
+"""
+# Standard Imports
+import logging
+import time
+
+# External imports
+import sqlalchemy.orm
+from tabulate import tabulate
+
+# User Imports
+from mservice.aggregate_operation.execution import fetch_rows
+from mservice.aggregate_operation.money import MONEY_DECIMAL
+from mservice.aggregate_operation.scatter_gather import SCATTER_REPORTS, run_scatter_gather
+from mservice.aggregate_operation.top_album_purchases_q4 import TOP_ALBUM_PURCHASES_STATEMENT
+from mservice.aggregate_operation.top_customer_amount_q3 import TOP_CUSTOMERS_STATEMENTS
+from mservice.aggregate_operation.top_tracks_for_genre_q5 import TOP_TRACKS_FOR_GENRE_STATEMENT
+
+LOGGER = logging.getLogger(__name__)
+
+
+def benchmark_scatter_gather(session_factory, number=10, worker_counts=(1, 2, 4, 8), repeat=3):
+    """
+    Function to run Q3, Q4 and Q5 `repeat` times as single queries and scattered over as many ranges and worker
+    processes as every worker count, and compare their median latencies. Rows may differ where the SQL report leaves
+    the order of ties unspecified, as in Q5
+
+    :param session_factory: The session factory used to create new sessions
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param number: The number of rows asked from every report
+    :type number: int
+
+    :param worker_counts: The numbers of worker processes to try
+    :type worker_counts: tuple
+
+    :param repeat: The number of runs with every number of workers
+    :type repeat: int
+
+    :return: results - Per number of workers, 0 being the single queries, the median milliseconds, the speedup over
+                       one worker and whether the rows are the ones of the single queries
+    :rtype: dict
+    """
+    if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+        raise AttributeError("Session Maker not passed properly, correct type 'sqlalchemy.orm.session.sessionmaker' ")
+
+    if not issubclass(type(repeat), int) or repeat < 1:
+        raise AttributeError("repeat should be integer and greater than 0")
+
+    statements = {"Q3": TOP_CUSTOMERS_STATEMENTS[MONEY_DECIMAL], "Q4": TOP_ALBUM_PURCHASES_STATEMENT,
+                  "Q5": TOP_TRACKS_FOR_GENRE_STATEMENT}
+    timings = []
+
+    for _ in range(repeat):
+        session = session_factory()
+        started = time.perf_counter()
+
+        try:
+            single_rows = {report: [tuple(row) for row in fetch_rows(session, statements[report], {"limit": number})]
+                           for report in SCATTER_REPORTS}
+        finally:
+            session.close()
+
+        timings.append(time.perf_counter() - started)
+
+    results = {0: {"ms": sorted(timings)[len(timings) // 2] * 1000, "speedup": None, "same_rows": True}}
+
+    for workers in worker_counts:
+        timings = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            scattered_rows = run_scatter_gather(session_factory, list(SCATTER_REPORTS), number, partitions=workers,
+                                                workers=workers)
+            timings.append(time.perf_counter() - started)
+
+        results[workers] = {"ms": sorted(timings)[len(timings) // 2] * 1000, "speedup": None,
+                            "same_rows": scattered_rows == single_rows}
+
+    one_worker = results.get(1, results[0])["ms"]
+
+    for workers in worker_counts:
+        results[workers]["speedup"] = one_worker / results[workers]["ms"]
+
+    LOGGER.info("\n\nScatter Gather of %s, 0 Workers Being The Single Queries\n\n %s", ", ".join(SCATTER_REPORTS),
+                tabulate([[workers, result["ms"], result["speedup"], result["same_rows"]]
+                          for workers, result in results.items()],
+                         headers=["Workers", "Median (ms)", "Speedup Over One Worker", "Same Rows"], tablefmt="grid"))
+    return results
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Benchmark Approximate Distinct Counts
+===================================================
+
+Module for comparing the exact DISTINCT reports Q4, Q9 and Q13 with the same reports answered from HyperLogLog
+sketches, timing both, measuring the memory the sketches take against exact sets of the distinct values, and checking
+how far the estimates are from the exact counts
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * time - to time the reports
+    * tracemalloc - to measure the memory of the sketches and of the exact sets
+
+This script contains the following function
+    * benchmark_distinct_sketches - Function to time and measure the exact and approximate distinct reports
+"""
+# Standard Imports
+import logging
+import time
+import tracemalloc
+from collections import defaultdict
+
+# External imports
+import sqlalchemy.orm
+from sqlalchemy import select
+from tabulate import tabulate
+
+# User Imports
+import mservice.database_model as models
+from mservice.aggregate_operation.execution import fetch_rows
+from mservice.aggregate_operation.number_of_playlist_album_q9 import NUMBER_OF_PLAYLIST_ALBUM_STATEMENT
+from mservice.aggregate_operation.top_album_purchases_q4 import TOP_ALBUM_PURCHASES_STATEMENT
+from mservice.aggregate_operation.top_artist_distinct_genre_q13 import TOP_ARTIST_GENRE_STATEMENT
+from mservice.sketches.distinct_sketches import DISTINCT_REPORTS, DistinctSketches
+from mservice.sketches.hyperloglog import DEFAULT_PRECISION, standard_error
+
+LOGGER = logging.getLogger(__name__)
+
+REPORT_STATEMENTS = {"Q4": TOP_ALBUM_PURCHASES_STATEMENT, "Q9": NUMBER_OF_PLAYLIST_ALBUM_STATEMENT,
+                     "Q13": TOP_ARTIST_GENRE_STATEMENT}
+
+
+def _median_ms(timings):
+    """
+    Function to get the median of timings in milliseconds
+
+    :param timings: The timings in seconds
+    :type timings: list
+
+    :return: median
+    :rtype: float
+    """
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def _exact_sets(session):
+    """
+    Function to hold the distinct values of every album or artist in sets, the memory an exact count in the
+    application would take
+
+    :param session: The session to read the tables with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :return: sets - Per report, album or artist id to its set of values
+    :rtype: dict
+    """
+    album_artists = dict(session.execute(select(models.AlbumTable.album_id, models.AlbumTable.artist_id)).all())
+    track_albums = {}
+    sets = {report: defaultdict(set) for report in DISTINCT_REPORTS}
+
+    for track_id, album_id, genre_id in session.execute(select(models.TracksTable.track_id, models.TracksTable.album_id,
+                                                               models.TracksTable.genre_id)):
+        track_albums[track_id] = album_id
+
+        if genre_id is not None and album_id in album_artists:
+            sets["Q13"][album_artists[album_id]].add(genre_id)
+
+    for invoice_id, track_id in session.execute(select(models.InvoiceLineTable.invoice_id,
+                                                       models.InvoiceLineTable.track_id)):
+        sets["Q4"][track_albums.get(track_id)].add(invoice_id)
+
+    for play_list_id, track_id in session.execute(select(models.PlaylistTrackTable.play_list_id,
+                                                         models.PlaylistTrackTable.track_id)):
+        sets["Q9"][track_albums.get(track_id)].add(play_list_id)
+
+    return sets
+
+
+def benchmark_distinct_sketches(session_factory, number=10, precision=DEFAULT_PRECISION, repeat=5):
+    """
+    Function to run Q4, Q9 and Q13 `repeat` times with exact DISTINCT aggregates and from sketches, and compare their
+    median latencies, their memory and the error of the estimates over every album or artist
+
+    :param session_factory: The session factory used to create new sessions
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param number: The number of rows asked from every report
+    :type number: int
+
+    :param precision: The precision of the sketches
+    :type precision: int
+
+    :param repeat: The number of runs of every report
+    :type repeat: int
+
+    :return: results - Per report, the median milliseconds of the exact and approximate reports, the bytes of the
+                       sketches and of the exact sets, the largest relative error and whether the top rows have the
+                       same ids; and the milliseconds and bytes of building the sketches
+    :rtype: dict
+    """
+    if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+        raise AttributeError("Session Maker not passed properly, correct type 'sqlalchemy.orm.session.sessionmaker' ")
+
+    if not issubclass(type(repeat), int) or repeat < 1:
+        raise AttributeError("repeat should be integer and greater than 0")
+
+    session = session_factory()
+
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        sketches = DistinctSketches.build(session, precision)
+        build_ms = (time.perf_counter() - started) * 1000
+        build_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        exact_sets = _exact_sets(session)
+        exact_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results = {"build": {"ms": build_ms, "peak_bytes": build_bytes, "sketch_bytes": sketches.nbytes,
+                             "exact_set_bytes": exact_bytes}}
+
+        for report in DISTINCT_REPORTS:
+            exact_timings, approximate_timings = [], []
+
+            for _ in range(repeat):
+                started = time.perf_counter()
+                exact_rows = fetch_rows(session, REPORT_STATEMENTS[report], {"limit": number})
+                exact_timings.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                approximate_rows = sketches.top_rows(session, report, number)
+                approximate_timings.append(time.perf_counter() - started)
+
+            estimates = sketches.estimates(report)
+            errors = [abs(estimates.get(key, 0) - len(values)) / len(values)
+                      for key, values in exact_sets[report].items() if key is not None]
+
+            results[report] = {"exact_ms": _median_ms(exact_timings), "approximate_ms": _median_ms(approximate_timings),
+                               "max_error": max(errors, default=0.0),
+                               "same_ids": [row[0] for row in exact_rows] == [row[0] for row in approximate_rows]}
+    finally:
+        session.close()
+
+    LOGGER.info("\n\nDistinct Sketches Of Precision %s, Standard Error %.2f%%, Built In %.1f ms Holding %s Bytes, The "
+                "Exact Sets Holding %s Bytes\n\n %s", precision, standard_error(precision) * 100, build_ms,
+                sketches.nbytes, exact_bytes,
+                tabulate([[report, results[report]["exact_ms"], results[report]["approximate_ms"],
+                           results[report]["max_error"] * 100, results[report]["same_ids"]]
+                          for report in DISTINCT_REPORTS],
+                         headers=["Report", "Exact (ms)", "Sketches (ms)", "Max Error (%)", "Same Ids"],
+                         tablefmt="grid"))
+    return results
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Benchmark the Catalog Snapshot
+=============================================
+
+Module for comparing the latency of the catalog reports answered by the database with the same reports answered from
+an in memory catalog snapshot, and checking both give the same rows
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * time - to time the reports
+
+This script contains the following
+    * SNAPSHOT_REPORTS - The SQL reports along with the snapshot method answering them
+    * benchmark_snapshot_reports - Function to time every report both ways
+"""
+# Standard Imports
+import logging
+import time
+
+# External imports
+import sqlalchemy.orm
+from tabulate import tabulate
+
+# User Imports
+import mservice.aggregate_operation as reports
+from mservice.snapshot.catalog_snapshot import CatalogSnapshot
+
+LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_REPORTS = [
+    ("Q1", reports.get_top_album_tracks, CatalogSnapshot.top_album_tracks),
+    ("Q2", reports.get_top_artist_tracks, CatalogSnapshot.top_artist_tracks),
+    ("Q3", reports.get_top_customers, CatalogSnapshot.top_customers),
+    ("Q4", reports.get_top_album_purchases, CatalogSnapshot.top_album_purchases),
+    ("Q5", reports.get_top_tracks_for_genre, CatalogSnapshot.top_tracks_for_genre),
+    ("Q6", reports.get_longest_tracks, CatalogSnapshot.longest_tracks),
+    ("Q7", reports.get_longest_album, CatalogSnapshot.longest_album),
+    ("Q8", reports.get_number_of_playlist_tracks, CatalogSnapshot.number_of_playlist_tracks),
+    ("Q9", reports.get_number_of_playlist_album, CatalogSnapshot.number_of_playlist_album),
+    ("Q10", reports.get_tracks_with_more_genre, CatalogSnapshot.tracks_with_more_genre),
+    ("Q13", reports.get_top_artist_genre, CatalogSnapshot.top_artist_genre),
+]
+
+
+def benchmark_snapshot_reports(session_factory, number=10, repeat=100):
+    """
+    Function to run every catalog report against the database once and against a snapshot `repeat` times, and compare
+    their latency and rows. Rows may differ where the SQL report leaves the order of ties unspecified
+
+    :param session_factory: The session factory used to create new sessions
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param number: The number of rows asked from every report
+    :type number: int
+
+    :param repeat: The number of times every snapshot report is run, the median latency being reported
+    :type repeat: int
+
+    :return: results - Per report, the SQL latency in milliseconds, the snapshot latency in microseconds and whether
+                       both gave the same rows
+    :rtype: dict
+    """
+    if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+        raise AttributeError("Session Maker not passed properly, correct type 'sqlalchemy.orm.session.sessionmaker' ")
+
+    if not issubclass(type(repeat), int) or repeat < 1:
+        raise AttributeError("repeat should be integer and greater than 0")
+
+    started = time.perf_counter()
+    snapshot = CatalogSnapshot.load(session_factory())
+    load_seconds = time.perf_counter() - started
+
+    results = {}
+
+    for name, sql_report, snapshot_report in SNAPSHOT_REPORTS:
+        started = time.perf_counter()
+        sql_rows = sql_report(session_factory(), number) or []
+        sql_ms = (time.perf_counter() - started) * 1000
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            snapshot_rows = snapshot_report(snapshot, number)
+            timings.append(time.perf_counter() - started)
+
+        results[name] = {"sql_ms": sql_ms, "snapshot_us": sorted(timings)[len(timings) // 2] * 1000000,
+                         "same_rows": [tuple(row) for row in sql_rows] == snapshot_rows}
+
+    LOGGER.info("\n\nSnapshot Loaded In %.3f Seconds\n\n %s", load_seconds,
+                tabulate([[name] + list(result.values()) for name, result in results.items()],
+                         headers=["Report", "SQL (ms)", "Snapshot (us)", "Same Rows"], tablefmt="grid"))
+    return results
@@ -6,4 +6,12 @@ This is an initialization module for session_getter module
 """
 
 # Importing necessary modules and functions to be used by modules using this package
-from mservice.connections.session_getter import create_new_engine, get_session_factory
+from mservice.connections.session_getter import create_new_engine, create_in_memory_engine, get_session_factory
+from mservice.connections.retry import retry_transaction, run_in_transaction, is_retryable_error, get_retry_counters
+from mservice.connections.statement_cache import track_statement_cache, record_statement_cache, \
+    get_statement_cache_counters
+from mservice.connections.sharding import SHARDED_TABLES, shard_for_customer, create_shard_engines, replicate_tables, \
+    refresh_shard_invoice_facts, CustomerShardedSession, get_sharded_session_factory
+from mservice.connections.warehouse import WAREHOUSE_METADATA, create_warehouse_engine, copy_to_warehouse, \
+    sync_warehouse, get_report_session_factory
+from mservice.connections.statement_counter import StatementCounter, count_statements, assert_max_statements
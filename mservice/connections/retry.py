@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Module for Retrying Transactions
+=====================================
+
+Module for replaying a unit of work when its transaction fails with an error that is expected under concurrent writers,
+such as InnoDB deadlocks and lock wait timeouts. The transaction is rolled back and replayed after a jittered
+exponential backoff, until it succeeds or the attempts run out
+
+A dropped connection is only replayed when it was dropped before a COMMIT was sent, as a connection lost during or
+after its COMMIT may have committed, and replaying would write the unit of work twice. The COMMITs sent by every engine
+are followed with a listener, per thread
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * random, time - to sleep a jittered backoff between attempts
+    * functools - to wrap the decorated functions
+
+This script contains the following functions
+    * is_retryable_error - Function to classify whether a database error is worth replaying the transaction for
+    * get_retry_counters - Function to get the number of attempts, retries and give ups so far
+    * retry_transaction - Decorator replaying a function taking a session as its first argument
+    * run_in_transaction - Function running a unit of work in a new session and committing it
+"""
+# Standard Imports
+import functools
+import logging
+import random
+import threading
+import time
+from collections import Counter
+
+# External Imports
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+LOGGER = logging.getLogger(__name__)
+
+# MySQL error codes, 1213 deadlock found, 1205 lock wait timeout exceeded
+MYSQL_RETRYABLE_CODES = {1205, 1213}
+
+# PostgreSQL SQLSTATE codes, 40001 serialization failure, 40P01 deadlock detected
+POSTGRESQL_RETRYABLE_CODES = {"40001", "40P01"}
+
+# SQLite messages, the database file is locked by another writer
+SQLITE_RETRYABLE_MESSAGES = ("database is locked", "database table is locked")
+
+_COUNTERS = Counter()
+_COUNTERS_LOCK = threading.Lock()
+
+# Whether the unit of work running in the thread has sent a COMMIT
+_COMMITS = threading.local()
+
+
+@event.listens_for(Engine, "commit")
+def _mark_commit(connection):
+    """
+    Function listening to the COMMITs of every engine, before they are sent, marking the unit of work of the thread
+
+    :return: Nothing
+    :rtype: None
+    """
+    _COMMITS.sent = True
+
+
+def _count(name):
+    """
+    Function to increment a retry counter
+
+    :param name: The counter name
+    :type name: str
+
+    :return: Nothing
+    :rtype: None
+    """
+    with _COUNTERS_LOCK:
+        _COUNTERS[name] += 1
+
+
+def get_retry_counters():
+    """
+    Function to get the counters of all the retried transactions: attempts, retries, successes and give_ups
+
+    :return: counters
+    :rtype: dict
+    """
+    with _COUNTERS_LOCK:
+        return {name: _COUNTERS[name] for name in ("attempts", "retries", "successes", "give_ups")}
+
+
+def is_retryable_error(err, commit_sent=False):
+    """
+    Function to check whether an error is a deadlock, a lock wait timeout, a serialization failure or a connection
+    dropped before any COMMIT was sent, after which replaying the whole transaction is expected to succeed
+
+    :param err: The raised error
+    :type err: Exception
+
+    :param commit_sent: Whether the unit of work had sent a COMMIT when the error was raised
+    :type commit_sent: bool
+
+    :return: True if the transaction should be replayed
+    :rtype: bool
+    """
+    if not issubclass(type(err), DBAPIError):
+        return False
+
+    # The COMMIT may have gone through before the connection dropped
+    if err.connection_invalidated:
+        return not commit_sent
+
+    orig = err.orig
+
+    if getattr(orig, "pgcode", None) in POSTGRESQL_RETRYABLE_CODES:
+        return True
+
+    if orig is not None and orig.args and orig.args[0] in MYSQL_RETRYABLE_CODES:
+        return True
+
+    return any(message in str(orig) for message in SQLITE_RETRYABLE_MESSAGES)
+
+
+def _backoff(attempt, base_delay, max_delay):
+    """
+    Function to sleep a full jitter exponential backoff before the next attempt
+
+    :param attempt: The number of the attempt which failed, starting at 1
+    :type attempt: int
+
+    :param base_delay: The upper bound of the first sleep in seconds
+    :type base_delay: float
+
+    :param max_delay: The upper bound of any sleep in seconds
+    :type max_delay: float
+
+    :return: Nothing
+    :rtype: None
+    """
+    time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1))))
+
+
+def retry_transaction(max_attempts=5, base_delay=0.05, max_delay=2.0):
+    """
+    Decorator replaying a function whose first argument is a session, rolling the session back before every replay.
+    The function must do the whole unit of work, including the commit, so that replaying it is safe
+
+    :param max_attempts: The number of attempts before giving up and raising the error
+    :type max_attempts: int
+
+    :param base_delay: The upper bound of the first sleep in seconds
+    :type base_delay: float
+
+    :param max_delay: The upper bound of any sleep in seconds
+    :type max_delay: float
+
+    :return: decorator
+    :rtype: callable
+    """
+    if not issubclass(type(max_attempts), int) or max_attempts < 1:
+        raise AttributeError("max attempts should be integer and greater than 0")
+
+    def decorator(function):
+
+        @functools.wraps(function)
+        def wrapper(session, *args, **kwargs):
+            attempt = 1
+            outer_commit_sent = getattr(_COMMITS, "sent", False)
+
+            while True:
+                _count("attempts")
+                _COMMITS.sent = False
+                try:
+                    result = function(session, *args, **kwargs)
+                except DBAPIError as err:
+                    commit_sent = _COMMITS.sent
+                    session.rollback()
+
+                    if not is_retryable_error(err, commit_sent):
+                        raise
+
+                    if attempt >= max_attempts:
+                        _count("give_ups")
+                        LOGGER.error("Giving up %s after %s attempts: %s", function.__name__, attempt, err.orig)
+                        raise
+
+                    _count("retries")
+                    LOGGER.warning("Retrying %s, attempt %s failed: %s", function.__name__, attempt, err.orig)
+                    _backoff(attempt, base_delay, max_delay)
+                    attempt += 1
+                else:
+                    _count("successes")
+                    return result
+                finally:
+                    # A unit of work nested in another one commits for it too
+                    _COMMITS.sent = outer_commit_sent or _COMMITS.sent
+
+        return wrapper
+
+    return decorator
+
+
+def run_in_transaction(session_factory, unit_of_work, max_attempts=5, base_delay=0.05, max_delay=2.0):
+    """
+    Function to run a unit of work in a new session and commit it, rolling back and replaying it when the transaction
+    fails with a retryable error
+
+    :param session_factory: The session factory used to create the session of every attempt
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param unit_of_work: Function taking the session and returning the result
+    :type unit_of_work: callable
+
+    :param max_attempts: The number of attempts before giving up and raising the error
+    :type max_attempts: int
+
+    :param base_delay: The upper bound of the first sleep in seconds
+    :type base_delay: float
+
+    :param max_delay: The upper bound of any sleep in seconds
+    :type max_delay: float
+
+    :return: result - The result of the unit of work
+    :rtype: object
+    """
+
+    @retry_transaction(max_attempts, base_delay, max_delay)
+    def attempt(session):
+        result = unit_of_work(session)
+        session.commit()
+        return result
+
+    session = session_factory()
+    try:
+        return attempt(session)
+    finally:
+        session.close()
@@ -11,13 +11,30 @@ import logging
 
 # External Imports
 import sqlalchemy
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# User Imports
+from mservice.connections.statement_cache import track_statement_cache
+from mservice.database_model.orm_classes import BASE
 
 LOGGER = logging.getLogger(__name__)
 
 
-def create_new_engine(dialect, driver, user, password, host, database):
+def _enforce_foreign_keys(dbapi_connection, connection_record):
+    """
+    Function listening to the new connections of a SQLite engine, enforcing their foreign keys, which SQLite leaves off
+    by default, so the ON DELETE CASCADE of the tables removes the dependent rows
+
+    :return: Nothing
+    :rtype: None
+    """
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+def create_new_engine(dialect, driver, user, password, host, database, pool_size=5, max_overflow=10):
     """
     Function to Create new engine from given input arguments
 
@@ -36,9 +53,15 @@ def create_new_engine(dialect, driver, user, password, host, database):
     :param host: The host ID
     :type host: str
 
-    :param database: The database name to connect to
+    :param database: The database name to connect to, the path of the file for SQLite
     :type database: str
 
+    :param pool_size: The number of connections kept open in the pool
+    :type pool_size: int
+
+    :param max_overflow: The number of connections opened beyond pool_size when all of them are in use
+    :type max_overflow: int
+
     :return: New engine configured with given parameters
     :rtype: :class:`sqlalchemy.engine.create_engine`
     """
@@ -48,16 +71,46 @@ def create_new_engine(dialect, driver, user, password, host, database):
                                                                                    host, database])):
             raise AttributeError("Invalid attribute type, should be string")
 
-        connection_string = dialect + "+" + driver + "://" + user + ":" + password + "@" + host + "/" + database + \
-                            "?charset=utf8mb4"
+        if not issubclass(type(pool_size), int) or not issubclass(type(max_overflow), int) or pool_size < 1 or \
+                max_overflow < 0:
+            raise AttributeError("pool size should be integer greater than 0 and max overflow integer not negative")
 
-        engine = create_engine(connection_string, echo=True)
+        # The URL quotes the user and password, the charset being a MySQL option
+        url = URL.create(dialect + "+" + driver, username=user or None, password=password or None, host=host or None,
+                         database=database, query={"charset": "utf8mb4"} if dialect == "mysql" else {})
+
+        # SQLite has no server, and picks the pool of its connections itself
+        if dialect == "sqlite":
+            engine = create_engine(url, echo=True)
+            event.listen(engine, "connect", _enforce_foreign_keys)
+        else:
+            engine = create_engine(url, echo=True, pool_size=pool_size, max_overflow=max_overflow)
+
+        track_statement_cache(engine)
         return engine
     except AttributeError as err:
         LOGGER.error(err)
         raise
 
 
+def create_in_memory_engine(echo=False):
+    """
+    Function to create an engine on a new in memory SQLite database holding the tables of the ORM classes, with foreign
+    keys enforced, its single connection being shared by every thread, for the test and performance suites
+
+    :param echo: Whether to log the statements
+    :type echo: bool
+
+    :return: New engine on the in memory database
+    :rtype: :class:`sqlalchemy.engine.base.Engine`
+    """
+    engine = create_engine("sqlite://", echo=echo, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", _enforce_foreign_keys)
+    BASE.metadata.create_all(engine)
+    track_statement_cache(engine)
+    return engine
+
+
 def get_session_factory(engine):
     """
     Function used to create and new session and return back
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+Sharding by Customer
+=========================
+
+Module for spreading the customer, invoice and invoiceline rows over several databases, the shards, by customer id,
+every other table being replicated to all of them, so the joins of a customer's invoices with the catalog and the
+employees stay local to a shard. The invoice fact table, built from the invoice lines, is spread along with them, each
+shard refreshing it from its own lines with :func:`refresh_shard_invoice_facts`
+
+The shard of a customer is its id modulo the number of shards. The :class:`CustomerShardedSession` writes customers,
+invoices and invoice lines to the shard of their customer, and reads from the shard of the customer when a statement
+filters on one customer id, from the first shard when it only reads replicated tables, and from every shard
+otherwise, concatenating their rows. Aggregates spanning shards are merged by the sharded reports
+
+Ids must be unique across the shards: customers need their id assigned before being added, and invoices and invoice
+lines should take theirs from a :class:`BlockIdAllocator` on the first shard rather than from auto increment. The
+replicated tables are written to a source database and copied to the shards with :func:`replicate_tables`, a
+:class:`CustomerShardedSession` refusing to write them to a single shard
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following
+    * SHARDED_TABLES - The tables spread over the shards by customer id
+    * shard_for_customer - Function to get the shard of a customer
+    * create_shard_engines - Function to create the engines of the shards and their tables
+    * replicate_tables - Function to copy the replicated tables from a source database to every shard
+    * refresh_shard_invoice_facts - Function to refresh the invoice fact table of every shard from its invoice lines
+    * CustomerShardedSession - Session routing statements to the shards
+    * get_sharded_session_factory - Function to create a session factory over the shards
+"""
+# Standard Imports
+import logging
+from collections import OrderedDict
+
+# External Imports
+import sqlalchemy
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.sql.util import find_tables
+
+# User Imports
+from mservice.connections.statement_cache import track_statement_cache
+from mservice.database_model.invoice_fact import refresh_invoice_fact
+from mservice.database_model.orm_classes import BASE
+
+LOGGER = logging.getLogger(__name__)
+
+SHARDED_TABLES = ("customer", "invoice", "invoiceline", "invoicefact")
+
+# The idblock table hands out ids for every shard, so it lives on the first shard only
+UNREPLICATED_TABLES = SHARDED_TABLES + ("idblock",)
+
+SHARD_ID_PREFIX = "shard_"
+
+
+def shard_for_customer(customer_id, shard_ids):
+    """
+    Function to get the shard of a customer
+
+    :param customer_id: The id of the customer
+    :type customer_id: int
+
+    :param shard_ids: The ids of the shards, in order
+    :type shard_ids: list
+
+    :return: shard_id
+    :rtype: str
+    """
+    if not issubclass(type(customer_id), int):
+        raise AttributeError("customer id should be integer to choose its shard")
+
+    return shard_ids[customer_id % len(shard_ids)]
+
+
+def create_shard_engines(urls):
+    """
+    Function to create the engines of the shards, named "shard_0" onwards in the order of their URLs, and create the
+    tables missing on them
+
+    :param urls: The database URLs of the shards, such as several local SQLite files
+    :type urls: list
+
+    :return: shards - Shard id to its engine
+    :rtype: :class:`collections.OrderedDict`
+    """
+    if not urls or not all(issubclass(type(url), str) for url in urls):
+        raise AttributeError("urls should be a non empty list of database URLs")
+
+    shards = OrderedDict()
+
+    for index, url in enumerate(urls):
+        engine = create_engine(url)
+        track_statement_cache(engine)
+        BASE.metadata.create_all(engine)
+        shards[SHARD_ID_PREFIX + str(index)] = engine
+
+    return shards
+
+
+def replicate_tables(source_engine, shards):
+    """
+    Function to copy every replicated table from a source database to every shard, replacing the rows already there
+
+    :param source_engine: The engine of the database holding the replicated tables
+    :type source_engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :param shards: Shard id to its engine
+    :type shards: dict
+
+    :return: counts - Table name to the number of rows copied
+    :rtype: :class:`collections.OrderedDict`
+    """
+    if not issubclass(type(source_engine), sqlalchemy.engine.base.Engine):
+        raise AttributeError("Engine should be of type 'sqlalchemy.engine.base.Engine'")
+
+    tables = [table for table in BASE.metadata.sorted_tables if table.name not in UNREPLICATED_TABLES]
+    counts = OrderedDict()
+
+    with source_engine.connect() as source:
+        rows = {table.name: [dict(row) for row in source.execute(select(table)).mappings()] for table in tables}
+
+    for shard_id, engine in shards.items():
+        with engine.begin() as connection:
+            # Deleting the children before their parents, and inserting the parents first
+            for table in reversed(tables):
+                connection.execute(table.delete())
+
+            for table in tables:
+                if rows[table.name]:
+                    connection.execute(table.insert(), rows[table.name])
+
+        LOGGER.info("Replicated %s tables to %s", len(tables), shard_id)
+
+    for table in tables:
+        counts[table.name] = len(rows[table.name])
+
+    return counts
+
+
+class CustomerShardedSession(ShardedSession):
+    """
+    Session routing the statements of the sharded tables to the shard of their customer, and those of the replicated
+    tables to the first shard
+
+    :ivar shard_ids: The ids of the shards, in order
+    :vartype shard_ids: list
+    """
+
+    def __init__(self, shards=None, **kwargs):
+        """
+        Constructor of the session
+
+        :param shards: Shard id to its engine
+        :type shards: dict
+        """
+        self.shard_ids = list(shards)
+
+        super().__init__(shard_chooser=self._choose_shard, id_chooser=self._choose_shards_by_id,
+                         execute_chooser=self._choose_shards_to_execute, shards=shards, **kwargs)
+
+    def _choose_shard(self, mapper, instance, clause=None):
+        """
+        Function to choose the shard an object is written to, or a statement without a shard is run on
+
+        :param mapper: The mapper of the object, None for a plain statement
+        :type mapper: :class:`sqlalchemy.orm.Mapper`
+
+        :param instance: The object, None if there is none
+        :type instance: object
+
+        :param clause: The statement, if any
+        :type clause: :class:`sqlalchemy.sql.expression.ClauseElement`
+
+        :return: shard_id
+        :rtype: str
+        """
+        table_name = mapper.local_table.name if mapper is not None else None
+
+        if instance is None or table_name not in SHARDED_TABLES:
+            if instance is not None:
+                raise AttributeError("%s is replicated to every shard, write it with replicate_tables" % table_name)
+
+            return self.shard_ids[0]
+
+        if table_name == "invoiceline":
+            instance = instance.invoice
+
+            if instance is None:
+                raise AttributeError("An invoice line needs its invoice to choose its shard")
+
+        # The invoice fact rows have no customer relationship to fall back on
+        if table_name != "customer" and instance.customer_id is None and \
+                getattr(instance, "customer", None) is not None:
+            return shard_for_customer(instance.customer.customer_id, self.shard_ids)
+
+        return shard_for_customer(instance.customer_id, self.shard_ids)
+
+    def _choose_shards_by_id(self, query, primary_key):
+        """
+        Function to choose the shards an object is looked up on by its primary key
+
+        :param query: The query of the lookup
+        :type query: :class:`sqlalchemy.orm.Query`
+
+        :param primary_key: The primary key of the object
+        :type primary_key: tuple
+
+        :return: shard_ids
+        :rtype: list
+        """
+        table_name = query.column_descriptions[0]["entity"].__table__.name
+
+        if table_name == "customer":
+            return [shard_for_customer(primary_key[0], self.shard_ids)]
+
+        if table_name not in SHARDED_TABLES:
+            return self.shard_ids[:1]
+
+        return self.shard_ids
+
+    def _choose_shards_to_execute(self, orm_context):
+        """
+        Function to choose the shards a statement is run on: the shard of the customer it filters on, the first shard
+        if it only reads replicated tables, otherwise every shard
+
+        :param orm_context: The execution of the statement
+        :type orm_context: :class:`sqlalchemy.orm.ORMExecuteState`
+
+        :return: shard_ids
+        :rtype: list
+        """
+        statement = orm_context.statement
+
+        if not any(table.name in SHARDED_TABLES for table in find_tables(statement, include_aliases=True)):
+            return self.shard_ids[:1]
+
+        # Only a customer id every row must have narrows the shards, so only the conditions joined by AND are looked at
+        whereclause = getattr(statement, "whereclause", None)
+        conditions = [] if whereclause is None else \
+            whereclause.clauses if getattr(whereclause, "operator", None) is operators.and_ else [whereclause]
+
+        for condition in conditions:
+            if getattr(condition, "operator", None) is operators.eq and \
+                    getattr(condition.left, "name", None) == "CustomerId" and \
+                    issubclass(type(condition.right), BindParameter):
+                customer_id = condition.right.effective_value
+
+                if customer_id is None and orm_context.parameters:
+                    customer_id = orm_context.parameters.get(condition.right.key)
+
+                if issubclass(type(customer_id), int):
+                    return [shard_for_customer(customer_id, self.shard_ids)]
+
+        return self.shard_ids
+
+
+def refresh_shard_invoice_facts(shards, rebuild=False):
+    """
+    Function to refresh the invoice fact table of every shard from the invoice lines of the shard, which are the lines
+    of its customers
+
+    :param shards: Shard id to its engine
+    :type shards: dict
+
+    :param rebuild: Whether to delete every row and copy every line again
+    :type rebuild: bool
+
+    :return: rows - Shard id to the number of rows copied
+    :rtype: :class:`collections.OrderedDict`
+    """
+    if not shards or not all(issubclass(type(engine), sqlalchemy.engine.base.Engine) for engine in shards.values()):
+        raise AttributeError("shards should be a non empty dict of shard id to 'sqlalchemy.engine.base.Engine'")
+
+    rows = OrderedDict()
+
+    for shard_id, engine in shards.items():
+        session = sessionmaker(bind=engine)()
+
+        try:
+            rows[shard_id] = refresh_invoice_fact(session, rebuild)
+            session.commit()
+        finally:
+            session.close()
+
+    return rows
+
+
+def get_sharded_session_factory(shards):
+    """
+    Function to create a session factory over the shards
+
+    :param shards: Shard id to its engine
+    :type shards: dict
+
+    :return: sessionmaker
+    :rtype: :class:`sqlalchemy.orm.sessionmaker`
+    """
+    if not shards or not all(issubclass(type(engine), sqlalchemy.engine.base.Engine) for engine in shards.values()):
+        raise AttributeError("shards should be a non empty dict of shard id to 'sqlalchemy.engine.base.Engine'")
+
+    return sessionmaker(class_=CustomerShardedSession, shards=shards)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Module for Counting Statement Cache Hits
+=============================================
+
+Module for counting how often the statements executed by an engine were found in the compiled statement cache of
+SQLAlchemy. Statements built once with bound parameters compile on their first execution and hit the cache afterwards,
+while statements rendering their values into the SQL compile again for every new value
+
+The counters are kept per engine, in a WeakKeyDictionary so a dropped engine takes its counters with it, and the
+benchmarks of one engine never count the statements run meanwhile by the other engines of the process
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * threading - to guard the counters
+    * weakref - to key the counters by engine
+
+This script contains the following functions
+    * track_statement_cache - Function to count the cache lookups of the statements executed by an engine
+    * record_statement_cache - Function to count a cache lookup done outside of an engine
+    * get_statement_cache_counters - Function to get the number of hits and misses so far
+"""
+# Standard Imports
+import logging
+import threading
+import weakref
+from collections import Counter
+
+# External Imports
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.engine import default
+
+LOGGER = logging.getLogger(__name__)
+
+# The cache_hit of an execution context, to the counter it increments
+_CACHE_OUTCOMES = {
+    default.CACHE_HIT: "hits",
+    default.CACHE_MISS: "misses",
+    default.CACHING_DISABLED: "uncached",
+    default.NO_CACHE_KEY: "uncached",
+    default.NO_DIALECT_SUPPORT: "uncached",
+}
+
+# Engine to the counter of its cache lookups
+_COUNTERS = weakref.WeakKeyDictionary()
+_COUNTERS_LOCK = threading.Lock()
+
+
+def _check_engine(engine):
+    """
+    Function to check the engine the counters are kept for
+
+    :param engine: The engine
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :return: Nothing
+    :rtype: None
+    """
+    if not issubclass(type(engine), sqlalchemy.engine.base.Engine):
+        raise AttributeError("Engine should be of type 'sqlalchemy.engine.base.Engine'")
+
+
+def record_statement_cache(engine, hit):
+    """
+    Function to count a compiled statement cache lookup done for the statements of an engine
+
+    :param engine: The engine the statement is executed with
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :param hit: True if the compiled statement was found in the cache
+    :type hit: bool
+
+    :return: Nothing
+    :rtype: None
+    """
+    _check_engine(engine)
+
+    with _COUNTERS_LOCK:
+        _COUNTERS.setdefault(engine, Counter())["hits" if hit else "misses"] += 1
+
+
+def get_statement_cache_counters(engine):
+    """
+    Function to get the counters of the compiled statement cache of an engine: hits, misses and uncached, the
+    statements which can not be cached, such as textual SQL
+
+    :param engine: The engine
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :return: counters
+    :rtype: dict
+    """
+    _check_engine(engine)
+
+    with _COUNTERS_LOCK:
+        counters = _COUNTERS.get(engine, Counter())
+        return {name: counters[name] for name in ("hits", "misses", "uncached")}
+
+
+def _count_execution(conn, cursor, statement, parameters, context, executemany):
+    """
+    Function listening to the executions of an engine, counting the outcome of their cache lookup
+
+    :return: Nothing
+    :rtype: None
+    """
+    outcome = _CACHE_OUTCOMES.get(getattr(context, "cache_hit", None), "uncached")
+
+    with _COUNTERS_LOCK:
+        _COUNTERS.setdefault(conn.engine, Counter())[outcome] += 1
+
+
+def track_statement_cache(engine):
+    """
+    Function to count the compiled statement cache lookups of every statement executed by the engine
+
+    :param engine: The engine to track
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :return: Nothing
+    :rtype: None
+    """
+    _check_engine(engine)
+
+    if not event.contains(engine, "after_cursor_execute", _count_execution):
+        event.listen(engine, "after_cursor_execute", _count_execution)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Module for Counting the Statements of a Code Path
+=====================================================
+
+Module for counting the statements an engine sends to the database while a block of code runs, to check a code path
+walking the relationships loads them with a fixed number of statements rather than one statement per parent
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following
+    * StatementCounter - Class holding the statements executed while counting
+    * count_statements - Context manager counting the statements executed by an engine
+    * assert_max_statements - Context manager failing if the statements executed by an engine are more than a maximum
+"""
+# Standard Imports
+import logging
+from contextlib import contextmanager
+
+# External Imports
+import sqlalchemy
+from sqlalchemy import event
+
+LOGGER = logging.getLogger(__name__)
+
+
+class StatementCounter:
+    """
+    Class holding the SQL of the statements executed while counting, in their order
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        """
+        The number of statements executed so far
+
+        :return: count
+        :rtype: int
+        """
+        return len(self.statements)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        """
+        Method listening to the executions of an engine, recording their SQL
+
+        :return: Nothing
+        :rtype: None
+        """
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_statements(engine):
+    """
+    Context manager counting the statements executed by the engine inside the block
+
+    :param engine: The engine to count the statements of
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :return: counter - The counter of the statements, filled as the block runs
+    :rtype: :class:`StatementCounter`
+    """
+    if not issubclass(type(engine), sqlalchemy.engine.base.Engine):
+        raise AttributeError("Engine should be of type 'sqlalchemy.engine.base.Engine'")
+
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter.record)
+
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter.record)
+
+
+@contextmanager
+def assert_max_statements(engine, maximum):
+    """
+    Context manager failing with an AssertionError listing the statements if the engine executed more than the maximum
+    number of statements inside the block
+
+    :param engine: The engine to count the statements of
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :param maximum: The maximum number of statements the block may execute
+    :type maximum: int
+
+    :return: counter - The counter of the statements, filled as the block runs
+    :rtype: :class:`StatementCounter`
+    """
+    if not issubclass(type(maximum), int) or maximum < 0:
+        raise AttributeError("maximum should be integer and not negative")
+
+    with count_statements(engine) as counter:
+        yield counter
+
+    LOGGER.debug("Executed %s statements, at most %s expected", counter.count, maximum)
+
+    if counter.count > maximum:
+        raise AssertionError("Executed %s statements, at most %s expected:\n%s"
+                             % (counter.count, maximum, "\n".join(counter.statements)))
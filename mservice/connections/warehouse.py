@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+Analytics Warehouse
+=======================
+
+Module for mirroring the tables of the ORM classes into a local SQLite file, the warehouse, so the reports can run on
+it instead of competing with the purchases on the production database
+
+The first copy reads every table in parallel, split in ranges of its primary key, and writes the ranges to the
+warehouse as they arrive, SQLite taking one writer at a time. The syncs after it copy the rows whose last_updated_on is
+at or above the watermark of their table, the highest last_updated_on read from the source before the previous copy,
+less an overlap for the transactions which committed late. The rows copied again replace the ones in the warehouse.
+Rows deleted in the source leave nothing to copy. The small tables whose rows are deleted in the normal course are
+copied whole every time, and a reconciling sync, run on a less frequent schedule than the others, reads the primary keys
+of the other tables from both sides range by range and deletes from the warehouse the rows whose key is no longer in the
+source. Reconciling reads every primary key of the source, which the plain syncs avoid
+
+The warehouse holds the tables without their server defaults, its rows coming from the source, and with indexes for
+the reports. SQLite sums NUMERIC amounts as floats, so the reports summing money are best run in cents on it
+
+This script requires the following modules be installed in the python environment
+    * datetime - to hold the overlap of the syncs
+    * logging - to perform logging operations
+    * os - to check the warehouse file exists
+
+This script contains the following
+    * WAREHOUSE_METADATA - The tables of the warehouse
+    * create_warehouse_engine - Function to create the engine of the warehouse file
+    * copy_to_warehouse - Function to copy every table from the source into a new warehouse
+    * sync_warehouse - Function to copy the rows changed since the last copy, and delete the rows deleted if reconciling
+    * get_report_session_factory - Function to create the session factory of the reports, on the warehouse or not
+"""
+# Standard Imports
+import datetime
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# External Imports
+import sqlalchemy
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, create_engine, event, func, select, \
+    tuple_
+
+# User Imports
+from mservice.connections.session_getter import get_session_factory
+from mservice.connections.statement_cache import track_statement_cache
+from mservice.database_model.orm_classes import BASE
+
+LOGGER = logging.getLogger(__name__)
+
+# The indexes of the warehouse for the reports: table, index name, columns
+ANALYTICS_INDEXES = (
+    ("invoice", "ix_warehouse_invoice_date", ("InvoiceDate", "CustomerId", "InvoiceId", "Total")),
+    ("invoiceline", "ix_warehouse_invoiceline_track", ("TrackId", "InvoiceId", "UnitPrice", "Quantity")),
+    ("track", "ix_warehouse_track_genre", ("GenreId", "TrackId", "Name")),
+    ("track", "ix_warehouse_track_album", ("AlbumId", "Milliseconds", "TrackId")),
+    ("playlisttrack", "ix_warehouse_playlisttrack_track", ("TrackId", "PlaylistId")),
+    ("customer", "ix_warehouse_customer_rep", ("SupportRepId", "CustomerId")),
+)
+
+# The small tables whose rows are deleted in the normal course, copied whole by every sync
+RECOPIED_TABLES = ("employeeclosure", "idblock")
+
+# The table of the watermarks
+SYNC_TABLE_NAME = "warehousesync"
+
+# The overlap of the syncs, for the transactions committing after rows with a later last_updated_on
+SYNC_OVERLAP = datetime.timedelta(minutes=5)
+
+# The number of primary key values per range of the first copy, and of the key comparison of the syncs
+COPY_CHUNK_SIZE = 50000
+
+# The number of keys per DELETE of the rows deleted in the source, within the bound parameter limit of SQLite
+DELETE_BATCH_SIZE = 400
+
+
+def build_warehouse_metadata():
+    """
+    Function to build the tables of the warehouse from the tables of the ORM classes, without their server defaults,
+    with the indexes of the reports and the table of the watermarks
+
+    :return: metadata
+    :rtype: :class:`sqlalchemy.schema.MetaData`
+    """
+    metadata = MetaData()
+
+    for table in BASE.metadata.sorted_tables:
+        for column in table.to_metadata(metadata).columns:
+            column.server_default = None
+            column.server_onupdate = None
+
+    for table_name, index_name, columns in ANALYTICS_INDEXES:
+        Index(index_name, *(metadata.tables[table_name].c[column] for column in columns))
+
+    Table(SYNC_TABLE_NAME, metadata, Column("TableName", String(64), primary_key=True),
+          Column("Watermark", DateTime))
+
+    return metadata
+
+
+# The tables of the warehouse, built once
+WAREHOUSE_METADATA = build_warehouse_metadata()
+SYNC_TABLE = WAREHOUSE_METADATA.tables[SYNC_TABLE_NAME]
+MIRRORED_TABLES = [WAREHOUSE_METADATA.tables[table.name] for table in BASE.metadata.sorted_tables]
+
+
+def _concat(*values):
+    """
+    Function standing for the CONCAT of MySQL in SQLite, None if any value is None
+
+    :return: value
+    :rtype: str
+    """
+    if any(value is None for value in values):
+        return None
+
+    return "".join(str(value) for value in values)
+
+
+def create_warehouse_engine(path):
+    """
+    Function to create the engine of a warehouse file, in write ahead log mode so the reports read while a sync writes
+
+    :param path: The path of the warehouse file
+    :type path: str
+
+    :return: engine
+    :rtype: :class:`sqlalchemy.engine.base.Engine`
+    """
+    if not issubclass(type(path), str):
+        raise AttributeError("warehouse path should be string")
+
+    engine = create_engine("sqlite:///" + path)
+
+    @event.listens_for(engine, "connect")
+    def _prepare_connection(dbapi_connection, connection_record):
+        dbapi_connection.create_function("concat", -1, _concat)
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+        dbapi_connection.execute("PRAGMA synchronous=NORMAL")
+
+    track_statement_cache(engine)
+    return engine
+
+
+def _check_engines(source_engine, warehouse_engine):
+    """
+    Function to check the engines of the source and the warehouse
+
+    :return: Nothing
+    :rtype: None
+    """
+    if not issubclass(type(source_engine), sqlalchemy.engine.base.Engine) or \
+            not issubclass(type(warehouse_engine), sqlalchemy.engine.base.Engine):
+        raise AttributeError("Engine should be of type 'sqlalchemy.engine.base.Engine'")
+
+
+def _key_ranges(connection, table, chunk_size, other=None):
+    """
+    Function to split a table in ranges of its first primary key column, the whole table being one range when the key
+    is not an integer
+
+    :param connection: The connection to the source
+    :type connection: :class:`sqlalchemy.engine.Connection`
+
+    :param table: The table
+    :type table: :class:`sqlalchemy.schema.Table`
+
+    :param chunk_size: The number of key values per range
+    :type chunk_size: int
+
+    :param other: Another connection holding the table, such as the warehouse, whose keys the ranges cover too
+    :type other: :class:`sqlalchemy.engine.Connection`
+
+    :return: ranges - (lowest key, key above the range) pairs, (None, None) for the whole table
+    :rtype: list
+    """
+    key = list(table.primary_key.columns)[0]
+
+    # The affinity of the type, as a variant such as the unsigned integer of MySQL has no python_type
+    if not issubclass(key.type._type_affinity, Integer):
+        return [(None, None)]
+
+    bounds = [connection.execute(select(func.min(key), func.max(key))).one()]
+
+    if other is not None:
+        bounds.append(other.execute(select(func.min(key), func.max(key))).one())
+
+    bounds = [bound for bound in bounds if bound[0] is not None]
+
+    if not bounds:
+        return []
+
+    lowest, highest = min(bound[0] for bound in bounds), max(bound[1] for bound in bounds)
+
+    return [(start, start + chunk_size) for start in range(lowest, highest + 1, chunk_size)]
+
+
+def _read_rows(source_engine, table, lowest=None, above=None, watermark=None):
+    """
+    Function to read the rows of a table from the source, in a range of its first primary key column or at or above a
+    watermark of their last update
+
+    :return: rows
+    :rtype: list
+    """
+    statement = select(table)
+
+    if lowest is not None:
+        key = list(table.primary_key.columns)[0]
+        statement = statement.where(key >= lowest, key < above)
+
+    if watermark is not None:
+        statement = statement.where(table.c.last_updated_on >= watermark)
+
+    with source_engine.connect() as connection:
+        return [dict(row) for row in connection.execute(statement).mappings()]
+
+
+def _read_keys(connection, table, lowest=None, above=None):
+    """
+    Function to read the primary keys of a table, in a range of its first primary key column
+
+    :return: keys - The primary keys, as tuples of their columns
+    :rtype: set
+    """
+    key_columns = list(table.primary_key.columns)
+    statement = select(*key_columns)
+
+    if lowest is not None:
+        statement = statement.where(key_columns[0] >= lowest, key_columns[0] < above)
+
+    return {tuple(row) for row in connection.execute(statement)}
+
+
+def _delete_missing_rows(source_engine, connection, table, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Function to delete from the warehouse the rows of a table whose primary key is no longer in the source, comparing
+    the keys of both range by range
+
+    :param source_engine: The engine of the production database
+    :type source_engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :param connection: The connection to the warehouse
+    :type connection: :class:`sqlalchemy.engine.Connection`
+
+    :param table: The table
+    :type table: :class:`sqlalchemy.schema.Table`
+
+    :param chunk_size: The number of key values per range
+    :type chunk_size: int
+
+    :return: deleted - The number of rows deleted
+    :rtype: int
+    """
+    key_columns = list(table.primary_key.columns)
+    deleted = 0
+
+    with source_engine.connect() as source_connection:
+        for lowest, above in _key_ranges(source_connection, table, chunk_size, other=connection):
+            missing = sorted(_read_keys(connection, table, lowest, above) -
+                             _read_keys(source_connection, table, lowest, above))
+
+            for start in range(0, len(missing), DELETE_BATCH_SIZE):
+                batch = missing[start:start + DELETE_BATCH_SIZE]
+
+                if len(key_columns) == 1:
+                    condition = key_columns[0].in_([key[0] for key in batch])
+                else:
+                    condition = tuple_(*key_columns).in_(batch)
+
+                deleted += connection.execute(table.delete().where(condition)).rowcount
+
+    return deleted
+
+
+def _read_watermarks(source_engine, tables):
+    """
+    Function to read the highest last_updated_on of tables from the source
+
+    :return: watermarks - Table name to its watermark
+    :rtype: dict
+    """
+    with source_engine.connect() as connection:
+        return {table.name: connection.execute(select(func.max(table.c.last_updated_on))).scalar()
+                for table in tables}
+
+
+def _write_watermarks(connection, watermarks):
+    """
+    Function to write the watermarks of tables to the warehouse
+
+    :return: Nothing
+    :rtype: None
+    """
+    connection.execute(SYNC_TABLE.insert().prefix_with("OR REPLACE"),
+                       [{"TableName": table_name, "Watermark": watermark}
+                        for table_name, watermark in watermarks.items()])
+
+
+def copy_to_warehouse(source_engine, warehouse_engine, workers=4, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Function to copy every table from the source into a new warehouse, the tables of the warehouse being created
+    again, reading the ranges of the tables in parallel
+
+    :param source_engine: The engine of the production database
+    :type source_engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :param warehouse_engine: The engine of the warehouse
+    :type warehouse_engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :param workers: The number of threads reading the source
+    :type workers: int
+
+    :param chunk_size: The number of primary key values per range
+    :type chunk_size: int
+
+    :return: counts - Table name to the number of rows copied
+    :rtype: :class:`collections.OrderedDict`
+    """
+    _check_engines(source_engine, warehouse_engine)
+
+    if not issubclass(type(workers), int) or workers < 1 or not issubclass(type(chunk_size), int) or chunk_size < 1:
+        raise AttributeError("workers and chunk size should be integers greater than 0")
+
+    WAREHOUSE_METADATA.drop_all(warehouse_engine)
+    WAREHOUSE_METADATA.create_all(warehouse_engine)
+
+    # The watermarks are read before the rows, so the rows changed during the copy are copied by the next sync
+    watermarks = _read_watermarks(source_engine, MIRRORED_TABLES)
+    counts = OrderedDict((table.name, 0) for table in MIRRORED_TABLES)
+
+    with source_engine.connect() as connection:
+        ranges = [(table, lowest, above) for table in MIRRORED_TABLES
+                  for lowest, above in _key_ranges(connection, table, chunk_size)]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor, warehouse_engine.begin() as connection:
+        futures = {executor.submit(_read_rows, source_engine, table, lowest, above): table
+                   for table, lowest, above in ranges}
+
+        for future in as_completed(futures):
+            table, rows = futures[future], future.result()
+
+            if rows:
+                connection.execute(table.insert(), rows)
+                counts[table.name] += len(rows)
+
+        _write_watermarks(connection, watermarks)
+
+    LOGGER.info("Copied %s rows of %s tables in %s ranges into the warehouse", sum(counts.values()), len(counts),
+                len(ranges))
+    return counts
+
+
+def sync_warehouse(source_engine, warehouse_engine, overlap=SYNC_OVERLAP, workers=4, reconcile=False):
+    """
+    Function to copy the rows changed since the last copy into the warehouse, making the first copy if there was none,
+    and when reconciling delete the rows deleted in the source
+
+    :param source_engine: The engine of the production database
+    :type source_engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :param warehouse_engine: The engine of the warehouse
+    :type warehouse_engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :param overlap: How far below the watermarks the rows are read again
+    :type overlap: :class:`datetime.timedelta`
+
+    :param workers: The number of threads reading the source for a first copy
+    :type workers: int
+
+    :param reconcile: If True the primary keys of every table are compared with the source, and the rows whose key is
+                      no longer in the source are deleted
+    :type reconcile: bool
+
+    :return: counts - Table name to the number of rows copied
+    :rtype: :class:`collections.OrderedDict`
+    """
+    _check_engines(source_engine, warehouse_engine)
+
+    if not issubclass(type(overlap), datetime.timedelta):
+        raise AttributeError("overlap should be of type 'datetime.timedelta'")
+
+    if not sqlalchemy.inspect(warehouse_engine).has_table(SYNC_TABLE_NAME):
+        return copy_to_warehouse(source_engine, warehouse_engine, workers)
+
+    # Creating the tables added to the ORM classes since the first copy
+    WAREHOUSE_METADATA.create_all(warehouse_engine)
+
+    with warehouse_engine.connect() as connection:
+        previous = dict(connection.execute(select(SYNC_TABLE.c.TableName, SYNC_TABLE.c.Watermark)).all())
+
+    watermarks = _read_watermarks(source_engine, MIRRORED_TABLES)
+    counts = OrderedDict()
+    deleted = 0
+
+    with warehouse_engine.begin() as connection:
+        for table in MIRRORED_TABLES:
+            if table.name in RECOPIED_TABLES:
+                connection.execute(table.delete())
+                rows = _read_rows(source_engine, table)
+            elif previous.get(table.name) is None:
+                rows = _read_rows(source_engine, table)
+            else:
+                rows = _read_rows(source_engine, table, watermark=previous[table.name] - overlap)
+
+            if rows:
+                connection.execute(table.insert().prefix_with("OR REPLACE"), rows)
+
+            # The keys are read after the rows, so a row deleted after being read is deleted from the warehouse too
+            if reconcile and table.name not in RECOPIED_TABLES:
+                deleted += _delete_missing_rows(source_engine, connection, table)
+
+            counts[table.name] = len(rows)
+
+        _write_watermarks(connection, watermarks)
+
+    LOGGER.info("Synced %s rows of %s tables into the warehouse%s", sum(counts.values()), len(counts),
+                ", deleting %s rows deleted in the source" % deleted if reconcile else "")
+    return counts
+
+
+def get_report_session_factory(engine, warehouse=None):
+    """
+    Function to create the session factory the reports run with, on the warehouse file if given, on the database of
+    the engine otherwise
+
+    :param engine: The engine of the production database
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :param warehouse: The path of the warehouse file, None for production
+    :type warehouse: str
+
+    :return: sessionmaker
+    :rtype: :class:`sqlalchemy.orm.sessionmaker`
+    """
+    if warehouse is None:
+        return get_session_factory(engine)
+
+    if not issubclass(type(warehouse), str) or not os.path.isfile(warehouse):
+        raise AttributeError("warehouse should be the path of a synced warehouse file")
+
+    LOGGER.info("Running the reports on the warehouse %s", warehouse)
+    return get_session_factory(create_warehouse_engine(warehouse))
@@ -6,4 +6,6 @@ This is an initialization module for helper utilities
 """
 
 # Importing necessary modules and functions to be used by modules using this package
-from mservice.create_operation.create_records import perform_create
+from mservice.create_operation.create_records import perform_create, perform_bulk_create, create_bulk_records
+from mservice.create_operation.id_allocator import BlockIdAllocator
+from mservice.create_operation.purchase_buffer import PurchaseBuffer, PurchaseBufferMetrics
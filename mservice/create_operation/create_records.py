@@ -15,26 +15,61 @@ This script contains the following function
     * create_new_invoiceline - function to create a new invoiceline record in the invoiceline table, with previously
                                created track and invoice
     * perform_create - function to invokes all the above function
+    * create_bulk_records - function to create a genre with its tracks, an invoice and its invoicelines, using ids
+                            allocated client side, with a single executemany per table
+    * perform_bulk_create - function to invoke create_bulk_records with a new block id allocator
+
+Every create_new_* function accepts an optional block id allocator, the primary key being assigned client side rather
+than read back from auto increment with a flush. When none is given a single id is reserved, as every writer of these
+tables must take its ids from an allocator. Deadlocks and lock wait timeouts are retried by replaying the whole function
 """
 # Standard Imports
+import datetime
 import logging
 
 # External imports
 import sqlalchemy.orm
+from sqlalchemy.orm import sessionmaker
 
 # User Imports
 import mservice.database_model as models
+from mservice.connections.retry import retry_transaction
+from mservice.create_operation.id_allocator import BlockIdAllocator
 
 LOGGER = logging.getLogger(__name__)
 
 
-def create_new_genre(session):
+def _get_allocator(session, allocator):
+    """
+    Function to get the allocator a create function takes its ids from, a new one reserving the ids it is asked for
+    on the bind of the session when none is given
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param allocator: The allocator given to the create function, None if not given
+    :type allocator: :class:`mservice.create_operation.id_allocator.BlockIdAllocator`
+
+    :return: allocator
+    :rtype: :class:`mservice.create_operation.id_allocator.BlockIdAllocator`
+    """
+    if allocator is not None:
+        return allocator
+
+    return BlockIdAllocator(sessionmaker(bind=session.get_bind()), block_size=1)
+
+
+@retry_transaction()
+def create_new_genre(session, allocator=None):
     """
     Function to create a new genre record in the genre table
 
     :param session: The session to work with
     :type session: :class:`sqlalchemy.orm.session.Session`
 
+    :param allocator: The allocator to take the genre id from, a single use one if not given
+    :type allocator: :class:`mservice.create_operation.id_allocator.BlockIdAllocator`
+
     :return: genre_id
     :rtype: int
     """
@@ -46,15 +81,17 @@ def create_new_genre(session):
 
     new_genre = models.GenreTable(name="NEW_GENRE")
 
+    new_genre.genre_id = _get_allocator(session, allocator).next_id(models.GenreTable)
     session.add(new_genre)
-    session.flush()
+
     genre_id = new_genre.genre_id
     session.commit()
     session.close()
     return genre_id
 
 
-def create_new_track(session, genre_id):
+@retry_transaction()
+def create_new_track(session, genre_id, allocator=None):
     """
     Function to create a new track record in the track table, with the previously created genre
 
@@ -64,6 +101,9 @@ def create_new_track(session, genre_id):
     :param genre_id: The genre Id to which the track has to associated with
     :type genre_id: int
 
+    :param allocator: The allocator to take the track id from, a single use one if not given
+    :type allocator: :class:`mservice.create_operation.id_allocator.BlockIdAllocator`
+
     :return: track_id
     :rtype: int
     """
@@ -79,21 +119,26 @@ def create_new_track(session, genre_id):
                                    genre_id=genre_id, composer="Angus Young, Malcolm Young, Brian Johnson",
                                    milliseconds=343719, bytes=11170334, unit_price=99)
 
+    new_track.track_id = _get_allocator(session, allocator).next_id(models.TracksTable)
     session.add(new_track)
-    session.flush()
+
     track_id = new_track.track_id
     session.commit()
     session.close()
     return track_id
 
 
-def create_new_invoice(session):
+@retry_transaction()
+def create_new_invoice(session, allocator=None):
     """
     Function to create a new invoice record in the invoice table
 
     :param session: The session to work with
     :type session: :class:`sqlalchemy.orm.session.Session`
 
+    :param allocator: The allocator to take the invoice id from, a single use one if not given
+    :type allocator: :class:`mservice.create_operation.id_allocator.BlockIdAllocator`
+
     :return: invoice_id
     :rtype: int
     """
@@ -104,15 +149,17 @@ def create_new_invoice(session):
 
     new_invoice = models.InvoiceTable(invoice_date="2020-10-22", total=1.98, customer_id=1)
 
+    new_invoice.invoice_id = _get_allocator(session, allocator).next_id(models.InvoiceTable)
     session.add(new_invoice)
-    session.flush()
+
     invoice_id = new_invoice.invoice_id
     session.commit()
     session.close()
     return invoice_id
 
 
-def create_new_invoiceline(session, track_id, invoice_id):
+@retry_transaction()
+def create_new_invoiceline(session, track_id, invoice_id, allocator=None):
     """
     Function to create a new invoiceline record in the invoiceline table, with previously created track and invoice
 
@@ -125,6 +172,9 @@ def create_new_invoiceline(session, track_id, invoice_id):
     :param invoice_id: The invoice id previously craeted, that needs to be referenced in the invoiceline
     :type invoice_id: int
 
+    :param allocator: The allocator to take the invoiceline ids from, a single use one if not given
+    :type allocator: :class:`mservice.create_operation.id_allocator.BlockIdAllocator`
+
     :return: new_invoiceline_1_id, new_invoiceline_2_id - The id of newly created invoicelines
     :rtype: int
     """
@@ -142,8 +192,11 @@ def create_new_invoiceline(session, track_id, invoice_id):
     new_invoiceline_1 = models.InvoiceLineTable(unit_price=0.99, quantity=1, invoice_id=invoice_id, track_id=track_id)
     new_invoiceline_2 = models.InvoiceLineTable(unit_price=0.99, quantity=1, invoice_id=invoice_id, track_id=2)
 
+    new_invoiceline_1.invoice_line_id, new_invoiceline_2.invoice_line_id = \
+        _get_allocator(session, allocator).reserve(models.InvoiceLineTable, 2)
+
     session.add_all([new_invoiceline_1, new_invoiceline_2])
-    session.flush()
+
     new_invoiceline_2_id = new_invoiceline_2.invoice_line_id
     new_invoiceline_1_id = new_invoiceline_1.invoice_line_id
     session.commit()
@@ -206,3 +259,102 @@ def perform_create(session_factory):
         print("\n\n")
     except AttributeError as err:
         LOGGER.error(err)
+
+
+@retry_transaction()
+def create_bulk_records(session, allocator, number_of_tracks):
+    """
+    Function to create a new genre with the given number of tracks, and a new invoice purchasing every one of those
+    tracks. All the ids are allocated client side, so the whole graph goes out as a single executemany per table
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param allocator: The allocator to take the ids from
+    :type allocator: :class:`mservice.create_operation.id_allocator.BlockIdAllocator`
+
+    :param number_of_tracks: The number of tracks to be created
+    :type number_of_tracks: int
+
+    :return: genre_id, track_ids, invoice_id, invoice_line_ids - The ids of the newly created records
+    :rtype: tuple
+    """
+    if not issubclass(type(session), sqlalchemy.orm.session.Session):
+        raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+    if not issubclass(type(allocator), BlockIdAllocator):
+        raise AttributeError("allocator not passed correctly, should be of type 'BlockIdAllocator' ")
+
+    if not issubclass(type(number_of_tracks), int) or number_of_tracks < 1:
+        raise AttributeError("number of tracks should be integer and greater than 0")
+
+    LOGGER.info("Creating New Genre With %s Tracks And Their Invoice", number_of_tracks)
+
+    genre_id = allocator.next_id(models.GenreTable)
+    track_ids = allocator.reserve(models.TracksTable, number_of_tracks)
+    invoice_id = allocator.next_id(models.InvoiceTable)
+    invoice_line_ids = allocator.reserve(models.InvoiceLineTable, number_of_tracks)
+
+    genres = [dict(genre_id=genre_id, name="NEW_GENRE")]
+
+    tracks = [dict(track_id=track_id, name="For Those About To Rock (We Salute You)", album_id=1, media_type_id=1,
+                   genre_id=genre_id, composer="Angus Young, Malcolm Young, Brian Johnson", milliseconds=343719,
+                   bytes=11170334, unit_price=0.99) for track_id in track_ids]
+
+    invoices = [dict(invoice_id=invoice_id, invoice_date=datetime.datetime(2020, 10, 22),
+                     total=round(0.99 * number_of_tracks, 2), customer_id=1)]
+
+    invoice_lines = [dict(invoice_line_id=invoice_line_id, unit_price=0.99, quantity=1, invoice_id=invoice_id,
+                          track_id=track_id) for invoice_line_id, track_id in zip(invoice_line_ids, track_ids)]
+
+    # Parents go out before their children, one executemany per table
+    session.bulk_insert_mappings(models.GenreTable, genres)
+    session.bulk_insert_mappings(models.TracksTable, tracks)
+    session.bulk_insert_mappings(models.InvoiceTable, invoices)
+    session.bulk_insert_mappings(models.InvoiceLineTable, invoice_lines)
+    session.commit()
+    session.close()
+    return genre_id, track_ids, invoice_id, invoice_line_ids
+
+
+def perform_bulk_create(session_factory, number_of_tracks, block_size=1000):
+    """
+    Function to create a new genre, its tracks, an invoice and its invoicelines in bulk with client side ids
+
+    :param session_factory: The session factory used to create new session to be passed to other functions
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param number_of_tracks: The number of tracks to be created
+    :type number_of_tracks: int
+
+    :param block_size: The number of ids reserved by the allocator with every round trip
+    :type block_size: int
+
+    :return: Nothing
+    :rtype: None
+    """
+    try:
+
+        if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+            raise AttributeError("Session Maker not passed properly, correct type "
+                                 "'sqlalchemy.orm.session.sessionmaker' ")
+
+        allocator = BlockIdAllocator(session_factory, block_size)
+
+        session = session_factory()
+        genre_id, track_ids, invoice_id, invoice_line_ids = create_bulk_records(session, allocator, number_of_tracks)
+
+        print("\n\n")
+        print("====" * 50)
+        print("\n\n")
+
+        LOGGER.info("The ID of new Genre: %s", genre_id)
+        LOGGER.info("The IDs of new Tracks: %s to %s", track_ids[0], track_ids[-1])
+        LOGGER.info("The ID of new Invoice: %s", invoice_id)
+        LOGGER.info("The IDs of new Invoicelines: %s to %s", invoice_line_ids[0], invoice_line_ids[-1])
+
+        print("\n\n")
+        print("====" * 50)
+        print("\n\n")
+    except AttributeError as err:
+        LOGGER.error(err)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Module for Block Based Primary Key Allocation
+==================================================
+
+Module for handing out primary keys client side, from blocks of ids reserved in the idblock table. Reserving a block
+takes one short transaction, after which every id of the block is assigned without talking to the database, so new
+parent rows no longer need a flush to learn their id before the dependent rows can be built
+
+The auto increment counter of the database knows nothing of the blocks, so a row inserted without an id could take one
+of a block reserved by another writer. Every writer of the tables served by the allocator must therefore take its ids
+from an allocator, the create functions of this package reserving a single id when they are not given one
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * threading - to guard the reserved blocks when the allocator is shared between threads
+
+This script contains the following class
+    * BlockIdAllocator - class to reserve blocks of ids and to assign them client side
+"""
+# Standard Imports
+import logging
+import threading
+
+# External imports
+import sqlalchemy.orm
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+# User Imports
+import mservice.database_model as models
+
+LOGGER = logging.getLogger(__name__)
+
+
+class BlockIdAllocator:
+    """
+    Class to reserve blocks of primary keys in the idblock table and assign them client side
+
+    The start of every new block is never lower than the current maximum primary key of the table, so rows created
+    through auto increment before the allocator was introduced are never collided with. The rows created later must
+    take their ids from an allocator
+
+    :ivar session_factory: The session factory used to create the sessions that reserve new blocks
+    :vartype session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :ivar block_size: The number of ids reserved with every round trip to the database
+    :vartype block_size: int
+
+    """
+
+    def __init__(self, session_factory, block_size=100):
+        """
+        Constructor of the allocator
+
+        :param session_factory: The session factory used to create the sessions that reserve new blocks
+        :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+        :param block_size: The number of ids reserved with every round trip to the database
+        :type block_size: int
+        """
+        if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+            raise AttributeError("Session Maker not passed properly, correct type "
+                                 "'sqlalchemy.orm.session.sessionmaker' ")
+
+        if not issubclass(type(block_size), int) or block_size < 1:
+            raise AttributeError("block size should be integer and greater than 0")
+
+        self.session_factory = session_factory
+        self.block_size = block_size
+
+        # Table name -> [next free id, end of the block (exclusive)]
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def next_id(self, model):
+        """
+        Function to get the next free primary key for the given ORM class
+
+        :param model: The ORM class the id is allocated for
+        :type model: :class:`sqlalchemy.ext.declarative.api.DeclarativeMeta`
+
+        :return: id
+        :rtype: int
+        """
+        return self.reserve(model, 1)[0]
+
+    def reserve(self, model, count):
+        """
+        Function to get the given number of free primary keys for the given ORM class, a new block is reserved only
+        when the current one is used up
+
+        :param model: The ORM class the ids are allocated for
+        :type model: :class:`sqlalchemy.ext.declarative.api.DeclarativeMeta`
+
+        :param count: The number of ids needed
+        :type count: int
+
+        :return: ids - The allocated ids, in ascending order
+        :rtype: list
+        """
+        if not issubclass(type(count), int) or count < 1:
+            raise AttributeError("count should be integer and greater than 0")
+
+        table_name = model.__tablename__
+        ids = []
+
+        with self._lock:
+            while len(ids) < count:
+                block = self._blocks.get(table_name)
+
+                if block is None or block[0] >= block[1]:
+                    start, end = self._reserve_block(model, max(self.block_size, count - len(ids)))
+                    block = self._blocks[table_name] = [start, end]
+
+                taken = min(block[1] - block[0], count - len(ids))
+                ids.extend(range(block[0], block[0] + taken))
+                block[0] += taken
+
+        return ids
+
+    def _reserve_block(self, model, size):
+        """
+        Function to reserve a new block of ids for the given ORM class in the idblock table
+
+        :param model: The ORM class the block is reserved for
+        :type model: :class:`sqlalchemy.ext.declarative.api.DeclarativeMeta`
+
+        :param size: The number of ids in the block
+        :type size: int
+
+        :return: start, end - The first id of the block and the id following the last one
+        :rtype: tuple
+        """
+        table_name = model.__tablename__
+        primary_key = model.__mapper__.primary_key[0]
+
+        while True:
+            session = self.session_factory()
+            try:
+                block = session.query(models.IdBlockTable).filter(models.IdBlockTable.table_name == table_name).\
+                    with_for_update().one_or_none()
+
+                max_id = session.query(func.max(primary_key)).scalar() or 0
+
+                if block is None:
+                    block = models.IdBlockTable(table_name=table_name, next_id=max_id + 1)
+                    session.add(block)
+
+                start = max(block.next_id, max_id + 1)
+                block.next_id = start + size
+                session.commit()
+
+                LOGGER.debug("Reserved ids %s to %s for %s", start, start + size - 1, table_name)
+                return start, start + size
+            except IntegrityError:
+                # Another allocator created the row for this table first, its block is read on the next attempt
+                session.rollback()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
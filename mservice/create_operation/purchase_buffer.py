@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+"""
+Module for Group Committing Purchases
+==========================================
+
+Module for a write behind buffer in front of the invoice creation path. Purchases submitted from many threads or
+coroutines are queued, and a background thread flushes them as one multi row insert per table and a single commit,
+either when the batch is full or when the oldest queued purchase has waited long enough. Every caller gets back a
+future that resolves with the invoice id assigned to its purchase once the group commit succeeded. When a group commit
+fails, its purchases are committed again one by one, so only the futures of the purchases which fail alone get the
+error
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * threading, queue - to run the flusher and to bound the number of queued purchases
+    * concurrent.futures - to hand the assigned invoice id back to the callers
+    * asyncio - to let coroutines wait on their purchase without blocking the event loop
+
+This script contains the following classes
+    * PurchaseBufferMetrics - class to keep the metrics on batch sizes and flush latency
+    * PurchaseBuffer - class to queue purchases and group commit them
+"""
+# Standard Imports
+import asyncio
+import datetime
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from decimal import Decimal
+
+# External imports
+import sqlalchemy.orm
+
+# User Imports
+import mservice.database_model as models
+from mservice.connections.retry import run_in_transaction
+from mservice.create_operation.id_allocator import BlockIdAllocator
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PurchaseBufferMetrics:
+    """
+    Class to keep the metrics of a purchase buffer, updated by the flusher thread
+
+    :ivar flushed_batches: Number of batches committed
+    :vartype flushed_batches: int
+
+    :ivar flushed_purchases: Number of purchases committed
+    :vartype flushed_purchases: int
+
+    :ivar failed_batches: Number of batches whose commit failed
+    :vartype failed_batches: int
+
+    :ivar largest_batch: Size of the largest batch flushed
+    :vartype largest_batch: int
+
+    :ivar batch_size_histogram: Number of batches per size bucket, the bucket is the smallest power of two not below
+                                the batch size
+    :vartype batch_size_histogram: dict
+
+    :ivar total_flush_seconds: Time spent in all the flushes
+    :vartype total_flush_seconds: float
+
+    :ivar last_flush_seconds: Time spent in the latest flush
+    :vartype last_flush_seconds: float
+
+    :ivar max_flush_seconds: Time spent in the slowest flush
+    :vartype max_flush_seconds: float
+
+    """
+
+    def __init__(self):
+        """
+        Constructor of the metrics, all counters start at zero
+        """
+        self.flushed_batches = 0
+        self.flushed_purchases = 0
+        self.failed_batches = 0
+        self.largest_batch = 0
+        self.batch_size_histogram = {}
+        self.total_flush_seconds = 0.0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_flush(self, batch_size, seconds, succeeded):
+        """
+        Function to record a finished flush
+
+        :param batch_size: Number of purchases in the batch
+        :type batch_size: int
+
+        :param seconds: Time the flush took
+        :type seconds: float
+
+        :param succeeded: Whether the batch was committed
+        :type succeeded: bool
+
+        :return: Nothing
+        :rtype: None
+        """
+        bucket = 1
+        while bucket < batch_size:
+            bucket *= 2
+
+        with self._lock:
+            if succeeded:
+                self.flushed_batches += 1
+                self.flushed_purchases += batch_size
+            else:
+                self.failed_batches += 1
+
+            self.largest_batch = max(self.largest_batch, batch_size)
+            self.batch_size_histogram[bucket] = self.batch_size_histogram.get(bucket, 0) + 1
+            self.total_flush_seconds += seconds
+            self.last_flush_seconds = seconds
+            self.max_flush_seconds = max(self.max_flush_seconds, seconds)
+
+    def as_dict(self):
+        """
+        Function to get a consistent copy of the metrics, along with the average batch size and flush latency
+
+        :return: metrics
+        :rtype: dict
+        """
+        with self._lock:
+            flushes = self.flushed_batches + self.failed_batches
+            return {
+                "flushed_batches": self.flushed_batches,
+                "flushed_purchases": self.flushed_purchases,
+                "failed_batches": self.failed_batches,
+                "largest_batch": self.largest_batch,
+                "average_batch_size": self.flushed_purchases / self.flushed_batches if self.flushed_batches else 0.0,
+                "batch_size_histogram": dict(self.batch_size_histogram),
+                "average_flush_seconds": self.total_flush_seconds / flushes if flushes else 0.0,
+                "last_flush_seconds": self.last_flush_seconds,
+                "max_flush_seconds": self.max_flush_seconds,
+            }
+
+
+class PurchaseBuffer:
+    """
+    Class to queue purchases from many threads or coroutines and group commit them from a background thread
+
+    The queue is bounded, once max_queue_depth purchases are waiting a submit blocks until the flusher catches up, or
+    raises :class:`queue.Full` when its timeout runs out. A submit queues its purchase under the same lock close takes,
+    so every purchase accepted is queued before the buffer is closed, and flushed by the flusher before it stops
+
+    :ivar session_factory: The session factory used to create the session of every flush
+    :vartype session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :ivar allocator: The allocator the invoice and invoiceline ids are taken from
+    :vartype allocator: :class:`mservice.create_operation.id_allocator.BlockIdAllocator`
+
+    :ivar max_batch_size: Number of purchases which triggers a flush
+    :vartype max_batch_size: int
+
+    :ivar max_delay: Seconds the oldest purchase of a batch may wait before the batch is flushed
+    :vartype max_delay: float
+
+    :ivar metrics: The metrics on batch sizes and flush latency
+    :vartype metrics: :class:`mservice.create_operation.purchase_buffer.PurchaseBufferMetrics`
+
+    """
+
+    def __init__(self, session_factory, allocator=None, max_batch_size=100, max_delay=0.05, max_queue_depth=1000):
+        """
+        Constructor of the buffer, the flusher thread is started right away
+
+        :param session_factory: The session factory used to create the session of every flush
+        :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+        :param allocator: The allocator the ids are taken from, a new one is created if not given
+        :type allocator: :class:`mservice.create_operation.id_allocator.BlockIdAllocator`
+
+        :param max_batch_size: Number of purchases which triggers a flush
+        :type max_batch_size: int
+
+        :param max_delay: Seconds the oldest purchase of a batch may wait before the batch is flushed
+        :type max_delay: float
+
+        :param max_queue_depth: Number of purchases which may wait in the queue before submit blocks
+        :type max_queue_depth: int
+        """
+        if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+            raise AttributeError("Session Maker not passed properly, correct type "
+                                 "'sqlalchemy.orm.session.sessionmaker' ")
+
+        if not issubclass(type(max_batch_size), int) or max_batch_size < 1:
+            raise AttributeError("max batch size should be integer and greater than 0")
+
+        if not issubclass(type(max_queue_depth), int) or max_queue_depth < max_batch_size:
+            raise AttributeError("max queue depth should be integer and not lower than the max batch size")
+
+        if not issubclass(type(max_delay), (int, float)) or max_delay <= 0:
+            raise AttributeError("max delay should be a number greater than 0")
+
+        self.session_factory = session_factory
+        self.allocator = allocator if allocator is not None else BlockIdAllocator(session_factory,
+                                                                                  block_size=max_batch_size * 4)
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.metrics = PurchaseBufferMetrics()
+
+        self._queue = queue.Queue(maxsize=max_queue_depth)
+        self._closed = threading.Event()
+        self._submit_lock = threading.Lock()
+        self._flusher = threading.Thread(target=self._run, name="purchase-buffer-flusher", daemon=True)
+        self._flusher.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, customer_id, lines, invoice_date=None, billing=None, timeout=None):
+        """
+        Function to queue a purchase, blocks while the queue is full
+
+        :param customer_id: The customer making the purchase
+        :type customer_id: int
+
+        :param lines: The purchased tracks, as (track_id, unit_price, quantity) tuples
+        :type lines: list
+
+        :param invoice_date: The date of the invoice, now if not given
+        :type invoice_date: :class:`datetime.datetime`
+
+        :param billing: The billing_* attributes of the invoice, keyed by attribute name
+        :type billing: dict
+
+        :param timeout: Seconds to wait for room in the queue, waits forever if not given
+        :type timeout: float
+
+        :return: future - Resolves with the invoice id once the purchase is committed
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        if not issubclass(type(customer_id), int):
+            raise AttributeError("Customer Id is not of type Int")
+
+        if not lines:
+            raise AttributeError("A purchase should have at least one line")
+
+        purchase = {
+            "customer_id": customer_id,
+            "invoice_date": invoice_date if invoice_date is not None else datetime.datetime.now(),
+            "lines": [(track_id, Decimal(str(unit_price)), quantity) for track_id, unit_price, quantity in lines],
+            "billing": dict(billing or {}),
+        }
+
+        future = Future()
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        if not self._submit_lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise queue.Full
+
+        # The buffer cannot be closed between the check and the put, which would leave the purchase unflushed
+        try:
+            if self._closed.is_set():
+                raise RuntimeError("Purchase buffer is closed")
+
+            self._queue.put((purchase, future), timeout=None if deadline is None else
+                            max(deadline - time.monotonic(), 0))
+        finally:
+            self._submit_lock.release()
+
+        return future
+
+    async def submit_async(self, customer_id, lines, invoice_date=None, billing=None):
+        """
+        Function to queue a purchase from a coroutine and wait for its invoice id, backpressure is applied in an
+        executor thread so the event loop is never blocked
+
+        :param customer_id: The customer making the purchase
+        :type customer_id: int
+
+        :param lines: The purchased tracks, as (track_id, unit_price, quantity) tuples
+        :type lines: list
+
+        :param invoice_date: The date of the invoice, now if not given
+        :type invoice_date: :class:`datetime.datetime`
+
+        :param billing: The billing_* attributes of the invoice, keyed by attribute name
+        :type billing: dict
+
+        :return: invoice_id
+        :rtype: int
+        """
+        loop = asyncio.get_running_loop()
+        future = await loop.run_in_executor(None, self.submit, customer_id, lines, invoice_date, billing)
+        return await asyncio.wrap_future(future)
+
+    def close(self, timeout=None):
+        """
+        Function to stop accepting purchases, flush everything still queued and stop the flusher thread
+
+        :param timeout: Seconds to wait for the flusher thread, waits forever if not given
+        :type timeout: float
+
+        :return: Nothing
+        :rtype: None
+        """
+        # Waiting for the submits already putting their purchase, the flusher drains the queue before it stops
+        with self._submit_lock:
+            self._closed.set()
+
+        self._flusher.join(timeout)
+
+    def _run(self):
+        """
+        Function run by the flusher thread, collects a batch until it is full or its oldest purchase has waited
+        max_delay seconds, and flushes it
+
+        :return: Nothing
+        :rtype: None
+        """
+        while not (self._closed.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.max_delay)]
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._flush(batch)
+
+    def _write(self, invoices, invoice_lines):
+        """
+        Function to write invoices and their lines with one multi row insert per table and a single commit, replayed
+        on a deadlock or lock wait timeout
+
+        :param invoices: The rows of the invoices
+        :type invoices: list
+
+        :param invoice_lines: The rows of their lines
+        :type invoice_lines: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        def write_batch(session):
+            session.bulk_insert_mappings(models.InvoiceTable, invoices)
+            session.bulk_insert_mappings(models.InvoiceLineTable, invoice_lines)
+
+        # The ids are allocated once, a replayed batch after a deadlock reuses them
+        run_in_transaction(self.session_factory, write_batch)
+
+    def _flush(self, batch):
+        """
+        Function to write a batch of purchases with one multi row insert per table and a single commit, and to resolve
+        the futures of the batch. When the batch fails, its purchases are written one by one, so a purchase which
+        cannot be written fails alone
+
+        :param batch: The queued (purchase, future) pairs
+        :type batch: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        started = time.perf_counter()
+        # Purchases whose future was cancelled while queued are dropped
+        batch = [(purchase, future) for purchase, future in batch if future.set_running_or_notify_cancel()]
+        purchases = [purchase for purchase, _ in batch]
+        futures = [future for _, future in batch]
+
+        if not purchases:
+            return
+
+        try:
+            invoice_ids = self.allocator.reserve(models.InvoiceTable, len(purchases))
+            invoice_line_ids = iter(self.allocator.reserve(models.InvoiceLineTable,
+                                                           sum(len(purchase["lines"]) for purchase in purchases)))
+        except Exception as err:
+            LOGGER.error("Reserving the ids of %s purchases failed: %s", len(purchases), err)
+            self.metrics.record_flush(len(purchases), time.perf_counter() - started, succeeded=False)
+            for future in futures:
+                future.set_exception(err)
+            return
+
+        # The invoice of every purchase along with its lines, a purchase whose rows cannot be built failing alone
+        rows = []
+        valid_futures = []
+        for invoice_id, purchase, future in zip(invoice_ids, purchases, futures):
+            line_ids = [next(invoice_line_ids) for _ in purchase["lines"]]
+
+            try:
+                invoice = dict(purchase["billing"], invoice_id=invoice_id, customer_id=purchase["customer_id"],
+                               invoice_date=purchase["invoice_date"],
+                               total=sum(unit_price * quantity for _, unit_price, quantity in purchase["lines"]))
+
+                lines = [dict(invoice_line_id=invoice_line_id, invoice_id=invoice_id, track_id=track_id,
+                              unit_price=unit_price, quantity=quantity)
+                         for invoice_line_id, (track_id, unit_price, quantity) in zip(line_ids, purchase["lines"])]
+            except Exception as err:
+                LOGGER.error("The purchase of invoice %s is invalid: %s", invoice_id, err)
+                self.metrics.record_flush(1, 0.0, succeeded=False)
+                future.set_exception(err)
+                continue
+
+            rows.append((invoice, lines))
+            valid_futures.append(future)
+
+        futures = valid_futures
+
+        if not rows:
+            return
+
+        try:
+            self._write([invoice for invoice, _ in rows], [line for _, lines in rows for line in lines])
+        except Exception as err:
+            LOGGER.error("Group commit of %s purchases failed: %s", len(rows), err)
+            self.metrics.record_flush(len(rows), time.perf_counter() - started, succeeded=False)
+
+            if len(rows) == 1:
+                futures[0].set_exception(err)
+                return
+
+            # Writing the purchases one by one, with the ids they were given, so only the failing ones fail
+            for (invoice, lines), future in zip(rows, futures):
+                started = time.perf_counter()
+                try:
+                    self._write([invoice], lines)
+                except Exception as purchase_err:
+                    LOGGER.error("Commit of the purchase of invoice %s failed: %s", invoice["invoice_id"],
+                                 purchase_err)
+                    self.metrics.record_flush(1, time.perf_counter() - started, succeeded=False)
+                    future.set_exception(purchase_err)
+                else:
+                    self.metrics.record_flush(1, time.perf_counter() - started, succeeded=True)
+                    future.set_result(invoice["invoice_id"])
+            return
+
+        self.metrics.record_flush(len(rows), time.perf_counter() - started, succeeded=True)
+        for (invoice, _), future in zip(rows, futures):
+            future.set_result(invoice["invoice_id"])
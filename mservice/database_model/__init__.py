@@ -8,4 +8,9 @@ This is an initialization module for database models
 
 # Importing necessary modules and functions to be used by modules using this package
 from mservice.database_model.orm_classes import GenreTable, MediaTypeTable, ArtistTable, AlbumTable,\
-    TracksTable, EmployeeTable, CustomerTable, InvoiceTable, InvoiceLineTable, PlaylistTable, PlaylistTrackTable
+    TracksTable, EmployeeTable, CustomerTable, InvoiceTable, InvoiceLineTable, PlaylistTable, PlaylistTrackTable, \
+    IdBlockTable, VersionedMixin, EmployeeClosureTable, InvoiceFactTable
+from mservice.database_model.employee_closure import rebuild_employee_closure
+from mservice.database_model.invoice_fact import refresh_invoice_fact
+from mservice.database_model.schema_upgrade import find_missing_columns, find_missing_indexes, upgrade_schema
+from mservice.database_model.insert_watermark import WATERMARK_OVERLAP, InsertWatermark
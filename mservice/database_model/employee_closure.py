@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Employee Closure Table Maintenance
+======================================
+
+Module keeping the employeeclosure table in step with the reporting hierarchy of the employee table. The ORM inserts,
+updates and deletes of employees write the closure rows in the same transaction, from mapper events:
+
+    * an inserted employee gets its own row at depth 0, and one row per ancestor of its manager, one level deeper
+    * an employee whose manager changes takes its whole subtree along: the rows linking the subtree to the ancestors
+      of the old manager are deleted, and the subtree is linked to the ancestors of the new manager
+    * a deleted employee loses every row it is part of, its reports having been moved by the update of their manager
+
+Employees written with bulk inserts or Core statements are not seen, and rebuild_employee_closure writes the table
+again from the reporting hierarchy, as needed once for existing data
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following
+    * rebuild_employee_closure - Function to write the closure table again from the employee table
+"""
+# Standard Imports
+import logging
+
+# External imports
+import sqlalchemy.orm
+from sqlalchemy import delete, event, inspect, insert, select
+
+# User Imports
+from mservice.database_model.orm_classes import EmployeeClosureTable, EmployeeTable
+
+LOGGER = logging.getLogger(__name__)
+
+CLOSURE_TABLE = EmployeeClosureTable.__table__
+
+
+def _link_subtree(connection, manager_id, subtree):
+    """
+    Function to link a subtree of employees to their new manager and every ancestor of that manager
+
+    :param connection: The connection of the flush
+    :type connection: :class:`sqlalchemy.engine.Connection`
+
+    :param manager_id: The id of the new manager, None for an employee reporting to nobody
+    :type manager_id: int
+
+    :param subtree: (descendant id, depth below the root of the subtree) pairs, the root being at depth 0
+    :type subtree: list
+
+    :return: Nothing
+    :rtype: None
+    """
+    if manager_id is None:
+        return
+
+    ancestors = connection.execute(select(EmployeeClosureTable.ancestor_id, EmployeeClosureTable.depth).
+                                   where(EmployeeClosureTable.descendant_id == manager_id)).all()
+
+    if any(ancestor_id == descendant_id for ancestor_id, _ in ancestors for descendant_id, _ in subtree):
+        raise AttributeError("employee %s can not report to one of their own reports" % subtree[0][0])
+
+    rows = [{"AncestorId": ancestor_id, "DescendantId": descendant_id, "Depth": depth + subtree_depth + 1}
+            for ancestor_id, depth in ancestors for descendant_id, subtree_depth in subtree]
+
+    if rows:
+        connection.execute(insert(CLOSURE_TABLE), rows)
+
+
+@event.listens_for(EmployeeTable, "after_insert")
+def _insert_closure(mapper, connection, target):
+    """
+    Function listening to the inserts of employees, adding their own row and the rows of their ancestors
+
+    :param mapper: The mapper of the employee table
+    :type mapper: :class:`sqlalchemy.orm.Mapper`
+
+    :param connection: The connection of the flush
+    :type connection: :class:`sqlalchemy.engine.Connection`
+
+    :param target: The employee
+    :type target: :class:`mservice.database_model.orm_classes.EmployeeTable`
+
+    :return: Nothing
+    :rtype: None
+    """
+    connection.execute(insert(CLOSURE_TABLE),
+                       [{"AncestorId": target.employee_id, "DescendantId": target.employee_id, "Depth": 0}])
+    _link_subtree(connection, target.reports_to, [(target.employee_id, 0)])
+
+
+@event.listens_for(EmployeeTable, "after_update")
+def _move_closure(mapper, connection, target):
+    """
+    Function listening to the updates of employees, moving the subtree of an employee whose manager changed
+
+    :param mapper: The mapper of the employee table
+    :type mapper: :class:`sqlalchemy.orm.Mapper`
+
+    :param connection: The connection of the flush
+    :type connection: :class:`sqlalchemy.engine.Connection`
+
+    :param target: The employee
+    :type target: :class:`mservice.database_model.orm_classes.EmployeeTable`
+
+    :return: Nothing
+    :rtype: None
+    """
+    if not inspect(target).attrs.reports_to.history.has_changes():
+        return
+
+    subtree = connection.execute(select(EmployeeClosureTable.descendant_id, EmployeeClosureTable.depth).
+                                 where(EmployeeClosureTable.ancestor_id == target.employee_id)).all()
+    subtree_ids = [descendant_id for descendant_id, _ in subtree]
+
+    # The subtree is read first, as MySQL can not read the table a DELETE deletes from in a subquery
+    connection.execute(delete(CLOSURE_TABLE).where(EmployeeClosureTable.descendant_id.in_(subtree_ids),
+                                                   EmployeeClosureTable.ancestor_id.notin_(subtree_ids)))
+    _link_subtree(connection, target.reports_to, subtree)
+
+
+@event.listens_for(EmployeeTable, "after_delete")
+def _delete_closure(mapper, connection, target):
+    """
+    Function listening to the deletes of employees, deleting every row they are part of
+
+    :param mapper: The mapper of the employee table
+    :type mapper: :class:`sqlalchemy.orm.Mapper`
+
+    :param connection: The connection of the flush
+    :type connection: :class:`sqlalchemy.engine.Connection`
+
+    :param target: The employee
+    :type target: :class:`mservice.database_model.orm_classes.EmployeeTable`
+
+    :return: Nothing
+    :rtype: None
+    """
+    connection.execute(delete(CLOSURE_TABLE).where((EmployeeClosureTable.ancestor_id == target.employee_id) |
+                                                   (EmployeeClosureTable.descendant_id == target.employee_id)))
+
+
+def rebuild_employee_closure(session):
+    """
+    Function to write the closure table again from the reporting hierarchy of the employee table
+
+    :param session: The session to work with, committed by the caller
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :return: rows - The number of closure rows written
+    :rtype: int
+    """
+    if not issubclass(type(session), sqlalchemy.orm.session.Session):
+        raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+    managers = dict(session.execute(select(EmployeeTable.employee_id, EmployeeTable.reports_to)).all())
+    rows = []
+
+    # Walking up from every employee, a cycle in the data stopping the walk
+    for employee_id in managers:
+        ancestor_id, depth, seen = employee_id, 0, set()
+
+        while ancestor_id in managers and ancestor_id not in seen:
+            rows.append({"AncestorId": ancestor_id, "DescendantId": employee_id, "Depth": depth})
+            seen.add(ancestor_id)
+            ancestor_id, depth = managers.get(ancestor_id), depth + 1
+
+    session.execute(delete(CLOSURE_TABLE))
+
+    if rows:
+        session.execute(insert(CLOSURE_TABLE), rows)
+
+    LOGGER.info("Rebuilt the employee closure with %s rows for %s employees", len(rows), len(managers))
+    return len(rows)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Insert Watermark
+====================
+
+Module for resuming the consumption of a table from the rows inserted since the last rows consumed. The ids of the rows
+do not commit in their order, as a transaction, or a block of ids reserved by another process, commits ids below the
+highest one already consumed, so the rows are resumed from their created_on instead. The created_on of a row is set
+once by its INSERT and never changed, so a row is never read again for being updated
+
+The rows are read again from an overlap before the latest created_on consumed, for the transactions committing after
+rows with a later created_on, and the ids of the rows consumed inside the overlap are kept to skip them. A transaction
+committing longer than the overlap after its INSERT is missed
+
+The ids of the rows consumed without their created_on can not be pruned, so they are settled by the next full pass over
+the overlap: the rows it reads give them their created_on, and the ones it does not find, deleted since, are forgotten
+
+This script requires the following modules be installed in the python environment
+    * datetime - to hold the overlap
+    * numpy - to save the watermark with the consumer
+
+This script contains the following
+    * WATERMARK_OVERLAP - The default overlap of the watermarks
+    * InsertWatermark - class holding the latest created_on consumed and the ids consumed inside the overlap
+"""
+# Standard Imports
+import datetime
+
+# External imports
+import numpy as np
+
+# The overlap of the watermarks, for the transactions committing after rows with a later created_on
+WATERMARK_OVERLAP = datetime.timedelta(minutes=5)
+
+
+class InsertWatermark:
+    """
+    Class holding the latest created_on consumed from a table and the ids of the rows consumed inside the overlap
+
+    :ivar overlap: The overlap the rows are read again from
+    :vartype overlap: :class:`datetime.timedelta`
+
+    :ivar latest: The latest created_on consumed, None if none
+    :vartype latest: :class:`datetime.datetime`
+
+    :ivar recent: Id to created_on of the rows consumed inside the overlap, None for the rows whose created_on was not
+                  read yet, such as the rows fed from a flush of the session which inserted them
+    :vartype recent: dict
+    """
+
+    def __init__(self, overlap=WATERMARK_OVERLAP):
+        """
+        Constructor of the watermark of a table none of whose rows were consumed
+
+        :param overlap: The overlap the rows are read again from
+        :type overlap: :class:`datetime.timedelta`
+        """
+        if not issubclass(type(overlap), datetime.timedelta) or overlap < datetime.timedelta(0):
+            raise AttributeError("overlap should be a timedelta and not negative")
+
+        self.overlap = overlap
+        self.latest = None
+        self.recent = {}
+
+    @property
+    def lower_bound(self):
+        """
+        The created_on the rows should be read from, None for every row
+        """
+        return None if self.latest is None else self.latest - self.overlap
+
+    def consume(self, key, created_on=None):
+        """
+        Function to record the consumption of a row, unless it was consumed already
+
+        :param key: The id of the row
+        :type key: int
+
+        :param created_on: The created_on of the row, None if not known
+        :type created_on: :class:`datetime.datetime`
+
+        :return: True if the row was not consumed before
+        :rtype: bool
+        """
+        if key in self.recent:
+            if self.recent[key] is None:
+                self.recent[key] = created_on
+            return False
+
+        self.recent[key] = created_on
+
+        if created_on is not None and (self.latest is None or created_on > self.latest):
+            self.latest = created_on
+
+        return True
+
+    def prune(self):
+        """
+        Function to forget the ids of the rows created before the overlap, which are not read again
+
+        :return: Nothing
+        :rtype: None
+        """
+        lower_bound = self.lower_bound
+
+        if lower_bound is not None:
+            self.recent = {key: created_on for key, created_on in self.recent.items()
+                           if created_on is None or created_on >= lower_bound}
+
+    def unknown_keys(self):
+        """
+        Function to get the ids of the rows consumed whose created_on was not read yet
+
+        :return: keys
+        :rtype: set
+        """
+        return {key for key, created_on in self.recent.items() if created_on is None}
+
+    def settle(self, keys):
+        """
+        Function to forget the ids of rows consumed without their created_on which a full pass over the overlap, started
+        after their consumption, did not read, as their rows are not in the table anymore
+
+        :param keys: The ids from unknown_keys, taken before the pass started
+        :type keys: set
+
+        :return: Nothing
+        :rtype: None
+        """
+        for key in keys:
+            if key in self.recent and self.recent[key] is None:
+                del self.recent[key]
+
+    def to_arrays(self):
+        """
+        Function to get the watermark as arrays to be saved with numpy
+
+        :return: latest, keys, created_ons - The latest created_on, the recent ids and their created_on, NaT for None
+        :rtype: tuple
+        """
+        keys = np.array(list(self.recent), dtype=np.int64)
+        created_ons = np.array([np.datetime64("NaT") if created_on is None else np.datetime64(created_on, "us")
+                                for created_on in self.recent.values()], dtype="datetime64[us]")
+        latest = np.array(np.datetime64("NaT") if self.latest is None else np.datetime64(self.latest, "us"),
+                          dtype="datetime64[us]")
+        return latest, keys, created_ons
+
+    @classmethod
+    def from_arrays(cls, latest, keys, created_ons, overlap=WATERMARK_OVERLAP):
+        """
+        Function to restore a watermark from the arrays of to_arrays
+
+        :return: watermark
+        :rtype: :class:`mservice.database_model.insert_watermark.InsertWatermark`
+        """
+        watermark = cls(overlap)
+        watermark.latest = None if np.isnat(latest) else latest.astype(datetime.datetime)
+        watermark.recent = {int(key): None if np.isnat(created_on) else created_on.astype(datetime.datetime)
+                            for key, created_on in zip(keys, created_ons)}
+        return watermark
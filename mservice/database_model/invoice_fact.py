@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Invoice Fact Table Maintenance
+==================================
+
+Module copying the invoice lines into the invoicefact table, along with the invoice, customer, support rep, track,
+album, artist and genre every read of the invoices joins them with. The table is refreshed incrementally with a single
+INSERT ... SELECT of the five way join, run inside the database, copying the lines missing from the fact table among
+those inserted from an overlap before the latest copy. The line ids do not commit in their order, so a line committed
+after a higher one was copied would be missed by a refresh resuming above the highest line id copied
+
+The lines are copied as they were at the refresh. Lines deleted later are deleted with them by the foreign key, but
+names, titles or totals changed later are not, and a rebuild copies every line again
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * datetime - to hold the overlap of the refresh
+
+This script contains the following
+    * FACT_ROWS_STATEMENT - The statement of the rows of the invoice lines missing from the fact table, built once
+    * FACT_ROWS_SINCE_STATEMENT - The statement of the rows of the invoice lines missing from the fact table among those
+                                  inserted since a watermark, built once
+    * refresh_invoice_fact - Function to copy the new invoice lines into the fact table
+"""
+# Standard Imports
+import datetime
+import logging
+
+# External imports
+import sqlalchemy.orm
+from sqlalchemy import bindparam, delete, exists, func, insert, select
+
+# User Imports
+from mservice.database_model.orm_classes import AlbumTable, ArtistTable, CustomerTable, EmployeeTable, GenreTable, \
+    InvoiceFactTable, InvoiceLineTable, InvoiceTable, TracksTable
+from mservice.database_model.insert_watermark import WATERMARK_OVERLAP
+
+LOGGER = logging.getLogger(__name__)
+
+# The columns of the fact table filled by FACT_ROWS_STATEMENT, in its order
+FACT_COLUMNS = (InvoiceFactTable.invoice_line_id, InvoiceFactTable.invoice_id, InvoiceFactTable.invoice_date,
+                InvoiceFactTable.invoice_total, InvoiceFactTable.billing_country, InvoiceFactTable.customer_id,
+                InvoiceFactTable.customer_first_name, InvoiceFactTable.customer_last_name,
+                InvoiceFactTable.support_rep_id, InvoiceFactTable.support_rep_first_name,
+                InvoiceFactTable.support_rep_last_name, InvoiceFactTable.support_rep_title, InvoiceFactTable.track_id,
+                InvoiceFactTable.track_name, InvoiceFactTable.album_title, InvoiceFactTable.artist_name,
+                InvoiceFactTable.genre_name, InvoiceFactTable.unit_price, InvoiceFactTable.quantity)
+
+
+def build_fact_rows_statement():
+    """
+    Function to build the statement of the rows of the invoice lines missing from the fact table, in the order of
+    FACT_COLUMNS
+
+    :return: statement
+    :rtype: :class:`sqlalchemy.sql.selectable.Select`
+    """
+    statement = select(InvoiceLineTable.invoice_line_id, InvoiceTable.invoice_id, InvoiceTable.invoice_date,
+                       InvoiceTable.total, InvoiceTable.billing_country, CustomerTable.customer_id,
+                       CustomerTable.first_name, CustomerTable.last_name, EmployeeTable.employee_id,
+                       EmployeeTable.first_name, EmployeeTable.last_name, EmployeeTable.title, TracksTable.track_id,
+                       TracksTable.name, AlbumTable.title, ArtistTable.name, GenreTable.name,
+                       InvoiceLineTable.unit_price, InvoiceLineTable.quantity)
+
+    # Joining the invoice, customer and track of every line, and the support rep, album, artist and genre if any
+    statement = statement.join(InvoiceTable, InvoiceLineTable.invoice_id == InvoiceTable.invoice_id)
+    statement = statement.join(CustomerTable, InvoiceTable.customer_id == CustomerTable.customer_id)
+    statement = statement.join(TracksTable, InvoiceLineTable.track_id == TracksTable.track_id)
+    statement = statement.outerjoin(EmployeeTable, CustomerTable.support_rep_id == EmployeeTable.employee_id)
+    statement = statement.outerjoin(AlbumTable, TracksTable.album_id == AlbumTable.album_id)
+    statement = statement.outerjoin(ArtistTable, AlbumTable.artist_id == ArtistTable.artist_id)
+    statement = statement.outerjoin(GenreTable, TracksTable.genre_id == GenreTable.genre_id)
+
+    # Anti joining the lines copied already, through the primary key of the fact table
+    return statement.where(~exists().where(InvoiceFactTable.invoice_line_id == InvoiceLineTable.invoice_line_id))
+
+
+# The statements of the rows of the invoice lines missing from the fact table, among every line and among the lines
+# inserted from the created_on bound to the "created_from" parameter, built once
+FACT_ROWS_STATEMENT = build_fact_rows_statement()
+FACT_ROWS_SINCE_STATEMENT = FACT_ROWS_STATEMENT.where(InvoiceLineTable.created_on >= bindparam("created_from"))
+
+
+def refresh_invoice_fact(session, rebuild=False, overlap=WATERMARK_OVERLAP):
+    """
+    Function to copy the invoice lines missing from the fact table, among those inserted from an overlap before the
+    latest copy, into the fact table
+
+    :param session: The session to work with, committed by the caller
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param rebuild: Whether to delete every row and copy every line again
+    :type rebuild: bool
+
+    :param overlap: The overlap before the latest copy the lines are looked for from, for the transactions committing
+                    after it
+    :type overlap: :class:`datetime.timedelta`
+
+    :return: rows - The number of rows copied
+    :rtype: int
+    """
+    if not issubclass(type(session), sqlalchemy.orm.session.Session):
+        raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+    if not issubclass(type(overlap), datetime.timedelta) or overlap < datetime.timedelta(0):
+        raise AttributeError("overlap should be a timedelta and not negative")
+
+    if rebuild:
+        session.execute(delete(InvoiceFactTable))
+
+    # The watermark is read first, so the copy is a range scan of the created_on of the invoice lines. A line is copied
+    # after its insert, so a line inserted before the overlap was visible to the latest copy unless its transaction
+    # lasted longer than the overlap
+    latest_copy = session.execute(select(func.max(InvoiceFactTable.created_on))).scalar()
+
+    if latest_copy is None:
+        created_from = None
+        statement = insert(InvoiceFactTable).from_select(FACT_COLUMNS, FACT_ROWS_STATEMENT)
+        rows = session.execute(statement).rowcount
+    else:
+        created_from = latest_copy - overlap
+        statement = insert(InvoiceFactTable).from_select(FACT_COLUMNS, FACT_ROWS_SINCE_STATEMENT)
+        rows = session.execute(statement, {"created_from": created_from}).rowcount
+
+    LOGGER.info("Copied %s invoice lines inserted from %s into the invoice fact table", rows,
+                "the first one" if created_from is None else created_from)
+    return rows
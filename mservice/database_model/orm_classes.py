@@ -9,6 +9,7 @@ This script contains all the class details required to perform the
 orm_queries based SQL operations, it contains the following classes
 
     * TimestampMixin
+    * VersionedMixin
     * GenreTable
     * MediaTypeTable
     * ArtistTable
@@ -20,6 +21,9 @@ orm_queries based SQL operations, it contains the following classes
     * InvoiceLineTable
     * PlaylistTable
     * PlaylistTrackTable
+    * IdBlockTable
+    * EmployeeClosureTable
+    * InvoiceFactTable
 
 This script requires that the following packages be installed within the Python
 environment you are running this script in.
@@ -29,15 +33,51 @@ environment you are running this script in.
 """
 
 # External imports
-from sqlalchemy import text, ForeignKey
-from sqlalchemy.schema import FetchedValue
-from sqlalchemy import Column
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.dialects.mysql import INTEGER, NUMERIC, NVARCHAR, TIMESTAMP, DATETIME
+from sqlalchemy import text, func, ForeignKey
+from sqlalchemy import Column, Index
+from sqlalchemy import DateTime, Integer, Numeric, String, TIMESTAMP
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.declarative import declarative_base, declared_attr
+from sqlalchemy.dialects.mysql import INTEGER, NVARCHAR
 from sqlalchemy.orm import relationship, backref
+from sqlalchemy.schema import CreateColumn
 
 BASE = declarative_base()
 
+# The unsigned INTEGER of MySQL, a plain INTEGER on the other dialects
+UNSIGNED_INTEGER = Integer().with_variant(INTEGER(unsigned=True), "mysql")
+
+
+def national_string(length):
+    """
+    Function to get the type of a string column, the NVARCHAR of MySQL, a plain VARCHAR on the other dialects
+
+    :param length: The length of the column
+    :type length: int
+
+    :return: type
+    :rtype: :class:`sqlalchemy.types.TypeEngine`
+    """
+    return String(length).with_variant(NVARCHAR(length), "mysql")
+
+
+@compiles(CreateColumn, "mysql")
+def _create_mysql_column(element, compiler, **kwargs):
+    """
+    Function to compile a column of a CREATE TABLE for MySQL, adding the ON UPDATE clause held by the "mysql_on_update"
+    info of the column, which the generic column has no argument for
+
+    :return: The column specification
+    :rtype: str
+    """
+    specification = compiler.visit_create_column(element, **kwargs)
+    on_update = element.element.info.get("mysql_on_update")
+
+    if on_update is not None:
+        specification += " ON UPDATE " + on_update
+
+    return specification
+
 
 class TimestampMixin:
     """
@@ -59,12 +99,32 @@ class TimestampMixin:
     """
     __table_args__ = {'mysql_engine': 'InnoDB'}
 
-    created_by = Column(NVARCHAR(250), default="SYSTEM", nullable=False)
+    created_by = Column(national_string(250), default="SYSTEM", nullable=False)
     created_on = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
 
-    last_updated_by = Column(NVARCHAR(250), default="SYSTEM", nullable=False)
-    last_updated_on = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
-                             server_onupdate=FetchedValue(), nullable=False)
+    last_updated_by = Column(national_string(250), default="SYSTEM", nullable=False)
+    # Set by the ON UPDATE clause of MySQL for every writer, and by every UPDATE the ORM or Core issues on the other
+    # dialects, which have no such clause
+    last_updated_on = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"), onupdate=func.current_timestamp(),
+                             info={"mysql_on_update": "CURRENT_TIMESTAMP"}, nullable=False)
+
+
+class VersionedMixin:
+    """
+    Class to be inherited by ORM classes opting in to optimistic concurrency, the version column is checked and
+    incremented by every UPDATE the ORM issues for the row, which turns the update into a compare and set instead of a
+    last write wins. A concurrent change makes the flush raise :class:`sqlalchemy.orm.exc.StaleDataError`
+
+    :ivar version_id: Version of the row, incremented with every update
+    :vartype version_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
+    """
+
+    version_id = Column(UNSIGNED_INTEGER, name="Version", server_default=text("1"), nullable=False)
+
+    @declared_attr
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.version_id}
 
 
 class GenreTable(TimestampMixin, BASE):
@@ -84,8 +144,8 @@ class GenreTable(TimestampMixin, BASE):
 
     __tablename__ = 'genre'
 
-    genre_id = Column(INTEGER(unsigned=True), name="GenreId", primary_key=True, autoincrement=True, nullable=False)
-    name = Column(NVARCHAR(120), name="Name")
+    genre_id = Column(UNSIGNED_INTEGER, name="GenreId", primary_key=True, autoincrement=True, nullable=False)
+    name = Column(national_string(120), name="Name")
 
     # Relationships
     tracks = relationship("TracksTable", backref=backref("genre"), cascade="all, delete, delete-orphan")
@@ -108,9 +168,9 @@ class MediaTypeTable(TimestampMixin, BASE):
 
     __tablename__ = 'mediatype'
 
-    media_type_id = Column(INTEGER(unsigned=True), name="MediaTypeId", primary_key=True, autoincrement=True,
+    media_type_id = Column(UNSIGNED_INTEGER, name="MediaTypeId", primary_key=True, autoincrement=True,
                            nullable=False)
-    name = Column(NVARCHAR(120), name="Name")
+    name = Column(national_string(120), name="Name")
 
     # Relationships
     tracks = relationship("TracksTable", backref=backref("media_type"), cascade="all, delete, delete-orphan")
@@ -133,8 +193,8 @@ class ArtistTable(TimestampMixin, BASE):
 
     __tablename__ = 'artist'
 
-    artist_id = Column(INTEGER(unsigned=True), name="ArtistId", primary_key=True, autoincrement=True, nullable=False)
-    name = Column(NVARCHAR(120), name="Name")
+    artist_id = Column(UNSIGNED_INTEGER, name="ArtistId", primary_key=True, autoincrement=True, nullable=False)
+    name = Column(national_string(120), name="Name")
 
     # Relationships
     albums = relationship("AlbumTable", backref=backref("artist"), cascade="all, delete, delete-orphan")
@@ -160,19 +220,19 @@ class AlbumTable(TimestampMixin, BASE):
 
     __tablename__ = 'album'
 
-    album_id = Column(INTEGER(unsigned=True), name="AlbumId", primary_key=True, autoincrement=True, nullable=False)
-    title = Column(NVARCHAR(160), name="Title", nullable=False)
+    album_id = Column(UNSIGNED_INTEGER, name="AlbumId", primary_key=True, autoincrement=True, nullable=False)
+    title = Column(national_string(160), name="Title", nullable=False)
 
     # Foreign Key
-    artist_id = Column(INTEGER(unsigned=True), ForeignKey('artist.ArtistId', onupdate="NO ACTION", ondelete="NO "
-                                                                                                            "ACTION"),
+    artist_id = Column(UNSIGNED_INTEGER, ForeignKey('artist.ArtistId', onupdate="NO ACTION", ondelete="NO "
+                                                                                                      "ACTION"),
                        name="ArtistId", nullable=False, index=True)
 
     # Relationships
     tracks = relationship("TracksTable", backref=backref("album"), cascade="all, delete, delete-orphan")
 
 
-class TracksTable(TimestampMixin, BASE):
+class TracksTable(VersionedMixin, TimestampMixin, BASE):
     """
      ORM class for the Tracks table
 
@@ -203,29 +263,32 @@ class TracksTable(TimestampMixin, BASE):
      :ivar genre_id: Foregin key representing the GenreId this track belongs to
      :vartype genre_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
 
+     :ivar version_id: Version of the track, checked and incremented with every update
+     :vartype version_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
      """
 
     __tablename__ = 'track'
 
-    track_id = Column(INTEGER(unsigned=True), name="TrackId", primary_key=True, autoincrement=True, nullable=False)
+    track_id = Column(UNSIGNED_INTEGER, name="TrackId", primary_key=True, autoincrement=True, nullable=False)
 
     # NVARCHAR types
-    name = Column(NVARCHAR(200), name="Name", nullable=False)
-    composer = Column(NVARCHAR(220), name="Composer")
+    name = Column(national_string(200), name="Name", nullable=False)
+    composer = Column(national_string(220), name="Composer")
 
     # Numeric and Integer Types
-    milliseconds = Column(INTEGER(unsigned=True), name="Milliseconds", nullable=False)
-    bytes = Column(INTEGER(unsigned=True), name="Bytes")
-    unit_price = Column(NUMERIC(10, 2), name="UnitPrice", nullable=False)
+    milliseconds = Column(UNSIGNED_INTEGER, name="Milliseconds", nullable=False)
+    bytes = Column(UNSIGNED_INTEGER, name="Bytes")
+    unit_price = Column(Numeric(10, 2), name="UnitPrice", nullable=False)
 
     # Foreign Key Columns
-    album_id = Column(INTEGER(unsigned=True), ForeignKey('album.AlbumId', onupdate="NO ACTION", ondelete="NO ACTION"),
+    album_id = Column(UNSIGNED_INTEGER, ForeignKey('album.AlbumId', onupdate="NO ACTION", ondelete="NO ACTION"),
                       name="AlbumId", nullable=False, index=True)
-    media_type_id = Column(INTEGER(unsigned=True), ForeignKey('mediatype.MediaTypeId', onupdate="NO ACTION",
-                                                              ondelete="NO ACTION"), name="MediaTypeId",
+    media_type_id = Column(UNSIGNED_INTEGER, ForeignKey('mediatype.MediaTypeId', onupdate="NO ACTION",
+                                                        ondelete="NO ACTION"), name="MediaTypeId",
                            nullable=False, index=True)
 
-    genre_id = Column(INTEGER(unsigned=True), ForeignKey('genre.GenreId', onupdate="NO ACTION", ondelete="NO ACTION"),
+    genre_id = Column(UNSIGNED_INTEGER, ForeignKey('genre.GenreId', onupdate="NO ACTION", ondelete="NO ACTION"),
                       name="GenreId")
 
 
@@ -288,29 +351,29 @@ class EmployeeTable(TimestampMixin, BASE):
 
     __tablename__ = 'employee'
 
-    employee_id = Column(INTEGER(unsigned=True), name="EmployeeId", primary_key=True, autoincrement=True,
+    employee_id = Column(UNSIGNED_INTEGER, name="EmployeeId", primary_key=True, autoincrement=True,
                          nullable=False)
 
     # NVARCHAR data type
-    last_name = Column(NVARCHAR(20), name="LastName", nullable=False)
-    first_name = Column(NVARCHAR(20), name="FirstName", nullable=False)
-    title = Column(NVARCHAR(30), name="Title")
-    address = Column(NVARCHAR(70), name="Address")
-    city = Column(NVARCHAR(40), name="City")
-    state = Column(NVARCHAR(40), name="State")
-    country = Column(NVARCHAR(40), name="Country")
-    postal_code = Column(NVARCHAR(10), name="PostalCode")
-    phone = Column(NVARCHAR(24), name="Phone")
-    fax = Column(NVARCHAR(24), name="Fax")
-    email = Column(NVARCHAR(24), name="Email")
+    last_name = Column(national_string(20), name="LastName", nullable=False)
+    first_name = Column(national_string(20), name="FirstName", nullable=False)
+    title = Column(national_string(30), name="Title")
+    address = Column(national_string(70), name="Address")
+    city = Column(national_string(40), name="City")
+    state = Column(national_string(40), name="State")
+    country = Column(national_string(40), name="Country")
+    postal_code = Column(national_string(10), name="PostalCode")
+    phone = Column(national_string(24), name="Phone")
+    fax = Column(national_string(24), name="Fax")
+    email = Column(national_string(24), name="Email")
 
     # DATETIME data type
-    birth_date = Column(DATETIME, name="BirthDate")
-    hire_date = Column(DATETIME, name="HireDate")
+    birth_date = Column(DateTime, name="BirthDate")
+    hire_date = Column(DateTime, name="HireDate")
 
     # Foreign Key
-    reports_to = Column(INTEGER(unsigned=True), ForeignKey("employee.EmployeeId", onupdate="NO ACTION",
-                                                           ondelete="NO ACTION"), name="ReportsTo", index=True)
+    reports_to = Column(UNSIGNED_INTEGER, ForeignKey("employee.EmployeeId", onupdate="NO ACTION",
+                                                     ondelete="NO ACTION"), name="ReportsTo", index=True)
 
     # Relationships
     manages = relationship("EmployeeTable", backref=backref("manager", remote_side=[employee_id]))
@@ -372,31 +435,31 @@ class CustomerTable(TimestampMixin, BASE):
     __tablename__ = 'customer'
 
     # Primary Key
-    customer_id = Column(INTEGER(unsigned=True), name="CustomerId", primary_key=True, autoincrement=True,
+    customer_id = Column(UNSIGNED_INTEGER, name="CustomerId", primary_key=True, autoincrement=True,
                          nullable=False)
 
     # NVARCHAR data type
-    last_name = Column(NVARCHAR(20), name="LastName", nullable=False)
-    first_name = Column(NVARCHAR(40), name="FirstName", nullable=False)
-    company = Column(NVARCHAR(80), name="Company")
-    address = Column(NVARCHAR(70), name="Address")
-    city = Column(NVARCHAR(40), name="City")
-    state = Column(NVARCHAR(40), name="State")
-    country = Column(NVARCHAR(40), name="Country")
-    postal_code = Column(NVARCHAR(10), name="PostalCode")
-    phone = Column(NVARCHAR(24), name="Phone")
-    fax = Column(NVARCHAR(24), name="Fax")
-    email = Column(NVARCHAR(60), name="Email", nullable=False)
+    last_name = Column(national_string(20), name="LastName", nullable=False)
+    first_name = Column(national_string(40), name="FirstName", nullable=False)
+    company = Column(national_string(80), name="Company")
+    address = Column(national_string(70), name="Address")
+    city = Column(national_string(40), name="City")
+    state = Column(national_string(40), name="State")
+    country = Column(national_string(40), name="Country")
+    postal_code = Column(national_string(10), name="PostalCode")
+    phone = Column(national_string(24), name="Phone")
+    fax = Column(national_string(24), name="Fax")
+    email = Column(national_string(60), name="Email", nullable=False)
 
     # Foreign Key
-    support_rep_id = Column(INTEGER(unsigned=True), ForeignKey("employee.EmployeeId", onupdate="NO ACTION",
-                                                               ondelete="NO ACTION"), name="SupportRepId", index=True)
+    support_rep_id = Column(UNSIGNED_INTEGER, ForeignKey("employee.EmployeeId", onupdate="NO ACTION",
+                                                         ondelete="NO ACTION"), name="SupportRepId", index=True)
 
     # Relationships
     invoices = relationship("InvoiceTable", backref=backref("customer"), cascade="all, delete, delete-orphan")
 
 
-class InvoiceTable(TimestampMixin, BASE):
+class InvoiceTable(VersionedMixin, TimestampMixin, BASE):
     """
       ORM class for the Invoice Table
 
@@ -430,34 +493,40 @@ class InvoiceTable(TimestampMixin, BASE):
       :ivar purchased_tracks: List of tracks involved in this invoice
       :vartype purchased_tracks: list
 
+      :ivar version_id: Version of the invoice, checked and incremented with every update
+      :vartype version_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
       """
 
     __tablename__ = 'invoice'
 
     # Primary Key
-    invoice_id = Column(INTEGER(unsigned=True), name="InvoiceId", primary_key=True, autoincrement=True, nullable=False)
+    invoice_id = Column(UNSIGNED_INTEGER, name="InvoiceId", primary_key=True, autoincrement=True, nullable=False)
 
     # NVARCHAR data type
-    billing_address = Column(NVARCHAR(70), name="BillingAddress")
-    billing_city = Column(NVARCHAR(40), name="BillingCity")
-    billing_state = Column(NVARCHAR(40), name="BillingState")
-    billing_country = Column(NVARCHAR(40), name="BillingCountry")
-    billing_postal_code = Column(NVARCHAR(10), name="BillingPostalCode")
+    billing_address = Column(national_string(70), name="BillingAddress")
+    billing_city = Column(national_string(40), name="BillingCity")
+    billing_state = Column(national_string(40), name="BillingState")
+    billing_country = Column(national_string(40), name="BillingCountry")
+    billing_postal_code = Column(national_string(10), name="BillingPostalCode")
 
     # DATETIME data type
-    invoice_date = Column(DATETIME, name="InvoiceDate", nullable=False)
+    invoice_date = Column(DateTime, name="InvoiceDate", nullable=False)
 
     # Numeric Data Type
-    total = Column(NUMERIC(10, 2), name="Total", nullable=False)
+    total = Column(Numeric(10, 2), name="Total", nullable=False)
 
     # Foreign Key
-    customer_id = Column(INTEGER(unsigned=True), ForeignKey("customer.CustomerId", onupdate="NO ACTION",
-                                                            ondelete="NO ACTION"), name="CustomerId",
+    customer_id = Column(UNSIGNED_INTEGER, ForeignKey("customer.CustomerId", onupdate="NO ACTION",
+                                                      ondelete="NO ACTION"), name="CustomerId",
                          nullable=False, index=True)
 
     # Relationships
     purchased_tracks = relationship("TracksTable", backref=backref("invoices"), secondary="invoiceline")
 
+    # The invoices inserted since a watermark are read in the order of their insert
+    __table_args__ = (Index("ix_invoice_created_on", "created_on"), TimestampMixin.__table_args__)
+
 
 class InvoiceLineTable(TimestampMixin, BASE):
     """
@@ -489,25 +558,28 @@ class InvoiceLineTable(TimestampMixin, BASE):
     __tablename__ = 'invoiceline'
 
     # Primary key
-    invoice_line_id = Column(INTEGER(unsigned=True), name="InvoiceLineId", primary_key=True, autoincrement=True,
+    invoice_line_id = Column(UNSIGNED_INTEGER, name="InvoiceLineId", primary_key=True, autoincrement=True,
                              nullable=False)
 
     # Numeric & Int type
-    unit_price = Column(NUMERIC(10, 2), name="UnitPrice", nullable=False)
-    quantity = Column(INTEGER(unsigned=True), name="Quantity", nullable=False)
+    unit_price = Column(Numeric(10, 2), name="UnitPrice", nullable=False)
+    quantity = Column(UNSIGNED_INTEGER, name="Quantity", nullable=False)
 
     # Foreign Key
-    invoice_id = Column(INTEGER(unsigned=True), ForeignKey("invoice.InvoiceId", onupdate="NO ACTION",
-                                                           ondelete="NO ACTION"), name="InvoiceId",
+    invoice_id = Column(UNSIGNED_INTEGER, ForeignKey("invoice.InvoiceId", onupdate="NO ACTION",
+                                                     ondelete="NO ACTION"), name="InvoiceId",
                         nullable=False, index=True)
 
-    track_id = Column(INTEGER(unsigned=True), ForeignKey("track.TrackId", onupdate="NO ACTION", ondelete="NO ACTION"),
+    track_id = Column(UNSIGNED_INTEGER, ForeignKey("track.TrackId", onupdate="NO ACTION", ondelete="NO ACTION"),
                       name="TrackId", nullable=False, index=True)
 
     # Relationships
     invoice = relationship("InvoiceTable", backref=backref("track_associations", cascade="all, delete, delete-orphan"))
     track = relationship("TracksTable", backref=backref("invoice_associations", cascade="all, delete, delete-orphan"))
 
+    # The lines inserted since a watermark are read in the order of their insert
+    __table_args__ = (Index("ix_invoiceline_created_on", "created_on"), TimestampMixin.__table_args__)
+
 
 class PlaylistTable(TimestampMixin, BASE):
     """
@@ -526,9 +598,9 @@ class PlaylistTable(TimestampMixin, BASE):
 
     __tablename__ = 'playlist'
 
-    play_list_id = Column(INTEGER(unsigned=True), name="PlaylistId", primary_key=True, autoincrement=True,
+    play_list_id = Column(UNSIGNED_INTEGER, name="PlaylistId", primary_key=True, autoincrement=True,
                           nullable=False)
-    name = Column(NVARCHAR(120), name="Name")
+    name = Column(national_string(120), name="Name")
 
     # Relationships
     tracks_in_playlist = relationship("TracksTable", backref=backref("playlist_involved"), secondary="playlisttrack")
@@ -554,13 +626,169 @@ class PlaylistTrackTable(TimestampMixin, BASE):
 
     __tablename__ = 'playlisttrack'
 
-    play_list_id = Column(INTEGER(unsigned=True), ForeignKey("playlist.PlaylistId", onupdate="NO ACTION",
-                                                             ondelete="NO ACTION"), name="PlaylistId",
+    play_list_id = Column(UNSIGNED_INTEGER, ForeignKey("playlist.PlaylistId", onupdate="NO ACTION",
+                                                       ondelete="NO ACTION"), name="PlaylistId",
                           nullable=False, primary_key=True)
 
-    track_id = Column(INTEGER(unsigned=True), ForeignKey("track.TrackId", onupdate="NO ACTION", ondelete="NO ACTION"),
+    track_id = Column(UNSIGNED_INTEGER, ForeignKey("track.TrackId", onupdate="NO ACTION", ondelete="NO ACTION"),
                       name="TrackId", nullable=False, primary_key=True, index=True)
 
     # Relationships
     playlist = relationship("PlaylistTable", backref=backref("track_association", cascade="all, delete, delete-orphan"))
     track = relationship("TracksTable", backref=backref("playlist_association", cascade="all, delete, delete-orphan"))
+
+
+class IdBlockTable(TimestampMixin, BASE):
+    """
+      ORM class for the IdBlock Table, which holds the next unallocated primary key of the tables whose ids are
+      handed out client side in blocks
+
+      :ivar table_name: Primary key of IdBlock Table, the name of the table the ids are allocated for
+      :vartype table_name: class:`sqlalchemy.dialects.mysql.types.NVARCHAR`
+
+      :ivar next_id: The first id which has not been reserved yet
+      :vartype next_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
+      """
+
+    __tablename__ = 'idblock'
+
+    table_name = Column(national_string(64), name="TableName", primary_key=True, nullable=False)
+    next_id = Column(UNSIGNED_INTEGER, name="NextId", nullable=False)
+
+
+class EmployeeClosureTable(TimestampMixin, BASE):
+    """
+      ORM class for the EmployeeClosure Table, which holds every (ancestor, descendant) pair of the reporting hierarchy
+      of the employees with their distance, so the reports of a manager at every level are a single join. Every
+      employee is its own ancestor at depth 0. The rows are maintained from the employee table by
+      :mod:`mservice.database_model.employee_closure`
+
+      :ivar ancestor_id: Primary key of EmployeeClosure Table, the manager at any level above the descendant
+      :vartype ancestor_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
+      :ivar descendant_id: Primary key of EmployeeClosure Table, the employee reporting to the ancestor
+      :vartype descendant_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
+      :ivar depth: The number of levels between the ancestor and the descendant
+      :vartype depth: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
+      """
+
+    __tablename__ = 'employeeclosure'
+
+    ancestor_id = Column(UNSIGNED_INTEGER, ForeignKey("employee.EmployeeId", onupdate="CASCADE",
+                                                      ondelete="CASCADE"), name="AncestorId", primary_key=True,
+                         nullable=False)
+    descendant_id = Column(UNSIGNED_INTEGER, ForeignKey("employee.EmployeeId", onupdate="CASCADE",
+                                                        ondelete="CASCADE"), name="DescendantId",
+                           primary_key=True, index=True, nullable=False)
+    depth = Column(UNSIGNED_INTEGER, name="Depth", nullable=False)
+
+
+class InvoiceFactTable(TimestampMixin, BASE):
+    """
+      ORM class for the InvoiceFact Table, which holds every invoice line along with its invoice, customer, support rep,
+      track, album, artist and genre, so the reads of the invoices are scans of a single table rather than a five way
+      join. The rows are copied from the invoice lines by :mod:`mservice.database_model.invoice_fact`
+
+      :ivar invoice_line_id: Primary key of InvoiceFact Table, the invoice line copied
+      :vartype invoice_line_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
+      :ivar invoice_id: The invoice of the line
+      :vartype invoice_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
+      :ivar invoice_date: The date of the invoice
+      :vartype invoice_date: class:`sqlalchemy.dialects.mysql.types.DATETIME`
+
+      :ivar invoice_total: The total of the invoice
+      :vartype invoice_total: class:`sqlalchemy.dialects.mysql.types.NUMERIC`
+
+      :ivar billing_country: The billing country of the invoice
+      :vartype billing_country: class:`sqlalchemy.dialects.mysql.types.NVARCHAR`
+
+      :ivar customer_id: The customer of the invoice
+      :vartype customer_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
+      :ivar customer_first_name: The first name of the customer
+      :vartype customer_first_name: class:`sqlalchemy.dialects.mysql.types.NVARCHAR`
+
+      :ivar customer_last_name: The last name of the customer
+      :vartype customer_last_name: class:`sqlalchemy.dialects.mysql.types.NVARCHAR`
+
+      :ivar support_rep_id: The support rep of the customer
+      :vartype support_rep_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
+      :ivar support_rep_first_name: The first name of the support rep
+      :vartype support_rep_first_name: class:`sqlalchemy.dialects.mysql.types.NVARCHAR`
+
+      :ivar support_rep_last_name: The last name of the support rep
+      :vartype support_rep_last_name: class:`sqlalchemy.dialects.mysql.types.NVARCHAR`
+
+      :ivar support_rep_title: The title of the support rep
+      :vartype support_rep_title: class:`sqlalchemy.dialects.mysql.types.NVARCHAR`
+
+      :ivar track_id: The track bought
+      :vartype track_id: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
+      :ivar track_name: The name of the track
+      :vartype track_name: class:`sqlalchemy.dialects.mysql.types.NVARCHAR`
+
+      :ivar album_title: The title of the album of the track
+      :vartype album_title: class:`sqlalchemy.dialects.mysql.types.NVARCHAR`
+
+      :ivar artist_name: The name of the artist of the album
+      :vartype artist_name: class:`sqlalchemy.dialects.mysql.types.NVARCHAR`
+
+      :ivar genre_name: The name of the genre of the track
+      :vartype genre_name: class:`sqlalchemy.dialects.mysql.types.NVARCHAR`
+
+      :ivar unit_price: The unit price of the line
+      :vartype unit_price: class:`sqlalchemy.dialects.mysql.types.NUMERIC`
+
+      :ivar quantity: The quantity of the line
+      :vartype quantity: class:`sqlalchemy.dialects.mysql.types.INTEGER`
+
+      """
+
+    __tablename__ = 'invoicefact'
+
+    # Covering indexes of the read of the invoices, and of the sales of a month by support rep, and the index of the
+    # latest copy the refresh resumes from
+    __table_args__ = (Index("ix_invoicefact_read_lines", "InvoiceId", "InvoiceLineId", "CustomerId", "InvoiceDate",
+                            "InvoiceTotal", "CustomerFirstName", "SupportRepId", "SupportRepFirstName",
+                            "SupportRepTitle", "TrackName"),
+                      Index("ix_invoicefact_date_rep", "InvoiceDate", "SupportRepId", "InvoiceId", "InvoiceTotal"),
+                      Index("ix_invoicefact_created_on", "created_on"),
+                      TimestampMixin.__table_args__)
+
+    # Primary key
+    invoice_line_id = Column(UNSIGNED_INTEGER, ForeignKey("invoiceline.InvoiceLineId", onupdate="CASCADE",
+                                                          ondelete="CASCADE"), name="InvoiceLineId",
+                             primary_key=True, autoincrement=False, nullable=False)
+
+    # Invoice and customer
+    invoice_id = Column(UNSIGNED_INTEGER, name="InvoiceId", nullable=False)
+    invoice_date = Column(DateTime, name="InvoiceDate", nullable=False)
+    invoice_total = Column(Numeric(10, 2), name="InvoiceTotal", nullable=False)
+    billing_country = Column(national_string(40), name="BillingCountry")
+    customer_id = Column(UNSIGNED_INTEGER, name="CustomerId", nullable=False)
+    customer_first_name = Column(national_string(40), name="CustomerFirstName", nullable=False)
+    customer_last_name = Column(national_string(20), name="CustomerLastName", nullable=False)
+
+    # Support rep, none for the customers without one
+    support_rep_id = Column(UNSIGNED_INTEGER, name="SupportRepId")
+    support_rep_first_name = Column(national_string(20), name="SupportRepFirstName")
+    support_rep_last_name = Column(national_string(20), name="SupportRepLastName")
+    support_rep_title = Column(national_string(30), name="SupportRepTitle")
+
+    # Track, album, artist and genre
+    track_id = Column(UNSIGNED_INTEGER, name="TrackId", nullable=False, index=True)
+    track_name = Column(national_string(200), name="TrackName", nullable=False)
+    album_title = Column(national_string(160), name="AlbumTitle")
+    artist_name = Column(national_string(120), name="ArtistName")
+    genre_name = Column(national_string(120), name="GenreName")
+
+    # Line
+    unit_price = Column(Numeric(10, 2), name="UnitPrice", nullable=False)
+    quantity = Column(UNSIGNED_INTEGER, name="Quantity", nullable=False)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Schema Upgrade
+==================
+
+Module bringing an existing database up to the ORM classes: the tables missing from it are created, the columns
+missing from its existing tables, such as the Version column of the track and invoice tables the VersionedMixin maps,
+are added with ALTER TABLE ... ADD COLUMN, and their missing indexes are created. Existing columns and indexes are never
+altered or dropped, so the upgrade can be run again safely
+
+The columns are added with the server default declared on them, which fills the existing rows, the Version column of
+every existing track and invoice starting at 1
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following
+    * find_missing_columns - Function to find the columns of the ORM classes missing from the existing tables
+    * find_missing_indexes - Function to find the named indexes of the ORM classes missing from the existing tables
+    * upgrade_schema - Function to create the missing tables and add the missing columns and indexes
+"""
+# Standard Imports
+import logging
+from collections import OrderedDict
+
+# External imports
+import sqlalchemy
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn, CreateIndex
+
+# User Imports
+from mservice.database_model.orm_classes import BASE
+
+LOGGER = logging.getLogger(__name__)
+
+
+def find_missing_columns(engine):
+    """
+    Function to find the columns of the ORM classes missing from the tables existing in the database, the missing
+    tables being left out
+
+    :param engine: The engine of the database
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :return: missing - Table to its missing columns, in the order of the tables and of their columns
+    :rtype: :class:`collections.OrderedDict`
+    """
+    if not issubclass(type(engine), sqlalchemy.engine.base.Engine):
+        raise AttributeError("Engine should be of type 'sqlalchemy.engine.base.Engine'")
+
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = OrderedDict()
+
+    for table in BASE.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_columns = {column["name"].lower() for column in inspector.get_columns(table.name)}
+        columns = [column for column in table.columns if column.name.lower() not in existing_columns]
+
+        if columns:
+            missing[table] = columns
+
+    return missing
+
+
+def find_missing_indexes(engine):
+    """
+    Function to find the indexes of the ORM classes missing from the tables existing in the database, by their name,
+    the missing tables being left out
+
+    :param engine: The engine of the database
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :return: missing - The missing indexes, in the order of the tables
+    :rtype: list
+    """
+    if not issubclass(type(engine), sqlalchemy.engine.base.Engine):
+        raise AttributeError("Engine should be of type 'sqlalchemy.engine.base.Engine'")
+
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+
+    for table in BASE.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_indexes = {index["name"].lower() for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in sorted(table.indexes, key=lambda index: index.name)
+                       if index.name.lower() not in existing_indexes)
+
+    return missing
+
+
+def upgrade_schema(engine, dry_run=False):
+    """
+    Function to create the tables of the ORM classes missing from the database, and add the columns and indexes missing
+    from its existing tables
+
+    :param engine: The engine of the database
+    :type engine: :class:`sqlalchemy.engine.base.Engine`
+
+    :param dry_run: If True nothing is changed, the statements are only logged
+    :type dry_run: bool
+
+    :return: statements - The ALTER TABLE and CREATE INDEX statements of the missing columns and indexes, run unless on
+                          a dry run
+    :rtype: list
+    """
+    missing = find_missing_columns(engine)
+    preparer = engine.dialect.identifier_preparer
+
+    statements = ["ALTER TABLE %s ADD COLUMN %s" % (preparer.format_table(table),
+                                                    CreateColumn(column).compile(dialect=engine.dialect))
+                  for table, columns in missing.items() for column in columns]
+
+    # The indexes are looked for before the columns are added, as they are created after them
+    statements.extend(str(CreateIndex(index).compile(dialect=engine.dialect)) for index in find_missing_indexes(engine))
+
+    for statement in statements:
+        LOGGER.info("%s%s", "Dry Run: " if dry_run else "", statement)
+
+    if dry_run:
+        return statements
+
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+
+    # Only the tables missing from the database are created
+    BASE.metadata.create_all(engine)
+
+    LOGGER.info("Ran %s Statements, Adding Columns To %s Tables", len(statements), len(missing))
+    return statements
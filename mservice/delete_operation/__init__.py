@@ -7,3 +7,4 @@ This is an initialization module for helper utilities
 
 # Importing necessary modules and functions to be used by modules using this package
 from mservice.delete_operation.delete_records import perform_delete
+from mservice.delete_operation.set_based_delete import build_delete_plan, delete_with_dependents
@@ -16,10 +16,12 @@ import logging
 
 # External Imports
 import sqlalchemy
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
 
 # User Imports
 import mservice.database_model as models
+from mservice.delete_operation.set_based_delete import delete_with_dependents
 
 LOGGER = logging.getLogger(__name__)
 
@@ -41,15 +43,19 @@ def perform_delete(session):
         if not issubclass(type(session), sqlalchemy.orm.session.Session):
             raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
 
-        new_genre = session.query(models.GenreTable).filter(models.GenreTable.genre_id == 26).one()
-        session.delete(new_genre)
-        session.commit()
-        LOGGER.info("Deleted New Media")
+        # Only the id is read, the genre itself and its dependents are never loaded into the session
+        genre_id = session.query(models.GenreTable.genre_id).filter(models.GenreTable.genre_id == 26).one()[0]
+
+        # Deleting the genre along with its tracks, their invoicelines and playlist entries, with set based statements
+        # instead of loading every dependent row into the session
+        impact = delete_with_dependents(session, models.GenreTable, [genre_id])
+        LOGGER.info("Deleted New Media, Rows Deleted Per Table: %s", dict(impact))
     except NoResultFound as err:
         LOGGER.error("No Results: %s", err)
     except MultipleResultsFound as err:
         LOGGER.error("Multiple Results: %s", err)
-    except Exception as err:
+    except SQLAlchemyError as err:
+        # Deadlocks and lock wait timeouts were already retried by delete_with_dependents
         LOGGER.error("Error: %s", err)
         session.rollback()
     finally:
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Module to perform Set Based Cascading Delete
+=================================================
+
+Module for deleting records along with every record depending on them, without loading any of them into the session.
+The foreign key graph of the ORM classes is walked from the table being deleted from, and every dependent table gets a
+chunked DELETE ... WHERE foreign_key IN (subquery) statement, issued bottom up so that no row is deleted before the rows
+referencing it
+
+Foreign keys declaring ON DELETE CASCADE or SET NULL, and relationships configured with passive_deletes, are left to
+the database. Self referencing foreign keys are not followed. Every chunk is committed on its own, so an interrupted
+delete leaves only dependents removed and can be run again. A deadlock or lock wait timeout replays the chunk it hit
+alone
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+    * build_delete_plan - Function to build the tables and row conditions to delete from, in bottom up order
+    * delete_with_dependents - Function to delete records and their dependents, or to count them on a dry run
+"""
+# Standard Imports
+import logging
+from collections import OrderedDict
+
+# External imports
+import sqlalchemy.orm
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.orm import ONETOMANY
+from sqlalchemy.schema import sort_tables
+
+# User Imports
+from mservice.connections.retry import retry_transaction
+from mservice.database_model.orm_classes import BASE
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _is_passive(foreign_key):
+    """
+    Function to check whether the rows behind a foreign key are removed by the database itself
+
+    :param foreign_key: The foreign key of the dependent table
+    :type foreign_key: :class:`sqlalchemy.schema.ForeignKey`
+
+    :return: True if the delete is left to the database
+    :rtype: bool
+    """
+    if foreign_key.ondelete and foreign_key.ondelete.upper() in ("CASCADE", "SET NULL"):
+        return True
+
+    for mapper in BASE.registry.mappers:
+        if mapper.local_table is not foreign_key.column.table:
+            continue
+
+        for relation in mapper.relationships:
+            if relation.direction is ONETOMANY and relation.secondary is None and relation.passive_deletes and \
+                    foreign_key.parent in relation.remote_side:
+                return True
+
+    return False
+
+
+def build_delete_plan(model, ids):
+    """
+    Function to build the delete plan of the given records, the tables reachable through foreign keys in bottom up
+    order, along with the condition selecting the rows of each table to be deleted
+
+    :param model: The ORM class the records belong to
+    :type model: :class:`sqlalchemy.ext.declarative.api.DeclarativeMeta`
+
+    :param ids: The primary keys of the records
+    :type ids: list
+
+    :return: plan - Table to condition, children before their parents
+    :rtype: :class:`collections.OrderedDict`
+    """
+    root = model.__table__
+    primary_key = root.primary_key.columns.values()[0]
+
+    conditions = {root: [primary_key.in_(ids)]}
+    pending = [root]
+
+    while pending:
+        parent = pending.pop()
+        parent_condition = or_(*conditions[parent])
+
+        for table in BASE.metadata.sorted_tables:
+            if table is parent:
+                continue
+
+            for foreign_key in table.foreign_keys:
+                if foreign_key.column.table is not parent or _is_passive(foreign_key):
+                    continue
+
+                condition = foreign_key.parent.in_(select(foreign_key.column).where(parent_condition))
+                conditions.setdefault(table, []).append(condition)
+                pending.append(table)
+
+    plan = OrderedDict()
+    for table in reversed(sort_tables(conditions)):
+        plan[table] = or_(*conditions[table])
+
+    return plan
+
+
+@retry_transaction()
+def _delete_chunk(session, table, condition, chunk_key, chunk_size):
+    """
+    Function to delete the next chunk of the matching rows of a table and commit, replayed on its own when the
+    transaction fails with a retryable error
+
+    :return: deleted, high_key - The number of rows deleted, and the highest key of the chunk, None for the last chunk
+    :rtype: tuple
+    """
+    high_key = session.execute(select(chunk_key).where(condition).order_by(chunk_key).offset(chunk_size - 1).
+                               limit(1)).scalar()
+
+    if high_key is None:
+        deleted = session.execute(delete(table).where(condition)).rowcount
+    else:
+        deleted = session.execute(delete(table).where(condition, chunk_key <= high_key)).rowcount
+
+    session.commit()
+    return deleted, high_key
+
+
+def delete_with_dependents(session, model, ids, chunk_size=1000, dry_run=False):
+    """
+    Function to delete the given records and every record depending on them with set based statements, committing
+    after every chunk
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param model: The ORM class the records belong to
+    :type model: :class:`sqlalchemy.ext.declarative.api.DeclarativeMeta`
+
+    :param ids: The primary keys of the records
+    :type ids: list
+
+    :param chunk_size: The maximum number of rows deleted by each statement
+    :type chunk_size: int
+
+    :param dry_run: If True nothing is deleted, only the rows which would be deleted are counted
+    :type dry_run: bool
+
+    :return: impact - Table name to the number of rows deleted, or to be deleted on a dry run, in bottom up order
+    :rtype: :class:`collections.OrderedDict`
+    """
+    if not issubclass(type(session), sqlalchemy.orm.session.Session):
+        raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+    if not ids:
+        raise AttributeError("ids should be a non empty list of primary keys")
+
+    if not issubclass(type(chunk_size), int) or chunk_size < 1:
+        raise AttributeError("chunk size should be integer and greater than 0")
+
+    impact = OrderedDict()
+
+    for table, condition in build_delete_plan(model, list(ids)).items():
+
+        if dry_run:
+            impact[table.name] = session.execute(select(func.count()).select_from(table).where(condition)).scalar()
+            continue
+
+        # Chunking on the first primary key column, each chunk ends at the chunk_size-th matching key
+        chunk_key = table.primary_key.columns.values()[0]
+        impact[table.name] = 0
+        last_key = None
+
+        while True:
+            chunk_condition = condition if last_key is None else (condition & (chunk_key > last_key))
+            deleted, high_key = _delete_chunk(session, table, chunk_condition, chunk_key, chunk_size)
+            impact[table.name] += deleted
+            last_key = high_key
+
+            if high_key is None:
+                break
+
+        LOGGER.debug("Deleted %s rows from %s", impact[table.name], table.name)
+
+    if dry_run:
+        session.rollback()
+
+    return impact
@@ -7,3 +7,6 @@ This is an initialization module for helper utilities
 
 # Importing necessary modules and functions to be used by modules using this package
 from mservice.read_operation.read_records import perform_read_join
+from mservice.read_operation.loading_profiles import LOADING_PROFILES, get_loading_options
+from mservice.read_operation.catalog_traversal import get_artist_catalog, get_customer_history, get_playlist_tracks, \
+    get_employee_team
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Traverse the Catalog Through the Relationships
+============================================================
+
+Module for reading an artist, customer, playlist or employee with the records hanging off it, walking the relationships
+of the ORM classes. The relationships are loaded with a loading profile, so a traversal issues a fixed number of
+statements whatever the number of records walked, or lazily one statement per parent when no profile is given
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+    * get_artist_catalog - Function to read an artist with its albums and their tracks
+    * get_customer_history - Function to read a customer with its invoices and the tracks bought
+    * get_playlist_tracks - Function to read a playlist with its tracks and their album and artist
+    * get_employee_team - Function to read an employee with the employees reporting to them
+"""
+# Standard Imports
+import logging
+
+# External imports
+import sqlalchemy.orm
+from sqlalchemy import select
+from sqlalchemy.orm.exc import NoResultFound
+from tabulate import tabulate
+
+# User Imports
+import mservice.database_model as models
+from mservice.read_operation.loading_profiles import TEAM_LEVELS, get_loading_options
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _load_one(session, key_column, key, profile):
+    """
+    Function to load the record with the key, along with the relationships of the loading profile
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param key_column: The primary key column of the record, its class being the class loaded
+    :type key_column: :class:`sqlalchemy.orm.attributes.InstrumentedAttribute`
+
+    :param key: The primary key of the record
+    :type key: int
+
+    :param profile: The name of the loading profile, None for lazy loading
+    :type profile: str
+
+    :return: record
+    :rtype: :class:`mservice.database_model.orm_classes.BASE`
+    """
+    if not issubclass(type(session), sqlalchemy.orm.session.Session):
+        raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+    if not issubclass(type(key), int):
+        raise AttributeError("id should be integer")
+
+    statement = select(key_column.class_).where(key_column == key).options(*get_loading_options(profile))
+    record = session.execute(statement).unique().scalar()
+
+    if record is None:
+        raise NoResultFound("No Records Found")
+
+    return record
+
+
+def _log_table(title, rows, headers):
+    """
+    Function to log the rows of a traversal as a table
+
+    :return: Nothing
+    :rtype: None
+    """
+    LOGGER.info("\n\n%s", title)
+
+    print("\n\n")
+    print("===" * 50)
+    print("\n\n")
+
+    LOGGER.info("\n\n %s", tabulate(rows, headers=headers, tablefmt="grid"))
+
+    print("\n\n")
+    print("===" * 50)
+    print("\n\n")
+
+
+def get_artist_catalog(session, artist_id, profile="artist_catalog"):
+    """
+    Function to perform read operation with the database to Find the Albums of an Artist with their Tracks
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param artist_id: The id of the artist
+    :type artist_id: int
+
+    :param profile: The name of the loading profile, None for lazy loading
+    :type profile: str
+
+    :return: results - Album title, track id, track name, genre and media type of every track, None if the arguments
+                       were invalid or nothing was found
+    :rtype: list
+    """
+    try:
+        LOGGER.info("Performing Read Operation")
+
+        artist = _load_one(session, models.ArtistTable.artist_id, artist_id, profile)
+
+        results = [(album.title, track.track_id, track.name, track.genre.name if track.genre else None,
+                    track.media_type.name if track.media_type else None)
+                   for album in sorted(artist.albums, key=lambda album: album.album_id)
+                   for track in sorted(album.tracks, key=lambda track: track.track_id)]
+
+        _log_table("The Catalog of the Artist: %s" % artist.name, results,
+                   ["Album", "Track ID", "Track Name", "Genre", "Media Type"])
+
+        return results
+    except AttributeError as err:
+        LOGGER.error(err)
+    except NoResultFound as err:
+        LOGGER.error(err)
+    finally:
+        session.close()
+
+
+def get_customer_history(session, customer_id, profile="customer_history"):
+    """
+    Function to perform read operation with the database to Find the Invoices of a Customer with the Tracks Bought
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param customer_id: The id of the customer
+    :type customer_id: int
+
+    :param profile: The name of the loading profile, None for lazy loading
+    :type profile: str
+
+    :return: results - Invoice id, invoice date, track name, unit price and quantity of every invoice line, None if the
+                       arguments were invalid or nothing was found
+    :rtype: list
+    """
+    try:
+        LOGGER.info("Performing Read Operation")
+
+        customer = _load_one(session, models.CustomerTable.customer_id, customer_id, profile)
+
+        results = [(invoice.invoice_id, invoice.invoice_date, line.track.name, line.unit_price, line.quantity)
+                   for invoice in sorted(customer.invoices, key=lambda invoice: invoice.invoice_id)
+                   for line in sorted(invoice.track_associations, key=lambda line: line.invoice_line_id)]
+
+        support_rep = customer.support_rep
+        _log_table("The Purchases of the Customer: %s %s, Supported by: %s"
+                   % (customer.first_name, customer.last_name,
+                      "%s %s" % (support_rep.first_name, support_rep.last_name) if support_rep else None),
+                   results, ["Invoice ID", "Invoice Date", "Track Name", "Unit Price", "Quantity"])
+
+        return results
+    except AttributeError as err:
+        LOGGER.error(err)
+    except NoResultFound as err:
+        LOGGER.error(err)
+    finally:
+        session.close()
+
+
+def get_playlist_tracks(session, playlist_id, profile="playlist_tracks"):
+    """
+    Function to perform read operation with the database to Find the Tracks of a Playlist with their Album and Artist
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param playlist_id: The id of the playlist
+    :type playlist_id: int
+
+    :param profile: The name of the loading profile, None for lazy loading
+    :type profile: str
+
+    :return: results - Track id, track name, album title and artist name of every track, None if the arguments were
+                       invalid or nothing was found
+    :rtype: list
+    """
+    try:
+        LOGGER.info("Performing Read Operation")
+
+        playlist = _load_one(session, models.PlaylistTable.play_list_id, playlist_id, profile)
+
+        results = [(track.track_id, track.name, track.album.title if track.album else None,
+                    track.album.artist.name if track.album else None)
+                   for track in sorted(playlist.tracks_in_playlist, key=lambda track: track.track_id)]
+
+        _log_table("The Tracks of the Playlist: %s" % playlist.name, results,
+                   ["Track ID", "Track Name", "Album", "Artist"])
+
+        return results
+    except AttributeError as err:
+        LOGGER.error(err)
+    except NoResultFound as err:
+        LOGGER.error(err)
+    finally:
+        session.close()
+
+
+def get_employee_team(session, employee_id, profile="employee_team"):
+    """
+    Function to perform read operation with the database to Find the Employees Reporting to an Employee, up to
+    TEAM_LEVELS levels below them
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param employee_id: The id of the employee
+    :type employee_id: int
+
+    :param profile: The name of the loading profile, None for lazy loading
+    :type profile: str
+
+    :return: results - Level, employee id, employee name, title and manager id of every employee below, None if the
+                       arguments were invalid or nothing was found
+    :rtype: list
+    """
+    try:
+        LOGGER.info("Performing Read Operation")
+
+        employee = _load_one(session, models.EmployeeTable.employee_id, employee_id, profile)
+
+        results = []
+        level, managers = 1, [employee]
+
+        # Walking the hierarchy a level at a time, each level loaded with one statement by the profile
+        while managers and level <= TEAM_LEVELS:
+            reports = [report for manager in managers
+                       for report in sorted(manager.manages, key=lambda report: report.employee_id)]
+
+            results.extend((level, report.employee_id, report.first_name + " " + report.last_name, report.title,
+                            report.reports_to) for report in reports)
+
+            level, managers = level + 1, reports
+
+        _log_table("The Team of the Employee: %s %s" % (employee.first_name, employee.last_name), results,
+                   ["Level", "Employee ID", "Employee Name", "Title", "Manager ID"])
+
+        return results
+    except AttributeError as err:
+        LOGGER.error(err)
+    except NoResultFound as err:
+        LOGGER.error(err)
+    finally:
+        session.close()
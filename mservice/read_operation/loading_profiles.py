@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Relationship Loading Profiles
+=================================
+
+Module naming the chains of eager loaders a traversal of the relationships needs, so a code path walking an artist's
+catalog or a customer's invoices loads every level with one statement, instead of the one statement per parent of the
+lazy loading every relationship defaults to
+
+Collections are loaded with selectinload, one SELECT ... WHERE parent IN (...) per level, and the many to one
+relationships hanging off them with joinedload, in the statement of their collection
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following
+    * LOADING_PROFILES - The names of the profiles, to the function building their loader options
+    * get_loading_options - Function to get the loader options of a profile
+"""
+# Standard Imports
+import logging
+from collections import OrderedDict
+
+# External imports
+from sqlalchemy.orm import joinedload, selectinload
+
+# User Imports
+import mservice.database_model as models
+
+LOGGER = logging.getLogger(__name__)
+
+# The number of levels below an employee the employee_team profile loads
+TEAM_LEVELS = 3
+
+
+def _artist_catalog():
+    """
+    Function to build the loader options of an artist with its albums, their tracks, and the genre and media type of
+    every track
+
+    :return: options
+    :rtype: list
+    """
+    return [selectinload(models.ArtistTable.albums).selectinload(models.AlbumTable.tracks).
+            options(joinedload(models.TracksTable.genre), joinedload(models.TracksTable.media_type))]
+
+
+def _customer_history():
+    """
+    Function to build the loader options of a customer with its support rep, its invoices, their lines and the track of
+    every line
+
+    :return: options
+    :rtype: list
+    """
+    return [joinedload(models.CustomerTable.support_rep),
+            selectinload(models.CustomerTable.invoices).selectinload(models.InvoiceTable.track_associations).
+            joinedload(models.InvoiceLineTable.track)]
+
+
+def _playlist_tracks():
+    """
+    Function to build the loader options of a playlist with its tracks, and the album and artist of every track
+
+    :return: options
+    :rtype: list
+    """
+    return [selectinload(models.PlaylistTable.tracks_in_playlist).joinedload(models.TracksTable.album).
+            joinedload(models.AlbumTable.artist)]
+
+
+def _employee_team():
+    """
+    Function to build the loader options of an employee with the employees reporting to them, TEAM_LEVELS levels down
+
+    :return: options
+    :rtype: list
+    """
+    loader = selectinload(models.EmployeeTable.manages)
+
+    for _ in range(TEAM_LEVELS - 1):
+        loader = loader.selectinload(models.EmployeeTable.manages)
+
+    return [loader]
+
+
+LOADING_PROFILES = OrderedDict([
+    ("artist_catalog", _artist_catalog),
+    ("customer_history", _customer_history),
+    ("playlist_tracks", _playlist_tracks),
+    ("employee_team", _employee_team),
+])
+
+
+def get_loading_options(profile):
+    """
+    Function to get the loader options of a profile, to be given to the options of a statement or query
+
+    :param profile: The name of the profile, None for the default lazy loading
+    :type profile: str
+
+    :return: options
+    :rtype: list
+    """
+    if profile is None:
+        return []
+
+    if profile not in LOADING_PROFILES:
+        raise AttributeError("loading profile should be one of %s" % ", ".join(LOADING_PROFILES))
+
+    return LOADING_PROFILES[profile]()
@@ -9,7 +9,8 @@ This script requires the following modules be installed in the python environmen
     * logging - to perform logging operations
 
 This script contains the following function
-    * perform_read_join - Function to perform read operation with the database using inner joins
+    * perform_read_join - Function to perform read operation with the database using inner joins, or a scan of the
+                          invoice fact table
 """
 # Standard Imports
 import logging
@@ -26,7 +27,62 @@ import mservice.database_model as models
 LOGGER = logging.getLogger(__name__)
 
 
-def perform_read_join(session, records):
+def _build_join_query(session):
+    """
+    Function to build the query of the invoice records, joining the invoice, customer, invoiceline, employee and track
+    tables
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :return: query
+    :rtype: :class:`sqlalchemy.orm.Query`
+    """
+    # Selecting the Invoice Id, Customer Id, Invoice Date, Invoice Total, Customer Name, Employee Name,
+    # Employee Title, Track Name
+    query = session.query(models.InvoiceTable.invoice_id, models.InvoiceTable.customer_id,
+                          models.InvoiceTable.invoice_date, models.InvoiceTable.total,
+                          models.CustomerTable.first_name,
+                          models.EmployeeTable.first_name.label("Employee_Name"), models.EmployeeTable.title,
+                          models.TracksTable.name)
+
+    # Joining Invoice Table, Customer Table, Invoice Line, Employee, Tracks Table
+    query = query.join(models.CustomerTable, models.InvoiceTable.customer_id == models.CustomerTable.customer_id)
+    query = query.join(models.InvoiceLineTable,
+                       models.InvoiceTable.invoice_id == models.InvoiceLineTable.invoice_id)
+    query = query.join(models.EmployeeTable,
+                       models.CustomerTable.support_rep_id == models.EmployeeTable.employee_id)
+    query = query.join(models.TracksTable, models.InvoiceLineTable.track_id == models.TracksTable.track_id)
+
+    # Sorting by Invoice Id, and by Invoice Line Id within an invoice
+    return query.order_by(models.InvoiceTable.invoice_id, models.InvoiceLineTable.invoice_line_id)
+
+
+def _build_fact_query(session):
+    """
+    Function to build the query of the invoice records, scanning the invoice fact table. The lines of the customers
+    without a support rep are left out, as the join leaves them out
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :return: query
+    :rtype: :class:`sqlalchemy.orm.Query`
+    """
+    fact = models.InvoiceFactTable
+
+    # Selecting the columns of the join, all of them held by the ix_invoicefact_read_lines index in the order sorted
+    query = session.query(fact.invoice_id, fact.customer_id, fact.invoice_date, fact.invoice_total,
+                          fact.customer_first_name, fact.support_rep_first_name.label("Employee_Name"),
+                          fact.support_rep_title, fact.track_name)
+
+    query = query.filter(fact.support_rep_id.isnot(None))
+
+    # Sorting by Invoice Id, and by Invoice Line Id within an invoice, as the join does
+    return query.order_by(fact.invoice_id, fact.invoice_line_id)
+
+
+def perform_read_join(session, records, from_fact_table=False):
     """
     Function to perform read operation with the database
 
@@ -36,6 +92,9 @@ def perform_read_join(session, records):
     :param records: The number of records to return from the query
     :type records: int
 
+    :param from_fact_table: Whether to scan the invoice fact table, refreshed by the caller, instead of joining
+    :type from_fact_table: bool
+
     :return: Nothing
     :rtype: None
     """
@@ -49,24 +108,10 @@ def perform_read_join(session, records):
 
         LOGGER.info("Performing Read Operation")
 
-        # Selecting the Invoice Id, Customer Id, Invoice Date, Invoice Total, Customer Name, Employee Name,
-        # Employee Title, Track Name
-        query = session.query(models.InvoiceTable.invoice_id, models.InvoiceTable.customer_id,
-                              models.InvoiceTable.invoice_date, models.InvoiceTable.total,
-                              models.CustomerTable.first_name,
-                              models.EmployeeTable.first_name.label("Employee_Name"), models.EmployeeTable.title,
-                              models.TracksTable.name)
-
-        # Joining Invoice Table, Customer Table, Invoice Line, Employee, Tracks Table
-        query = query.join(models.CustomerTable, models.InvoiceTable.customer_id == models.CustomerTable.customer_id)
-        query = query.join(models.InvoiceLineTable,
-                           models.InvoiceTable.invoice_id == models.InvoiceLineTable.invoice_id)
-        query = query.join(models.EmployeeTable,
-                           models.CustomerTable.support_rep_id == models.EmployeeTable.employee_id)
-        query = query.join(models.TracksTable, models.InvoiceLineTable.track_id == models.TracksTable.track_id)
-
-        # Sorting by Invoice Id
-        query = query.order_by(models.InvoiceTable.invoice_id)
+        if from_fact_table:
+            query = _build_fact_query(session)
+        else:
+            query = _build_join_query(session)
 
         results = query.limit(records).all()
 
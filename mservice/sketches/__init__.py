@@ -0,0 +1,12 @@
+# -*- coding: UTF-8 -*-
+"""
+Initialization For Sketches
+===============================
+
+This is an initialization module for the approximate distinct count sketches
+"""
+
+# Importing necessary modules and functions to be used by modules using this package
+from mservice.sketches.hyperloglog import DEFAULT_PRECISION, HyperLogLog, standard_error
+from mservice.sketches.distinct_sketches import DISTINCT_REPORTS, DistinctSketches, open_shared_sketches
+from mservice.sketches.heavy_hitters import SpaceSaving, TrackHeavyHitters
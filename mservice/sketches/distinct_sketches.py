@@ -0,0 +1,556 @@
+# -*- coding: utf-8 -*-
+"""
+Distinct Count Sketches of the Reports
+==========================================
+
+Module for answering the distinct count reports approximately from HyperLogLog sketches, instead of the DISTINCT
+aggregates whose sorts or hashes spill at scale: Q4 the distinct invoices of every album, Q9 the distinct playlists of
+every album and Q13 the distinct genres of every artist. Every report keeps one sketch per album or artist. A sketch
+starts sparse, as the sorted 64 bit hashes of its values, which count exactly, and becomes a dense row of a register
+matrix once its hashes would take more bytes than the registers, so the many albums and artists with a few values
+each do not take 2 ** precision bytes each
+
+The sketches are built in one streaming pass over the album, track, invoiceline and playlisttrack tables, saved
+compressed to a single file and opened again without the database, once per process by open_shared_sketches, which
+the reports answered approximately are given rather than building sketches of their own. Attached to a session
+factory, they are updated incrementally with the rows every committed flush inserts. Rows written with bulk inserts or
+Core statements, updated or deleted are not seen, sketches only growing, so they should be rebuilt from time to time,
+with main_build_sketches
+
+The estimates of the dense sketches follow the error bound of :mod:`mservice.sketches.hyperloglog`. Ties are broken by
+ascending id
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * threading - to guard the sketches updated from several sessions
+    * numpy - to hold the registers
+
+This script contains the following
+    * DISTINCT_REPORTS - The reports answered from the sketches and what they count
+    * DistinctSketches - class holding the sketches of the reports and answering them
+    * open_shared_sketches - Function to open saved sketches once per process and attach them to a session factory
+"""
+# Standard Imports
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+
+# External imports
+import numpy as np
+import sqlalchemy.orm
+from sqlalchemy import event, select
+
+# User Imports
+import mservice.database_model as models
+from mservice.sketches.hyperloglog import DEFAULT_PRECISION, HyperLogLog, check_precision, estimate_cardinality, \
+    hash_values, register_ranks
+
+LOGGER = logging.getLogger(__name__)
+
+# Report -> (the key the sketches are kept by, the values they count)
+DISTINCT_REPORTS = OrderedDict([
+    ("Q4", ("album", "invoice")),
+    ("Q9", ("album", "playlist")),
+    ("Q13", ("artist", "genre")),
+])
+
+# The number of rows taken from the stream at once
+SCAN_BATCH_SIZE = 10000
+
+# The key of the inserted rows waiting for the commit in the info of a session
+PENDING_KEY = "distinct_sketches_pending"
+
+# The bytes of a hash of a sparse sketch
+SPARSE_HASH_BYTES = 8
+
+# The path of the sketches opened by open_shared_sketches to the sketches, and the guard of their opening
+_SHARED_SKETCHES = {}
+_SHARED_LOCK = threading.Lock()
+
+
+class DistinctSketches:
+    """
+    Class holding the sketches of the distinct count reports, along with the album of every track and the artist of
+    every album needed to key the rows streamed or inserted
+
+    :ivar precision: The precision of every sketch
+    :vartype precision: int
+
+    :ivar keys: Per report, the album or artist id of the dense sketches to its row of registers
+    :vartype keys: dict
+
+    :ivar registers: Per report, the registers, one row per album or artist of a dense sketch
+    :vartype registers: dict
+
+    :ivar sparse: Per report, the album or artist id of the sparse sketches to the sorted hashes of its values
+    :vartype sparse: dict
+
+    :ivar sparse_limit: The number of hashes a sparse sketch holds at most, those of the bytes of the registers
+    :vartype sparse_limit: int
+
+    :ivar track_albums: Track id to its album id
+    :vartype track_albums: dict
+
+    :ivar album_artists: Album id to its artist id
+    :vartype album_artists: dict
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        """
+        Constructor of empty sketches
+
+        :param precision: The precision of every sketch
+        :type precision: int
+        """
+        check_precision(precision)
+
+        self.precision = precision
+        self.keys = {report: {} for report in DISTINCT_REPORTS}
+        self.registers = {report: np.zeros((0, 1 << precision), dtype=np.uint8) for report in DISTINCT_REPORTS}
+        self.sparse = {report: {} for report in DISTINCT_REPORTS}
+        self.sparse_limit = (1 << precision) // SPARSE_HASH_BYTES
+        self.track_albums = {}
+        self.album_artists = {}
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        """
+        The bytes held by the registers of the dense sketches and the hashes of the sparse ones
+        """
+        return sum(registers.nbytes for registers in self.registers.values()) + \
+            sum(hashes.nbytes for sparse in self.sparse.values() for hashes in sparse.values())
+
+    def _rows(self, report, keys):
+        """
+        Function to get the rows of registers of keys, adding rows for new keys and growing the matrix by doubling
+
+        :param report: The name of the report
+        :type report: str
+
+        :param keys: The album or artist ids
+        :type keys: list
+
+        :return: rows
+        :rtype: :class:`numpy.ndarray`
+        """
+        rows = self.keys[report]
+
+        for key in keys:
+            if key not in rows:
+                rows[key] = len(rows)
+
+        if len(rows) > len(self.registers[report]):
+            grown = np.zeros((max(len(rows), 2 * len(self.registers[report])), 1 << self.precision), dtype=np.uint8)
+            grown[:len(self.registers[report])] = self.registers[report]
+            self.registers[report] = grown
+
+        return np.fromiter((rows[key] for key in keys), dtype=np.intp, count=len(keys))
+
+    def _add_dense(self, report, keys, hashes):
+        """
+        Function to add hashes to the dense sketches of keys, adding rows for new keys
+
+        :param report: The name of the report
+        :type report: str
+
+        :param keys: The album or artist id of every hash
+        :type keys: list
+
+        :param hashes: The hashes of the values counted
+        :type hashes: :class:`numpy.ndarray`
+
+        :return: Nothing
+        :rtype: None
+        """
+        if not keys:
+            return
+
+        rows = self._rows(report, keys)
+        registers, ranks = register_ranks(hashes, self.precision)
+        np.maximum.at(self.registers[report], (rows, registers), ranks)
+
+    def _add(self, report, pairs):
+        """
+        Function to add (key, value) pairs to the sketches of a report, pairs with a None key or value being skipped.
+        The hashes of a sparse sketch are merged with the new ones, and moved to a dense row past the sparse limit
+
+        :param report: The name of the report
+        :type report: str
+
+        :param pairs: The album or artist id and the value counted
+        :type pairs: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        pairs = [(key, value) for key, value in pairs if key is not None and value is not None]
+
+        if not pairs:
+            return
+
+        keys = np.fromiter((key for key, _ in pairs), dtype=np.int64, count=len(pairs))
+        hashes = hash_values(np.fromiter((value for _, value in pairs), dtype=np.int64, count=len(pairs)))
+
+        # Grouping the hashes by key
+        order = np.argsort(keys, kind="stable")
+        keys, hashes = keys[order], hashes[order]
+        group_keys, starts = np.unique(keys, return_index=True)
+
+        dense = self.keys[report]
+        sparse = self.sparse[report]
+        dense_keys, dense_hashes = [], []
+
+        for key, group in zip(group_keys.tolist(), np.split(hashes, starts[1:])):
+            if key not in dense:
+                group = np.union1d(sparse.pop(key, group[:0]), group)
+
+                if len(group) <= self.sparse_limit:
+                    sparse[key] = group
+                    continue
+
+            dense_keys.extend([key] * len(group))
+            dense_hashes.append(group)
+
+        if dense_hashes:
+            self._add_dense(report, dense_keys, np.concatenate(dense_hashes))
+
+    def add_albums(self, rows):
+        """
+        Function to add (album id, artist id) rows
+
+        :param rows: The rows
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        self.album_artists.update(rows)
+
+    def add_tracks(self, rows):
+        """
+        Function to add (track id, album id, genre id) rows, counting the genre for the artist of the album
+
+        :param rows: The rows
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        self.track_albums.update((track_id, album_id) for track_id, album_id, _ in rows)
+        self._add("Q13", [(self.album_artists.get(album_id), genre_id) for _, album_id, genre_id in rows])
+
+    def add_invoice_lines(self, rows):
+        """
+        Function to add (invoice id, track id) rows, counting the invoice for the album of the track
+
+        :param rows: The rows
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        self._add("Q4", [(self.track_albums.get(track_id), invoice_id) for invoice_id, track_id in rows])
+
+    def add_playlist_tracks(self, rows):
+        """
+        Function to add (playlist id, track id) rows, counting the playlist for the album of the track
+
+        :param rows: The rows
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        self._add("Q9", [(self.track_albums.get(track_id), play_list_id) for play_list_id, track_id in rows])
+
+    @classmethod
+    def build(cls, session, precision=DEFAULT_PRECISION, batch_size=SCAN_BATCH_SIZE):
+        """
+        Function to build the sketches in one streaming pass over the album, track, invoiceline and playlisttrack
+        tables
+
+        :param session: The session to read the tables with
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :param precision: The precision of every sketch
+        :type precision: int
+
+        :param batch_size: The number of rows taken from the stream at once
+        :type batch_size: int
+
+        :return: sketches
+        :rtype: :class:`mservice.sketches.distinct_sketches.DistinctSketches`
+        """
+        if not issubclass(type(session), sqlalchemy.orm.session.Session):
+            raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+        sketches = cls(precision)
+
+        # Albums before tracks, and tracks before the rows keyed by their album
+        scans = [(sketches.add_albums, (models.AlbumTable.album_id, models.AlbumTable.artist_id)),
+                 (sketches.add_tracks, (models.TracksTable.track_id, models.TracksTable.album_id,
+                                        models.TracksTable.genre_id)),
+                 (sketches.add_invoice_lines, (models.InvoiceLineTable.invoice_id, models.InvoiceLineTable.track_id)),
+                 (sketches.add_playlist_tracks, (models.PlaylistTrackTable.play_list_id,
+                                                 models.PlaylistTrackTable.track_id))]
+
+        # Streaming the rows rather than buffering them, where the driver supports it
+        connection = session.connection().execution_options(stream_results=True, future_result=True)
+
+        for add_rows, columns in scans:
+            for rows in connection.execute(select(*columns)).partitions(batch_size):
+                add_rows(rows)
+
+        LOGGER.info("Built the sketches of %s, holding %s bytes", ", ".join(DISTINCT_REPORTS), sketches.nbytes)
+        return sketches
+
+    def estimates(self, report):
+        """
+        Function to estimate the distinct count of every album or artist of a report, the count of a sparse sketch being
+        the number of its hashes
+
+        :param report: The name of the report
+        :type report: str
+
+        :return: estimates - Album or artist id to its estimated count
+        :rtype: dict
+        """
+        keys = self.keys[report]
+        estimates = {key: len(hashes) for key, hashes in self.sparse[report].items()}
+
+        if keys:
+            dense_estimates = estimate_cardinality(self.registers[report][:len(keys)])
+            estimates.update((key, int(round(dense_estimates[row]))) for key, row in keys.items())
+
+        return estimates
+
+    def sketch(self, report, key):
+        """
+        Function to get a copy of the sketch of an album or artist, to merge with others
+
+        :param report: The name of the report
+        :type report: str
+
+        :param key: The album or artist id
+        :type key: int
+
+        :return: sketch
+        :rtype: :class:`mservice.sketches.hyperloglog.HyperLogLog`
+        """
+        if key in self.keys[report]:
+            return HyperLogLog(self.precision, self.registers[report][self.keys[report][key]])
+
+        sketch = HyperLogLog(self.precision)
+
+        if key in self.sparse[report]:
+            registers, ranks = register_ranks(self.sparse[report][key], self.precision)
+            np.maximum.at(sketch.registers, registers, ranks)
+
+        return sketch
+
+    def top_rows(self, session, report, number):
+        """
+        Function to answer a report from the sketches, as the rows of the matching SQL report with estimated counts
+
+        :param session: The session to read the album titles or artist names with
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :param report: The name of the report, "Q4", "Q9" or "Q13"
+        :type report: str
+
+        :param number: The number of rows
+        :type number: int
+
+        :return: rows - (album or artist id, title or name, estimated count) rows
+        :rtype: list
+        """
+        if report not in DISTINCT_REPORTS:
+            raise AttributeError("report should be one of %s" % ", ".join(DISTINCT_REPORTS))
+
+        if DISTINCT_REPORTS[report][0] == "album":
+            names = dict(session.execute(select(models.AlbumTable.album_id, models.AlbumTable.title)).all())
+        else:
+            names = dict(session.execute(select(models.ArtistTable.artist_id, models.ArtistTable.name)).all())
+
+        with self._lock:
+            estimates = self.estimates(report)
+
+        top = heapq.nsmallest(number, ((-count, key) for key, count in estimates.items() if key in names and count))
+        return [(key, names[key], -count) for count, key in top]
+
+    def save(self, path):
+        """
+        Function to save the sketches compressed to a single file
+
+        :param path: The path of the file, ".npz" being appended if missing
+        :type path: str
+
+        :return: Nothing
+        :rtype: None
+        """
+        arrays = {"precision": np.array([self.precision]),
+                  "track_albums": np.array(list(self.track_albums.items()), dtype=np.int64).reshape(-1, 2),
+                  "album_artists": np.array(list(self.album_artists.items()), dtype=np.int64).reshape(-1, 2)}
+
+        with self._lock:
+            for report, keys in self.keys.items():
+                sparse = self.sparse[report]
+                arrays[report + ".keys"] = np.array(list(keys), dtype=np.int64)
+                arrays[report + ".registers"] = self.registers[report][:len(keys)]
+                arrays[report + ".sparse_keys"] = np.array(list(sparse), dtype=np.int64)
+                arrays[report + ".sparse_lengths"] = np.array([len(hashes) for hashes in sparse.values()],
+                                                              dtype=np.int64)
+                arrays[report + ".sparse_hashes"] = np.concatenate([np.zeros(0, dtype=np.uint64)] +
+                                                                   list(sparse.values()))
+
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Function to open sketches saved with save, the files saved before the sparse sketches holding only dense ones
+
+        :param path: The path of the file
+        :type path: str
+
+        :return: sketches
+        :rtype: :class:`mservice.sketches.distinct_sketches.DistinctSketches`
+        """
+        with np.load(path) as arrays:
+            sketches = cls(int(arrays["precision"][0]))
+            sketches.track_albums = {int(track_id): int(album_id) for track_id, album_id in arrays["track_albums"]}
+            sketches.album_artists = {int(album_id): int(artist_id) for album_id, artist_id in arrays["album_artists"]}
+
+            for report in DISTINCT_REPORTS:
+                sketches.keys[report] = {int(key): row for row, key in enumerate(arrays[report + ".keys"])}
+                sketches.registers[report] = np.array(arrays[report + ".registers"])
+
+                if report + ".sparse_keys" in arrays:
+                    lengths = arrays[report + ".sparse_lengths"]
+                    sketches.sparse[report] = dict(zip(arrays[report + ".sparse_keys"].tolist(),
+                                                       np.split(arrays[report + ".sparse_hashes"],
+                                                                np.cumsum(lengths)[:-1])))
+
+        return sketches
+
+    def _collect_inserts(self, session, flush_context):
+        """
+        Function listening to the flushes of a session, keeping the keys and values of the rows inserted until the
+        transaction commits
+
+        :param session: The session flushed
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :param flush_context: The context of the flush
+        :type flush_context: :class:`sqlalchemy.orm.unitofwork.UOWTransaction`
+
+        :return: Nothing
+        :rtype: None
+        """
+        pending = session.info.setdefault(PENDING_KEY, {"albums": [], "tracks": [], "lines": [], "playlists": []})
+
+        for instance in session.new:
+            if issubclass(type(instance), models.AlbumTable):
+                pending["albums"].append((instance.album_id, instance.artist_id))
+            elif issubclass(type(instance), models.TracksTable):
+                pending["tracks"].append((instance.track_id, instance.album_id, instance.genre_id))
+            elif issubclass(type(instance), models.InvoiceLineTable):
+                pending["lines"].append((instance.invoice_id, instance.track_id))
+            elif issubclass(type(instance), models.PlaylistTrackTable):
+                pending["playlists"].append((instance.play_list_id, instance.track_id))
+
+    def _apply_inserts(self, session):
+        """
+        Function listening to the commits of a session, adding the rows it inserted to the sketches
+
+        :param session: The session committed
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :return: Nothing
+        :rtype: None
+        """
+        pending = session.info.pop(PENDING_KEY, None)
+
+        if pending is None:
+            return
+
+        with self._lock:
+            self.add_albums(pending["albums"])
+            self.add_tracks(pending["tracks"])
+            self.add_invoice_lines(pending["lines"])
+            self.add_playlist_tracks(pending["playlists"])
+
+    @staticmethod
+    def _discard_inserts(session):
+        """
+        Function listening to the rollbacks of a session, dropping the rows it inserted
+
+        :param session: The session rolled back
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :return: Nothing
+        :rtype: None
+        """
+        session.info.pop(PENDING_KEY, None)
+
+    def attach(self, session_factory):
+        """
+        Function to update the sketches with the rows inserted by the sessions of a factory, once committed
+
+        :param session_factory: The session factory
+        :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+        :return: Nothing
+        :rtype: None
+        """
+        if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+            raise AttributeError("Session Maker not passed properly, correct type "
+                                 "'sqlalchemy.orm.session.sessionmaker' ")
+
+        event.listen(session_factory, "after_flush", self._collect_inserts)
+        event.listen(session_factory, "after_commit", self._apply_inserts)
+        event.listen(session_factory, "after_rollback", self._discard_inserts)
+
+    def detach(self, session_factory):
+        """
+        Function to stop updating the sketches with the rows inserted by the sessions of a factory
+
+        :param session_factory: The session factory given to attach
+        :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+        :return: Nothing
+        :rtype: None
+        """
+        event.remove(session_factory, "after_flush", self._collect_inserts)
+        event.remove(session_factory, "after_commit", self._apply_inserts)
+        event.remove(session_factory, "after_rollback", self._discard_inserts)
+
+
+def open_shared_sketches(path, session_factory=None):
+    """
+    Function to open the sketches saved at a path once per process, every later call getting the same sketches, and
+    to attach them to a session factory the first time it is given, so they follow the rows its sessions insert
+
+    :param path: The path of the file saved with save
+    :type path: str
+
+    :param session_factory: The session factory to attach the sketches to, if any
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :return: sketches
+    :rtype: :class:`mservice.sketches.distinct_sketches.DistinctSketches`
+    """
+    with _SHARED_LOCK:
+        if path not in _SHARED_SKETCHES:
+            _SHARED_SKETCHES[path] = DistinctSketches.open(path)
+            LOGGER.info("Opened the sketches at %s, holding %s bytes", path, _SHARED_SKETCHES[path].nbytes)
+
+        sketches = _SHARED_SKETCHES[path]
+
+        if session_factory is not None and \
+                not event.contains(session_factory, "after_commit", sketches._apply_inserts):
+            sketches.attach(session_factory)
+
+    return sketches
@@ -0,0 +1,524 @@
+# -*- coding: utf-8 -*-
+"""
+Heavy Hitter Tracks
+=======================
+
+Module for keeping the best selling tracks, overall and in every genre, from the stream of invoice lines instead of
+counting the whole invoiceline table for every Q5. Every ranking is a Space-Saving summary of a bounded number of
+counters: a track already counted gets its counter incremented, a new track takes the counter of the least counted
+track when all of them are in use, starting from its count, which it remembers as its possible overcount
+
+With c counters over a stream of n invoice lines, every track bought more than n / c times holds a counter, and the
+count of a track is at most n / c above its true count, the overcount being kept with every counter. The summaries
+hold at most c counters per genre and c global counters whatever the size of the stream, and answer at once
+
+The invoice lines are read by replaying the invoiceline table from the watermark of the lines consumed, and, attached
+to a session factory, from every committed flush, whose lines have their created_on read back in one statement. Rows
+written with bulk inserts, such as by the purchase buffer, are fed with add_invoice_lines, with their created_on where
+known, the ids of the lines fed without it being kept until the next replay. A replay reads the lines inserted from an
+overlap before the latest created_on consumed, rather than the lines above the highest id consumed, as ids do not commit
+in their order, and skips the lines already counted. A checkpoint saves the summaries and the watermark to a single
+file, so a process restarts from it rather than from the whole table
+
+This script requires the following modules be installed in the python environment
+    * heapq - to find the least counted track
+    * logging - to perform logging operations
+    * threading - to guard the summaries updated from several sessions
+    * numpy - to write the checkpoints
+
+This script contains the following
+    * SpaceSaving - class holding the counters of one ranking
+    * TrackHeavyHitters - class holding the global and per genre rankings of the tracks
+"""
+# Standard Imports
+import heapq
+import logging
+import threading
+from collections import defaultdict
+
+# External imports
+import numpy as np
+import sqlalchemy.orm
+from sqlalchemy import event, select
+
+# User Imports
+import mservice.database_model as models
+from mservice.database_model.insert_watermark import InsertWatermark
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 100
+
+# The number of rows taken from the stream at once
+SCAN_BATCH_SIZE = 10000
+
+# The key of the inserted rows waiting for the commit in the info of a session
+PENDING_KEY = "heavy_hitters_pending"
+
+# The number of invoice line ids per statement reading back the created_on of the lines of a flush
+CREATED_ON_BATCH_SIZE = 500
+
+# The version of the layout of the checkpoints, checkpoints of another version are replayed again
+FILE_FORMAT = 2
+
+
+class SpaceSaving:
+    """
+    Class holding the counters of one Space-Saving ranking
+
+    :ivar capacity: The number of counters
+    :vartype capacity: int
+
+    :ivar counters: Key to its [count, overcount]
+    :vartype counters: dict
+
+    :ivar total: The number of items counted
+    :vartype total: int
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Constructor of an empty ranking
+
+        :param capacity: The number of counters
+        :type capacity: int
+        """
+        if not issubclass(type(capacity), int) or capacity < 1:
+            raise AttributeError("capacity should be integer and greater than 0")
+
+        self.capacity = capacity
+        self.counters = {}
+        self.total = 0
+
+        # (count, key) entries, the ones whose count is no longer that of the key being skipped when popped
+        self._heap = []
+
+    def _push(self, key):
+        """
+        Function to record the new count of a key in the heap, rebuilding the heap once its stale entries pile up
+
+        :param key: The key counted
+        :type key: int
+
+        :return: Nothing
+        :rtype: None
+        """
+        heapq.heappush(self._heap, (self.counters[key][0], key))
+
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, (count, _) in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def offer(self, key, count=1):
+        """
+        Function to count an item
+
+        :param key: The item
+        :type key: int
+
+        :param count: The number of times it was seen
+        :type count: int
+
+        :return: Nothing
+        :rtype: None
+        """
+        self.total += count
+
+        if key in self.counters:
+            self.counters[key][0] += count
+        elif len(self.counters) < self.capacity:
+            self.counters[key] = [count, 0]
+        else:
+            while self._heap[0][1] not in self.counters or self.counters[self._heap[0][1]][0] != self._heap[0][0]:
+                heapq.heappop(self._heap)
+
+            least, evicted = heapq.heappop(self._heap)
+            del self.counters[evicted]
+            self.counters[key] = [least + count, least]
+
+        self._push(key)
+
+    def top(self, number):
+        """
+        Function to get the most counted items, ties broken by ascending key
+
+        :param number: The number of items
+        :type number: int
+
+        :return: top - (key, count, overcount) rows
+        :rtype: list
+        """
+        return [(key, -count, overcount) for count, key, overcount in
+                heapq.nsmallest(number, ((-count, key, overcount) for key, (count, overcount) in
+                                         self.counters.items()))]
+
+    def to_arrays(self):
+        """
+        Function to get the counters as arrays, for a checkpoint
+
+        :return: keys, counts, overcounts
+        :rtype: tuple
+        """
+        keys = np.array(list(self.counters), dtype=np.int64)
+        counts = np.array([counter[0] for counter in self.counters.values()], dtype=np.int64)
+        overcounts = np.array([counter[1] for counter in self.counters.values()], dtype=np.int64)
+        return keys, counts, overcounts
+
+    @classmethod
+    def from_arrays(cls, capacity, total, keys, counts, overcounts):
+        """
+        Function to restore a ranking from its arrays
+
+        :param capacity: The number of counters
+        :type capacity: int
+
+        :param total: The number of items counted
+        :type total: int
+
+        :param keys: The keys of the counters
+        :type keys: :class:`numpy.ndarray`
+
+        :param counts: Their counts
+        :type counts: :class:`numpy.ndarray`
+
+        :param overcounts: Their overcounts
+        :type overcounts: :class:`numpy.ndarray`
+
+        :return: ranking
+        :rtype: :class:`mservice.sketches.heavy_hitters.SpaceSaving`
+        """
+        ranking = cls(capacity)
+        ranking.total = total
+        ranking.counters = {int(key): [int(count), int(overcount)]
+                            for key, count, overcount in zip(keys, counts, overcounts)}
+        ranking._heap = [(count, key) for key, (count, _) in ranking.counters.items()]
+        heapq.heapify(ranking._heap)
+        return ranking
+
+
+class TrackHeavyHitters:
+    """
+    Class holding the best selling tracks overall and in every genre, counted from the invoice lines
+
+    :ivar capacity: The number of counters of every ranking
+    :vartype capacity: int
+
+    :ivar tracks: The global ranking of the tracks
+    :vartype tracks: :class:`mservice.sketches.heavy_hitters.SpaceSaving`
+
+    :ivar genres: Genre id to the ranking of its tracks
+    :vartype genres: dict
+
+    :ivar track_genres: Track id to its genre id, None for tracks without a genre
+    :vartype track_genres: dict
+
+    :ivar watermark: The watermark of the invoice lines consumed
+    :vartype watermark: :class:`mservice.database_model.insert_watermark.InsertWatermark`
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Constructor of empty rankings
+
+        :param capacity: The number of counters of every ranking
+        :type capacity: int
+        """
+        self.capacity = capacity
+        self.tracks = SpaceSaving(capacity)
+        self.genres = {}
+        self.track_genres = {}
+        self.watermark = InsertWatermark()
+        self._lock = threading.Lock()
+
+    def add_tracks(self, rows):
+        """
+        Function to add (track id, genre id) rows, giving the genre the lines of a track are counted in
+
+        :param rows: The rows
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        with self._lock:
+            self.track_genres.update(rows)
+
+    def add_invoice_lines(self, rows):
+        """
+        Function to count (invoice line id, track id) or (invoice line id, track id, created on) rows, in the global
+        ranking and in the ranking of the genre of the track, the lines counted already being skipped. Tracks without a
+        genre, or not added yet, are only counted globally
+
+        :param rows: The rows
+        :type rows: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        with self._lock:
+            for row in rows:
+                invoice_line_id, track_id = row[0], row[1]
+
+                if not self.watermark.consume(invoice_line_id, row[2] if len(row) > 2 else None):
+                    continue
+
+                self.tracks.offer(track_id)
+                genre_id = self.track_genres.get(track_id)
+
+                if genre_id is not None:
+                    if genre_id not in self.genres:
+                        self.genres[genre_id] = SpaceSaving(self.capacity)
+
+                    self.genres[genre_id].offer(track_id)
+
+            self.watermark.prune()
+
+    def replay(self, session, batch_size=SCAN_BATCH_SIZE):
+        """
+        Function to consume the invoice lines inserted since the watermark, in one streaming pass in the order of their
+        insert, after reading the genre of every track
+
+        :param session: The session to read the tables with
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :param batch_size: The number of rows taken from the stream at once
+        :type batch_size: int
+
+        :return: lines - The number of invoice lines read, those counted already included
+        :rtype: int
+        """
+        if not issubclass(type(session), sqlalchemy.orm.session.Session):
+            raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+        self.add_tracks(session.execute(select(models.TracksTable.track_id, models.TracksTable.genre_id)).all())
+
+        # Streaming the rows rather than buffering them, where the driver supports it
+        connection = session.connection().execution_options(stream_results=True, future_result=True)
+        statement = select(models.InvoiceLineTable.invoice_line_id, models.InvoiceLineTable.track_id,
+                           models.InvoiceLineTable.created_on).\
+            order_by(models.InvoiceLineTable.created_on, models.InvoiceLineTable.invoice_line_id)
+
+        with self._lock:
+            unknown_keys = self.watermark.unknown_keys()
+            lower_bound = self.watermark.lower_bound
+
+        if lower_bound is not None:
+            statement = statement.where(models.InvoiceLineTable.created_on >= lower_bound)
+
+        lines = 0
+
+        for rows in connection.execute(statement).partitions(batch_size):
+            self.add_invoice_lines(rows)
+            lines += len(rows)
+
+        # The lines fed without their created_on before the replay and not read by it are not in the table anymore
+        with self._lock:
+            self.watermark.settle(unknown_keys)
+
+        LOGGER.info("Replayed %s invoice lines up to %s", lines, self.watermark.latest)
+        return lines
+
+    def top_tracks(self, number):
+        """
+        Function to get the best selling tracks overall
+
+        :param number: The number of tracks
+        :type number: int
+
+        :return: top - (track id, count, overcount) rows
+        :rtype: list
+        """
+        with self._lock:
+            return self.tracks.top(number)
+
+    def top_tracks_for_genre(self, number):
+        """
+        Function to get the best selling tracks of every genre
+
+        :param number: The number of tracks per genre
+        :type number: int
+
+        :return: top - Genre id to its (track id, count, overcount) rows
+        :rtype: dict
+        """
+        with self._lock:
+            return {genre_id: self.genres[genre_id].top(number) for genre_id in sorted(self.genres)}
+
+    def top_rows(self, session, number):
+        """
+        Function to answer Q5 from the rankings, as the rows of the SQL report with the counts of the rankings
+
+        :param session: The session to read the track and genre names with
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :param number: The number of tracks per genre
+        :type number: int
+
+        :return: rows - (track id, track name, genre id, genre name, number of purchases) rows
+        :rtype: list
+        """
+        top = self.top_tracks_for_genre(number)
+        track_ids = [track_id for rows in top.values() for track_id, _, _ in rows]
+
+        genre_names = dict(session.execute(select(models.GenreTable.genre_id, models.GenreTable.name)).all())
+        track_names = dict(session.execute(select(models.TracksTable.track_id, models.TracksTable.name).
+                                           where(models.TracksTable.track_id.in_(track_ids))).all()) \
+            if track_ids else {}
+
+        return [(track_id, track_names[track_id], genre_id, genre_names[genre_id], count)
+                for genre_id, rows in top.items() if genre_id in genre_names
+                for track_id, count, _ in rows if track_id in track_names]
+
+    def save(self, path):
+        """
+        Function to checkpoint the rankings and the watermark of the invoice lines consumed to a single file
+
+        :param path: The path of the file, ".npz" being appended if missing
+        :type path: str
+
+        :return: Nothing
+        :rtype: None
+        """
+        with self._lock:
+            arrays = {"state": np.array([self.capacity, self.tracks.total, FILE_FORMAT], dtype=np.int64),
+                      "track_genres": np.array([(track_id, genre_id) for track_id, genre_id in
+                                                self.track_genres.items() if genre_id is not None],
+                                               dtype=np.int64).reshape(-1, 2),
+                      "genres": np.array([(genre_id, ranking.total) for genre_id, ranking in self.genres.items()],
+                                         dtype=np.int64).reshape(-1, 2)}
+            arrays["watermark.latest"], arrays["watermark.keys"], arrays["watermark.created_ons"] = \
+                self.watermark.to_arrays()
+
+            for name, ranking in [("tracks", self.tracks)] + [("genre.%s" % genre_id, ranking)
+                                                              for genre_id, ranking in self.genres.items()]:
+                arrays[name + ".keys"], arrays[name + ".counts"], arrays[name + ".overcounts"] = ranking.to_arrays()
+
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Function to restore rankings from a checkpoint written with save
+
+        :param path: The path of the file
+        :type path: str
+
+        :return: heavy_hitters
+        :rtype: :class:`mservice.sketches.heavy_hitters.TrackHeavyHitters`
+        """
+        with np.load(path) as arrays:
+            if "watermark.latest" not in arrays or int(arrays["state"][2]) != FILE_FORMAT:
+                raise AttributeError("the checkpoint at %s was saved with another layout, the lines should be replayed "
+                                     "again" % path)
+
+            capacity, total = (int(value) for value in arrays["state"][:2])
+            heavy_hitters = cls(capacity)
+            heavy_hitters.watermark = InsertWatermark.from_arrays(arrays["watermark.latest"], arrays["watermark.keys"],
+                                                                  arrays["watermark.created_ons"])
+            heavy_hitters.track_genres = {int(track_id): int(genre_id) for track_id, genre_id in arrays["track_genres"]}
+            heavy_hitters.tracks = SpaceSaving.from_arrays(capacity, total, arrays["tracks.keys"],
+                                                           arrays["tracks.counts"], arrays["tracks.overcounts"])
+
+            for genre_id, genre_total in arrays["genres"]:
+                name = "genre.%s" % genre_id
+                heavy_hitters.genres[int(genre_id)] = SpaceSaving.from_arrays(
+                    capacity, int(genre_total), arrays[name + ".keys"], arrays[name + ".counts"],
+                    arrays[name + ".overcounts"])
+
+        return heavy_hitters
+
+    @staticmethod
+    def _collect_inserts(session, flush_context):
+        """
+        Function listening to the flushes of a session, keeping the tracks and invoice lines inserted until the
+        transaction commits
+
+        :param session: The session flushed
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :param flush_context: The context of the flush
+        :type flush_context: :class:`sqlalchemy.orm.unitofwork.UOWTransaction`
+
+        :return: Nothing
+        :rtype: None
+        """
+        pending = session.info.setdefault(PENDING_KEY, defaultdict(list))
+        lines = {}
+
+        for instance in session.new:
+            if issubclass(type(instance), models.TracksTable):
+                pending["tracks"].append((instance.track_id, instance.genre_id))
+            elif issubclass(type(instance), models.InvoiceLineTable):
+                lines[instance.invoice_line_id] = instance.track_id
+
+        # The created_on of the lines is set by the database, it is read back so the watermark can prune their ids
+        line_ids = list(lines)
+        line = models.InvoiceLineTable
+
+        for start in range(0, len(line_ids), CREATED_ON_BATCH_SIZE):
+            batch = line_ids[start:start + CREATED_ON_BATCH_SIZE]
+            created_ons = session.execute(select(line.invoice_line_id, line.created_on).
+                                          where(line.invoice_line_id.in_(batch))).all()
+            pending["lines"].extend((invoice_line_id, lines[invoice_line_id], created_on)
+                                    for invoice_line_id, created_on in created_ons)
+
+    def _apply_inserts(self, session):
+        """
+        Function listening to the commits of a session, counting the invoice lines it inserted
+
+        :param session: The session committed
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :return: Nothing
+        :rtype: None
+        """
+        pending = session.info.pop(PENDING_KEY, None)
+
+        if pending is not None:
+            self.add_tracks(pending["tracks"])
+            self.add_invoice_lines(pending["lines"])
+
+    @staticmethod
+    def _discard_inserts(session):
+        """
+        Function listening to the rollbacks of a session, dropping the rows it inserted
+
+        :param session: The session rolled back
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :return: Nothing
+        :rtype: None
+        """
+        session.info.pop(PENDING_KEY, None)
+
+    def attach(self, session_factory):
+        """
+        Function to count the invoice lines inserted by the sessions of a factory, once committed
+
+        :param session_factory: The session factory
+        :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+        :return: Nothing
+        :rtype: None
+        """
+        if not issubclass(type(session_factory), sqlalchemy.orm.session.sessionmaker):
+            raise AttributeError("Session Maker not passed properly, correct type "
+                                 "'sqlalchemy.orm.session.sessionmaker' ")
+
+        event.listen(session_factory, "after_flush", self._collect_inserts)
+        event.listen(session_factory, "after_commit", self._apply_inserts)
+        event.listen(session_factory, "after_rollback", self._discard_inserts)
+
+    def detach(self, session_factory):
+        """
+        Function to stop counting the invoice lines inserted by the sessions of a factory
+
+        :param session_factory: The session factory given to attach
+        :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+        :return: Nothing
+        :rtype: None
+        """
+        event.remove(session_factory, "after_flush", self._collect_inserts)
+        event.remove(session_factory, "after_commit", self._apply_inserts)
+        event.remove(session_factory, "after_rollback", self._discard_inserts)
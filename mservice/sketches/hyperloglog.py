@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+HyperLogLog Distinct Count Sketch
+=====================================
+
+Module for estimating the number of distinct values of a stream in a fixed amount of memory. A sketch of precision p
+keeps 2 ** p one byte registers: every value is hashed to 64 bits, the first p bits pick a register and the register
+keeps the highest rank, the position of the first 1 bit, seen among the remaining bits. Two sketches of the same
+precision merge by keeping the highest of every register, so sketches of parts of a stream, or of several keys, add up
+to the sketch of their union
+
+The relative standard error of an estimate is 1.04 / sqrt(2 ** p), 1.6% at the default precision of 12, and an
+estimate is within three standard errors, 4.9%, of the true count 99.7% of the time. Below 2.5 * 2 ** p distinct
+values the estimate comes from the number of empty registers instead, which only misses the values sharing a register,
+about n * n / 2 ** (p + 1) of n values: a fraction of a value on average for the counts of tens of the reports, though
+now and then one or two. Values can be added but never removed
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * numpy - to hash the values and hold the registers
+
+This script contains the following
+    * DEFAULT_PRECISION - The precision of the sketches when none is given
+    * standard_error - Function to get the relative standard error of a precision
+    * hash_values - Function to hash integer values to 64 bits
+    * register_ranks - Function to get the register and the rank of hashed values
+    * estimate_cardinality - Function to estimate the distinct counts of rows of registers
+    * HyperLogLog - class holding the registers of one sketch
+"""
+# Standard Imports
+import logging
+import math
+
+# External imports
+import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PRECISION = 12
+MIN_PRECISION = 4
+MAX_PRECISION = 18
+
+# The ranks are read from at most 52 bits, which float64 holds exactly
+RANK_BITS = 52
+
+
+def check_precision(precision):
+    """
+    Function to check the precision of a sketch
+
+    :param precision: The number of bits picking the register
+    :type precision: int
+
+    :return: Nothing
+    :rtype: None
+    """
+    if not issubclass(type(precision), int) or not MIN_PRECISION <= precision <= MAX_PRECISION:
+        raise AttributeError("precision should be integer between %s and %s" % (MIN_PRECISION, MAX_PRECISION))
+
+
+def standard_error(precision=DEFAULT_PRECISION):
+    """
+    Function to get the relative standard error of the estimates of a precision
+
+    :param precision: The number of bits picking the register
+    :type precision: int
+
+    :return: error - 0.016 for 1.6%
+    :rtype: float
+    """
+    check_precision(precision)
+
+    return 1.04 / math.sqrt(1 << precision)
+
+
+def hash_values(values):
+    """
+    Function to hash integer values to 64 bits with the splitmix64 finalizer, the same value always giving the same
+    hash in every process
+
+    :param values: The values
+    :type values: :class:`numpy.ndarray`
+
+    :return: hashes
+    :rtype: :class:`numpy.ndarray`
+    """
+    # uint64 arrays wrap around on overflow, which the mixing relies on
+    hashes = np.asarray(values).astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    hashes = (hashes ^ (hashes >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    hashes = (hashes ^ (hashes >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+def register_ranks(hashes, precision):
+    """
+    Function to get the register every hash goes to, from its first bits, and its rank, the position of the first 1
+    bit among the next ones
+
+    :param hashes: The 64 bit hashes
+    :type hashes: :class:`numpy.ndarray`
+
+    :param precision: The number of bits picking the register
+    :type precision: int
+
+    :return: registers, ranks
+    :rtype: tuple
+    """
+    bits = min(64 - precision, RANK_BITS)
+
+    registers = (hashes >> np.uint64(64 - precision)).astype(np.intp)
+    remaining = (hashes >> np.uint64(64 - precision - bits)) & np.uint64((1 << bits) - 1)
+
+    # The exponent of frexp is the bit length of the number, 0 for 0
+    _, bit_lengths = np.frexp(remaining.astype(np.float64))
+    return registers, (bits + 1 - bit_lengths).astype(np.uint8)
+
+
+def estimate_cardinality(registers):
+    """
+    Function to estimate the number of distinct values from registers, for every row of registers at once
+
+    :param registers: The registers, one row per sketch
+    :type registers: :class:`numpy.ndarray`
+
+    :return: estimates - One per row
+    :rtype: :class:`numpy.ndarray`
+    """
+    registers = np.atleast_2d(registers)
+    size = registers.shape[1]
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(size, 0.7213 / (1 + 1.079 / size))
+
+    estimates = alpha * size * size / np.sum(np.exp2(-registers.astype(np.float64)), axis=1)
+    empty = np.count_nonzero(registers == 0, axis=1)
+
+    # Linear counting of the empty registers for small counts
+    small = (estimates <= 2.5 * size) & (empty > 0)
+    estimates[small] = size * np.log(size / empty[small])
+    return estimates
+
+
+class HyperLogLog:
+    """
+    Class holding the registers of one HyperLogLog sketch
+
+    :ivar precision: The number of bits picking the register
+    :vartype precision: int
+
+    :ivar registers: The 2 ** precision registers
+    :vartype registers: :class:`numpy.ndarray`
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        """
+        Constructor of the sketch
+
+        :param precision: The number of bits picking the register
+        :type precision: int
+
+        :param registers: The registers to start from, all empty if None
+        :type registers: :class:`numpy.ndarray`
+        """
+        check_precision(precision)
+
+        if registers is not None and len(registers) != 1 << precision:
+            raise AttributeError("a sketch of precision %s has %s registers" % (precision, 1 << precision))
+
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else \
+            np.array(registers, dtype=np.uint8)
+
+    def add(self, value):
+        """
+        Function to add one integer value to the sketch
+
+        :param value: The value
+        :type value: int
+
+        :return: Nothing
+        :rtype: None
+        """
+        self.update([value])
+
+    def update(self, values):
+        """
+        Function to add integer values to the sketch
+
+        :param values: The values
+        :type values: list
+
+        :return: Nothing
+        :rtype: None
+        """
+        registers, ranks = register_ranks(hash_values(np.asarray(values, dtype=np.int64)), self.precision)
+        np.maximum.at(self.registers, registers, ranks)
+
+    def merge(self, other):
+        """
+        Function to merge another sketch of the same precision into this one, which then counts their union
+
+        :param other: The other sketch
+        :type other: :class:`mservice.sketches.hyperloglog.HyperLogLog`
+
+        :return: self
+        :rtype: :class:`mservice.sketches.hyperloglog.HyperLogLog`
+        """
+        if not issubclass(type(other), HyperLogLog) or other.precision != self.precision:
+            raise AttributeError("only sketches of precision %s can be merged" % self.precision)
+
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """
+        Function to estimate the number of distinct values added
+
+        :return: estimate
+        :rtype: float
+        """
+        return float(estimate_cardinality(self.registers)[0])
+
+    def to_bytes(self):
+        """
+        Function to serialize the sketch, its precision followed by its registers
+
+        :return: data
+        :rtype: bytes
+        """
+        return bytes([self.precision]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Function to read a sketch serialized with to_bytes
+
+        :param data: The serialized sketch
+        :type data: bytes
+
+        :return: sketch
+        :rtype: :class:`mservice.sketches.hyperloglog.HyperLogLog`
+        """
+        return cls(data[0], np.frombuffer(data[1:], dtype=np.uint8))
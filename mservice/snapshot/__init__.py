@@ -0,0 +1,11 @@
+# -*- coding: UTF-8 -*-
+"""
+Initialization For Snapshots
+================================
+
+This is an initialization module for the in memory catalog snapshots
+"""
+
+# Importing necessary modules and functions to be used by modules using this package
+from mservice.snapshot.catalog_snapshot import CatalogSnapshot, SNAPSHOT_TABLES, cents_to_decimal
+from mservice.snapshot.snapshot_store import StringHeap, write_snapshot, open_snapshot, refresh_snapshot
@@ -0,0 +1,521 @@
+# -*- coding: utf-8 -*-
+"""
+In Memory Columnar Catalog Snapshot
+=======================================
+
+Module for loading the catalog tables once into NumPy column arrays and answering the catalog reports (Q1 to Q10 and
+Q13) with vectorized operations instead of GROUP BY queries. Ids and counts are int64 arrays, prices are int64 cents and
+strings are dictionary encoded, each string column being an int32 array of codes into its sorted list of distinct values
+
+The rows returned are the ones of the matching SQL report. Where the SQL leaves the order of ties unspecified, ties are
+broken by ascending id, and Q10 orders names by code point rather than by the collation of the database
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * numpy - to hold the columns and run the aggregates
+
+This script contains the following
+    * SNAPSHOT_TABLES - The tables and columns held by a snapshot
+    * CatalogSnapshot - class holding the columns and answering the reports
+"""
+# Standard Imports
+import logging
+from collections import OrderedDict
+from decimal import Decimal
+
+# External imports
+import numpy as np
+import sqlalchemy.orm
+from sqlalchemy import func
+
+# User Imports
+import mservice.database_model as models
+from mservice.aggregate_operation.money import MONEY_CENTS, MONEY_DECIMAL, check_money, cents_to_decimal
+
+LOGGER = logging.getLogger(__name__)
+
+# Table -> (ORM class, [(attribute, kind)]), the first attribute being the primary key the table is ordered by.
+# Kinds are "int" (nullable ints become -1), "cents", "string" and "datetime"
+SNAPSHOT_TABLES = OrderedDict([
+    ("genre", (models.GenreTable, [("genre_id", "int"), ("name", "string")])),
+    ("artist", (models.ArtistTable, [("artist_id", "int"), ("name", "string")])),
+    ("album", (models.AlbumTable, [("album_id", "int"), ("title", "string"), ("artist_id", "int")])),
+    ("track", (models.TracksTable, [("track_id", "int"), ("name", "string"), ("album_id", "int"),
+                                    ("media_type_id", "int"), ("genre_id", "int"), ("milliseconds", "int"),
+                                    ("unit_price", "cents")])),
+    ("playlisttrack", (models.PlaylistTrackTable, [("play_list_id", "int"), ("track_id", "int")])),
+    ("customer", (models.CustomerTable, [("customer_id", "int"), ("first_name", "string"),
+                                         ("last_name", "string")])),
+    ("invoice", (models.InvoiceTable, [("invoice_id", "int"), ("customer_id", "int"), ("invoice_date", "datetime"),
+                                       ("total", "cents")])),
+    ("invoiceline", (models.InvoiceLineTable, [("invoice_line_id", "int"), ("invoice_id", "int"), ("track_id", "int"),
+                                               ("unit_price", "cents"), ("quantity", "int")])),
+])
+
+PLAYTIME_SCALE = Decimal("0.0001")
+
+
+def _encode_strings(values):
+    """
+    Function to dictionary encode a list of strings
+
+    :param values: The strings, None for NULL
+    :type values: list
+
+    :return: codes, dictionary - The code of every value (-1 for NULL) and the sorted distinct values
+    :rtype: tuple
+    """
+    dictionary = sorted({value for value in values if value is not None})
+    index = {value: code for code, value in enumerate(dictionary)}
+    codes = np.fromiter((-1 if value is None else index[value] for value in values), dtype=np.int32,
+                        count=len(values))
+    return codes, dictionary
+
+
+def _top_k(keys, values, number):
+    """
+    Function to get the positions of the rows with the highest values, ties broken by ascending key. The candidates are
+    narrowed down with argpartition before the lexsort, so only about `number` rows get sorted
+
+    :param keys: The ids of the rows
+    :type keys: :class:`numpy.ndarray`
+
+    :param values: The values to rank by
+    :type values: :class:`numpy.ndarray`
+
+    :param number: The number of rows wanted
+    :type number: int
+
+    :return: positions - Positions into keys and values, best first
+    :rtype: :class:`numpy.ndarray`
+    """
+    if len(values) > number:
+        threshold = values[np.argpartition(-values, number - 1)[:number]].min()
+        candidates = np.flatnonzero(values >= threshold)
+    else:
+        candidates = np.arange(len(values))
+
+    order = np.lexsort((keys[candidates], -values[candidates]))
+    return candidates[order[:number]]
+
+
+class CatalogSnapshot:
+    """
+    Class holding the catalog tables as NumPy columns, and answering the catalog reports from them
+
+    :ivar columns: Column arrays keyed by "table.attribute", string columns hold codes into their dictionary
+    :vartype columns: dict
+
+    :ivar dictionaries: Sorted distinct values of the string columns, keyed by "table.attribute"
+    :vartype dictionaries: dict
+
+    :ivar watermarks: The latest last_updated_on of every table when it was read, None for an empty table
+    :vartype watermarks: dict
+
+    """
+
+    def __init__(self, columns, dictionaries, watermarks=None):
+        """
+        Constructor of the snapshot, deriving the join indexes used by the reports
+
+        :param columns: Column arrays keyed by "table.attribute"
+        :type columns: dict
+
+        :param dictionaries: Sorted distinct values of the string columns, keyed by "table.attribute", any sequence
+                             indexable by code
+        :type dictionaries: dict
+
+        :param watermarks: The latest last_updated_on of every table when it was read
+        :type watermarks: dict
+        """
+        self.columns = columns
+        self.dictionaries = dictionaries
+        self.watermarks = watermarks or {}
+        self._prepare()
+
+    @classmethod
+    def load(cls, session):
+        """
+        Function to read the catalog tables with the given session and build a snapshot of them
+
+        :param session: The session to work with
+        :type session: :class:`sqlalchemy.orm.session.Session`
+
+        :return: snapshot
+        :rtype: :class:`mservice.snapshot.catalog_snapshot.CatalogSnapshot`
+        """
+        if not issubclass(type(session), sqlalchemy.orm.session.Session):
+            raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+        columns = {}
+        dictionaries = {}
+        watermarks = {}
+
+        try:
+            for table, (model, attributes) in SNAPSHOT_TABLES.items():
+                watermarks[table] = session.query(func.max(model.last_updated_on)).scalar()
+
+                query = session.query(*[getattr(model, name) for name, _ in attributes])
+                rows = query.order_by(*[column for column in model.__mapper__.primary_key]).all()
+                LOGGER.debug("Loaded %s rows of %s", len(rows), table)
+
+                values_by_column = list(zip(*rows)) if rows else [() for _ in attributes]
+
+                for (name, kind), values in zip(attributes, values_by_column):
+                    key = table + "." + name
+
+                    if kind == "string":
+                        columns[key], dictionaries[key] = _encode_strings(values)
+                    elif kind == "cents":
+                        columns[key] = np.fromiter((int(value.scaleb(2)) for value in values), dtype=np.int64,
+                                                   count=len(values))
+                    elif kind == "datetime":
+                        columns[key] = np.array(values, dtype="datetime64[s]")
+                    else:
+                        columns[key] = np.fromiter((-1 if value is None else value for value in values),
+                                                   dtype=np.int64, count=len(values))
+        finally:
+            session.close()
+
+        return cls(columns, dictionaries, watermarks)
+
+    def _string(self, key, code):
+        """
+        Function to decode a string column value
+
+        :param key: The column, as "table.attribute"
+        :type key: str
+
+        :param code: The code of the value
+        :type code: int
+
+        :return: value - None for NULL
+        :rtype: str
+        """
+        return None if code < 0 else self.dictionaries[key][int(code)]
+
+    def _positions(self, table, ids):
+        """
+        Function to find the rows of the given primary keys in a table
+
+        :param table: The table name
+        :type table: str
+
+        :param ids: The primary keys looked up
+        :type ids: :class:`numpy.ndarray`
+
+        :return: positions, found - The row of every id, and whether the id exists at all
+        :rtype: tuple
+        """
+        primary_key = self.columns[table + "." + SNAPSHOT_TABLES[table][1][0][0]]
+        positions = np.searchsorted(primary_key, ids)
+        positions = np.minimum(positions, max(len(primary_key) - 1, 0))
+        found = (primary_key[positions] == ids) if len(primary_key) else np.zeros(len(ids), dtype=bool)
+        return positions, found
+
+    def _prepare(self):
+        """
+        Function to derive the inner join indexes shared by the reports, computed once when the snapshot is built
+
+        :return: Nothing
+        :rtype: None
+        """
+        column = self.columns
+
+        # track -> album -> artist
+        self._track_album_row, track_has_album = self._positions("album", column["track.album_id"])
+        track_artist_ids = column["album.artist_id"][self._track_album_row] if len(column["album.artist_id"]) else \
+            np.zeros(0, dtype=np.int64)
+        self._track_artist_row, track_has_artist = self._positions("artist", track_artist_ids)
+        self._track_has_album = track_has_album
+        self._track_in_album = np.flatnonzero(track_has_album)
+        self._track_in_artist = np.flatnonzero(track_has_album & track_has_artist)
+
+        # track -> genre
+        self._track_genre_row, self._track_has_genre = self._positions("genre", column["track.genre_id"])
+
+        # invoiceline -> track, playlisttrack -> track
+        self._line_track_row, self._line_has_track = self._positions("track", column["invoiceline.track_id"])
+        self._entry_track_row, self._entry_has_track = self._positions("track", column["playlisttrack.track_id"])
+
+        # invoice -> customer
+        self._invoice_customer_row, self._invoice_has_customer = self._positions("customer",
+                                                                                 column["invoice.customer_id"])
+
+    def top_album_tracks(self, number_of_albums):
+        """
+        Function to get the top albums based on number of tracks (Q1)
+
+        :param number_of_albums: The number of albums to be returned
+        :type number_of_albums: int
+
+        :return: results - (album id, title, number of tracks) rows
+        :rtype: list
+        """
+        album_ids = self.columns["track.album_id"][self._track_in_album]
+        counts = np.bincount(album_ids)
+        keys = np.flatnonzero(counts)
+
+        best = keys[_top_k(keys, counts[keys], number_of_albums)]
+        rows, _ = self._positions("album", best)
+        titles = self.columns["album.title"][rows]
+
+        return [(int(album_id), self._string("album.title", title), int(counts[album_id]))
+                for album_id, title in zip(best, titles)]
+
+    def top_artist_tracks(self, number_of_artist):
+        """
+        Function to get the top artist based on number of tracks (Q2)
+
+        :param number_of_artist: The number of artist to be returned
+        :type number_of_artist: int
+
+        :return: results - (artist id, name, number of tracks) rows
+        :rtype: list
+        """
+        artist_ids = self.columns["album.artist_id"][self._track_album_row[self._track_in_artist]]
+        counts = np.bincount(artist_ids)
+        keys = np.flatnonzero(counts)
+
+        best = keys[_top_k(keys, counts[keys], number_of_artist)]
+        rows, _ = self._positions("artist", best)
+        names = self.columns["artist.name"][rows]
+
+        return [(int(artist_id), self._string("artist.name", name), int(counts[artist_id]))
+                for artist_id, name in zip(best, names)]
+
+    def top_customers(self, number_of_customers, money=MONEY_DECIMAL):
+        """
+        Function to get the top customers based on total amount of purchases (Q3)
+
+        :param number_of_customers: The number of customers to be returned
+        :type number_of_customers: int
+
+        :param money: The money representation of the totals, "decimal" for Decimal amounts or "cents" for int cents
+        :type money: str
+
+        :return: results - (customer id, full name, total amount) rows
+        :rtype: list
+        """
+        check_money(money)
+        to_money = int if money == MONEY_CENTS else cents_to_decimal
+
+        invoices = np.flatnonzero(self._invoice_has_customer)
+        customer_ids = self.columns["invoice.customer_id"][invoices]
+        totals = np.zeros(customer_ids.max() + 1 if len(customer_ids) else 0, dtype=np.int64)
+        np.add.at(totals, customer_ids, self.columns["invoice.total"][invoices])
+        keys = np.unique(customer_ids)
+
+        best = keys[_top_k(keys, totals[keys], number_of_customers)]
+        rows, _ = self._positions("customer", best)
+
+        return [(int(customer_id), "%s %s" % (self._string("customer.first_name", first),
+                                              self._string("customer.last_name", last)),
+                 to_money(totals[customer_id]))
+                for customer_id, first, last in zip(best, self.columns["customer.first_name"][rows],
+                                                    self.columns["customer.last_name"][rows])]
+
+    def top_album_purchases(self, number_of_albums):
+        """
+        Function to get the top albums based on number of purchases, an invoice counting once per album (Q4)
+
+        :param number_of_albums: The number of albums to be returned
+        :type number_of_albums: int
+
+        :return: results - (album id, title, number of purchases) rows
+        :rtype: list
+        """
+        lines = np.flatnonzero(self._line_has_track)
+        track_rows = self._line_track_row[lines]
+        in_album = self._track_has_album[track_rows]
+        album_ids = self.columns["track.album_id"][track_rows[in_album]]
+        invoice_ids = self.columns["invoiceline.invoice_id"][lines[in_album]]
+
+        # Distinct (album, invoice) pairs, encoded into a single int64 key
+        stride = invoice_ids.max() + 1 if len(invoice_ids) else 1
+        pairs = np.unique(album_ids * stride + invoice_ids)
+        counts = np.bincount(pairs // stride)
+        keys = np.flatnonzero(counts)
+
+        best = keys[_top_k(keys, counts[keys], number_of_albums)]
+        rows, _ = self._positions("album", best)
+
+        return [(int(album_id), self._string("album.title", title), int(counts[album_id]))
+                for album_id, title in zip(best, self.columns["album.title"][rows])]
+
+    def top_tracks_for_genre(self, number_of_tracks):
+        """
+        Function to get the top tracks of every genre based on number of purchases (Q5), ordered by genre and rank
+
+        :param number_of_tracks: The number of tracks to be returned per genre
+        :type number_of_tracks: int
+
+        :return: results - (track id, track name, genre id, genre name, number of purchases) rows
+        :rtype: list
+        """
+        track_rows = self._line_track_row[self._line_has_track]
+        track_rows = track_rows[self._track_has_genre[track_rows]]
+
+        purchases = np.bincount(track_rows, minlength=len(self.columns["track.track_id"]))
+        purchased = np.flatnonzero(purchases)
+
+        genre_ids = self.columns["track.genre_id"][purchased]
+        track_ids = self.columns["track.track_id"][purchased]
+        counts = purchases[purchased]
+
+        # Ranking within every genre: by genre, then most purchases, then track id
+        order = np.lexsort((track_ids, -counts, genre_ids))
+        sorted_genres = genre_ids[order]
+        _, group_starts, group_sizes = np.unique(sorted_genres, return_index=True, return_counts=True)
+        ranks = np.arange(len(order)) - np.repeat(group_starts, group_sizes)
+        chosen = purchased[order[ranks < number_of_tracks]]
+
+        genre_rows = self._track_genre_row[chosen]
+        return [(int(track_id), self._string("track.name", name), int(genre_id), self._string("genre.name", genre),
+                 int(count))
+                for track_id, name, genre_id, genre, count in zip(self.columns["track.track_id"][chosen],
+                                                                  self.columns["track.name"][chosen],
+                                                                  self.columns["track.genre_id"][chosen],
+                                                                  self.columns["genre.name"][genre_rows],
+                                                                  purchases[chosen])]
+
+    def longest_tracks(self, number_of_tracks):
+        """
+        Function to get the longest tracks (Q6)
+
+        :param number_of_tracks: The number of tracks to be returned
+        :type number_of_tracks: int
+
+        :return: results - (track id, name, milliseconds) rows
+        :rtype: list
+        """
+        track_ids = self.columns["track.track_id"]
+        best = _top_k(track_ids, self.columns["track.milliseconds"], number_of_tracks)
+
+        return [(int(track_id), self._string("track.name", name), int(milliseconds))
+                for track_id, name, milliseconds in zip(track_ids[best], self.columns["track.name"][best],
+                                                        self.columns["track.milliseconds"][best])]
+
+    def longest_album(self, number_of_albums):
+        """
+        Function to get the albums with the longest total playtime (Q7), in seconds with four decimals as MySQL divides
+
+        :param number_of_albums: The number of albums to be returned
+        :type number_of_albums: int
+
+        :return: results - (album id, title, total playtime) rows
+        :rtype: list
+        """
+        album_ids = self.columns["track.album_id"][self._track_in_album]
+        playtime = np.zeros(album_ids.max() + 1 if len(album_ids) else 0, dtype=np.int64)
+        np.add.at(playtime, album_ids, self.columns["track.milliseconds"][self._track_in_album])
+        keys = np.unique(album_ids)
+
+        best = keys[_top_k(keys, playtime[keys], number_of_albums)]
+        rows, _ = self._positions("album", best)
+
+        return [(int(album_id), self._string("album.title", title),
+                 Decimal(int(playtime[album_id])).scaleb(-3).quantize(PLAYTIME_SCALE))
+                for album_id, title in zip(best, self.columns["album.title"][rows])]
+
+    def number_of_playlist_tracks(self, number_of_tracks):
+        """
+        Function to get the tracks which are part of the most playlists (Q8)
+
+        :param number_of_tracks: The number of tracks to be returned
+        :type number_of_tracks: int
+
+        :return: results - (track id, name, number of playlists) rows
+        :rtype: list
+        """
+        track_rows = self._entry_track_row[self._entry_has_track]
+        counts = np.bincount(track_rows, minlength=len(self.columns["track.track_id"]))
+        rows = np.flatnonzero(counts)
+        track_ids = self.columns["track.track_id"][rows]
+
+        best = rows[_top_k(track_ids, counts[rows], number_of_tracks)]
+
+        return [(int(track_id), self._string("track.name", name), int(count))
+                for track_id, name, count in zip(self.columns["track.track_id"][best],
+                                                 self.columns["track.name"][best], counts[best])]
+
+    def number_of_playlist_album(self, number_of_albums):
+        """
+        Function to get the albums whose tracks are part of the most distinct playlists (Q9)
+
+        :param number_of_albums: The number of albums to be returned
+        :type number_of_albums: int
+
+        :return: results - (album id, title, number of playlists) rows
+        :rtype: list
+        """
+        entries = np.flatnonzero(self._entry_has_track)
+        track_rows = self._entry_track_row[entries]
+        in_album = self._track_has_album[track_rows]
+        album_ids = self.columns["track.album_id"][track_rows[in_album]]
+        playlist_ids = self.columns["playlisttrack.play_list_id"][entries[in_album]]
+
+        stride = playlist_ids.max() + 1 if len(playlist_ids) else 1
+        pairs = np.unique(album_ids * stride + playlist_ids)
+        counts = np.bincount(pairs // stride)
+        keys = np.flatnonzero(counts)
+
+        best = keys[_top_k(keys, counts[keys], number_of_albums)]
+        rows, _ = self._positions("album", best)
+
+        return [(int(album_id), self._string("album.title", title), int(counts[album_id]))
+                for album_id, title in zip(best, self.columns["album.title"][rows])]
+
+    def tracks_with_more_genre(self, number_of_tracks):
+        """
+        Function to get the track names which are part of more than one genre, along with each of their genres (Q10)
+
+        :param number_of_tracks: The number of rows to be returned
+        :type number_of_tracks: int
+
+        :return: results - (track name, genre name) rows, ordered by track name then genre name
+        :rtype: list
+        """
+        names = self.columns["track.name"]
+        genre_ids = self.columns["track.genre_id"]
+
+        # Names having more than one distinct, non NULL, genre id
+        known = genre_ids >= 0
+        name_genre = np.unique(np.stack([names[known].astype(np.int64), genre_ids[known]]), axis=1)
+        genre_counts = np.bincount(name_genre[0], minlength=len(self.dictionaries["track.name"]))
+        shared_names = genre_counts > 1
+
+        # Distinct (name, genre name) pairs over the tracks joined to their genre, the dictionaries being sorted
+        # the codes order the same way as the strings
+        tracks = np.flatnonzero(self._track_has_genre & shared_names[np.maximum(names, 0)] & (names >= 0))
+        genre_names = self.columns["genre.name"][self._track_genre_row[tracks]]
+        pairs = np.unique(np.stack([names[tracks].astype(np.int64), genre_names.astype(np.int64)]), axis=1)
+        pairs = pairs[:, :number_of_tracks]
+
+        return [(self._string("track.name", name), self._string("genre.name", genre)) for name, genre in pairs.T]
+
+    def top_artist_genre(self, number_of_artist):
+        """
+        Function to get the artist whose tracks span the most distinct genres (Q13)
+
+        :param number_of_artist: The number of artist to be returned
+        :type number_of_artist: int
+
+        :return: results - (artist id, name, number of genres) rows
+        :rtype: list
+        """
+        artist_ids = self.columns["album.artist_id"][self._track_album_row[self._track_in_artist]]
+        genre_ids = self.columns["track.genre_id"][self._track_in_artist]
+        known = genre_ids >= 0
+
+        stride = genre_ids.max() + 1 if len(genre_ids) else 1
+        pairs = np.unique(artist_ids[known] * stride + genre_ids[known])
+        counts = np.bincount(pairs // stride, minlength=artist_ids.max() + 1 if len(artist_ids) else 0)
+
+        # Artist with tracks but no genre at all still form a group, with a count of zero
+        keys = np.unique(artist_ids)
+        best = keys[_top_k(keys, counts[keys], number_of_artist)]
+        rows, _ = self._positions("artist", best)
+
+        return [(int(artist_id), self._string("artist.name", name), int(counts[artist_id]))
+                for artist_id, name in zip(best, self.columns["artist.name"][rows])]
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+On Disk Catalog Snapshot Store
+===================================
+
+Module for writing catalog snapshots to disk and opening them again with memory maps, so a new process answers the
+catalog reports without reading the tables from the database nor parsing anything, the pages being shared by every
+process opening the same snapshot
+
+A store is a directory holding one directory per snapshot version, and a `current` symbolic link to the version in
+use::
+
+    store/
+        current -> versions/20201022T101500-3f2a9c
+        versions/20201022T101500-3f2a9c/
+            manifest.json               the format, the columns and the watermark and row count of every table
+            track.track_id.npy          one .npy file per fixed width column
+            track.name.npy              the codes of a string column
+            track.name.heap             its dictionary, the utf-8 encoded strings back to back
+            track.name.offsets.npy      the start of every string in the heap, and the end of the last one
+
+A refresh writes a complete new version and then replaces the link in a single rename, so readers see either the old
+or the new snapshot, never a partially written one. Readers resolve the link once when opening, and keep using their
+version even when it gets replaced
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * json, os, shutil, uuid - to write the manifest and replace the versions
+    * numpy - to write and memory map the columns
+
+This script contains the following
+    * StringHeap - class giving indexed access to the strings of a memory mapped heap
+    * write_snapshot - Function to write a snapshot as a new version and make it the current one
+    * open_snapshot - Function to memory map the current version of a store
+    * refresh_snapshot - Function to read the catalog from the database into a new version of a store
+"""
+# Standard Imports
+import datetime
+import json
+import logging
+import os
+import shutil
+import uuid
+
+# External imports
+import numpy as np
+
+# User Imports
+from mservice.snapshot.catalog_snapshot import CatalogSnapshot, SNAPSHOT_TABLES
+
+LOGGER = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+CURRENT_LINK = "current"
+VERSIONS_DIRECTORY = "versions"
+MANIFEST_FILE = "manifest.json"
+
+
+class StringHeap:
+    """
+    Class giving indexed access to the strings of a heap, decoding a string only when it is asked for
+
+    :ivar heap: The utf-8 encoded strings back to back
+    :vartype heap: :class:`numpy.memmap`
+
+    :ivar offsets: The start of every string in the heap, followed by the end of the last string
+    :vartype offsets: :class:`numpy.ndarray`
+
+    """
+
+    def __init__(self, heap, offsets):
+        """
+        Constructor of the heap
+
+        :param heap: The utf-8 encoded strings back to back
+        :type heap: :class:`numpy.ndarray`
+
+        :param offsets: The start of every string in the heap, followed by the end of the last string
+        :type offsets: :class:`numpy.ndarray`
+        """
+        self.heap = heap
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, code):
+        if not 0 <= code < len(self):
+            raise IndexError("string code %s out of range" % code)
+
+        return self.heap[self.offsets[code]:self.offsets[code + 1]].tobytes().decode("utf-8")
+
+
+def _write_strings(path, strings):
+    """
+    Function to write a dictionary of strings as a heap and its offsets
+
+    :param path: The path of the column, without extension
+    :type path: str
+
+    :param strings: The strings
+    :type strings: list
+
+    :return: Nothing
+    :rtype: None
+    """
+    encoded = [string.encode("utf-8") for string in strings]
+
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(string) for string in encoded], out=offsets[1:])
+
+    with open(path + ".heap", "wb") as heap_file:
+        heap_file.write(b"".join(encoded))
+
+    np.save(path + ".offsets.npy", offsets)
+
+
+def _read_strings(path):
+    """
+    Function to memory map a heap and its offsets
+
+    :param path: The path of the column, without extension
+    :type path: str
+
+    :return: strings
+    :rtype: :class:`mservice.snapshot.snapshot_store.StringHeap`
+    """
+    offsets = np.load(path + ".offsets.npy", mmap_mode="r")
+
+    # np.memmap refuses empty files, a heap of empty strings only is held in memory
+    if offsets[-1] == 0:
+        return StringHeap(np.zeros(0, dtype=np.uint8), offsets)
+
+    return StringHeap(np.memmap(path + ".heap", dtype=np.uint8, mode="r"), offsets)
+
+
+def _isoformat(watermark):
+    """
+    Function to serialize a watermark for the manifest
+
+    :param watermark: The watermark
+    :type watermark: :class:`datetime.datetime`
+
+    :return: watermark - ISO 8601, None for an empty table
+    :rtype: str
+    """
+    return watermark.isoformat() if watermark is not None else None
+
+
+def _prune_versions(root, keep):
+    """
+    Function to remove the oldest versions of a store, the current one is never removed
+
+    :param root: The store directory
+    :type root: str
+
+    :param keep: The number of versions kept
+    :type keep: int
+
+    :return: Nothing
+    :rtype: None
+    """
+    versions_directory = os.path.join(root, VERSIONS_DIRECTORY)
+    current = os.path.realpath(os.path.join(root, CURRENT_LINK))
+
+    # Version names start with their creation time, so they sort oldest first
+    for name in sorted(os.listdir(versions_directory))[:-keep]:
+        path = os.path.join(versions_directory, name)
+
+        if os.path.realpath(path) != current:
+            LOGGER.debug("Removing snapshot version %s", name)
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def write_snapshot(snapshot, root, keep=2):
+    """
+    Function to write a snapshot as a new version of the store and atomically make it the current one. Processes
+    which already opened the previous version keep their memory maps, pruned files staying readable on POSIX systems
+    until they are unmapped
+
+    :param snapshot: The snapshot to be written
+    :type snapshot: :class:`mservice.snapshot.catalog_snapshot.CatalogSnapshot`
+
+    :param root: The store directory, created if missing
+    :type root: str
+
+    :param keep: The number of versions kept in the store, older ones are removed
+    :type keep: int
+
+    :return: path - The directory of the new version
+    :rtype: str
+    """
+    if not issubclass(type(snapshot), CatalogSnapshot):
+        raise AttributeError("snapshot should be of type 'CatalogSnapshot'")
+
+    if not issubclass(type(keep), int) or keep < 1:
+        raise AttributeError("keep should be integer and greater than 0")
+
+    name = "%s-%s" % (datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%S%f"), uuid.uuid4().hex[:6])
+    path = os.path.join(root, VERSIONS_DIRECTORY, name)
+    os.makedirs(path)
+
+    manifest = {"format": FORMAT_VERSION, "created_at": datetime.datetime.utcnow().isoformat(), "tables": {},
+                "columns": {}}
+
+    for table, (_, attributes) in SNAPSHOT_TABLES.items():
+        manifest["tables"][table] = {"rows": len(snapshot.columns[table + "." + attributes[0][0]]),
+                                     "watermark": _isoformat(snapshot.watermarks.get(table))}
+
+        for attribute, kind in attributes:
+            key = table + "." + attribute
+            column = np.ascontiguousarray(snapshot.columns[key])
+
+            np.save(os.path.join(path, key + ".npy"), column)
+            manifest["columns"][key] = {"kind": kind, "dtype": column.dtype.str}
+
+            if kind == "string":
+                _write_strings(os.path.join(path, key), snapshot.dictionaries[key])
+
+    # The manifest is written last, a version without one is incomplete and never linked
+    with open(os.path.join(path, MANIFEST_FILE), "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    # Replacing the link with a rename is atomic, readers see either the previous or the new version
+    link = os.path.join(root, CURRENT_LINK)
+    temporary_link = "%s.%s" % (link, uuid.uuid4().hex)
+    os.symlink(os.path.join(VERSIONS_DIRECTORY, name), temporary_link)
+    os.replace(temporary_link, link)
+
+    LOGGER.info("Snapshot Version %s Is Now Current", name)
+
+    _prune_versions(root, keep)
+    return path
+
+
+def open_snapshot(root):
+    """
+    Function to open the current version of a store, every column being memory mapped read only
+
+    :param root: The store directory
+    :type root: str
+
+    :return: snapshot
+    :rtype: :class:`mservice.snapshot.catalog_snapshot.CatalogSnapshot`
+    """
+    # Resolving the link once, so a concurrent refresh cannot mix columns of two versions
+    path = os.path.realpath(os.path.join(root, CURRENT_LINK))
+
+    if not os.path.isfile(os.path.join(path, MANIFEST_FILE)):
+        raise FileNotFoundError("No snapshot found in %s" % root)
+
+    with open(os.path.join(path, MANIFEST_FILE)) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if manifest["format"] != FORMAT_VERSION:
+        raise ValueError("Snapshot format %s is not supported" % manifest["format"])
+
+    columns = {}
+    dictionaries = {}
+
+    for key, column in manifest["columns"].items():
+        columns[key] = np.load(os.path.join(path, key + ".npy"), mmap_mode="r")
+
+        if column["kind"] == "string":
+            dictionaries[key] = _read_strings(os.path.join(path, key))
+
+    watermarks = {table: datetime.datetime.fromisoformat(details["watermark"]) if details["watermark"] else None
+                  for table, details in manifest["tables"].items()}
+
+    LOGGER.debug("Opened snapshot %s", path)
+    return CatalogSnapshot(columns, dictionaries, watermarks)
+
+
+def refresh_snapshot(session_factory, root, keep=2):
+    """
+    Function to read the catalog from the database and write it as the new current version of the store
+
+    :param session_factory: The session factory used to create the session reading the catalog
+    :type session_factory: :class:`sqlalchemy.orm.session.sessionmaker`
+
+    :param root: The store directory, created if missing
+    :type root: str
+
+    :param keep: The number of versions kept in the store
+    :type keep: int
+
+    :return: path - The directory of the new version
+    :rtype: str
+    """
+    return write_snapshot(CatalogSnapshot.load(session_factory()), root, keep)
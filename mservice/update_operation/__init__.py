@@ -7,3 +7,5 @@ This is an initialization module for update_records module
 
 # Importing necessary modules and functions to be used by modules using this package
 from mservice.update_operation.update_records import perform_update
+from mservice.update_operation.reprice_tracks import PriceRule, compile_price_rules, reprice_tracks
+from mservice.update_operation.optimistic_update import compare_and_set, update_optimistically
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Module to perform Optimistic Updates
+=========================================
+
+Module for updating the rows of versioned ORM classes (those inheriting VersionedMixin, the track and invoice tables)
+without SELECT ... FOR UPDATE. The row is read without a lock, and written back with a compare and set statement that
+only matches while the version is still the one which was read. A concurrent change is reported as a
+:class:`sqlalchemy.orm.exc.StaleDataError`, upon which the caller can read the row again and redo its change
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+
+This script contains the following function
+    * compare_and_set - Function to update a row only if its version is still the expected one
+    * update_optimistically - Function to read a row, apply a change to it and compare and set it, redoing the change
+                              on conflicts
+"""
+# Standard Imports
+import logging
+
+# External imports
+import sqlalchemy.orm
+from sqlalchemy.orm.exc import StaleDataError, NoResultFound
+
+# User Imports
+from mservice.database_model.orm_classes import VersionedMixin
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _check_versioned(session, model):
+    """
+    Function to validate the session and that the ORM class opted in to optimistic concurrency
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param model: The ORM class of the row
+    :type model: :class:`sqlalchemy.ext.declarative.api.DeclarativeMeta`
+
+    :return: Nothing
+    :rtype: None
+    """
+    if not issubclass(type(session), sqlalchemy.orm.session.Session):
+        raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+    if not isinstance(model, type) or not issubclass(model, VersionedMixin):
+        raise AttributeError("model should be an ORM class inheriting 'VersionedMixin'")
+
+
+def compare_and_set(session, model, primary_key, expected_version, values):
+    """
+    Function to update a row and increment its version, only if its version is still the expected one, and commit
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param model: The ORM class of the row
+    :type model: :class:`sqlalchemy.ext.declarative.api.DeclarativeMeta`
+
+    :param primary_key: The primary key of the row
+    :type primary_key: int
+
+    :param expected_version: The version the row had when it was read
+    :type expected_version: int
+
+    :param values: The new values, keyed by attribute name
+    :type values: dict
+
+    :return: new_version
+    :rtype: int
+    """
+    _check_versioned(session, model)
+
+    pk_column = model.__mapper__.primary_key[0]
+
+    changes = {getattr(model, name): value for name, value in values.items()}
+    changes[model.version_id] = expected_version + 1
+
+    updated = session.query(model).filter(pk_column == primary_key, model.version_id == expected_version).\
+        update(changes, synchronize_session=False)
+
+    if updated != 1:
+        session.rollback()
+        raise StaleDataError("%s %s is no longer at version %s" % (model.__tablename__, primary_key,
+                                                                    expected_version))
+
+    session.commit()
+    return expected_version + 1
+
+
+def update_optimistically(session, model, primary_key, change, max_attempts=10):
+    """
+    Function to read a row without locking it, compute its new values and compare and set them, reading the row again
+    and recomputing the change whenever a concurrent writer got there first
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param model: The ORM class of the row
+    :type model: :class:`sqlalchemy.ext.declarative.api.DeclarativeMeta`
+
+    :param primary_key: The primary key of the row
+    :type primary_key: int
+
+    :param change: Function taking the current row and returning the new values, keyed by attribute name
+    :type change: callable
+
+    :param max_attempts: The number of conflicts tolerated before the StaleDataError is raised to the caller
+    :type max_attempts: int
+
+    :return: new_version, attempts - The version written and the number of attempts it took
+    :rtype: tuple
+    """
+    _check_versioned(session, model)
+
+    if not issubclass(type(max_attempts), int) or max_attempts < 1:
+        raise AttributeError("max attempts should be integer and greater than 0")
+
+    pk_column = model.__mapper__.primary_key[0]
+
+    for attempt in range(1, max_attempts + 1):
+        row = session.query(model).filter(pk_column == primary_key).one_or_none()
+
+        if row is None:
+            session.rollback()
+            raise NoResultFound("No %s with id %s" % (model.__tablename__, primary_key))
+
+        version, values = row.version_id, change(row)
+
+        # The row was only needed to compute the change, it must not be flushed along with the compare and set
+        session.expunge(row)
+
+        try:
+            return compare_and_set(session, model, primary_key, version, values), attempt
+        except StaleDataError:
+            LOGGER.debug("Conflict on %s %s at version %s, attempt %s", model.__tablename__, primary_key, version,
+                         attempt)
+
+            if attempt == max_attempts:
+                raise
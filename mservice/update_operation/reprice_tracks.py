@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Module to Reprice Tracks
+==============================
+
+Module for updating the unit price of tracks from a list of pricing rules. The rules are compiled into a single CASE
+based UPDATE, which is applied in chunks of track id ranges with a commit after every chunk, so concurrent purchases are
+never blocked for longer than one chunk. A deadlock or lock wait timeout replays the chunk it hit alone, the chunks
+already committed are never applied again
+
+This script requires the following modules be installed in the python environment
+    * logging - to perform logging operations
+    * collections - to define the pricing rule
+    * time - to time the repricing for the progress report
+
+This script contains the following
+    * PriceRule - named tuple describing the new price of the tracks matching all of its given criteria
+    * compile_price_rules - Function to compile the rules into the new price expression and the filter of the tracks
+    * reprice_tracks - Function to apply the rules chunk by chunk, or to count the affected tracks on a dry run
+"""
+# Standard Imports
+import logging
+import time
+from collections import namedtuple
+from decimal import Decimal
+
+# External imports
+import sqlalchemy.orm
+from sqlalchemy import and_, or_, case, func, select
+
+# User Imports
+import mservice.database_model as models
+from mservice.connections.retry import retry_transaction
+
+LOGGER = logging.getLogger(__name__)
+
+PriceRule = namedtuple("PriceRule", ["new_price", "genre_id", "media_type_id", "album_id", "artist_id", "min_price",
+                                     "max_price"], defaults=(None, None, None, None, None, None))
+PriceRule.__doc__ = """
+    Pricing rule, a track matches the rule when it matches every criteria which is not None, the price band being
+    inclusive on both ends. A rule without criteria matches every track. When several rules match a track the first
+    one in the list wins
+
+    :ivar new_price: The new unit price of the matching tracks
+    :ivar genre_id: The genre of the matching tracks
+    :ivar media_type_id: The media type of the matching tracks
+    :ivar album_id: The album of the matching tracks
+    :ivar artist_id: The artist of the album of the matching tracks
+    :ivar min_price: The lowest current unit price of the matching tracks
+    :ivar max_price: The highest current unit price of the matching tracks
+    """
+
+
+def _rule_condition(rule):
+    """
+    Function to build the condition selecting the tracks matched by a rule
+
+    :param rule: The pricing rule
+    :type rule: :class:`mservice.update_operation.reprice_tracks.PriceRule`
+
+    :return: condition
+    :rtype: :class:`sqlalchemy.sql.elements.ClauseElement`
+    """
+    track = models.TracksTable
+    criteria = []
+
+    if rule.genre_id is not None:
+        criteria.append(track.genre_id == rule.genre_id)
+
+    if rule.media_type_id is not None:
+        criteria.append(track.media_type_id == rule.media_type_id)
+
+    if rule.album_id is not None:
+        criteria.append(track.album_id == rule.album_id)
+
+    if rule.artist_id is not None:
+        criteria.append(track.album_id.in_(select(models.AlbumTable.album_id).
+                                           where(models.AlbumTable.artist_id == rule.artist_id)))
+
+    if rule.min_price is not None:
+        criteria.append(track.unit_price >= Decimal(str(rule.min_price)))
+
+    if rule.max_price is not None:
+        criteria.append(track.unit_price <= Decimal(str(rule.max_price)))
+
+    return and_(True, *criteria)
+
+
+def compile_price_rules(rules):
+    """
+    Function to compile the rules into the CASE expression giving the new price of a track, and the filter selecting the
+    tracks whose price changes
+
+    :param rules: The pricing rules, in order of precedence
+    :type rules: list
+
+    :return: new_price, condition
+    :rtype: tuple
+    """
+    if not rules or not all(issubclass(type(rule), PriceRule) for rule in rules):
+        raise AttributeError("rules should be a non empty list of 'PriceRule'")
+
+    conditions = [_rule_condition(rule) for rule in rules]
+
+    new_price = case(*[(condition, Decimal(str(rule.new_price))) for condition, rule in zip(conditions, rules)],
+                     else_=models.TracksTable.unit_price)
+
+    # Tracks already at their new price are left alone, so their rows are not locked
+    condition = and_(or_(*conditions), models.TracksTable.unit_price != new_price)
+    return new_price, condition
+
+
+@retry_transaction()
+def _reprice_chunk(session, low, high, new_price, condition):
+    """
+    Function to apply the new price to the matching tracks of a track id range and commit, replayed on its own when the
+    transaction fails with a retryable error
+
+    :return: updated - The number of tracks updated
+    :rtype: int
+    """
+    track = models.TracksTable
+
+    updated = session.query(track).filter(track.track_id.between(low, high), condition).\
+        update({track.unit_price: new_price, track.version_id: track.version_id + 1}, synchronize_session=False)
+    session.commit()
+
+    return updated
+
+
+def reprice_tracks(session, rules, chunk_size=1000, dry_run=False, progress=None):
+    """
+    Function to apply the pricing rules in chunks of track id ranges, committing after every chunk
+
+    :param session: The session to work with
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    :param rules: The pricing rules, in order of precedence
+    :type rules: list
+
+    :param chunk_size: The width of the track id range updated by each chunk
+    :type chunk_size: int
+
+    :param dry_run: If True nothing is updated, only the number of tracks whose price would change is counted
+    :type dry_run: bool
+
+    :param progress: Function called with the report after every chunk
+    :type progress: callable
+
+    :return: report - The number of chunks done and total, the rows updated (or matched on a dry run), the last track
+                      id covered and the elapsed seconds
+    :rtype: dict
+    """
+    if not issubclass(type(session), sqlalchemy.orm.session.Session):
+        raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
+
+    if not issubclass(type(chunk_size), int) or chunk_size < 1:
+        raise AttributeError("chunk size should be integer and greater than 0")
+
+    new_price, condition = compile_price_rules(rules)
+    track = models.TracksTable
+    started = time.perf_counter()
+
+    if dry_run:
+        matched_rows = session.query(func.count(track.track_id)).filter(condition).scalar()
+        session.rollback()
+
+        LOGGER.info("Dry Run: %s Tracks Would Be Repriced", matched_rows)
+        return {"chunks_done": 0, "chunks_total": 0, "rows_matched": matched_rows, "rows_updated": 0,
+                "last_track_id": None, "elapsed_seconds": time.perf_counter() - started}
+
+    first_id, last_id = session.query(func.min(track.track_id), func.max(track.track_id)).one()
+    session.rollback()
+
+    report = {"chunks_done": 0, "chunks_total": 0, "rows_matched": None, "rows_updated": 0, "last_track_id": None,
+              "elapsed_seconds": 0.0}
+
+    if first_id is None:
+        return report
+
+    report["chunks_total"] = (last_id - first_id) // chunk_size + 1
+
+    for low in range(first_id, last_id + 1, chunk_size):
+        high = min(low + chunk_size - 1, last_id)
+
+        updated = _reprice_chunk(session, low, high, new_price, condition)
+
+        report["chunks_done"] += 1
+        report["rows_updated"] += updated
+        report["last_track_id"] = high
+        report["elapsed_seconds"] = time.perf_counter() - started
+
+        LOGGER.debug("Repriced chunk %s of %s, %s tracks updated so far", report["chunks_done"],
+                     report["chunks_total"], report["rows_updated"])
+
+        if progress is not None:
+            progress(dict(report))
+
+    LOGGER.info("Repriced %s Tracks In %s Chunks", report["rows_updated"], report["chunks_done"])
+    return report
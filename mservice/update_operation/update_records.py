@@ -17,7 +17,7 @@ import logging
 # User Imports
 import sqlalchemy.orm
 
-import mservice.database_model as models
+from mservice.update_operation.reprice_tracks import PriceRule, reprice_tracks
 
 LOGGER = logging.getLogger(__name__)
 
@@ -37,9 +37,8 @@ def perform_update(session):
             raise AttributeError("session not passed correctly, should be of type 'sqlalchemy.orm.session.Session' ")
         LOGGER.info("Performing Update Operation")
 
-        session.query(models.TracksTable).update({models.TracksTable.unit_price: 0.99})
-
-        session.commit()
+        # Repricing every track in chunks, so purchases are never blocked for longer than one chunk
+        reprice_tracks(session, [PriceRule(new_price=0.99)])
     except AttributeError as err:
         LOGGER.error(err)
     finally:
@@ -32,6 +32,14 @@ def get_input_arguments():
     my_parser.add_argument('--password', action='store', type=str, required=True)
     my_parser.add_argument('--database', action='store', type=str, required=True)
     my_parser.add_argument('--number', action='store', type=int, required=False)
+    my_parser.add_argument('--snapshot', action='store', type=str, required=False, default='snapshot_store')
+    my_parser.add_argument('--workers', action='store', type=int, required=False, default=4)
+    my_parser.add_argument('--warehouse', action='store', type=str, required=False, default=None)
+    my_parser.add_argument('--dry_run', action='store_true', required=False)
+    my_parser.add_argument('--fact_table', action='store_true', required=False)
+    my_parser.add_argument('--sketches', action='store', type=str, required=False, default=None)
+    my_parser.add_argument('--from_snapshot', action='store_true', required=False)
+    my_parser.add_argument('--reconcile', action='store_true', required=False)
 
     args = my_parser.parse_args()
     return args